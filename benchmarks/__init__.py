@@ -0,0 +1,23 @@
+"""
+End-to-end benchmarks for LightRAG with stubbed models.
+
+Builds a synthetic corpus, inserts it with ainsert and runs aquery in every
+mode against the local storage backends, with deterministic LLM, embedding and
+rerank stubs that simulate model latency. The JSON report holds throughput,
+p50/p95/p99 latency and peak RSS per backend, so runs on two commits can be
+compared. See README.md for usage.
+"""
+
+from .corpus import Corpus, build_corpus
+from .report import compare_reports
+from .runner import BACKENDS, QUERY_MODES, BenchmarkConfig, run_benchmark
+
+__all__ = [
+    "BACKENDS",
+    "QUERY_MODES",
+    "BenchmarkConfig",
+    "Corpus",
+    "build_corpus",
+    "compare_reports",
+    "run_benchmark",
+]
@@ -0,0 +1,129 @@
+"""
+Command line entry point: python -m benchmarks [options]
+
+    python -m benchmarks --docs 50 --output before.json
+    python -m benchmarks --docs 50 --output after.json --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from .report import compare_reports, format_comparison
+from .runner import BACKENDS, QUERY_MODES, BenchmarkConfig, run_benchmark
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    defaults = BenchmarkConfig()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="End-to-end LightRAG benchmark with stubbed models",
+    )
+    parser.add_argument("--docs", type=int, default=defaults.num_docs)
+    parser.add_argument(
+        "--sentences",
+        type=int,
+        default=defaults.sentences_per_doc,
+        help="Sentences per document",
+    )
+    parser.add_argument("--entities", type=int, default=defaults.num_entities)
+    parser.add_argument(
+        "--queries", type=int, default=defaults.num_queries, help="Queries per mode"
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--insert-batch-size", type=int, default=defaults.insert_batch_size
+    )
+    parser.add_argument(
+        "--query-concurrency", type=int, default=defaults.query_concurrency
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=defaults.llm_latency,
+        help="Simulated seconds per LLM call",
+    )
+    parser.add_argument(
+        "--embedding-latency", type=float, default=defaults.embedding_latency
+    )
+    parser.add_argument("--rerank-latency", type=float, default=defaults.rerank_latency)
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS), default=defaults.backends
+    )
+    parser.add_argument(
+        "--modes", nargs="+", choices=list(QUERY_MODES), default=defaults.modes
+    )
+    parser.add_argument(
+        "--working-dir",
+        default=None,
+        help="Parent directory for the temporary working dirs",
+    )
+    parser.add_argument(
+        "--in-process", action="store_true", help="Do not spawn a process per backend"
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="Compare against an earlier JSON report"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change counted as a regression",
+    )
+    return parser.parse_args(argv)
+
+
+def _workload(report: dict) -> dict:
+    """The configuration of a report that decides what was measured"""
+    config = dict(report.get("meta", {}).get("config", {}))
+    config.pop("working_dir", None)
+    return config
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    config = BenchmarkConfig(
+        num_docs=args.docs,
+        sentences_per_doc=args.sentences,
+        num_entities=args.entities,
+        num_queries=args.queries,
+        seed=args.seed,
+        insert_batch_size=args.insert_batch_size,
+        query_concurrency=args.query_concurrency,
+        llm_latency=args.llm_latency,
+        embedding_latency=args.embedding_latency,
+        rerank_latency=args.rerank_latency,
+        backends=args.backends,
+        modes=args.modes,
+        working_dir=args.working_dir,
+        in_process=args.in_process,
+    )
+    report = run_benchmark(config)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if _workload(baseline) != _workload(report):
+            print(
+                "Warning: the baseline was run with a different configuration",
+                file=sys.stderr,
+            )
+        rows = compare_reports(baseline, report, args.threshold)
+        print(format_comparison(rows), file=sys.stderr)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Synthetic corpora for the benchmarks.
+
+Documents are made of sentences that name two entities, so the stub LLM can
+extract a graph from the text alone. Entity names look like `Korvan0042`: a
+capitalised syllable stem and a 4-digit number, matched by ENTITY_PATTERN.
+Entities are drawn from a Zipf-like distribution, which gives the graph the few
+highly connected hubs that real corpora have.
+
+The same seed and sizes always produce the same corpus and queries.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass, field
+
+ENTITY_PATTERN = re.compile(r"\b[A-Z][a-z]+\d{4}\b")
+
+_SYLLABLES = [
+    "ka",
+    "lo",
+    "vir",
+    "an",
+    "te",
+    "mos",
+    "ri",
+    "dun",
+    "sa",
+    "el",
+    "quo",
+    "bex",
+]
+_VERBS = [
+    "partners with",
+    "supplies",
+    "acquires a stake in",
+    "competes with",
+    "licenses technology to",
+    "audits",
+    "funds research at",
+    "shares a board member with",
+]
+_TOPICS = [
+    "energy",
+    "logistics",
+    "insurance",
+    "semiconductor",
+    "healthcare",
+    "agriculture",
+    "shipping",
+    "telecom",
+]
+_FILLERS = [
+    "Analysts expect the arrangement to last several years.",
+    "The terms were not disclosed.",
+    "Regulators reviewed the filing last quarter.",
+    "Both parties reported stable margins.",
+]
+
+
+@dataclass
+class Corpus:
+    documents: list[str]
+    doc_ids: list[str]
+    entities: list[str]
+    queries: list[str] = field(default_factory=list)
+
+    @property
+    def total_chars(self) -> int:
+        return sum(len(doc) for doc in self.documents)
+
+
+def _entity_names(rng: random.Random, count: int) -> list[str]:
+    names = []
+    for i in range(count):
+        stem = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3)))
+        names.append(f"{stem.capitalize()}{i:04d}")
+    return names
+
+
+def build_corpus(
+    num_docs: int = 20,
+    sentences_per_doc: int = 40,
+    num_entities: int = 200,
+    num_queries: int = 20,
+    seed: int = 0,
+) -> Corpus:
+    """Build a deterministic corpus of num_docs documents and num_queries queries"""
+    if num_entities < 2:
+        raise ValueError("num_entities must be at least 2")
+    rng = random.Random(seed)
+    entities = _entity_names(rng, num_entities)
+
+    def pick_entity() -> str:
+        # Pareto ranks: low ranks, the hubs, are drawn far more often
+        rank = int(rng.paretovariate(1.2)) - 1
+        return entities[rank % num_entities]
+
+    documents = []
+    for _ in range(num_docs):
+        sentences = []
+        for _ in range(sentences_per_doc):
+            source = pick_entity()
+            target = pick_entity()
+            while target == source:
+                target = rng.choice(entities)
+            sentence = (
+                f"{source} {rng.choice(_VERBS)} {target} "
+                f"in the {rng.choice(_TOPICS)} sector."
+            )
+            if rng.random() < 0.3:
+                sentence += " " + rng.choice(_FILLERS)
+            sentences.append(sentence)
+        documents.append(" ".join(sentences))
+
+    queries = []
+    for i in range(num_queries):
+        source, target = rng.sample(entities[: max(2, num_entities // 4)], 2)
+        topic = rng.choice(_TOPICS)
+        # The index keeps the queries distinct, so the LLM cache is not hit
+        queries.append(
+            f"How is {source} connected to {target} in the {topic} sector? (q{i})"
+        )
+
+    return Corpus(
+        documents=documents,
+        doc_ids=[f"bench-doc-{i:05d}" for i in range(num_docs)],
+        entities=entities,
+        queries=queries,
+    )
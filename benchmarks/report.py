@@ -0,0 +1,121 @@
+"""
+Latency statistics, peak RSS and comparison of two benchmark reports.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from typing import Any, Iterator, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """q-th percentile of values with linear interpolation, as numpy computes it"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_stats(latencies: Sequence[float], wall_seconds: float, items: int) -> dict:
+    """Throughput of items over the wall time and latency percentiles in ms"""
+    return {
+        "operations": len(latencies),
+        "items": items,
+        "wall_seconds": round(wall_seconds, 4),
+        "throughput_per_s": round(items / wall_seconds, 3) if wall_seconds else 0.0,
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 3)
+        if latencies
+        else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 50), 3),
+        "p95_ms": round(1000 * percentile(latencies, 95), 3),
+        "p99_ms": round(1000 * percentile(latencies, 99), 3),
+        "max_ms": round(1000 * max(latencies), 3) if latencies else 0.0,
+    }
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MiB, None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / scale, 2)
+
+
+# Metric name -> True when higher values are better
+_COMPARED_METRICS = {
+    "throughput_per_s": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def _flatten(report: dict[str, Any]) -> Iterator[tuple[str, str, float]]:
+    for result in report.get("results", []):
+        if result.get("status") != "ok":
+            continue
+        backend = result["backend"]
+        phases = {"insert": result["insert"]}
+        phases.update(
+            (f"query/{mode}", stats) for mode, stats in result["query"].items()
+        )
+        for phase, stats in phases.items():
+            for metric in _COMPARED_METRICS:
+                if stats.get(metric) is not None:
+                    yield f"{backend}/{phase}", metric, stats[metric]
+        if result.get("peak_rss_mb") is not None:
+            yield backend, "peak_rss_mb", result["peak_rss_mb"]
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.1
+) -> list[dict[str, Any]]:
+    """Rows comparing the metrics present in both reports
+
+    A row is flagged as a regression when the metric got worse by more than
+    threshold, a fraction of the baseline value.
+    """
+    base_values = {(key, metric): value for key, metric, value in _flatten(baseline)}
+    rows = []
+    for key, metric, value in _flatten(current):
+        base = base_values.get((key, metric))
+        if base is None:
+            continue
+        change = (value - base) / base if base else 0.0
+        worse = -change if _COMPARED_METRICS[metric] else change
+        rows.append(
+            {
+                "name": key,
+                "metric": metric,
+                "baseline": base,
+                "current": value,
+                "change": round(change, 4),
+                "regression": worse > threshold,
+            }
+        )
+    return rows
+
+
+def format_comparison(rows: list[dict[str, Any]]) -> str:
+    lines = [
+        f"{'name':<40} {'metric':<18} {'baseline':>12} {'current':>12} {'change':>8}"
+    ]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['name']:<40} {row['metric']:<18} {row['baseline']:>12.3f} "
+            f"{row['current']:>12.3f} {row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,235 @@
+"""
+Runs the insert and query workloads against each local storage backend.
+
+Each backend runs in a fresh spawned process by default, so the peak RSS of a
+report belongs to that backend alone and no shared storage state leaks from
+one run into the next.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Any
+
+from .corpus import build_corpus
+from .report import latency_stats, peak_rss_mb
+from .stubs import StubModels, WordTokenizer
+
+_JSON_STORAGES = {
+    "kv_storage": "JsonKVStorage",
+    "graph_storage": "NetworkXStorage",
+    "doc_status_storage": "JsonDocStatusStorage",
+}
+
+BACKENDS: dict[str, dict[str, str]] = {
+    "json-nano-networkx": {**_JSON_STORAGES, "vector_storage": "NanoVectorDBStorage"},
+    "json-faiss-networkx": {**_JSON_STORAGES, "vector_storage": "FaissVectorDBStorage"},
+}
+
+# Modules a backend needs; the backend is skipped when one is not installed
+BACKEND_MODULES: dict[str, list[str]] = {
+    "json-faiss-networkx": ["faiss"],
+}
+
+QUERY_MODES = ("local", "global", "hybrid", "naive", "mix", "bypass")
+
+
+@dataclass
+class BenchmarkConfig:
+    num_docs: int = 20
+    sentences_per_doc: int = 40
+    num_entities: int = 200
+    num_queries: int = 20
+    seed: int = 0
+    insert_batch_size: int = 1
+    """Documents per ainsert call; insert latencies are measured per call"""
+    query_concurrency: int = 1
+    llm_latency: float = 0.02
+    embedding_latency: float = 0.005
+    rerank_latency: float = 0.005
+    embedding_dim: int = 64
+    backends: list[str] = field(default_factory=lambda: list(BACKENDS))
+    modes: list[str] = field(default_factory=lambda: list(QUERY_MODES))
+    working_dir: str | None = None
+    """Parent of the temporary working directories, the system temp dir if None"""
+    in_process: bool = False
+    """Run the backends in this process; peak RSS then covers all runs so far"""
+
+
+def missing_modules(backend: str) -> list[str]:
+    return [
+        module
+        for module in BACKEND_MODULES.get(backend, [])
+        if importlib.util.find_spec(module) is None
+    ]
+
+
+async def _run_backend(backend: str, config: BenchmarkConfig) -> dict[str, Any]:
+    from lightrag import LightRAG, QueryParam
+    from lightrag.kg.shared_storage import finalize_share_data
+    from lightrag.utils import EmbeddingFunc, Tokenizer
+
+    corpus = build_corpus(
+        num_docs=config.num_docs,
+        sentences_per_doc=config.sentences_per_doc,
+        num_entities=config.num_entities,
+        num_queries=config.num_queries,
+        seed=config.seed,
+    )
+    stubs = StubModels(
+        llm_latency=config.llm_latency,
+        embedding_latency=config.embedding_latency,
+        rerank_latency=config.rerank_latency,
+        embedding_dim=config.embedding_dim,
+    )
+    llm_func, embedding_func, rerank_func = stubs.functions()
+    result: dict[str, Any] = {
+        "backend": backend,
+        "status": "ok",
+        "storages": BACKENDS[backend],
+        "peak_rss_mb_start": peak_rss_mb(),
+    }
+
+    with tempfile.TemporaryDirectory(
+        prefix="lightrag-bench-", dir=config.working_dir
+    ) as working_dir:
+        finalize_share_data()
+        rag = LightRAG(
+            working_dir=working_dir,
+            llm_model_func=llm_func,
+            embedding_func=EmbeddingFunc(
+                embedding_dim=config.embedding_dim,
+                max_token_size=8192,
+                func=embedding_func,
+            ),
+            tokenizer=Tokenizer("bench-word-tokenizer", WordTokenizer()),
+            rerank_model_func=rerank_func,
+            entity_extract_max_gleaning=0,
+            # Hashed bag-of-words vectors have low similarities
+            cosine_better_than_threshold=0.05,
+            **BACKENDS[backend],
+        )
+        await rag.initialize_storages()
+        try:
+            latencies = []
+            started = time.perf_counter()
+            for start in range(0, config.num_docs, config.insert_batch_size):
+                stop = start + config.insert_batch_size
+                call_started = time.perf_counter()
+                await rag.ainsert(
+                    corpus.documents[start:stop], ids=corpus.doc_ids[start:stop]
+                )
+                latencies.append(time.perf_counter() - call_started)
+            insert = latency_stats(
+                latencies, time.perf_counter() - started, config.num_docs
+            )
+            insert["chars_per_s"] = (
+                round(corpus.total_chars / insert["wall_seconds"], 1)
+                if insert["wall_seconds"]
+                else 0.0
+            )
+            insert["status_counts"] = await rag.doc_status.get_status_counts()
+            insert["graph_nodes"] = len(
+                await rag.chunk_entity_relation_graph.get_all_labels()
+            )
+            insert["peak_rss_mb"] = peak_rss_mb()
+            result["insert"] = insert
+
+            semaphore = asyncio.Semaphore(config.query_concurrency)
+
+            async def timed_query(query: str, mode: str) -> tuple[float, bool]:
+                async with semaphore:
+                    call_started = time.perf_counter()
+                    # aquery_llm reports failures that aquery turns into text
+                    response = await rag.aquery_llm(query, param=QueryParam(mode=mode))
+                    latency = time.perf_counter() - call_started
+                    return latency, response.get("status") == "success"
+
+            result["query"] = {}
+            for mode in config.modes:
+                started = time.perf_counter()
+                timings = await asyncio.gather(
+                    *(timed_query(query, mode) for query in corpus.queries)
+                )
+                stats = latency_stats(
+                    [latency for latency, _ in timings],
+                    time.perf_counter() - started,
+                    len(timings),
+                )
+                stats["failures"] = sum(1 for _, ok in timings if not ok)
+                result["query"][mode] = stats
+        finally:
+            await rag.finalize_storages()
+            finalize_share_data()
+
+    result["model_calls"] = dict(stubs.calls)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_backend(backend: str, config: BenchmarkConfig) -> dict[str, Any]:
+    """Benchmark one backend, or report why it was skipped"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, choose from {list(BACKENDS)}")
+    missing = missing_modules(backend)
+    if missing:
+        return {
+            "backend": backend,
+            "status": "skipped",
+            "reason": f"missing modules: {', '.join(missing)}",
+        }
+    for name in ("lightrag", "nano-vectordb"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    return asyncio.run(_run_backend(backend, config))
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(config: BenchmarkConfig) -> dict[str, Any]:
+    """Run every configured backend and return the report"""
+    from lightrag import __version__
+
+    results = []
+    for backend in config.backends:
+        if config.in_process:
+            results.append(run_backend(backend, config))
+            continue
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=get_context("spawn")
+        ) as pool:
+            results.append(pool.submit(run_backend, backend, config).result())
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "lightrag_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": asdict(config),
+        },
+        "results": results,
+    }
@@ -0,0 +1,177 @@
+"""
+Deterministic stand-ins for the LLM, embedding and rerank models.
+
+The stubs answer from the prompt alone, so a run does the same storage work
+every time, and sleep for a fixed simulated latency per call instead of waiting
+on a model server. With the latencies set to zero a run measures LightRAG and
+the storages only.
+
+- The LLM extracts every entity named in the input text (see corpus.py) and a
+  relation for each sentence naming two of them, answers keyword extraction
+  with the entity names of the query, and returns a short canned text for
+  summaries and answers.
+- Embeddings hash the words of a text into a normalized bag-of-words vector, so
+  texts sharing names are close and vector search returns meaningful results.
+- Rerank scores a document by the share of query words it contains.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from lightrag.prompt import PROMPTS
+
+from .corpus import ENTITY_PATTERN
+
+_INPUT_TEXT = re.compile(r"<Input Text>\n```\n(.*?)\n```", re.DOTALL)
+_SUMMARY_NAME = re.compile(r"Name: (.+)")
+_WORD = re.compile(r"\w+")
+_ENTITY_TYPES = ["organization", "person", "location", "product", "event"]
+
+
+class WordTokenizer:
+    """Whitespace tokenizer with a growing vocabulary, no model download needed"""
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._words: list[str] = []
+
+    def encode(self, content: str) -> list[int]:
+        tokens = []
+        for word in content.split():
+            token = self._ids.get(word)
+            if token is None:
+                token = self._ids[word] = len(self._words)
+                self._words.append(word)
+            tokens.append(token)
+        return tokens
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join(self._words[token] for token in tokens)
+
+
+def _entity_type(name: str) -> str:
+    return _ENTITY_TYPES[zlib.crc32(name.encode()) % len(_ENTITY_TYPES)]
+
+
+def extraction_result(text: str) -> str:
+    """Entity and relation records for the names in text, in the prompt format"""
+    delimiter = PROMPTS["DEFAULT_TUPLE_DELIMITER"]
+    entities: dict[str, str] = {}
+    relations: dict[tuple[str, str], str] = {}
+    for sentence in text.split("."):
+        names = ENTITY_PATTERN.findall(sentence)
+        sentence = sentence.strip()
+        for name in names:
+            entities.setdefault(name, sentence)
+        if len(names) >= 2 and names[0] != names[1]:
+            relations.setdefault((names[0], names[1]), sentence)
+
+    lines = [
+        delimiter.join(
+            ["entity", name, _entity_type(name), f"{name} is mentioned: {sentence}."]
+        )
+        for name, sentence in entities.items()
+    ]
+    lines.extend(
+        delimiter.join(["relation", source, target, "business", f"{sentence}."])
+        for (source, target), sentence in relations.items()
+    )
+    lines.append(PROMPTS["DEFAULT_COMPLETION_DELIMITER"])
+    return "\n".join(lines)
+
+
+@dataclass
+class StubModels:
+    """Fake model functions sharing call counters and simulated latencies"""
+
+    llm_latency: float = 0.0
+    embedding_latency: float = 0.0
+    rerank_latency: float = 0.0
+    embedding_dim: int = 64
+    calls: dict[str, int] = field(
+        default_factory=lambda: {"llm": 0, "embedding": 0, "rerank": 0}
+    )
+
+    def functions(self) -> tuple[Callable, Callable, Callable]:
+        """The llm, embedding and rerank functions to hand to LightRAG
+
+        Plain functions rather than bound methods: LightRAG deep-copies its
+        config, which would copy a bound method together with its instance and
+        its call counters.
+        """
+
+        async def llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+            return await self.llm(prompt, system_prompt, history_messages, **kwargs)
+
+        async def embed(texts: list[str]) -> np.ndarray:
+            return await self.embed(texts)
+
+        async def rerank(query: str, documents: list[str], top_n=None, **kwargs):
+            return await self.rerank(query, documents, top_n, **kwargs)
+
+        return llm, embed, rerank
+
+    async def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def llm(
+        self, prompt, system_prompt=None, history_messages=None, **kwargs
+    ) -> str:
+        self.calls["llm"] += 1
+        await self._sleep(self.llm_latency)
+
+        if kwargs.get("keyword_extraction"):
+            query = prompt.rsplit("User Query:", 1)[-1]
+            names = sorted(set(ENTITY_PATTERN.findall(query)))
+            topics = [w for w in _WORD.findall(query) if w.islower() and len(w) > 5]
+            return json.dumps(
+                {"high_level_keywords": topics[:3], "low_level_keywords": names}
+            )
+
+        match = _INPUT_TEXT.search(prompt)
+        if match:
+            return extraction_result(match.group(1))
+        if "Based on the last extraction task" in prompt:
+            # Gleaning finds nothing the first pass missed
+            return PROMPTS["DEFAULT_COMPLETION_DELIMITER"]
+        if "Description List:" in prompt:
+            match = _SUMMARY_NAME.search(prompt)
+            subject = match.group(1).strip() if match else "The entity"
+            return f"{subject} is active in several business relationships."
+        return "The context describes the requested relationships."
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        self.calls["embedding"] += 1
+        await self._sleep(self.embedding_latency)
+
+        vectors = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.embedding_dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    async def rerank(
+        self, query: str, documents: list[str], top_n: int | None = None, **kwargs
+    ) -> list[dict]:
+        self.calls["rerank"] += 1
+        await self._sleep(self.rerank_latency)
+
+        query_words = set(_WORD.findall(query.lower()))
+        results = []
+        for index, document in enumerate(documents):
+            words = set(_WORD.findall(document.lower()))
+            score = len(query_words & words) / max(1, len(query_words))
+            results.append({"index": index, "relevance_score": score})
+        results.sort(key=lambda r: (-r["relevance_score"], r["index"]))
+        return results[:top_n] if top_n else results
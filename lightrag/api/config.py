@@ -41,6 +41,7 @@ from lightrag.constants import (
     DEFAULT_OLLAMA_MODEL_TAG,
     DEFAULT_RERANK_BINDING,
     DEFAULT_ENTITY_TYPES,
+    DEFAULT_DELETE_BATCH_SIZE,
 )
 
 # use the .env that is inside the current folder
@@ -254,7 +255,7 @@ def parse_args() -> argparse.Namespace:
         "--rerank-binding",
         type=str,
         default=get_env_value("RERANK_BINDING", DEFAULT_RERANK_BINDING),
-        choices=["null", "cohere", "jina", "aliyun"],
+        choices=["null", "cohere", "jina", "aliyun", "local"],
         help=f"Rerank binding type (default: from env or {DEFAULT_RERANK_BINDING})",
     )
 
@@ -343,6 +344,11 @@ def parse_args() -> argparse.Namespace:
     # Get MAX_PARALLEL_INSERT from environment
     args.max_parallel_insert = get_env_value("MAX_PARALLEL_INSERT", 2, int)
 
+    # Documents deleted per consolidated graph rebuild
+    args.delete_batch_size = get_env_value(
+        "DELETE_BATCH_SIZE", DEFAULT_DELETE_BATCH_SIZE, int
+    )
+
     # Get MAX_GRAPH_NODES from environment
     args.max_graph_nodes = get_env_value("MAX_GRAPH_NODES", 1000, int)
 
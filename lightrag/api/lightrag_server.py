@@ -4,7 +4,7 @@ LightRAG FastAPI Server
 
 from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.openapi.docs import (
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
@@ -19,6 +19,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 from pathlib import Path
 import configparser
+from dataclasses import asdict
 from ascii_colors import ASCIIColors
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -34,7 +35,7 @@ from .config import (
     get_default_host,
 )
 from lightrag.utils import get_env_value
-from lightrag import LightRAG, __version__ as core_version
+from lightrag import LightRAG, QueryParam, __version__ as core_version
 from lightrag.api import __api_version__
 from lightrag.types import GPTKeywordExtractionFormat
 from lightrag.utils import EmbeddingFunc
@@ -44,6 +45,12 @@ from lightrag.constants import (
     DEFAULT_LOG_FILENAME,
     DEFAULT_LLM_TIMEOUT,
     DEFAULT_EMBEDDING_TIMEOUT,
+    DEFAULT_LOCAL_RERANK_BACKEND,
+    DEFAULT_LOCAL_RERANK_MAX_LENGTH,
+    DEFAULT_LOCAL_RERANK_BATCH_SIZE,
+    DEFAULT_LOCAL_RERANK_BATCH_WAIT_MS,
+    DEFAULT_LOCAL_RERANK_MAX_WORKERS,
+    DEFAULT_LOCAL_RERANK_CACHE_SIZE,
 )
 from lightrag.api.routers.document_routes import (
     DocumentManager,
@@ -53,15 +60,16 @@ from lightrag.api.routers.query_routes import create_query_routes
 from lightrag.api.routers.graph_routes import create_graph_routes
 from lightrag.api.routers.ollama_api import OllamaAPI
 
+from lightrag.utils import logger, set_verbose_debug
+from lightrag.metrics import render_metrics
+
 # Performance optimizations
 try:
-    from optimizations import CachedLightRAG, SmartReranker, QueryClassifier
+    from optimizations import CachedLightRAG
     OPTIMIZATIONS_AVAILABLE = True
 except ImportError:
     OPTIMIZATIONS_AVAILABLE = False
     logger.warning("Performance optimizations not available. Install dependencies: pip install cachetools redis")
-
-from lightrag.utils import logger, set_verbose_debug
 from lightrag.kg.shared_storage import (
     get_namespace_data,
     get_default_workspace,
@@ -984,13 +992,19 @@ def create_app(args):
     # Configure rerank function based on args.rerank_bindingparameter
     rerank_model_func = None
     if args.rerank_binding != "null":
-        from lightrag.rerank import cohere_rerank, jina_rerank, ali_rerank
+        from lightrag.rerank import (
+            cohere_rerank,
+            jina_rerank,
+            ali_rerank,
+            local_rerank,
+        )
 
         # Map rerank binding to corresponding function
         rerank_functions = {
             "cohere": cohere_rerank,
             "jina": jina_rerank,
             "aliyun": ali_rerank,
+            "local": local_rerank,
         }
 
         # Select the appropriate rerank function based on binding
@@ -1015,10 +1029,46 @@ def create_app(args):
                 if default_base_url != inspect.Parameter.empty:
                     args.rerank_binding_host = default_base_url
 
+        # Local cross-encoder settings are resolved once at startup
+        local_rerank_kwargs = {}
+        if args.rerank_binding == "local":
+            local_rerank_kwargs = {
+                "backend": get_env_value(
+                    "LOCAL_RERANK_BACKEND", DEFAULT_LOCAL_RERANK_BACKEND
+                ),
+                "max_length": get_env_value(
+                    "LOCAL_RERANK_MAX_LENGTH", DEFAULT_LOCAL_RERANK_MAX_LENGTH, int
+                ),
+                "batch_size": get_env_value(
+                    "LOCAL_RERANK_BATCH_SIZE", DEFAULT_LOCAL_RERANK_BATCH_SIZE, int
+                ),
+                "batch_wait_ms": get_env_value(
+                    "LOCAL_RERANK_BATCH_WAIT_MS",
+                    DEFAULT_LOCAL_RERANK_BATCH_WAIT_MS,
+                    float,
+                ),
+                "max_workers": get_env_value(
+                    "LOCAL_RERANK_MAX_WORKERS", DEFAULT_LOCAL_RERANK_MAX_WORKERS, int
+                ),
+                "cache_size": get_env_value(
+                    "LOCAL_RERANK_CACHE_SIZE", DEFAULT_LOCAL_RERANK_CACHE_SIZE, int
+                ),
+            }
+
         async def server_rerank_func(
             query: str, documents: list, top_n: int = None, extra_body: dict = None
         ):
             """Server rerank function with configuration from environment variables"""
+            if args.rerank_binding == "local":
+                # In-process cross-encoder: no endpoint or API key involved
+                return await local_rerank(
+                    query=query,
+                    documents=documents,
+                    top_n=top_n,
+                    model=args.rerank_model,
+                    **local_rerank_kwargs,
+                )
+
             # Prepare kwargs for rerank function
             kwargs = {
                 "query": query,
@@ -1095,27 +1145,33 @@ def create_app(args):
         logger.error(f"Failed to initialize LightRAG: {e}")
         raise
 
+    # Adaptive query planning is part of the core and follows ENABLE_QUERY_PLANNER.
+    # The legacy ENABLE_SMART_RERANKING switch only turns it on when set explicitly
+    # and ENABLE_QUERY_PLANNER is not set
+    if (
+        os.getenv("ENABLE_QUERY_PLANNER") is None
+        and os.getenv("ENABLE_SMART_RERANKING", "").lower() == "true"
+    ):
+        rag.query_planner.config["enabled"] = True
+    if rag.query_planner.config.get("enabled"):
+        logger.info(
+            "Adaptive query planner enabled: query modes local/global/hybrid/mix "
+            "may be answered with naive retrieval"
+        )
+
     # Initialize performance optimizations
     cached_rag = None
-    smart_reranker = None
-    query_classifier = None
 
     if OPTIMIZATIONS_AVAILABLE:
         try:
             # Check if optimizations are enabled via environment variables
             enable_cache = os.getenv("ENABLE_CACHE", "true").lower() == "true"
-            enable_smart_reranking = os.getenv("ENABLE_SMART_RERANKING", "true").lower() == "true"
             enable_redis = os.getenv("ENABLE_REDIS_CACHE", "false").lower() == "true"
 
             if enable_cache:
                 cached_rag = CachedLightRAG(rag, enable_redis=enable_redis)
                 logger.info(f"✅ Multi-level caching enabled (Redis: {enable_redis})")
 
-            if enable_smart_reranking:
-                smart_reranker = SmartReranker(rag)
-                query_classifier = QueryClassifier()
-                logger.info("✅ Smart reranking enabled")
-
         except Exception as e:
             logger.warning(f"Failed to initialize optimizations: {e}")
             logger.warning("Continuing without optimizations...")
@@ -1135,7 +1191,6 @@ def create_app(args):
             api_key,
             args.top_k,
             cached_rag=cached_rag,
-            smart_reranker=smart_reranker
         )
     )
     app.include_router(create_graph_routes(rag, api_key))
@@ -1342,6 +1397,19 @@ def create_app(args):
             logger.error(f"Error getting health status: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get(
+        "/metrics",
+        dependencies=[Depends(combined_auth)],
+        summary="Prometheus metrics",
+        description="Query stage and ingestion stage latency histograms, priority queue depth and wait time, cache lookups and LLM token counts in the Prometheus text format. Values are per worker process.",
+        response_class=PlainTextResponse,
+    )
+    async def get_metrics():
+        """Expose in-process metrics for Prometheus scraping"""
+        return PlainTextResponse(
+            render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
     # Performance optimization monitoring endpoints
     @app.get(
         "/optimizations/cache/stats",
@@ -1370,23 +1438,13 @@ def create_app(args):
     @app.get(
         "/optimizations/reranking/stats",
         dependencies=[Depends(combined_auth)],
-        summary="Get smart reranking statistics",
-        description="Returns query complexity distribution and time savings"
+        summary="Get query planner statistics",
+        description="Returns query complexity distribution, skipped reranks and mode changes"
     )
     async def get_reranking_stats():
-        """Get smart reranking statistics"""
-        if not OPTIMIZATIONS_AVAILABLE or smart_reranker is None:
-            return {
-                "enabled": False,
-                "message": "Smart reranking is not enabled"
-            }
-
+        """Get adaptive query planner statistics"""
         try:
-            stats = smart_reranker.get_stats()
-            return {
-                "enabled": True,
-                **stats
-            }
+            return rag.query_planner.get_stats()
         except Exception as e:
             logger.error(f"Error getting reranking stats: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -1395,21 +1453,22 @@ def create_app(args):
         "/optimizations/query/classify",
         dependencies=[Depends(combined_auth)],
         summary="Classify query complexity",
-        description="Analyzes query and returns complexity classification"
+        description="Runs the query planner without executing the query and returns its plan"
     )
-    async def classify_query_complexity(query: str):
-        """Classify query complexity for debugging"""
-        if not OPTIMIZATIONS_AVAILABLE or query_classifier is None:
-            return {
-                "enabled": False,
-                "message": "Query classifier is not enabled"
-            }
-
+    async def classify_query_complexity(query: str, mode: str = "mix"):
+        """Explain the query plan for debugging"""
         try:
-            result = query_classifier.explain_classification(query)
+            _, plan = await rag.query_planner.explain(
+                query.strip(),
+                QueryParam(mode=mode, top_k=args.top_k),
+                asdict(rag),
+                chunks_vdb=rag.chunks_vdb,
+                hashing_kv=rag.llm_response_cache,
+            )
             return {
-                "enabled": True,
-                **result
+                "enabled": rag.query_planner.enabled,
+                "query": query,
+                **plan.to_dict(),
             }
         except Exception as e:
             logger.error(f"Error classifying query: {str(e)}")
@@ -1426,7 +1485,7 @@ def create_app(args):
         return {
             "optimizations_available": OPTIMIZATIONS_AVAILABLE,
             "cache_enabled": cached_rag is not None,
-            "smart_reranking_enabled": smart_reranker is not None,
+            "smart_reranking_enabled": rag.query_planner.enabled,
             "redis_cache_enabled": os.getenv("ENABLE_REDIS_CACHE", "false").lower() == "true",
             "configuration": {
                 "ENABLE_CACHE": os.getenv("ENABLE_CACHE", "true"),
@@ -1805,6 +1805,8 @@ async def background_delete_documents(
     )
 
     total_docs = len(doc_ids)
+    batch_size = max(1, global_args.delete_batch_size)
+    total_batches = (total_docs + batch_size - 1) // batch_size
     successful_deletions = []
     failed_deletions = []
 
@@ -1818,11 +1820,11 @@ async def background_delete_documents(
         pipeline_status.update(
             {
                 "busy": True,
-                # Job name can not be changed, it's verified in adelete_by_doc_id()
+                # Job name can not be changed, it's verified in adelete_by_doc_ids()
                 "job_name": f"Deleting {total_docs} Documents",
                 "job_start": datetime.now().isoformat(),
                 "docs": total_docs,
-                "batchs": total_docs,
+                "batchs": total_batches,
                 "cur_batch": 0,
                 "latest_message": "Starting document deletion process",
             }
@@ -1834,33 +1836,56 @@ async def background_delete_documents(
                 "LLM cache cleanup requested for this deletion job"
             )
 
+    batch_results: Dict[str, DeletionResult] = {}
     try:
-        # Loop through each document ID and delete them one by one
+        # Documents are deleted in batches so entities shared between them are
+        # rebuilt once per batch; results are then reported document by document
         for i, doc_id in enumerate(doc_ids, 1):
-            # Check for cancellation at the start of each document deletion
-            async with pipeline_status_lock:
-                if pipeline_status.get("cancellation_requested", False):
-                    cancel_msg = f"Deletion cancelled by user at document {i}/{total_docs}. {len(successful_deletions)} deleted, {total_docs - i + 1} remaining."
-                    logger.info(cancel_msg)
-                    pipeline_status["latest_message"] = cancel_msg
-                    pipeline_status["history_messages"].append(cancel_msg)
-                    # Add remaining documents to failed list with cancellation reason
-                    failed_deletions.extend(
-                        doc_ids[i - 1 :]
-                    )  # i-1 because enumerate starts at 1
-                    break  # Exit the loop, remaining documents unchanged
-
-                start_msg = f"Deleting document {i}/{total_docs}: {doc_id}"
-                logger.info(start_msg)
-                pipeline_status["cur_batch"] = i
-                pipeline_status["latest_message"] = start_msg
-                pipeline_status["history_messages"].append(start_msg)
+            if (i - 1) % batch_size == 0:
+                batch = doc_ids[i - 1 : i - 1 + batch_size]
+                # Check for cancellation at the start of each batch
+                async with pipeline_status_lock:
+                    if pipeline_status.get("cancellation_requested", False):
+                        cancel_msg = f"Deletion cancelled by user at document {i}/{total_docs}. {len(successful_deletions)} deleted, {total_docs - i + 1} remaining."
+                        logger.info(cancel_msg)
+                        pipeline_status["latest_message"] = cancel_msg
+                        pipeline_status["history_messages"].append(cancel_msg)
+                        # Add remaining documents to failed list with cancellation reason
+                        failed_deletions.extend(
+                            doc_ids[i - 1 :]
+                        )  # i-1 because enumerate starts at 1
+                        break  # Exit the loop, remaining documents unchanged
+
+                    start_msg = (
+                        f"Deleting documents {i}-{i + len(batch) - 1}/{total_docs}"
+                    )
+                    logger.info(start_msg)
+                    pipeline_status["cur_batch"] = (i - 1) // batch_size + 1
+                    pipeline_status["latest_message"] = start_msg
+                    pipeline_status["history_messages"].append(start_msg)
+
+                try:
+                    batch_results = {
+                        result.doc_id: result
+                        for result in await rag.adelete_by_doc_ids(
+                            batch, delete_llm_cache=delete_llm_cache
+                        )
+                    }
+                except Exception as e:
+                    logger.error(traceback.format_exc())
+                    batch_results = {
+                        batch_doc_id: DeletionResult(
+                            status="fail",
+                            doc_id=batch_doc_id,
+                            message=str(e),
+                            status_code=500,
+                        )
+                        for batch_doc_id in batch
+                    }
 
             file_path = "#"
             try:
-                result = await rag.adelete_by_doc_id(
-                    doc_id, delete_llm_cache=delete_llm_cache
-                )
+                result = batch_results[doc_id]
                 file_path = (
                     getattr(result, "file_path", "-") if "result" in locals() else "-"
                 )
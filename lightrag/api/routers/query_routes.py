@@ -3,11 +3,17 @@ This module contains all query-related routes for the LightRAG API.
 """
 
 import json
+import time
+from contextlib import aclosing
 from typing import Any, Dict, List, Literal, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from lightrag.base import QueryParam
 from lightrag.api.utils_api import get_combined_auth_dependency
-from lightrag.utils import logger
+from lightrag.constants import (
+    DEFAULT_STREAM_COALESCE_CHARS,
+    DEFAULT_STREAM_COALESCE_MS,
+)
+from lightrag.utils import get_env_value, logger
 from pydantic import BaseModel, Field, field_validator
 
 router = APIRouter(tags=["query"])
@@ -110,6 +116,11 @@ class QueryRequest(BaseModel):
         description="If True, enables streaming output for real-time responses. Only affects /query/stream endpoint.",
     )
 
+    include_metrics: Optional[bool] = Field(
+        default=False,
+        description="If True, /query/stream ends a streaming response with a metrics line (time to first byte, time to first token, total time).",
+    )
+
     @field_validator("query", mode="after")
     @classmethod
     def query_strip_after(cls, query: str) -> str:
@@ -134,7 +145,8 @@ class QueryRequest(BaseModel):
         # Use Pydantic's `.model_dump(exclude_none=True)` to remove None values automatically
         # Exclude API-level parameters that don't belong in QueryParam
         request_data = self.model_dump(
-            exclude_none=True, exclude={"query", "include_chunk_content"}
+            exclude_none=True,
+            exclude={"query", "include_chunk_content", "include_metrics"},
         )
 
         # Ensure `mode` and `stream` are set explicitly
@@ -195,7 +207,6 @@ def create_query_routes(
     api_key: Optional[str] = None,
     top_k: int = 60,
     cached_rag = None,
-    smart_reranker = None
 ):
     """
     Create query routes with optional performance optimizations
@@ -205,13 +216,19 @@ def create_query_routes(
         api_key: API key for authentication
         top_k: Default top-k value for queries
         cached_rag: Optional CachedLightRAG wrapper for multi-level caching
-        smart_reranker: Optional SmartReranker for complexity-based reranking
     """
     combined_auth = get_combined_auth_dependency(api_key)
 
     # Use optimized versions if available, otherwise fall back to base rag
     rag_instance = cached_rag if cached_rag is not None else rag
-    use_smart_reranking = smart_reranker is not None
+
+    # Server-side coalescing of streamed LLM chunks (0 disables)
+    stream_coalesce_chars = get_env_value(
+        "STREAM_COALESCE_CHARS", DEFAULT_STREAM_COALESCE_CHARS, int
+    )
+    stream_coalesce_ms = get_env_value(
+        "STREAM_COALESCE_MS", DEFAULT_STREAM_COALESCE_MS, float
+    )
 
     @router.post(
         "/query",
@@ -553,7 +570,7 @@ def create_query_routes(
             },
         },
     )
-    async def query_text_stream(request: QueryRequest):
+    async def query_text_stream(request: QueryRequest, http_request: Request):
         """
         Advanced RAG query endpoint with flexible streaming response.
 
@@ -566,8 +583,17 @@ def create_query_routes(
         - First line: `{"references": [...]}` (if include_references=True)
         - Subsequent lines: `{"response": "content chunk"}`
         - Error handling: `{"error": "error message"}`
+        - Last line (if include_metrics=True): `{"metrics": {...}}` with time_to_first_byte,
+          time_to_context, time_to_first_token and total_time in seconds
+
+        In streaming mode the references line is sent as soon as retrieval finishes, before
+        the LLM is called. LLM chunks are coalesced server-side (STREAM_COALESCE_CHARS /
+        STREAM_COALESCE_MS). Send `Accept: text/event-stream` to receive the same JSON
+        objects as Server-Sent Events (`data: {...}`) instead of NDJSON.
 
-        > If stream parameter is False, or the query hit LLM cache, complete response delivered in a single streaming message.
+        > If stream parameter is False, the complete response is delivered in a single line.
+        > In streaming mode an LLM cache hit is sent like a generated answer: the references
+        > line first, then the cached answer in one `{"response": ...}` line.
 
         **Response Format Details**
         - **Content-Type**: `application/x-ndjson` (Newline-Delimited JSON)
@@ -687,18 +713,20 @@ def create_query_routes(
 
             from fastapi.responses import StreamingResponse
 
-            # Unified approach: always use aquery_llm for all cases
-            # Use optimized rag_instance for streaming
-            result = await rag_instance.aquery_llm(request.query, param=param)
+            # NDJSON by default, Server-Sent Events when the client asks for them
+            use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+            media_type = "text/event-stream" if use_sse else "application/x-ndjson"
 
-            async def stream_generator():
-                # Extract references and LLM response from unified result
-                references = result.get("data", {}).get("references", [])
-                llm_response = result.get("llm_response", {})
+            def format_line(payload: Dict[str, Any]) -> str:
+                if use_sse:
+                    return f"data: {json.dumps(payload)}\n\n"
+                return f"{json.dumps(payload)}\n"
+
+            def collect_references(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+                references = data.get("references", [])
 
                 # Enrich references with chunk content if requested
                 if request.include_references and request.include_chunk_content:
-                    data = result.get("data", {})
                     chunks = data.get("chunks", [])
                     # Create a mapping from reference_id to chunk content
                     ref_id_to_content = {}
@@ -719,41 +747,93 @@ def create_query_routes(
                             ref_copy["content"] = ref_id_to_content[ref_id]
                         enriched_references.append(ref_copy)
                     references = enriched_references
+                return references
+
+            if stream_mode:
+                # True streaming: the response starts immediately, references are
+                # flushed as soon as retrieval finishes and LLM chunks follow as
+                # they are generated. Streams bypass the response cache wrapper.
+                async def stream_generator():
+                    start = time.perf_counter()
+                    ttfb = None
+                    # aclosing: a client disconnect closes the query stream and
+                    # the LLM stream behind it instead of abandoning them
+                    try:
+                        async with aclosing(
+                            rag.aquery_stream(
+                                request.query,
+                                param,
+                                coalesce_chars=stream_coalesce_chars,
+                                coalesce_ms=stream_coalesce_ms,
+                            )
+                        ) as events:
+                            async for event in events:
+                                event_type = event["type"]
+                                if event_type == "context":
+                                    if not request.include_references:
+                                        continue
+                                    references = collect_references(
+                                        event["data"].get("data", {})
+                                    )
+                                    line = format_line({"references": references})
+                                elif event_type == "token":
+                                    line = format_line({"response": event["content"]})
+                                elif event_type == "error":
+                                    line = format_line({"error": event["error"]})
+                                else:
+                                    metrics = {
+                                        **event["metrics"],
+                                        "time_to_first_byte": ttfb,
+                                    }
+                                    logger.debug(f"Streaming query metrics: {metrics}")
+                                    if not request.include_metrics:
+                                        continue
+                                    line = format_line({"metrics": metrics})
+
+                                if ttfb is None:
+                                    ttfb = time.perf_counter() - start
+                                yield line
+                    except Exception as e:
+                        logger.error(f"Streaming error: {str(e)}")
+                        yield format_line({"error": str(e)})
+
+                return StreamingResponse(
+                    stream_generator(),
+                    media_type=media_type,
+                    headers={
+                        "Cache-Control": "no-cache",
+                        "Connection": "keep-alive",
+                        "Content-Type": media_type,
+                        "X-Accel-Buffering": "no",  # Ensure proper handling of streaming response when proxied by Nginx
+                    },
+                )
+
+            # Non-streaming mode: use aquery_llm (optimized rag_instance with response cache)
+            result = await rag_instance.aquery_llm(request.query, param=param)
+
+            async def complete_generator():
+                llm_response = result.get("llm_response", {})
+                references = collect_references(result.get("data", {}))
+
+                # Send complete response in one message
+                response_content = llm_response.get("content", "")
+                if not response_content:
+                    response_content = "No relevant context found for the query."
+
+                # Create complete response object
+                complete_response = {"response": response_content}
+                if request.include_references:
+                    complete_response["references"] = references
 
-                if llm_response.get("is_streaming"):
-                    # Streaming mode: send references first, then stream response chunks
-                    if request.include_references:
-                        yield f"{json.dumps({'references': references})}\n"
-
-                    response_stream = llm_response.get("response_iterator")
-                    if response_stream:
-                        try:
-                            async for chunk in response_stream:
-                                if chunk:  # Only send non-empty content
-                                    yield f"{json.dumps({'response': chunk})}\n"
-                        except Exception as e:
-                            logger.error(f"Streaming error: {str(e)}")
-                            yield f"{json.dumps({'error': str(e)})}\n"
-                else:
-                    # Non-streaming mode: send complete response in one message
-                    response_content = llm_response.get("content", "")
-                    if not response_content:
-                        response_content = "No relevant context found for the query."
-
-                    # Create complete response object
-                    complete_response = {"response": response_content}
-                    if request.include_references:
-                        complete_response["references"] = references
-
-                    yield f"{json.dumps(complete_response)}\n"
+                yield format_line(complete_response)
 
             return StreamingResponse(
-                stream_generator(),
-                media_type="application/x-ndjson",
+                complete_generator(),
+                media_type=media_type,
                 headers={
                     "Cache-Control": "no-cache",
                     "Connection": "keep-alive",
-                    "Content-Type": "application/x-ndjson",
+                    "Content-Type": media_type,
                     "X-Accel-Buffering": "no",  # Ensure proper handling of streaming response when proxied by Nginx
                 },
             )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from enum import Enum
 import os
@@ -11,6 +12,7 @@ from typing import (
     TypedDict,
     TypeVar,
     Callable,
+    Awaitable,
     Optional,
     Dict,
     List,
@@ -168,6 +170,12 @@ class QueryParam:
     containing citation information for the retrieved content.
     """
 
+    context_callback: Callable[[dict[str, Any]], Awaitable[None]] | None = None
+    """Optional async callback invoked with the structured retrieval data (same format as raw_data)
+    as soon as the query context is built, before the LLM is called.
+    Used by streaming endpoints to flush references ahead of generated tokens.
+    """
+
 
 @dataclass
 class StorageNameSpace(ABC):
@@ -271,6 +279,51 @@ class BaseVectorStorage(StorageNameSpace, ABC):
                            If provided, skips embedding computation for better performance.
         """
 
+    async def query_batch(
+        self,
+        queries: list[str],
+        top_k: int,
+        query_embeddings: list[list[float]] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Query the vector storage with several queries at once.
+
+        The default implementation runs `query` concurrently; backends with a
+        native multi-vector search should override it with a single request.
+
+        Args:
+            queries: The query strings to search for
+            top_k: Number of top results to return per query
+            query_embeddings: Optional pre-computed embeddings, one per query
+
+        Returns:
+            One result list per query, in the same order as `queries`
+        """
+        if query_embeddings is None:
+            query_embeddings = [None] * len(queries)
+        return list(
+            await asyncio.gather(
+                *(
+                    self.query(query, top_k, query_embedding=embedding)
+                    for query, embedding in zip(queries, query_embeddings)
+                )
+            )
+        )
+
+    async def _embed_queries(
+        self, queries: list[str], query_embeddings: list[list[float]] | None
+    ) -> list[list[float]]:
+        """Embed queries for a batched search unless embeddings are provided."""
+        if query_embeddings is not None:
+            if len(query_embeddings) != len(queries):
+                raise ValueError("query_embeddings must match queries in length")
+            return list(query_embeddings)
+        if not queries:
+            return []
+        embeddings = await self.embedding_func(
+            queries, _priority=5
+        )  # higher priority for query
+        return list(embeddings)
+
     @abstractmethod
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """Insert or update vectors in the storage.
@@ -596,6 +649,34 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             edge_data: A dictionary of edge properties
         """
 
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Insert or update nodes as a batch
+
+        Default implementation upserts nodes one by one.
+        Override this method for better performance in storage backends
+        that support batch operations.
+
+        Args:
+            nodes: Mapping of node ID to node properties
+        """
+        for node_id, node_data in nodes.items():
+            await self.upsert_node(node_id, node_data)
+
+    async def upsert_edges_batch(
+        self, edges: list[tuple[str, str, dict[str, str]]]
+    ) -> None:
+        """Insert or update edges as a batch
+
+        Default implementation upserts edges one by one.
+        Override this method for better performance in storage backends
+        that support batch operations.
+
+        Args:
+            edges: List of (source_node_id, target_node_id, edge_data) tuples
+        """
+        for source_node_id, target_node_id, edge_data in edges:
+            await self.upsert_edge(source_node_id, target_node_id, edge_data)
+
     @abstractmethod
     async def delete_node(self, node_id: str) -> None:
         """Delete a node from the graph.
@@ -678,6 +759,36 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             A list of all edges, where each edge is a dictionary of its properties
         """
 
+    async def iter_all_nodes(self, batch_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """Iterate over all nodes in batches, in the format of get_all_nodes.
+
+        The default implementation slices get_all_nodes(); backends that can page
+        or stream results from the server override this to bound memory use.
+        """
+        nodes = await self.get_all_nodes()
+        for i in range(0, len(nodes), batch_size):
+            yield nodes[i : i + batch_size]
+
+    async def iter_all_edges(self, batch_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """Iterate over all edges in batches, in the format of get_all_edges.
+
+        Each undirected edge is yielded once, so callers need no memory of the
+        edges already seen. The default implementation drops the second
+        direction of edges that get_all_edges returns twice; backends that
+        stream results override this and return each stored edge once.
+        """
+        edges = await self.get_all_edges()
+        seen_pairs: set[tuple[str, str]] = set()
+        unique_edges = []
+        for edge in edges:
+            src, tgt = str(edge.get("source")), str(edge.get("target"))
+            pair = (src, tgt) if src <= tgt else (tgt, src)
+            if pair not in seen_pairs:
+                seen_pairs.add(pair)
+                unique_edges.append(edge)
+        for i in range(0, len(unique_edges), batch_size):
+            yield unique_edges[i : i + batch_size]
+
     @abstractmethod
     async def get_popular_labels(self, limit: int = 300) -> list[str]:
         """Get popular labels by node degree (most connected entities)
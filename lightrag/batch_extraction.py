@@ -0,0 +1,461 @@
+"""
+Offline batch extraction through provider batch APIs.
+
+Regular ingestion sends one realtime chat completion per chunk (plus gleaning).
+In batch mode the extraction prompts of all pending documents are written to a
+JSONL job and submitted to a BatchBackend. The answers are stored under the LLM
+cache keys extract_entities looks up, so the regular pipeline then extracts,
+parses and merges from the cache. Calls the job did not answer fall back to the
+realtime LLM.
+
+Job files follow the OpenAI batch input format, one request per line:
+
+    {"custom_id": "<cache key>", "body": {"messages": [...]}}
+
+and backends return results in the batch output format:
+
+    {"custom_id": "...", "response": {"status_code": 200, "body": {"choices": [...]}}}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Iterable
+
+from lightrag.base import BaseKVStorage, TextChunkSchema
+from lightrag.operate import build_entity_extraction_context
+from lightrag.prompt import PROMPTS
+from lightrag.utils import (
+    compute_args_hash,
+    generate_cache_key,
+    logger,
+    pack_user_ass_to_openai_messages,
+    prepare_llm_cache_call,
+    remove_think_tags,
+)
+
+BATCH_COMPLETED = "completed"
+BATCH_FAILED = "failed"
+BATCH_IN_PROGRESS = "in_progress"
+
+
+class BatchBackend(ABC):
+    """Runs a JSONL job of chat completion requests offline"""
+
+    @abstractmethod
+    async def submit(self, input_path: str) -> str:
+        """Submit a job file and return the job ID"""
+
+    @abstractmethod
+    async def status(self, job_id: str) -> str:
+        """BATCH_COMPLETED, BATCH_FAILED or any other value while the job runs"""
+
+    @abstractmethod
+    async def results(self, job_id: str) -> dict[str, str]:
+        """Answer text by custom_id of the requests that succeeded"""
+
+
+def parse_batch_output(lines: Iterable[str]) -> dict[str, str]:
+    """Read answers from batch output lines, skipping failed requests"""
+    results = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            logger.warning(
+                f"Batch request {record.get('custom_id')} failed: "
+                f"{record.get('error') or response.get('body')}"
+            )
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            logger.warning(f"Batch request {record.get('custom_id')} has no answer")
+            continue
+        if content:
+            results[record["custom_id"]] = content
+    return results
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for a provider batch API
+
+    Each job lives in `work_dir/<job_id>/` with input.jsonl, output.jsonl and a
+    status file. submit() returns at once and the job answers its requests in
+    the background through `llm_func`, a regular LightRAG LLM function.
+    """
+
+    def __init__(
+        self,
+        llm_func: Callable[..., Any],
+        work_dir: str,
+        max_async: int = 4,
+    ):
+        self.llm_func = llm_func
+        self.work_dir = work_dir
+        self.max_async = max_async
+        self._jobs: dict[str, asyncio.Task] = {}
+
+    def _job_file(self, job_id: str, name: str) -> str:
+        return os.path.join(self.work_dir, job_id, name)
+
+    def _set_status(self, job_id: str, status: str) -> None:
+        with open(self._job_file(job_id, "status"), "w") as f:
+            f.write(status)
+
+    async def submit(self, input_path: str) -> str:
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        os.makedirs(os.path.join(self.work_dir, job_id), exist_ok=True)
+        shutil.copyfile(input_path, self._job_file(job_id, "input.jsonl"))
+        self._set_status(job_id, BATCH_IN_PROGRESS)
+        self._jobs[job_id] = asyncio.create_task(self._run(job_id))
+        return job_id
+
+    async def _answer(self, request: dict, semaphore: asyncio.Semaphore) -> dict:
+        messages = request["body"]["messages"]
+        system_prompt = None
+        if messages and messages[0]["role"] == "system":
+            system_prompt = messages[0]["content"]
+            messages = messages[1:]
+        async with semaphore:
+            try:
+                content = await self.llm_func(
+                    messages[-1]["content"],
+                    system_prompt=system_prompt,
+                    history_messages=messages[:-1],
+                )
+            except Exception as e:
+                return {
+                    "custom_id": request["custom_id"],
+                    "response": None,
+                    "error": {"message": str(e)},
+                }
+        return {
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"role": "assistant", "content": content}}]
+                },
+            },
+            "error": None,
+        }
+
+    async def _run(self, job_id: str) -> None:
+        try:
+            with open(self._job_file(job_id, "input.jsonl"), encoding="utf-8") as f:
+                requests = [json.loads(line) for line in f if line.strip()]
+            semaphore = asyncio.Semaphore(self.max_async)
+            records = await asyncio.gather(
+                *(self._answer(request, semaphore) for request in requests)
+            )
+            with open(
+                self._job_file(job_id, "output.jsonl"), "w", encoding="utf-8"
+            ) as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._set_status(job_id, BATCH_COMPLETED)
+        except Exception as e:
+            logger.error(f"Local batch job {job_id} failed: {e}")
+            self._set_status(job_id, BATCH_FAILED)
+
+    async def status(self, job_id: str) -> str:
+        with open(self._job_file(job_id, "status")) as f:
+            return f.read().strip()
+
+    async def results(self, job_id: str) -> dict[str, str]:
+        with open(self._job_file(job_id, "output.jsonl"), encoding="utf-8") as f:
+            return parse_batch_output(f)
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API backend for LightRAG.ainsert_batch
+
+    Requests go to /v1/chat/completions with `model` and `completion_kwargs`
+    added to each body, and are answered within `completion_window` at the
+    batch price. An expired job still returns the answers it completed.
+
+    Example:
+        backend = OpenAIBatchBackend("gpt-4o-mini", api_key=...)
+        await rag.ainsert_batch(documents, backend)
+    """
+
+    def __init__(
+        self,
+        model: str,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        completion_window: str = "24h",
+        client_configs: dict[str, Any] | None = None,
+        **completion_kwargs: Any,
+    ):
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+        self.completion_window = completion_window
+        self.client_configs = client_configs
+        self.completion_kwargs = completion_kwargs
+
+    def _client(self):
+        from lightrag.llm.openai import create_openai_async_client
+
+        return create_openai_async_client(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            client_configs=self.client_configs,
+        )
+
+    async def submit(self, input_path: str) -> str:
+        # Complete the generic job lines into OpenAI batch requests
+        openai_path = f"{input_path}.openai"
+        with (
+            open(input_path, encoding="utf-8") as src,
+            open(openai_path, "w", encoding="utf-8") as dst,
+        ):
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = {
+                    "model": self.model,
+                    **self.completion_kwargs,
+                    **request["body"],
+                }
+                dst.write(
+                    json.dumps(
+                        {
+                            "custom_id": request["custom_id"],
+                            "method": "POST",
+                            "url": "/v1/chat/completions",
+                            "body": body,
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+
+        client = self._client()
+        try:
+            with open(openai_path, "rb") as f:
+                uploaded = await client.files.create(file=f, purpose="batch")
+            batch = await client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint="/v1/chat/completions",
+                completion_window=self.completion_window,
+            )
+        finally:
+            await client.close()
+        return batch.id
+
+    async def status(self, job_id: str) -> str:
+        client = self._client()
+        try:
+            batch = await client.batches.retrieve(job_id)
+        finally:
+            await client.close()
+        if batch.status == "completed":
+            return BATCH_COMPLETED
+        if batch.status == "expired" and batch.output_file_id:
+            return BATCH_COMPLETED
+        if batch.status in ("failed", "expired", "cancelled"):
+            return BATCH_FAILED
+        return batch.status
+
+    async def results(self, job_id: str) -> dict[str, str]:
+        client = self._client()
+        try:
+            batch = await client.batches.retrieve(job_id)
+            if not batch.output_file_id:
+                return {}
+            output = await client.files.content(batch.output_file_id)
+        finally:
+            await client.close()
+        return parse_batch_output(output.text.splitlines())
+
+
+def _extraction_request(
+    chunk_id: str,
+    user_prompt: str,
+    system_prompt: str,
+    history_messages: list[dict[str, str]] | None = None,
+) -> dict:
+    """Batch request for one extraction call, keyed like use_llm_func_with_cache"""
+    safe_user_prompt, safe_system_prompt, safe_history_messages, cache_prompt = (
+        prepare_llm_cache_call(user_prompt, system_prompt, history_messages)
+    )
+    messages = [{"role": "system", "content": safe_system_prompt}]
+    messages.extend(safe_history_messages or [])
+    messages.append({"role": "user", "content": safe_user_prompt})
+    return {
+        "cache_key": generate_cache_key(
+            "default", "extract", compute_args_hash(cache_prompt)
+        ),
+        "chunk_id": chunk_id,
+        "prompt": cache_prompt,
+        "messages": messages,
+    }
+
+
+async def _run_extraction_round(
+    requests: dict[str, dict],
+    llm_response_cache: BaseKVStorage,
+    backend: BatchBackend,
+    work_dir: str,
+    poll_interval: float,
+    round_name: str,
+) -> dict[str, str]:
+    """Answer one extraction call per chunk from the cache or a batch job
+
+    Returns the answer by chunk ID; chunks the job did not answer are left out.
+    """
+    chunk_ids = list(requests)
+    cached = await llm_response_cache.get_by_ids(
+        [requests[chunk_id]["cache_key"] for chunk_id in chunk_ids]
+    )
+    answers = {
+        chunk_id: entry["return"]
+        for chunk_id, entry in zip(chunk_ids, cached)
+        if entry and entry.get("return")
+    }
+
+    # Identical chunks of different documents share one request
+    missing = {}
+    for chunk_id in chunk_ids:
+        if chunk_id not in answers:
+            missing.setdefault(requests[chunk_id]["cache_key"], requests[chunk_id])
+    if not missing:
+        return answers
+
+    os.makedirs(work_dir, exist_ok=True)
+    input_path = os.path.join(
+        work_dir,
+        f"extract-{round_name}-{int(time.time())}-{uuid.uuid4().hex[:8]}.jsonl",
+    )
+    with open(input_path, "w", encoding="utf-8") as f:
+        for cache_key, request in missing.items():
+            line = {"custom_id": cache_key, "body": {"messages": request["messages"]}}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    job_id = await backend.submit(input_path)
+    logger.info(
+        f"Batch extraction ({round_name}): submitted {len(missing)} requests as job {job_id}"
+    )
+    while (status := await backend.status(job_id)) not in (
+        BATCH_COMPLETED,
+        BATCH_FAILED,
+    ):
+        logger.debug(f"Batch extraction job {job_id}: {status}")
+        await asyncio.sleep(poll_interval)
+    if status == BATCH_FAILED:
+        logger.warning(
+            f"Batch extraction job {job_id} failed, {len(missing)} calls fall back to the realtime LLM"
+        )
+        return answers
+
+    results = await backend.results(job_id)
+    entries = {}
+    for cache_key, content in results.items():
+        request = missing.get(cache_key)
+        content = remove_think_tags(content)
+        if request is None or not content:
+            continue
+        # Same entry as save_to_cache writes for a realtime call
+        entries[cache_key] = {
+            "return": content,
+            "cache_type": "extract",
+            "chunk_id": request["chunk_id"],
+            "original_prompt": request["prompt"],
+            "queryparam": None,
+        }
+    if entries:
+        await llm_response_cache.upsert(entries)
+        # Batch answers are paid for; persist them before processing starts
+        await llm_response_cache.index_done_callback()
+    for chunk_id in chunk_ids:
+        entry = entries.get(requests[chunk_id]["cache_key"])
+        if entry is not None:
+            answers[chunk_id] = entry["return"]
+
+    logger.info(
+        f"Batch extraction ({round_name}): job {job_id} answered {len(entries)}/{len(missing)} requests"
+    )
+    return answers
+
+
+async def run_batch_extraction(
+    chunks: dict[str, TextChunkSchema],
+    global_config: dict,
+    llm_response_cache: BaseKVStorage,
+    backend: BatchBackend,
+    work_dir: str,
+    poll_interval: float = 30.0,
+) -> dict[str, int]:
+    """Cache the extraction answers for `chunks` through batch jobs
+
+    One job covers the initial extraction of all chunks and, with gleaning
+    enabled, a second job the gleaning calls built from the first answers.
+
+    Returns:
+        dict: chunks and answered calls per round
+    """
+    if not global_config.get("enable_llm_cache_for_entity_extract"):
+        raise ValueError(
+            "Batch extraction hands results over through the LLM cache, "
+            "enable_llm_cache_for_entity_extract must be enabled"
+        )
+    if not chunks:
+        return {"chunks": 0, "extract": 0, "gleaning": 0}
+
+    context_base = build_entity_extraction_context(global_config)
+    system_prompt = PROMPTS["entity_extraction_system_prompt"].format(**context_base)
+    user_prompts = {
+        chunk_id: PROMPTS["entity_extraction_user_prompt"].format(
+            **{**context_base, "input_text": chunk["content"]}
+        )
+        for chunk_id, chunk in chunks.items()
+    }
+
+    answers = await _run_extraction_round(
+        {
+            chunk_id: _extraction_request(chunk_id, user_prompt, system_prompt)
+            for chunk_id, user_prompt in user_prompts.items()
+        },
+        llm_response_cache,
+        backend,
+        work_dir,
+        poll_interval,
+        "extract",
+    )
+    stats = {"chunks": len(chunks), "extract": len(answers), "gleaning": 0}
+
+    if global_config["entity_extract_max_gleaning"] > 0 and answers:
+        gleaning_requests = {}
+        for chunk_id, final_result in answers.items():
+            continue_prompt = PROMPTS["entity_continue_extraction_user_prompt"].format(
+                **{**context_base, "input_text": chunks[chunk_id]["content"]}
+            )
+            history = pack_user_ass_to_openai_messages(
+                user_prompts[chunk_id], final_result
+            )
+            gleaning_requests[chunk_id] = _extraction_request(
+                chunk_id, continue_prompt, system_prompt, history
+            )
+        gleanings = await _run_extraction_round(
+            gleaning_requests,
+            llm_response_cache,
+            backend,
+            work_dir,
+            poll_interval,
+            "gleaning",
+        )
+        stats["gleaning"] = len(gleanings)
+
+    return stats
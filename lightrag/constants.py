@@ -57,6 +57,38 @@ DEFAULT_HISTORY_TURNS = 0
 # Rerank configuration defaults
 DEFAULT_MIN_RERANK_SCORE = 0.0
 DEFAULT_RERANK_BINDING = "null"
+# Max chunks sent to the reranker per query (0 disables candidate pruning)
+DEFAULT_RERANK_MAX_CANDIDATES = 50
+# Max cached (query, chunk_id) rerank scores per workspace (0 disables the cache)
+DEFAULT_RERANK_CACHE_SIZE = 10000
+
+# Local cross-encoder rerank defaults (RERANK_BINDING=local)
+DEFAULT_LOCAL_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_LOCAL_RERANK_BACKEND = "torch"  # torch or onnx
+DEFAULT_LOCAL_RERANK_MAX_LENGTH = 512
+DEFAULT_LOCAL_RERANK_BATCH_SIZE = 32
+DEFAULT_LOCAL_RERANK_BATCH_WAIT_MS = 5
+DEFAULT_LOCAL_RERANK_MAX_WORKERS = 1
+DEFAULT_LOCAL_RERANK_CACHE_SIZE = 20000
+
+# Adaptive query planner defaults (ENABLE_QUERY_PLANNER=true)
+DEFAULT_PLANNER_SIMPLE_MAX_WORDS = 8
+DEFAULT_PLANNER_COMPLEX_MIN_WORDS = 25
+DEFAULT_PLANNER_SIMPLE_MAX_KEYWORDS = 3
+DEFAULT_PLANNER_COMPLEX_MIN_KEYWORDS = 8
+DEFAULT_PLANNER_PROBE_TOP_K = 5
+# Vector probe: a top chunk above this similarity and margin counts as a confident hit
+DEFAULT_PLANNER_CONFIDENT_SCORE = 0.6
+DEFAULT_PLANNER_CONFIDENT_MARGIN = 0.15
+# Fast-path retrieval sizes and token budget ratio for simple queries
+DEFAULT_PLANNER_FAST_TOP_K = 20
+DEFAULT_PLANNER_FAST_CHUNK_TOP_K = 5
+DEFAULT_PLANNER_FAST_TOKEN_RATIO = 0.5
+
+# Streaming query output: LLM chunks are merged until this many characters
+# or this many milliseconds have passed since the previous flush
+DEFAULT_STREAM_COALESCE_CHARS = 24
+DEFAULT_STREAM_COALESCE_MS = 40
 
 # Default source ids limit in meta data for entity and relation
 DEFAULT_MAX_SOURCE_IDS_PER_ENTITY = 300
@@ -86,11 +118,28 @@ DEFAULT_TEMPERATURE = 1.0
 # Async configuration defaults
 DEFAULT_MAX_ASYNC = 4  # Default maximum async operations
 DEFAULT_MAX_PARALLEL_INSERT = 2  # Default maximum parallel insert operations
+DEFAULT_PARSE_MAX_WORKERS = 0  # Extraction parser processes, 0 parses on the event loop
+DEFAULT_REBUILD_BATCH_SIZE = 500  # KG rebuild: chunks read and items written per batch
+DEFAULT_GRAPH_WRITE_BATCH_SIZE = 500  # Rows per transaction in batched graph upserts
 
 # Embedding configuration defaults
 DEFAULT_EMBEDDING_FUNC_MAX_ASYNC = 8  # Default max async for embedding functions
 DEFAULT_EMBEDDING_BATCH_NUM = 10  # Default batch size for embedding computations
 
+# Remote vector DB client defaults (Qdrant, Milvus)
+DEFAULT_VDB_UPSERT_BATCH_SIZE = 256  # Points written per upsert request
+DEFAULT_VDB_MAX_CONCURRENCY = 4  # Concurrent requests (or executor threads) per storage
+
+# File based storages (NanoVectorDB, NetworkX, Faiss): change log generations kept
+# for incremental cross-process reload before readers fall back to a full reload
+DEFAULT_STORAGE_CHANGE_LOG_RETENTION = 64
+
+# Knowledge graph export: nodes/edges fetched and rows written per batch
+DEFAULT_EXPORT_BATCH_SIZE = 1000
+
+# Document deletion: documents removed together with one consolidated rebuild
+DEFAULT_DELETE_BATCH_SIZE = 100
+
 # Gunicorn worker timeout
 DEFAULT_TIMEOUT = 300
 
@@ -98,6 +147,18 @@ DEFAULT_TIMEOUT = 300
 DEFAULT_LLM_TIMEOUT = 180
 DEFAULT_EMBEDDING_TIMEOUT = 30
 
+# LLM rate limiting: requests/tokens per minute budgets (0 disables a budget)
+DEFAULT_LLM_RPM_LIMIT = 0
+DEFAULT_LLM_TPM_LIMIT = 0
+# Completion tokens charged to the TPM budget for calls that do not set max_tokens
+DEFAULT_LLM_COMPLETION_TOKENS_ESTIMATE = 500
+# Adaptive concurrency: latency above this many seconds shrinks it (0 disables)
+DEFAULT_LLM_LATENCY_TARGET = 0.0
+DEFAULT_LLM_RESERVED_WORKERS = 0
+
+# Seconds between status polls of an offline batch extraction job
+DEFAULT_BATCH_EXTRACTION_POLL_INTERVAL = 30.0
+
 # Logging configuration defaults
 DEFAULT_LOG_MAX_BYTES = 10485760  # Default 10MB
 DEFAULT_LOG_BACKUP_COUNT = 5  # Default 5 backups
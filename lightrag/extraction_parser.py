@@ -0,0 +1,144 @@
+"""
+Parsing of raw entity/relation extraction output, optionally in worker processes.
+
+Turning LLM extraction output into entity and relation records is pure regex
+and string work. With `max_workers` > 0 the records of a batch are parsed in a
+shared process pool so large batches (all chunks of a document in
+extract_entities, the cached extractions referenced by a knowledge rebuild) use
+all cores and do not stall the event loop; otherwise they are parsed inline on
+the event loop. lightrag.tools.benchmark_extraction_parser compares both paths.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from lightrag.prompt import PROMPTS
+from lightrag.utils import logger
+
+
+class ExtractionItem(NamedTuple):
+    """One raw extraction result and the chunk it was extracted from."""
+
+    result: str
+    chunk_key: str
+    timestamp: int
+    file_path: str = "unknown_source"
+
+
+# (nodes, edges) as returned by _process_extraction_result, or the parse error
+ParsedExtraction = tuple[dict, dict] | Exception
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+
+
+def get_parser_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared parser pool, (re)creating it for `max_workers`."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != max_workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _pool_workers = max_workers
+        logger.info(f"Started extraction parser pool with {max_workers} workers")
+    return _pool
+
+
+def shutdown_parser_pool() -> None:
+    """Stop the shared parser pool if it was started."""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+atexit.register(shutdown_parser_pool)
+
+
+async def _parse_items(
+    items: list[ExtractionItem], tuple_delimiter: str, completion_delimiter: str
+) -> list[ParsedExtraction]:
+    from lightrag.operate import _process_extraction_result
+
+    parsed: list[ParsedExtraction] = []
+    for item in items:
+        try:
+            parsed.append(
+                await _process_extraction_result(
+                    item.result,
+                    item.chunk_key,
+                    item.timestamp,
+                    item.file_path,
+                    tuple_delimiter=tuple_delimiter,
+                    completion_delimiter=completion_delimiter,
+                )
+            )
+        except Exception as e:
+            parsed.append(e)
+    return parsed
+
+
+def parse_extraction_batch(
+    items: list[ExtractionItem], tuple_delimiter: str, completion_delimiter: str
+) -> list[ParsedExtraction]:
+    """Parse a batch synchronously; this is the function run by pool workers."""
+    parsed = asyncio.run(_parse_items(items, tuple_delimiter, completion_delimiter))
+    # Exceptions may hold unpicklable state, only their message crosses processes
+    return [
+        RuntimeError(str(result)) if isinstance(result, Exception) else result
+        for result in parsed
+    ]
+
+
+async def aparse_extraction_results(
+    items: list[ExtractionItem],
+    max_workers: int = 0,
+    tuple_delimiter: str | None = None,
+    completion_delimiter: str | None = None,
+) -> list[ParsedExtraction]:
+    """Parse extraction results, in the parser pool when `max_workers` > 0.
+
+    Args:
+        items: Raw extraction results with their chunk metadata.
+        max_workers: Size of the process pool; 0 parses inline on the event loop.
+        tuple_delimiter: Field delimiter, defaults to the prompt's delimiter.
+        completion_delimiter: Completion marker, defaults to the prompt's marker.
+
+    Returns:
+        One (nodes, edges) tuple per item, in order; items that failed to parse
+        get the exception instead, so one malformed result does not fail a batch.
+    """
+    tuple_delimiter = tuple_delimiter or PROMPTS["DEFAULT_TUPLE_DELIMITER"]
+    completion_delimiter = (
+        completion_delimiter or PROMPTS["DEFAULT_COMPLETION_DELIMITER"]
+    )
+    if max_workers <= 0 or len(items) <= 1:
+        return await _parse_items(items, tuple_delimiter, completion_delimiter)
+
+    # One contiguous slice per worker keeps pickling overhead per call low
+    slice_size = -(-len(items) // max_workers)
+    pool = get_parser_pool(max_workers)
+    loop = asyncio.get_running_loop()
+    batches = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                pool,
+                parse_extraction_batch,
+                items[i : i + slice_size],
+                tuple_delimiter,
+                completion_delimiter,
+            )
+            for i in range(0, len(items), slice_size)
+        )
+    )
+    return [parsed for batch in batches for parsed in batch]
@@ -0,0 +1,128 @@
+"""
+Per-generation change log for file based storages.
+
+In multi-process mode a worker that persists a NanoVectorDB, NetworkX or Faiss
+storage also appends the records it upserted and the ids it deleted since the
+previous save to a directory next to the data file:
+
+    vdb_chunks.json.changes/000000000042.pkl
+
+Workers whose update flag flips read the generations after the one they hold
+and apply only that delta. They fall back to a full reload when a generation
+they need has been compacted away (only the last STORAGE_CHANGE_LOG_RETENTION
+generations are kept), when the storage was dropped, or when the data file
+changed without a new generation being logged.
+
+The log is written and read under the storage namespace lock.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Any, Hashable
+
+from lightrag.constants import DEFAULT_STORAGE_CHANGE_LOG_RETENTION
+from lightrag.utils import get_env_value, logger
+
+from .shared_storage import get_shared_state_backend
+
+_SUFFIX = ".pkl"
+
+
+def change_log_enabled() -> bool:
+    """Only other worker processes read the log, so skip it in single-process mode."""
+    return get_shared_state_backend() is not None
+
+
+@dataclass
+class PendingChanges:
+    """Keys touched since the last save.
+
+    Deletes are applied before upserts, so a key deleted and then upserted again
+    is recorded in both sets. Upserted keys that no longer exist at save time are
+    left out of the delta.
+    """
+
+    upserted: set[Hashable] = field(default_factory=set)
+    deleted: set[Hashable] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.upserted or self.deleted)
+
+    def clear(self) -> None:
+        self.upserted.clear()
+        self.deleted.clear()
+
+
+class StorageChangeLog:
+    """Change log directory for one storage data file."""
+
+    def __init__(self, data_file: str, retention: int | None = None):
+        self.directory = f"{data_file}.changes"
+        self.retention = retention or get_env_value(
+            "STORAGE_CHANGE_LOG_RETENTION", DEFAULT_STORAGE_CHANGE_LOG_RETENTION, int
+        )
+
+    def _path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{generation:012d}{_SUFFIX}")
+
+    def _generations(self) -> list[int]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name[: -len(_SUFFIX)])
+            for name in names
+            if name.endswith(_SUFFIX) and name[: -len(_SUFFIX)].isdigit()
+        )
+
+    def current_generation(self) -> int:
+        generations = self._generations()
+        return generations[-1] if generations else 0
+
+    def append(self, delta: dict[str, Any]) -> int:
+        """Write `delta` as the next generation, compact old ones and return it."""
+        generations = self._generations()
+        generation = (generations[-1] if generations else 0) + 1
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(generation)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(delta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+        for old in generations:
+            if old > generation - self.retention:
+                break
+            try:
+                os.remove(self._path(old))
+            except FileNotFoundError:
+                pass
+        return generation
+
+    def append_reset(self) -> int:
+        """Log that all data was dropped; readers reload instead of applying deltas."""
+        return self.append({"reset": True})
+
+    def read_since(self, generation: int) -> list[dict[str, Any]] | None:
+        """Deltas after `generation` in order, or None if a full reload is needed."""
+        generations = [g for g in self._generations() if g > generation]
+        # No new generation means the data changed without being logged
+        if not generations or generations != list(
+            range(generation + 1, generations[-1] + 1)
+        ):
+            return None
+        deltas = []
+        for g in generations:
+            try:
+                with open(self._path(g), "rb") as f:
+                    delta = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                logger.warning(f"Failed to read change log {self._path(g)}: {e}")
+                return None
+            if delta.get("reset"):
+                return None
+            deltas.append(delta)
+        return deltas
@@ -14,6 +14,7 @@ from .shared_storage import (
     get_update_flag,
     set_all_update_flags,
 )
+from .change_log import PendingChanges, StorageChangeLog, change_log_enabled
 
 # You must manually install faiss-cpu or faiss-gpu before using FAISS vector db
 import faiss  # type: ignore
@@ -68,6 +69,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
         self._id_to_meta = {}
 
         self._load_faiss_index()
+        self._change_log = StorageChangeLog(self._faiss_index_file)
+        self._change_log_generation = self._change_log.current_generation()
+        self._pending_changes = PendingChanges()
 
     async def initialize(self):
         """Initialize storage data"""
@@ -80,6 +84,37 @@ class FaissVectorDBStorage(BaseVectorStorage):
             self.namespace, workspace=self.workspace
         )
 
+    def _reload_index(self):
+        """Catch up with the index persisted by another process"""
+        # Apply only the logged delta, unless that would merge unsaved local changes
+        if not self._pending_changes:
+            deltas = self._change_log.read_since(self._change_log_generation)
+            if deltas is not None:
+                metas = {meta["__id__"]: meta for meta in self._id_to_meta.values()}
+                for delta in deltas:
+                    for custom_id in delta["deleted"]:
+                        metas.pop(custom_id, None)
+                    for custom_id, meta in delta["upserted"].items():
+                        metas.pop(custom_id, None)
+                        metas[custom_id] = meta
+                self._rebuild_index(list(metas.values()))
+                self._change_log_generation += len(deltas)
+                return
+        self._index = faiss.IndexFlatIP(self._dim)
+        self._id_to_meta = {}
+        self._load_faiss_index()
+        self._change_log_generation = self._change_log.current_generation()
+        self._pending_changes.clear()
+
+    def _change_log_delta(self) -> dict[str, Any]:
+        """Metadata (with vectors) upserted and custom IDs deleted since the last save"""
+        upserted = {
+            meta["__id__"]: meta
+            for meta in self._id_to_meta.values()
+            if meta["__id__"] in self._pending_changes.upserted
+        }
+        return {"upserted": upserted, "deleted": list(self._pending_changes.deleted)}
+
     async def _get_index(self):
         """Check if the shtorage should be reloaded"""
         # Acquire lock to prevent concurrent read and write
@@ -90,9 +125,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
                     f"[{self.workspace}] Process {os.getpid()} FAISS reloading {self.namespace} due to update by another process"
                 )
                 # Reload data
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
-                self._load_faiss_index()
+                self._reload_index()
                 self.storage_updated.value = False
             return self._index
 
@@ -176,6 +209,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
             # Store the raw vector so we can rebuild if something is removed
             meta["__vector__"] = embeddings[i].tolist()
             self._id_to_meta.update({fid: meta})
+        self._pending_changes.upserted.update(m["__id__"] for m in list_data)
 
         logger.debug(
             f"[{self.workspace}] Upserted {len(list_data)} vectors into Faiss index."
@@ -255,6 +289,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         if to_remove:
             await self._remove_faiss_ids(to_remove)
+            self._pending_changes.deleted.update(ids)
         logger.debug(
             f"[{self.workspace}] Successfully deleted {len(to_remove)} vectors from {self.namespace}"
         )
@@ -289,6 +324,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
             f"[{self.workspace}] Found {len(relations)} relations for {entity_name}"
         )
         if relations:
+            self._pending_changes.deleted.update(
+                self._id_to_meta[fid]["__id__"] for fid in relations
+            )
             await self._remove_faiss_ids(relations)
             logger.debug(
                 f"[{self.workspace}] Deleted {len(relations)} relations for {entity_name}"
@@ -315,22 +353,17 @@ class FaissVectorDBStorage(BaseVectorStorage):
         """
         keep_fids = [fid for fid in self._id_to_meta if fid not in fid_list]
 
-        # Rebuild the index
-        vectors_to_keep = []
-        new_id_to_meta = {}
-        for new_fid, old_fid in enumerate(keep_fids):
-            vec_meta = self._id_to_meta[old_fid]
-            vectors_to_keep.append(vec_meta["__vector__"])  # stored as list
-            new_id_to_meta[new_fid] = vec_meta
-
         async with self._storage_lock:
-            # Re-init index
-            self._index = faiss.IndexFlatIP(self._dim)
-            if vectors_to_keep:
-                arr = np.array(vectors_to_keep, dtype=np.float32)
-                self._index.add(arr)
+            self._rebuild_index([self._id_to_meta[fid] for fid in keep_fids])
 
-            self._id_to_meta = new_id_to_meta
+    def _rebuild_index(self, metas: list[dict[str, Any]]):
+        """Re-init the index from metadata entries, which carry their raw vectors."""
+        self._index = faiss.IndexFlatIP(self._dim)
+        if metas:
+            # __vector__ is stored as list
+            arr = np.array([meta["__vector__"] for meta in metas], dtype=np.float32)
+            self._index.add(arr)
+        self._id_to_meta = dict(enumerate(metas))
 
     def _save_faiss_index(self):
         """
@@ -406,9 +439,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
                 logger.warning(
                     f"[{self.workspace}] Storage for FAISS {self.namespace} was updated by another process, reloading..."
                 )
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
-                self._load_faiss_index()
+                self._reload_index()
                 self.storage_updated.value = False
                 return False  # Return error
 
@@ -417,6 +448,11 @@ class FaissVectorDBStorage(BaseVectorStorage):
             try:
                 # Save data to disk
                 self._save_faiss_index()
+                if change_log_enabled():
+                    self._change_log_generation = self._change_log.append(
+                        self._change_log_delta()
+                    )
+                self._pending_changes.clear()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
                 # Reset own update flag to avoid self-reloading
@@ -543,6 +579,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
                 self._id_to_meta = {}
                 self._load_faiss_index()
+                self._pending_changes.clear()
+                if change_log_enabled():
+                    self._change_log_generation = self._change_log.append_reset()
 
                 # Notify other processes
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
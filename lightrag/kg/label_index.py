@@ -0,0 +1,331 @@
+"""
+In-memory label index for graph storages that hold the whole graph in memory.
+
+search_labels of NetworkXStorage used to lower-case and substring-scan every
+node on each keystroke of the WebUI label search, and get_all_labels sorted all
+nodes on every call. LabelIndex keeps
+
+- the labels sorted, for get_all_labels and prefix matches,
+- (lower-case label, label) pairs sorted, so the labels with a given
+  case-insensitive prefix form one range found by bisection,
+- a trigram inverted index over the lower-case labels for contains matches.
+
+search() applies the scoring rules of the scan it replaces: exact match 1000,
+prefix match 500, otherwise 100 - len(label) plus 50 when the query starts a
+word; ties are broken alphabetically. Exact and prefix matches always outrank
+contains matches, so contains matches are only looked up when the prefix range
+does not fill the result.
+
+Adds and removes update the trigram postings at once. The sorted arrays catch
+up on the next read: a few changes are applied by bisection, larger batches by
+filtering out removed labels and appending the sorted added ones, which the
+sort then merges as two runs.
+
+The index is pickled next to the graph file. A small stamp file records the
+size and mtime of the graph file and of the index file, and the index is reused
+on load only while all of them still match. The index itself is only rewritten
+when labels were added or removed since it was last saved or loaded; otherwise
+saving just renews the stamp for the rewritten graph file.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import pickle
+import sys
+from bisect import bisect_left, insort
+from typing import Iterable
+
+from lightrag.utils import logger
+
+_FORMAT_VERSION = 2
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _prefix_end(prefix: str) -> str | None:
+    """Smallest string sorting after every string that starts with `prefix`"""
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    return stripped[:-1] + chr(ord(stripped[-1]) + 1)
+
+
+def _file_stamp(file_name: str) -> tuple[int, int]:
+    stat = os.stat(file_name)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _dump(data: dict, file_name: str) -> None:
+    tmp_file = f"{file_name}.tmp"
+    with open(tmp_file, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, file_name)
+
+
+def _contains_score(label: str, label_lower: str, query: str) -> int:
+    score = 100 - len(label)
+    if f" {query}" in label_lower or f"_{query}" in label_lower:
+        score += 50
+    return score
+
+
+class LabelIndex:
+    """Sorted and trigram index over the node labels of a graph"""
+
+    # Prefix ranges up to this size are sorted directly
+    _SMALL_RANGE = 512
+    # Case variants of an ASCII query looked up in the sorted labels
+    _MAX_CASE_VARIANTS = 64
+    # Up to this many changes are applied to the sorted arrays one by one
+    _MAX_POINT_UPDATES = 256
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self._labels: set[str] = set(labels)
+        self._trigrams: dict[str, set[str]] = {}
+        for label in self._labels:
+            self._add_trigrams(label)
+        self._sorted: list[str] = sorted(self._labels)
+        self._lower: list[tuple[str, str]] = sorted(
+            (label.lower(), label) for label in self._labels
+        )
+        self._added: set[str] = set()
+        self._removed: set[str] = set()
+        # Labels changed since the index was last saved or loaded
+        self._dirty = True
+        self._saved_stamp: tuple | None = None
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self._labels
+
+    def _add_trigrams(self, label: str) -> None:
+        for gram in _trigrams(label.lower()):
+            postings = self._trigrams.get(gram)
+            if postings is None:
+                self._trigrams[gram] = {label}
+            else:
+                postings.add(label)
+
+    def add(self, label: str) -> None:
+        if label in self._labels:
+            return
+        self._labels.add(label)
+        self._add_trigrams(label)
+        self._dirty = True
+        if label in self._removed:
+            # Still present in the sorted arrays
+            self._removed.discard(label)
+        else:
+            self._added.add(label)
+
+    def remove(self, label: str) -> None:
+        if label not in self._labels:
+            return
+        self._labels.discard(label)
+        self._dirty = True
+        for gram in _trigrams(label.lower()):
+            postings = self._trigrams.get(gram)
+            if postings is not None:
+                postings.discard(label)
+                if not postings:
+                    del self._trigrams[gram]
+        if label in self._added:
+            self._added.discard(label)
+        else:
+            self._removed.add(label)
+
+    def _sync(self) -> None:
+        """Bring the sorted arrays up to date with the adds and removes"""
+        if self._removed:
+            removed = self._removed
+            if len(removed) <= self._MAX_POINT_UPDATES:
+                for label in removed:
+                    del self._sorted[bisect_left(self._sorted, label)]
+                    del self._lower[bisect_left(self._lower, (label.lower(), label))]
+            else:
+                self._sorted = [label for label in self._sorted if label not in removed]
+                self._lower = [e for e in self._lower if e[1] not in removed]
+            self._removed = set()
+        if self._added:
+            added = self._added
+            if len(added) <= self._MAX_POINT_UPDATES:
+                for label in added:
+                    insort(self._sorted, label)
+                    insort(self._lower, (label.lower(), label))
+            else:
+                self._sorted.extend(sorted(added))
+                self._sorted.sort()
+                self._lower.extend(sorted((label.lower(), label) for label in added))
+                self._lower.sort()
+            self._added = set()
+
+    def labels(self) -> list[str]:
+        """All labels in alphabetical order"""
+        self._sync()
+        return list(self._sorted)
+
+    def search(self, query: str, limit: int = 50) -> list[str]:
+        """Labels matching `query` case-insensitively, most relevant first"""
+        query = query.lower().strip()
+        if not query or limit <= 0:
+            return []
+        self._sync()
+
+        lower = self._lower
+        start = bisect_left(lower, (query,))
+        end = _prefix_end(query)
+        stop = bisect_left(lower, (end,)) if end is not None else len(lower)
+
+        results = []
+        while start < stop and lower[start][0] == query:
+            results.append(lower[start][1])
+            start += 1
+        del results[limit:]
+        if len(results) < limit:
+            results.extend(
+                self._prefix_matches(query, start, stop, limit - len(results))
+            )
+        if len(results) < limit:
+            results.extend(self._contains_matches(query, limit - len(results)))
+        return results
+
+    def _case_variants(self, query: str) -> list[str] | None:
+        if not query.isascii():
+            return None
+        variants = [""]
+        for ch in query:
+            options = (ch.upper(), ch) if ch.isalpha() else (ch,)
+            variants = [variant + option for variant in variants for option in options]
+            if len(variants) > self._MAX_CASE_VARIANTS:
+                return None
+        return variants
+
+    def _prefix_matches(self, query: str, start: int, stop: int, n: int) -> list[str]:
+        """The n alphabetically first labels of the prefix range, exact matches excluded"""
+        if stop - start <= max(n, self._SMALL_RANGE):
+            return sorted(label for _, label in self._lower[start:stop])[:n]
+
+        variants = self._case_variants(query)
+        if variants is None:
+            return heapq.nsmallest(n, (label for _, label in self._lower[start:stop]))
+
+        # A large range of a short ASCII query: labels starting with one case
+        # variant of the query are contiguous in the sorted labels, so take
+        # the first n of each variant and merge them. Non-ASCII characters
+        # that lower-case to ASCII, like the Kelvin sign, are not covered.
+        runs = []
+        for variant in variants:
+            run = []
+            i = bisect_left(self._sorted, variant)
+            while i < len(self._sorted) and len(run) < n:
+                label = self._sorted[i]
+                if not label.startswith(variant):
+                    break
+                if len(label) != len(query):
+                    run.append(label)
+                i += 1
+            runs.append(run)
+        return list(heapq.merge(*runs))[:n]
+
+    def _contains_matches(self, query: str, n: int) -> list[str]:
+        """The n best labels containing but not starting with the query"""
+        if len(query) >= 3:
+            postings = []
+            for gram in _trigrams(query):
+                labels = self._trigrams.get(gram)
+                if not labels:
+                    return []
+                postings.append(labels)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            # Too short for trigrams, only reached when prefix matches run out
+            candidates = self._labels
+
+        matches = []
+        for label in candidates:
+            label_lower = label.lower()
+            if query in label_lower and not label_lower.startswith(query):
+                matches.append((-_contains_score(label, label_lower, query), label))
+        return [label for _, label in heapq.nsmallest(n, matches)]
+
+    def save(self, file_name: str, stamp: tuple | None) -> None:
+        """Persist the index, valid for the graph file with the given stamp
+
+        Does nothing when neither the labels nor the graph file changed since
+        the last save or load.
+        """
+        if not self._dirty and stamp == self._saved_stamp:
+            return
+        try:
+            if self._dirty:
+                self._sync()
+                _dump(
+                    {
+                        "version": _FORMAT_VERSION,
+                        "sorted": self._sorted,
+                        "lower": self._lower,
+                        "trigrams": self._trigrams,
+                    },
+                    file_name,
+                )
+            _dump(
+                {
+                    "version": _FORMAT_VERSION,
+                    "stamp": stamp,
+                    "index": _file_stamp(file_name),
+                },
+                f"{file_name}.stamp",
+            )
+        except OSError as e:
+            logger.warning(f"Could not save label index {file_name}: {e}")
+            return
+        self._dirty = False
+        self._saved_stamp = stamp
+
+    @classmethod
+    def load(cls, file_name: str, stamp: tuple | None) -> LabelIndex | None:
+        """Load a persisted index, None if missing or saved for another graph file"""
+        if stamp is None:
+            return None
+        try:
+            with open(f"{file_name}.stamp", "rb") as f:
+                header = pickle.load(f)
+            if header.get("version") != _FORMAT_VERSION:
+                return None
+            if tuple(header.get("stamp") or ()) != tuple(stamp):
+                return None
+            # The index file must be the one the stamp was written for
+            if tuple(header.get("index") or ()) != _file_stamp(file_name):
+                return None
+            with open(file_name, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not load label index {file_name}: {e}")
+            return None
+        if data.get("version") != _FORMAT_VERSION:
+            return None
+
+        index = cls()
+        index._sorted = data["sorted"]
+        index._lower = data["lower"]
+        index._trigrams = data["trigrams"]
+        index._labels = set(index._sorted)
+        index._dirty = False
+        index._saved_stamp = stamp
+        return index
+
+    @staticmethod
+    def delete(file_name: str) -> None:
+        """Remove a persisted index"""
+        for name in (f"{file_name}.stamp", file_name):
+            if os.path.exists(name):
+                os.remove(name)
@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from typing import final
 import configparser
 
+from ..constants import DEFAULT_GRAPH_WRITE_BATCH_SIZE
 from ..utils import logger
 from ..base import BaseGraphStorage
 from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
@@ -672,6 +673,110 @@ class MemgraphStorage(BaseGraphStorage):
                 )
                 raise
 
+    async def _write_batches(self, query: str, rows: list[dict], what: str) -> None:
+        """Run an UNWIND $rows write query, one transaction per batch of rows
+
+        Each batch is retried on transient errors like upsert_node/upsert_edge.
+        """
+        if self._driver is None:
+            raise RuntimeError(
+                "Memgraph driver is not initialized. Call 'await initialize()' first."
+            )
+        batch_size = self.global_config.get(
+            "graph_write_batch_size", DEFAULT_GRAPH_WRITE_BATCH_SIZE
+        )
+
+        # Manual transaction-level retry following official Memgraph documentation
+        max_retries = 100
+        initial_wait_time = 0.2
+        backoff_factor = 1.1
+        jitter_factor = 0.1
+
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i : i + batch_size]
+
+            async def execute_write(tx: AsyncManagedTransaction):
+                result = await tx.run(query, rows=batch)
+                await result.consume()
+
+            for attempt in range(max_retries):
+                try:
+                    async with self._driver.session(database=self._DATABASE) as session:
+                        await session.execute_write(execute_write)
+                    break  # Success - exit retry loop
+
+                except (TransientError, ResultFailedError) as e:
+                    root_cause = e
+                    while hasattr(root_cause, "__cause__") and root_cause.__cause__:
+                        root_cause = root_cause.__cause__
+
+                    is_transient = (
+                        isinstance(root_cause, TransientError)
+                        or isinstance(e, TransientError)
+                        or "TransientError" in str(e)
+                        or "Cannot resolve conflicting transactions" in str(e)
+                    )
+                    if not is_transient or attempt == max_retries - 1:
+                        logger.error(
+                            f"[{self.workspace}] Error during batch {what} upsert after {attempt + 1} attempts: {str(e)}"
+                        )
+                        raise
+                    jitter = random.uniform(0, jitter_factor) * initial_wait_time
+                    wait_time = initial_wait_time * (backoff_factor**attempt) + jitter
+                    logger.warning(
+                        f"[{self.workspace}] Batch {what} upsert failed. Attempt #{attempt + 1} retrying in {wait_time:.3f} seconds... Error: {str(e)}"
+                    )
+                    await asyncio.sleep(wait_time)
+                except Exception as e:
+                    logger.error(
+                        f"[{self.workspace}] Unexpected error during batch {what} upsert: {str(e)}"
+                    )
+                    raise
+
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Upsert nodes with UNWIND queries, one transaction per batch
+
+        Labels cannot be parameters, so nodes are grouped by entity type.
+        """
+        workspace_label = self._get_workspace_label()
+        rows_by_type: dict[str, list[dict]] = {}
+        for node_id, node_data in nodes.items():
+            if "entity_id" not in node_data:
+                raise ValueError(
+                    "Memgraph: node properties must contain an 'entity_id' field"
+                )
+            rows_by_type.setdefault(node_data["entity_type"], []).append(
+                {"entity_id": node_id, "properties": node_data}
+            )
+
+        for entity_type, rows in rows_by_type.items():
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (n:`{workspace_label}` {{entity_id: row.entity_id}})
+            SET n += row.properties
+            SET n:`{entity_type}`
+            """
+            await self._write_batches(query, rows, "node")
+
+    async def upsert_edges_batch(
+        self, edges: list[tuple[str, str, dict[str, str]]]
+    ) -> None:
+        """Upsert edges with UNWIND queries, one transaction per batch"""
+        workspace_label = self._get_workspace_label()
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (source:`{workspace_label}` {{entity_id: row.source_id}})
+        WITH source, row
+        MATCH (target:`{workspace_label}` {{entity_id: row.target_id}})
+        MERGE (source)-[r:DIRECTED]-(target)
+        SET r += row.properties
+        """
+        rows = [
+            {"source_id": src, "target_id": tgt, "properties": edge_data}
+            for src, tgt, edge_data in edges
+        ]
+        await self._write_batches(query, rows, "edge")
+
     async def delete_node(self, node_id: str) -> None:
         """Delete a node with the specified label
 
@@ -1042,6 +1147,61 @@ class MemgraphStorage(BaseGraphStorage):
             await result.consume()
             return edges
 
+    async def iter_all_nodes(self, batch_size: int = 1000):
+        """Stream all nodes in batches without materializing the whole result"""
+        if self._driver is None:
+            raise RuntimeError(
+                "Memgraph driver is not initialized. Call 'await initialize()' first."
+            )
+        workspace_label = self._get_workspace_label()
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ", fetch_size=batch_size
+        ) as session:
+            query = f"""
+            MATCH (n:`{workspace_label}`)
+            RETURN n
+            """
+            result = await session.run(query)
+            batch = []
+            async for record in result:
+                node_dict = dict(record["n"])
+                node_dict["id"] = node_dict.get("entity_id")
+                batch.append(node_dict)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+            await result.consume()
+
+    async def iter_all_edges(self, batch_size: int = 1000):
+        """Stream all edges in batches, each relationship once (directed match)"""
+        if self._driver is None:
+            raise RuntimeError(
+                "Memgraph driver is not initialized. Call 'await initialize()' first."
+            )
+        workspace_label = self._get_workspace_label()
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ", fetch_size=batch_size
+        ) as session:
+            query = f"""
+            MATCH (a:`{workspace_label}`)-[r]->(b:`{workspace_label}`)
+            RETURN a.entity_id AS source, b.entity_id AS target, properties(r) AS properties
+            """
+            result = await session.run(query)
+            batch = []
+            async for record in result:
+                edge_properties = record["properties"]
+                edge_properties["source"] = record["source"]
+                edge_properties["target"] = record["target"]
+                batch.append(edge_properties)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+            await result.consume()
+
     async def get_popular_labels(self, limit: int = 300) -> list[str]:
         """Get popular labels by node degree (most connected entities)
 
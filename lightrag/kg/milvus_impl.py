@@ -1,11 +1,17 @@
 import asyncio
+import functools
 import os
-from typing import Any, final
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, final
 from dataclasses import dataclass
 import numpy as np
-from lightrag.utils import logger, compute_mdhash_id
+from lightrag.utils import logger, compute_mdhash_id, get_env_value
 from ..base import BaseVectorStorage
-from ..constants import DEFAULT_MAX_FILE_PATH_LENGTH
+from ..constants import (
+    DEFAULT_MAX_FILE_PATH_LENGTH,
+    DEFAULT_VDB_MAX_CONCURRENCY,
+    DEFAULT_VDB_UPSERT_BATCH_SIZE,
+)
 from ..kg.shared_storage import get_data_init_lock
 import pipmaster as pm
 
@@ -804,6 +810,7 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             # Load the collection if it's not already loaded
             # In Milvus, collections need to be loaded before they can be searched
             self._client.load_collection(self.final_namespace)
+            self._collection_loaded = True
             # logger.debug(f"[{self.workspace}] Collection {self.namespace} loaded successfully")
 
         except Exception as e:
@@ -980,8 +987,66 @@ class MilvusVectorDBStorage(BaseVectorStorage):
         # Initialize client as None - will be created in initialize() method
         self._client = None
         self._max_batch_size = self.global_config["embedding_batch_num"]
+        self._upsert_batch_size = max(
+            1,
+            get_env_value(
+                "MILVUS_UPSERT_BATCH_SIZE", DEFAULT_VDB_UPSERT_BATCH_SIZE, int
+            ),
+        )
+        self._max_workers = max(
+            1, get_env_value("MILVUS_MAX_WORKERS", DEFAULT_VDB_MAX_CONCURRENCY, int)
+        )
+        # MilvusClient is blocking; every call runs on this bounded executor so
+        # vector operations never stall the event loop
+        self._executor: ThreadPoolExecutor | None = None
+        self._collection_loaded = False
         self._initialized = False
 
+    async def _run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking MilvusClient call on the storage executor"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix=f"milvus-{self.namespace}",
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _ensure_loaded(self) -> None:
+        # Loading is idempotent on the server, so skip the round trips once done
+        if not self._collection_loaded:
+            await self._run(self._ensure_collection_loaded)
+
+    def _create_client(self) -> MilvusClient:
+        return MilvusClient(
+            uri=os.environ.get(
+                "MILVUS_URI",
+                config.get(
+                    "milvus",
+                    "uri",
+                    fallback=os.path.join(
+                        self.global_config["working_dir"], "milvus_lite.db"
+                    ),
+                ),
+            ),
+            user=os.environ.get(
+                "MILVUS_USER", config.get("milvus", "user", fallback=None)
+            ),
+            password=os.environ.get(
+                "MILVUS_PASSWORD",
+                config.get("milvus", "password", fallback=None),
+            ),
+            token=os.environ.get(
+                "MILVUS_TOKEN", config.get("milvus", "token", fallback=None)
+            ),
+            db_name=os.environ.get(
+                "MILVUS_DB_NAME",
+                config.get("milvus", "db_name", fallback=None),
+            ),
+        )
+
     async def initialize(self):
         """Initialize Milvus collection"""
         async with get_data_init_lock():
@@ -991,38 +1056,13 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             try:
                 # Create MilvusClient if not already created
                 if self._client is None:
-                    self._client = MilvusClient(
-                        uri=os.environ.get(
-                            "MILVUS_URI",
-                            config.get(
-                                "milvus",
-                                "uri",
-                                fallback=os.path.join(
-                                    self.global_config["working_dir"], "milvus_lite.db"
-                                ),
-                            ),
-                        ),
-                        user=os.environ.get(
-                            "MILVUS_USER", config.get("milvus", "user", fallback=None)
-                        ),
-                        password=os.environ.get(
-                            "MILVUS_PASSWORD",
-                            config.get("milvus", "password", fallback=None),
-                        ),
-                        token=os.environ.get(
-                            "MILVUS_TOKEN", config.get("milvus", "token", fallback=None)
-                        ),
-                        db_name=os.environ.get(
-                            "MILVUS_DB_NAME",
-                            config.get("milvus", "db_name", fallback=None),
-                        ),
-                    )
+                    self._client = await self._run(self._create_client)
                     logger.debug(
                         f"[{self.workspace}] MilvusClient created successfully"
                     )
 
                 # Create collection and check compatibility
-                self._create_collection_if_not_exist()
+                await self._run(self._create_collection_if_not_exist)
                 self._initialized = True
                 logger.info(
                     f"[{self.workspace}] Milvus collection '{self.namespace}' initialized successfully"
@@ -1039,7 +1079,7 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             return
 
         # Ensure collection is loaded before upserting
-        self._ensure_collection_loaded()
+        await self._ensure_loaded()
 
         import time
 
@@ -1054,28 +1094,36 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             for k, v in data.items()
         ]
         contents = [v["content"] for v in data.values()]
-        batches = [
-            contents[i : i + self._max_batch_size]
-            for i in range(0, len(contents), self._max_batch_size)
-        ]
 
-        embedding_tasks = [self.embedding_func(batch) for batch in batches]
-        embeddings_list = await asyncio.gather(*embedding_tasks)
+        async def upsert_batch(start: int) -> None:
+            batch_data = list_data[start : start + self._upsert_batch_size]
+            batch_contents = contents[start : start + self._upsert_batch_size]
+            embedding_tasks = [
+                self.embedding_func(batch_contents[i : i + self._max_batch_size])
+                for i in range(0, len(batch_contents), self._max_batch_size)
+            ]
+            embeddings = np.concatenate(await asyncio.gather(*embedding_tasks))
+            for i, d in enumerate(batch_data):
+                d["vector"] = embeddings[i]
+            # The executor size bounds how many batches are written at once
+            await self._run(
+                self._client.upsert,
+                collection_name=self.final_namespace,
+                data=batch_data,
+            )
 
-        embeddings = np.concatenate(embeddings_list)
-        for i, d in enumerate(list_data):
-            d["vector"] = embeddings[i]
-        results = self._client.upsert(
-            collection_name=self.final_namespace, data=list_data
+        # Each batch is written as soon as its embeddings are ready, so embedding
+        # and network I/O of different batches overlap
+        await asyncio.gather(
+            *(
+                upsert_batch(start)
+                for start in range(0, len(list_data), self._upsert_batch_size)
+            )
         )
-        return results
 
     async def query(
         self, query: str, top_k: int, query_embedding: list[float] = None
     ) -> list[dict[str, Any]]:
-        # Ensure collection is loaded before querying
-        self._ensure_collection_loaded()
-
         # Use provided embedding or compute it
         if query_embedding is not None:
             embedding = [query_embedding]  # Milvus expects a list of embeddings
@@ -1084,12 +1132,32 @@ class MilvusVectorDBStorage(BaseVectorStorage):
                 [query], _priority=5
             )  # higher priority for query
 
+        results = await self._search(embedding, top_k)
+        return results[0]
+
+    async def query_batch(
+        self,
+        queries: list[str],
+        top_k: int,
+        query_embeddings: list[list[float]] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Search several query vectors in a single Milvus request"""
+        embeddings = await self._embed_queries(queries, query_embeddings)
+        if not embeddings:
+            return []
+        return await self._search(embeddings, top_k)
+
+    async def _search(self, embeddings, top_k: int) -> list[list[dict[str, Any]]]:
+        # Ensure collection is loaded before querying
+        await self._ensure_loaded()
+
         # Include all meta_fields (created_at is now always included)
         output_fields = list(self.meta_fields)
 
-        results = self._client.search(
+        results = await self._run(
+            self._client.search,
             collection_name=self.final_namespace,
-            data=embedding,
+            data=embeddings,
             limit=top_k,
             output_fields=output_fields,
             search_params={
@@ -1098,13 +1166,16 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             },
         )
         return [
-            {
-                **dp["entity"],
-                "id": dp["id"],
-                "distance": dp["distance"],
-                "created_at": dp.get("created_at"),
-            }
-            for dp in results[0]
+            [
+                {
+                    **dp["entity"],
+                    "id": dp["id"],
+                    "distance": dp["distance"],
+                    "created_at": dp.get("created_at"),
+                }
+                for dp in hits
+            ]
+            for hits in results
         ]
 
     async def index_done_callback(self) -> None:
@@ -1125,8 +1196,10 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             )
 
             # Delete the entity from Milvus collection
-            result = self._client.delete(
-                collection_name=self.final_namespace, pks=[entity_id]
+            result = await self._run(
+                self._client.delete,
+                collection_name=self.final_namespace,
+                pks=[entity_id],
             )
 
             if result and result.get("delete_count", 0) > 0:
@@ -1149,14 +1222,17 @@ class MilvusVectorDBStorage(BaseVectorStorage):
         """
         try:
             # Ensure collection is loaded before querying
-            self._ensure_collection_loaded()
+            await self._ensure_loaded()
 
             # Search for relations where entity is either source or target
             expr = f'src_id == "{entity_name}" or tgt_id == "{entity_name}"'
 
             # Find all relations involving this entity
-            results = self._client.query(
-                collection_name=self.final_namespace, filter=expr, output_fields=["id"]
+            results = await self._run(
+                self._client.query,
+                collection_name=self.final_namespace,
+                filter=expr,
+                output_fields=["id"],
             )
 
             if not results or len(results) == 0:
@@ -1173,8 +1249,10 @@ class MilvusVectorDBStorage(BaseVectorStorage):
 
             # Delete the relations
             if relation_ids:
-                delete_result = self._client.delete(
-                    collection_name=self.final_namespace, pks=relation_ids
+                delete_result = await self._run(
+                    self._client.delete,
+                    collection_name=self.final_namespace,
+                    pks=relation_ids,
                 )
 
                 logger.debug(
@@ -1194,10 +1272,12 @@ class MilvusVectorDBStorage(BaseVectorStorage):
         """
         try:
             # Ensure collection is loaded before deleting
-            self._ensure_collection_loaded()
+            await self._ensure_loaded()
 
             # Delete vectors by IDs
-            result = self._client.delete(collection_name=self.final_namespace, pks=ids)
+            result = await self._run(
+                self._client.delete, collection_name=self.final_namespace, pks=ids
+            )
 
             if result and result.get("delete_count", 0) > 0:
                 logger.debug(
@@ -1224,13 +1304,14 @@ class MilvusVectorDBStorage(BaseVectorStorage):
         """
         try:
             # Ensure collection is loaded before querying
-            self._ensure_collection_loaded()
+            await self._ensure_loaded()
 
             # Include all meta_fields (created_at is now always included) plus id
             output_fields = list(self.meta_fields) + ["id"]
 
             # Query Milvus for a specific ID
-            result = self._client.query(
+            result = await self._run(
+                self._client.query,
                 collection_name=self.final_namespace,
                 filter=f'id == "{id}"',
                 output_fields=output_fields,
@@ -1260,7 +1341,7 @@ class MilvusVectorDBStorage(BaseVectorStorage):
 
         try:
             # Ensure collection is loaded before querying
-            self._ensure_collection_loaded()
+            await self._ensure_loaded()
 
             # Include all meta_fields (created_at is now always included) plus id
             output_fields = list(self.meta_fields) + ["id"]
@@ -1270,7 +1351,8 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             filter_expr = f'id in ["{id_list}"]'
 
             # Query Milvus with the filter
-            result = self._client.query(
+            result = await self._run(
+                self._client.query,
                 collection_name=self.final_namespace,
                 filter=filter_expr,
                 output_fields=output_fields,
@@ -1313,14 +1395,15 @@ class MilvusVectorDBStorage(BaseVectorStorage):
 
         try:
             # Ensure collection is loaded before querying
-            self._ensure_collection_loaded()
+            await self._ensure_loaded()
 
             # Prepare the ID filter expression
             id_list = '", "'.join(ids)
             filter_expr = f'id in ["{id_list}"]'
 
             # Query Milvus with the filter, requesting only vector field
-            result = self._client.query(
+            result = await self._run(
+                self._client.query,
                 collection_name=self.final_namespace,
                 filter=filter_expr,
                 output_fields=["vector"],
@@ -1354,11 +1437,12 @@ class MilvusVectorDBStorage(BaseVectorStorage):
         """
         try:
             # Drop the collection and recreate it
-            if self._client.has_collection(self.final_namespace):
-                self._client.drop_collection(self.final_namespace)
+            if await self._run(self._client.has_collection, self.final_namespace):
+                await self._run(self._client.drop_collection, self.final_namespace)
+            self._collection_loaded = False
 
             # Recreate the collection
-            self._create_collection_if_not_exist()
+            await self._run(self._create_collection_if_not_exist)
 
             logger.info(
                 f"[{self.workspace}] Process {os.getpid()} drop Milvus collection {self.namespace}"
@@ -1369,3 +1453,14 @@ class MilvusVectorDBStorage(BaseVectorStorage):
                 f"[{self.workspace}] Error dropping Milvus collection {self.namespace}: {e}"
             )
             return {"status": "error", "message": str(e)}
+
+    async def finalize(self):
+        """Close the Milvus client and shut down its executor"""
+        if self._client is not None:
+            await self._run(self._client.close)
+            self._client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._collection_loaded = False
+        self._initialized = False
@@ -5,6 +5,7 @@ from dataclasses import dataclass, field
 import numpy as np
 import configparser
 import asyncio
+from collections import Counter
 
 from typing import Any, Union, final
 
@@ -776,6 +777,7 @@ class MongoGraphStorage(BaseGraphStorage):
 
         self._collection_name = self.final_namespace
         self._edge_collection_name = f"{self._collection_name}_edges"
+        self._degree_collection_name = f"{self._collection_name}_degrees"
 
     async def initialize(self):
         async with get_data_init_lock():
@@ -788,6 +790,7 @@ class MongoGraphStorage(BaseGraphStorage):
             self.edge_collection = await get_or_create_collection(
                 self.db, self._edge_collection_name
             )
+            await self._create_degree_collection()
 
             # Create Atlas Search index for better search performance if possible
             await self.create_search_index_if_not_exists()
@@ -802,6 +805,7 @@ class MongoGraphStorage(BaseGraphStorage):
             self.db = None
             self.collection = None
             self.edge_collection = None
+            self.degree_collection = None
 
     # Sample entity document
     # "source_ids" is Array representation of "source_id" split by GRAPH_FIELD_SEP
@@ -873,13 +877,54 @@ class MongoGraphStorage(BaseGraphStorage):
     # -------------------------------------------------------------------------
     #
 
+    # Degrees are kept in a side collection {"_id": node_id, "degree": n} that
+    # edge writes update with $inc, so degree lookups are point reads.
+
+    async def _create_degree_collection(self) -> None:
+        """Create the degree collection, filling it from the edges on first use"""
+        is_new = (
+            self._degree_collection_name not in await self.db.list_collection_names()
+        )
+        self.degree_collection = await get_or_create_collection(
+            self.db, self._degree_collection_name
+        )
+        await self.degree_collection.create_index([("degree", -1), ("_id", 1)])
+        if not is_new:
+            return
+
+        pipeline = [
+            {"$project": {"node_ids": ["$source_node_id", "$target_node_id"]}},
+            {"$unwind": "$node_ids"},
+            {"$group": {"_id": "$node_ids", "degree": {"$sum": 1}}},
+            {
+                "$merge": {
+                    "into": self._degree_collection_name,
+                    "whenMatched": "replace",
+                }
+            },
+        ]
+        cursor = await self.edge_collection.aggregate(pipeline, allowDiskUse=True)
+        async for _ in cursor:
+            pass
+        logger.info(
+            f"[{self.workspace}] Created degree collection {self._degree_collection_name}"
+        )
+
+    async def _add_degrees(self, deltas: Counter) -> None:
+        operations = [
+            UpdateOne({"_id": node_id}, {"$inc": {"degree": delta}}, upsert=True)
+            for node_id, delta in deltas.items()
+            if delta
+        ]
+        if operations:
+            await self.degree_collection.bulk_write(operations, ordered=False)
+
     async def node_degree(self, node_id: str) -> int:
         """
         Returns the total number of edges connected to node_id (both inbound and outbound).
         """
-        return await self.edge_collection.count_documents(
-            {"$or": [{"source_node_id": node_id}, {"target_node_id": node_id}]}
-        )
+        doc = await self.degree_collection.find_one({"_id": node_id})
+        return doc["degree"] if doc else 0
 
     async def edge_degree(self, src_id: str, tgt_id: str) -> int:
         """Get the total degree (sum of relationships) of two nodes.
@@ -959,36 +1004,10 @@ class MongoGraphStorage(BaseGraphStorage):
         return result
 
     async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
-        # merge the outbound and inbound results with the same "_id" and sum the "degree"
-        merged_results = {}
-
-        # Outbound degrees
-        outbound_pipeline = [
-            {"$match": {"source_node_id": {"$in": node_ids}}},
-            {"$group": {"_id": "$source_node_id", "degree": {"$sum": 1}}},
-        ]
-
-        cursor = await self.edge_collection.aggregate(
-            outbound_pipeline, allowDiskUse=True
-        )
-        async for doc in cursor:
-            merged_results[doc.get("_id")] = doc.get("degree")
-
-        # Inbound degrees
-        inbound_pipeline = [
-            {"$match": {"target_node_id": {"$in": node_ids}}},
-            {"$group": {"_id": "$target_node_id", "degree": {"$sum": 1}}},
-        ]
-
-        cursor = await self.edge_collection.aggregate(
-            inbound_pipeline, allowDiskUse=True
-        )
-        async for doc in cursor:
-            merged_results[doc.get("_id")] = merged_results.get(
-                doc.get("_id"), 0
-            ) + doc.get("degree")
-
-        return merged_results
+        result = {}
+        async for doc in self.degree_collection.find({"_id": {"$in": node_ids}}):
+            result[doc["_id"]] = doc["degree"]
+        return result
 
     async def get_nodes_edges_batch(
         self, node_ids: list[str]
@@ -1068,7 +1087,7 @@ class MongoGraphStorage(BaseGraphStorage):
         edge_data["source_node_id"] = source_node_id
         edge_data["target_node_id"] = target_node_id
 
-        await self.edge_collection.update_one(
+        result = await self.edge_collection.update_one(
             {
                 "$or": [
                     {
@@ -1084,6 +1103,8 @@ class MongoGraphStorage(BaseGraphStorage):
             update_doc,
             upsert=True,
         )
+        if result.upserted_id is not None:
+            await self._add_degrees(Counter([source_node_id, target_node_id]))
 
     #
     # -------------------------------------------------------------------------
@@ -1096,13 +1117,7 @@ class MongoGraphStorage(BaseGraphStorage):
         1) Remove node's doc entirely.
         2) Remove inbound & outbound edges from any doc that references node_id.
         """
-        # Remove all edges
-        await self.edge_collection.delete_many(
-            {"$or": [{"source_node_id": node_id}, {"target_node_id": node_id}]}
-        )
-
-        # Remove the node doc
-        await self.collection.delete_one({"_id": node_id})
+        await self.remove_nodes([node_id])
 
     #
     # -------------------------------------------------------------------------
@@ -1529,6 +1544,17 @@ class MongoGraphStorage(BaseGraphStorage):
         # Mongo handles persistence automatically
         pass
 
+    async def _edge_degree_deltas(self, edge_filter: dict) -> Counter:
+        """Degree changes of the endpoints when the matching edges are deleted"""
+        deltas = Counter()
+        cursor = self.edge_collection.find(
+            edge_filter, {"source_node_id": 1, "target_node_id": 1}
+        )
+        async for edge in cursor:
+            deltas[edge["source_node_id"]] -= 1
+            deltas[edge["target_node_id"]] -= 1
+        return deltas
+
     async def remove_nodes(self, nodes: list[str]) -> None:
         """Delete multiple nodes
 
@@ -1540,18 +1566,24 @@ class MongoGraphStorage(BaseGraphStorage):
             return
 
         # 1. Remove all edges referencing these nodes
-        await self.edge_collection.delete_many(
-            {
-                "$or": [
-                    {"source_node_id": {"$in": nodes}},
-                    {"target_node_id": {"$in": nodes}},
-                ]
-            }
-        )
+        edge_filter = {
+            "$or": [
+                {"source_node_id": {"$in": nodes}},
+                {"target_node_id": {"$in": nodes}},
+            ]
+        }
+        deltas = await self._edge_degree_deltas(edge_filter)
+        await self.edge_collection.delete_many(edge_filter)
 
         # 2. Delete the node documents
         await self.collection.delete_many({"_id": {"$in": nodes}})
 
+        # 3. Update the degrees of the remaining neighbours
+        for node_id in nodes:
+            deltas.pop(node_id, None)
+        await self._add_degrees(deltas)
+        await self.degree_collection.delete_many({"_id": {"$in": nodes}})
+
         logger.debug(f"[{self.workspace}] Successfully deleted nodes: {nodes}")
 
     async def remove_edges(self, edges: list[tuple[str, str]]) -> None:
@@ -1573,7 +1605,10 @@ class MongoGraphStorage(BaseGraphStorage):
                 {"source_node_id": target_id, "target_node_id": source_id}
             )
 
-        await self.edge_collection.delete_many({"$or": all_edge_pairs})
+        edge_filter = {"$or": all_edge_pairs}
+        deltas = await self._edge_degree_deltas(edge_filter)
+        await self.edge_collection.delete_many(edge_filter)
+        await self._add_degrees(deltas)
 
         logger.debug(f"[{self.workspace}] Successfully deleted edges: {edges}")
 
@@ -1607,6 +1642,35 @@ class MongoGraphStorage(BaseGraphStorage):
             edges.append(edge_dict)
         return edges
 
+    async def iter_all_nodes(self, batch_size: int = 1000):
+        """Stream all nodes in batches from the cursor"""
+        cursor = self.collection.find({}, batch_size=batch_size)
+        batch = []
+        async for node in cursor:
+            node_dict = dict(node)
+            node_dict["id"] = node_dict.get("_id")
+            batch.append(node_dict)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def iter_all_edges(self, batch_size: int = 1000):
+        """Stream all edges in batches from the cursor"""
+        cursor = self.edge_collection.find({}, batch_size=batch_size)
+        batch = []
+        async for edge in cursor:
+            edge_dict = dict(edge)
+            edge_dict["source"] = edge_dict.get("source_node_id")
+            edge_dict["target"] = edge_dict.get("target_node_id")
+            batch.append(edge_dict)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     async def get_popular_labels(self, limit: int = 300) -> list[str]:
         """Get popular labels by node degree (most connected entities)
 
@@ -1617,51 +1681,12 @@ class MongoGraphStorage(BaseGraphStorage):
             List of labels sorted by degree (highest first)
         """
         try:
-            # Use aggregation pipeline to count edges per node and sort by degree
-            pipeline = [
-                # Count outbound edges
-                {"$group": {"_id": "$source_node_id", "out_degree": {"$sum": 1}}},
-                # Union with inbound edges count
-                {
-                    "$unionWith": {
-                        "coll": self._edge_collection_name,
-                        "pipeline": [
-                            {
-                                "$group": {
-                                    "_id": "$target_node_id",
-                                    "in_degree": {"$sum": 1},
-                                }
-                            }
-                        ],
-                    }
-                },
-                # Group by node_id and sum degrees
-                {
-                    "$group": {
-                        "_id": "$_id",
-                        "total_degree": {
-                            "$sum": {
-                                "$add": [
-                                    {"$ifNull": ["$out_degree", 0]},
-                                    {"$ifNull": ["$in_degree", 0]},
-                                ]
-                            }
-                        },
-                    }
-                },
-                # Sort by degree descending, then by label ascending
-                {"$sort": {"total_degree": -1, "_id": 1}},
-                # Limit results
-                {"$limit": limit},
-                # Project only the label
-                {"$project": {"_id": 1}},
-            ]
-
-            cursor = await self.edge_collection.aggregate(pipeline, allowDiskUse=True)
-            labels = []
-            async for doc in cursor:
-                if doc.get("_id"):
-                    labels.append(doc["_id"])
+            cursor = (
+                self.degree_collection.find({"degree": {"$gt": 0}}, {"_id": 1})
+                .sort([("degree", -1), ("_id", 1)])
+                .limit(limit)
+            )
+            labels = [doc["_id"] async for doc in cursor]
 
             logger.debug(
                 f"[{self.workspace}] Retrieved {len(labels)} popular labels (limit: {limit})"
@@ -2020,6 +2045,7 @@ class MongoGraphStorage(BaseGraphStorage):
 
             result = await self.edge_collection.delete_many({})
             edge_count = result.deleted_count
+            await self.degree_collection.delete_many({})
             logger.info(
                 f"[{self.workspace}] Dropped {edge_count} edges from graph {self._edge_collection_name}"
             )
@@ -19,6 +19,40 @@ from .shared_storage import (
     get_update_flag,
     set_all_update_flags,
 )
+from .change_log import PendingChanges, StorageChangeLog, change_log_enabled
+from .shared_memory_snapshot import (
+    discard_snapshot,
+    load_latest_snapshot,
+    publish_snapshot,
+    snapshots_enabled,
+)
+
+
+class _NanoVectorDBClient(NanoVectorDB):
+    """NanoVectorDB with access to its in-memory storage (data and matrix).
+
+    NanoVectorDB keeps them in a name-mangled private attribute and has no
+    accessor. This subclass is the only place that touches it, and fails at
+    construction instead of misbehaving if a nano-vectordb release renames it.
+    """
+
+    _STORAGE_ATTR = "_NanoVectorDB__storage"
+
+    def __post_init__(self):
+        super().__post_init__()
+        if not isinstance(getattr(self, self._STORAGE_ATTR, None), dict):
+            raise RuntimeError(
+                "Unsupported nano-vectordb version: NanoVectorDB no longer keeps "
+                f"its data in {self._STORAGE_ATTR}"
+            )
+
+    @property
+    def storage(self) -> dict[str, Any]:
+        return getattr(self, self._STORAGE_ATTR)
+
+    @storage.setter
+    def storage(self, value: dict[str, Any]) -> None:
+        setattr(self, self._STORAGE_ATTR, value)
 
 
 @final
@@ -58,10 +92,13 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
         self._max_batch_size = self.global_config["embedding_batch_num"]
 
-        self._client = NanoVectorDB(
+        self._client = _NanoVectorDBClient(
             self.embedding_func.embedding_dim,
             storage_file=self._client_file_name,
         )
+        self._change_log = StorageChangeLog(self._client_file_name)
+        self._change_log_generation = self._change_log.current_generation()
+        self._pending_changes = PendingChanges()
 
     async def initialize(self):
         """Initialize storage data"""
@@ -74,6 +111,74 @@ class NanoVectorDBStorage(BaseVectorStorage):
             self.namespace, workspace=self.workspace
         )
 
+    async def _load_client(self) -> _NanoVectorDBClient:
+        """Load the latest data, from the shared memory snapshot when one is published"""
+        if snapshots_enabled():
+            snapshot = await load_latest_snapshot(self.namespace, self.workspace)
+            if snapshot is not None:
+                client = _NanoVectorDBClient(
+                    self.embedding_func.embedding_dim, storage_file=""
+                )
+                client.storage_file = self._client_file_name
+                storage = snapshot.load_payload()
+                # Read-only view of the shared matrix, already normalized by the writer
+                storage["matrix"] = snapshot.arrays["matrix"]
+                client.storage = storage
+                return client
+        return _NanoVectorDBClient(
+            self.embedding_func.embedding_dim,
+            storage_file=self._client_file_name,
+        )
+
+    async def _publish_snapshot(self) -> None:
+        """Publish the saved data so other processes can map it instead of reloading"""
+        storage = self._client.storage
+        snapshot = await publish_snapshot(
+            self.namespace,
+            self.workspace,
+            arrays={"matrix": storage["matrix"]},
+            payload={k: v for k, v in storage.items() if k != "matrix"},
+        )
+        if snapshot is not None:
+            # Share the published matrix instead of keeping a private copy
+            storage["matrix"] = snapshot.arrays["matrix"]
+
+    @staticmethod
+    def _ensure_writable_matrix(client: _NanoVectorDBClient) -> None:
+        """Copy-on-write: a matrix mapped from a shared memory snapshot is read-only"""
+        storage = client.storage
+        if not storage["matrix"].flags.writeable:
+            storage["matrix"] = storage["matrix"].copy()
+
+    async def _reload_client(self) -> None:
+        """Catch up with data persisted by another process"""
+        # Apply only the logged delta, unless that would merge unsaved local changes
+        # (a reload discards them) or snapshots are used (they keep the matrix shared)
+        if not self._pending_changes and not snapshots_enabled():
+            deltas = self._change_log.read_since(self._change_log_generation)
+            if deltas is not None:
+                self._ensure_writable_matrix(self._client)
+                for delta in deltas:
+                    if delta["deleted"]:
+                        self._client.delete(delta["deleted"])
+                    if delta["upserted"]:
+                        self._client.upsert(datas=delta["upserted"])
+                self._change_log_generation += len(deltas)
+                return
+        self._client = await self._load_client()
+        self._change_log_generation = self._change_log.current_generation()
+        self._pending_changes.clear()
+
+    def _change_log_delta(self) -> dict[str, Any]:
+        """Records upserted and ids deleted since the last save"""
+        storage = self._client.storage
+        upserted = [
+            {**dp, "__vector__": storage["matrix"][i]}
+            for i, dp in enumerate(storage["data"])
+            if dp["__id__"] in self._pending_changes.upserted
+        ]
+        return {"upserted": upserted, "deleted": list(self._pending_changes.deleted)}
+
     async def _get_client(self):
         """Check if the storage should be reloaded"""
         # Acquire lock to prevent concurrent read and write
@@ -84,10 +189,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
                     f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
                 )
                 # Reload data
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                await self._reload_client()
                 # Reset update flag
                 self.storage_updated.value = False
 
@@ -133,7 +235,9 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 d["vector"] = encoded_vector
                 d["__vector__"] = embeddings[i]
             client = await self._get_client()
+            self._ensure_writable_matrix(client)
             results = client.upsert(datas=list_data)
+            self._pending_changes.upserted.update(data.keys())
             return results
         else:
             # sometimes the embedding is not returned correctly. just log it.
@@ -164,7 +268,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             {
                 **{k: v for k, v in dp.items() if k != "vector"},
                 "id": dp["__id__"],
-                "distance": dp["__metrics__"],
+                "distance": float(dp["__metrics__"]),
                 "created_at": dp.get("__created_at__"),
             }
             for dp in results
@@ -174,7 +278,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
     @property
     async def client_storage(self):
         client = await self._get_client()
-        return getattr(client, "_NanoVectorDB__storage")
+        return client.storage
 
     async def delete(self, ids: list[str]):
         """Delete vectors with specified IDs
@@ -193,6 +297,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             before_count = len(client)
 
             client.delete(ids)
+            self._pending_changes.deleted.update(ids)
 
             # Calculate actual deleted count
             after_count = len(client)
@@ -224,6 +329,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             client = await self._get_client()
             if client.get([entity_id]):
                 client.delete([entity_id])
+                self._pending_changes.deleted.add(entity_id)
                 logger.debug(
                     f"[{self.workspace}] Successfully deleted entity {entity_name}"
                 )
@@ -244,7 +350,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
         try:
             client = await self._get_client()
-            storage = getattr(client, "_NanoVectorDB__storage")
+            storage = client.storage
             relations = [
                 dp
                 for dp in storage["data"]
@@ -258,6 +364,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             if ids_to_delete:
                 client = await self._get_client()
                 client.delete(ids_to_delete)
+                self._pending_changes.deleted.update(ids_to_delete)
                 logger.debug(
                     f"[{self.workspace}] Deleted {len(ids_to_delete)} relations for {entity_name}"
                 )
@@ -279,10 +386,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 logger.warning(
                     f"[{self.workspace}] Storage for {self.namespace} was updated by another process, reloading..."
                 )
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                await self._reload_client()
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
@@ -292,6 +396,13 @@ class NanoVectorDBStorage(BaseVectorStorage):
             try:
                 # Save data to disk
                 self._client.save()
+                if change_log_enabled():
+                    self._change_log_generation = self._change_log.append(
+                        self._change_log_delta()
+                    )
+                self._pending_changes.clear()
+                if snapshots_enabled():
+                    await self._publish_snapshot()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
                 # Reset own update flag to avoid self-reloading
@@ -409,10 +520,15 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 if os.path.exists(self._client_file_name):
                     os.remove(self._client_file_name)
 
-                self._client = NanoVectorDB(
+                self._client = _NanoVectorDBClient(
                     self.embedding_func.embedding_dim,
                     storage_file=self._client_file_name,
                 )
+                self._pending_changes.clear()
+                if change_log_enabled():
+                    self._change_log_generation = self._change_log.append_reset()
+                if snapshots_enabled():
+                    await discard_snapshot(self.namespace, self.workspace)
 
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
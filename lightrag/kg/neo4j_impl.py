@@ -13,6 +13,7 @@ from tenacity import (
 )
 
 import logging
+from ..constants import DEFAULT_GRAPH_WRITE_BATCH_SIZE
 from ..utils import logger
 from ..base import BaseGraphStorage
 from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
@@ -60,6 +61,15 @@ READ_RETRY = retry(
     reraise=True,
 )
 
+WRITE_RETRY = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=4, max=10),
+    retry=retry_if_exception_type(
+        READ_RETRY_EXCEPTIONS + (neo4jExceptions.WriteServiceUnavailable,)
+    ),
+    reraise=True,
+)
+
 
 @final
 @dataclass
@@ -1102,6 +1112,76 @@ class Neo4JStorage(BaseGraphStorage):
             logger.error(f"[{self.workspace}] Error during edge upsert: {str(e)}")
             raise
 
+    @WRITE_RETRY
+    async def _write_rows(self, query: str, rows: list[dict]) -> None:
+        """Run an UNWIND $rows write query for one batch in a single transaction"""
+
+        async def execute_write(tx: AsyncManagedTransaction):
+            result = await tx.run(query, rows=rows)
+            await result.consume()
+
+        async with self._driver.session(database=self._DATABASE) as session:
+            await session.execute_write(execute_write)
+
+    async def _write_batches(self, query: str, rows: list[dict]) -> None:
+        batch_size = self.global_config.get(
+            "graph_write_batch_size", DEFAULT_GRAPH_WRITE_BATCH_SIZE
+        )
+        for i in range(0, len(rows), batch_size):
+            await self._write_rows(query, rows[i : i + batch_size])
+
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Upsert nodes with UNWIND queries, one transaction per batch
+
+        Labels cannot be parameters, so nodes are grouped by entity type.
+        """
+        workspace_label = self._get_workspace_label()
+        rows_by_type: dict[str, list[dict]] = {}
+        for node_id, node_data in nodes.items():
+            if "entity_id" not in node_data:
+                raise ValueError(
+                    "Neo4j: node properties must contain an 'entity_id' field"
+                )
+            rows_by_type.setdefault(node_data["entity_type"], []).append(
+                {"entity_id": node_id, "properties": node_data}
+            )
+
+        try:
+            for entity_type, rows in rows_by_type.items():
+                query = f"""
+                UNWIND $rows AS row
+                MERGE (n:`{workspace_label}` {{entity_id: row.entity_id}})
+                SET n += row.properties
+                SET n:`{entity_type}`
+                """
+                await self._write_batches(query, rows)
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error during batch upsert: {str(e)}")
+            raise
+
+    async def upsert_edges_batch(
+        self, edges: list[tuple[str, str, dict[str, str]]]
+    ) -> None:
+        """Upsert edges with UNWIND queries, one transaction per batch"""
+        workspace_label = self._get_workspace_label()
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (source:`{workspace_label}` {{entity_id: row.source_id}})
+        WITH source, row
+        MATCH (target:`{workspace_label}` {{entity_id: row.target_id}})
+        MERGE (source)-[r:DIRECTED]-(target)
+        SET r += row.properties
+        """
+        rows = [
+            {"source_id": src, "target_id": tgt, "properties": edge_data}
+            for src, tgt, edge_data in edges
+        ]
+        try:
+            await self._write_batches(query, rows)
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error during batch edge upsert: {str(e)}")
+            raise
+
     async def get_knowledge_graph(
         self,
         node_label: str,
@@ -1669,6 +1749,53 @@ class Neo4JStorage(BaseGraphStorage):
             await result.consume()
             return edges
 
+    async def iter_all_nodes(self, batch_size: int = 1000):
+        """Stream all nodes in batches without materializing the whole result"""
+        workspace_label = self._get_workspace_label()
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ", fetch_size=batch_size
+        ) as session:
+            query = f"""
+            MATCH (n:`{workspace_label}`)
+            RETURN n
+            """
+            result = await session.run(query)
+            batch = []
+            async for record in result:
+                node_dict = dict(record["n"])
+                node_dict["id"] = node_dict.get("entity_id")
+                batch.append(node_dict)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+            await result.consume()
+
+    async def iter_all_edges(self, batch_size: int = 1000):
+        """Stream all edges in batches, each relationship once (directed match)"""
+        workspace_label = self._get_workspace_label()
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ", fetch_size=batch_size
+        ) as session:
+            query = f"""
+            MATCH (a:`{workspace_label}`)-[r]->(b:`{workspace_label}`)
+            RETURN a.entity_id AS source, b.entity_id AS target, properties(r) AS properties
+            """
+            result = await session.run(query)
+            batch = []
+            async for record in result:
+                edge_properties = record["properties"]
+                edge_properties["source"] = record["source"]
+                edge_properties["target"] = record["target"]
+                batch.append(edge_properties)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+            await result.consume()
+
     async def get_popular_labels(self, limit: int = 300) -> list[str]:
         """Get popular labels by node degree (most connected entities)
 
@@ -11,6 +11,14 @@ from .shared_storage import (
     get_update_flag,
     set_all_update_flags,
 )
+from .change_log import PendingChanges, StorageChangeLog, change_log_enabled
+from .label_index import LabelIndex
+from .shared_memory_snapshot import (
+    discard_snapshot,
+    load_latest_snapshot,
+    publish_snapshot,
+    snapshots_enabled,
+)
 
 from dotenv import load_dotenv
 
@@ -20,6 +28,11 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env", override=False)
 
 
+def _edge_key(source: str, target: str) -> tuple[str, str]:
+    # Edges are undirected: (a, b) and (b, a) are the same edge
+    return (source, target) if source <= target else (target, source)
+
+
 @final
 @dataclass
 class NetworkXStorage(BaseGraphStorage):
@@ -65,6 +78,12 @@ class NetworkXStorage(BaseGraphStorage):
                 f"[{self.workspace}] Created new empty graph file: {self._graphml_xml_file}"
             )
         self._graph = preloaded_graph or nx.Graph()
+        self._label_index_file = f"{self._graphml_xml_file}.labels.pkl"
+        self._label_index = self._build_label_index(self._graph)
+        self._change_log = StorageChangeLog(self._graphml_xml_file)
+        self._change_log_generation = self._change_log.current_generation()
+        self._pending_nodes = PendingChanges()
+        self._pending_edges = PendingChanges()
 
     async def initialize(self):
         """Initialize storage data"""
@@ -77,6 +96,84 @@ class NetworkXStorage(BaseGraphStorage):
             self.namespace, workspace=self.workspace
         )
 
+    def _graph_file_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self._graphml_xml_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _build_label_index(self, graph: nx.Graph) -> LabelIndex:
+        """Load the label index saved with the graph file, or build it from the graph"""
+        index = LabelIndex.load(self._label_index_file, self._graph_file_stamp())
+        if index is not None and len(index) == graph.number_of_nodes():
+            return index
+        return LabelIndex(str(node) for node in graph.nodes())
+
+    async def _load_graph(self) -> nx.Graph:
+        """Load the latest graph, from the shared memory snapshot when one is published"""
+        if snapshots_enabled():
+            snapshot = await load_latest_snapshot(self.namespace, self.workspace)
+            if snapshot is not None:
+                # Unpickling is much cheaper than parsing GraphML, but every
+                # worker still builds a graph of its own
+                return snapshot.load_payload()
+        return NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
+
+    async def _reload_graph(self) -> None:
+        """Catch up with the graph persisted by another process"""
+        # Apply only the logged delta, unless that would merge unsaved local changes
+        if not self._pending_nodes and not self._pending_edges:
+            deltas = self._change_log.read_since(self._change_log_generation)
+            if deltas is not None:
+                for delta in deltas:
+                    self._apply_change_log_delta(delta)
+                self._change_log_generation += len(deltas)
+                return
+        self._graph = await self._load_graph()
+        self._label_index = self._build_label_index(self._graph)
+        self._change_log_generation = self._change_log.current_generation()
+        self._pending_nodes.clear()
+        self._pending_edges.clear()
+
+    def _apply_change_log_delta(self, delta: dict) -> None:
+        graph = self._graph
+        label_index = self._label_index
+        graph.remove_nodes_from(delta["deleted_nodes"])
+        graph.remove_edges_from(delta["deleted_edges"])
+        for node_id in delta["deleted_nodes"]:
+            label_index.remove(str(node_id))
+        # Replace attributes rather than merging them, as the writer holds them
+        for node_id, node_data in delta["upserted_nodes"].items():
+            if graph.has_node(node_id):
+                graph.nodes[node_id].clear()
+            graph.add_node(node_id, **node_data)
+            label_index.add(str(node_id))
+        for source, target, edge_data in delta["upserted_edges"]:
+            if graph.has_edge(source, target):
+                graph.edges[source, target].clear()
+            graph.add_edge(source, target, **edge_data)
+            label_index.add(str(source))
+            label_index.add(str(target))
+
+    def _change_log_delta(self) -> dict:
+        """Nodes and edges upserted or deleted since the last save"""
+        graph = self._graph
+        return {
+            "deleted_nodes": list(self._pending_nodes.deleted),
+            "deleted_edges": list(self._pending_edges.deleted),
+            "upserted_nodes": {
+                node_id: dict(graph.nodes[node_id])
+                for node_id in self._pending_nodes.upserted
+                if graph.has_node(node_id)
+            },
+            "upserted_edges": [
+                (source, target, dict(graph.edges[source, target]))
+                for source, target in self._pending_edges.upserted
+                if graph.has_edge(source, target)
+            ],
+        }
+
     async def _get_graph(self):
         """Check if the storage should be reloaded"""
         # Acquire lock to prevent concurrent read and write
@@ -87,9 +184,7 @@ class NetworkXStorage(BaseGraphStorage):
                     f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
                 )
                 # Reload data
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                await self._reload_graph()
                 # Reset update flag
                 self.storage_updated.value = False
 
@@ -138,6 +233,8 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_node(node_id, **node_data)
+        self._label_index.add(str(node_id))
+        self._pending_nodes.upserted.add(node_id)
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
@@ -150,6 +247,10 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_edge(source_node_id, target_node_id, **edge_data)
+        # Missing endpoints are created by add_edge
+        self._label_index.add(str(source_node_id))
+        self._label_index.add(str(target_node_id))
+        self._pending_edges.upserted.add(_edge_key(source_node_id, target_node_id))
 
     async def delete_node(self, node_id: str) -> None:
         """
@@ -161,6 +262,8 @@ class NetworkXStorage(BaseGraphStorage):
         graph = await self._get_graph()
         if graph.has_node(node_id):
             graph.remove_node(node_id)
+            self._label_index.remove(str(node_id))
+            self._pending_nodes.deleted.add(node_id)
             logger.debug(f"[{self.workspace}] Node {node_id} deleted from the graph")
         else:
             logger.warning(
@@ -182,6 +285,8 @@ class NetworkXStorage(BaseGraphStorage):
         for node in nodes:
             if graph.has_node(node):
                 graph.remove_node(node)
+                self._label_index.remove(str(node))
+                self._pending_nodes.deleted.add(node)
 
     async def remove_edges(self, edges: list[tuple[str, str]]):
         """Delete multiple edges
@@ -198,6 +303,7 @@ class NetworkXStorage(BaseGraphStorage):
         for source, target in edges:
             if graph.has_edge(source, target):
                 graph.remove_edge(source, target)
+                self._pending_edges.deleted.add(_edge_key(source, target))
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -205,13 +311,8 @@ class NetworkXStorage(BaseGraphStorage):
         Returns:
             [label1, label2, ...]  # Alphabetically sorted label list
         """
-        graph = await self._get_graph()
-        labels = set()
-        for node in graph.nodes():
-            labels.add(str(node))  # Add node id as a label
-
-        # Return sorted list
-        return sorted(list(labels))
+        await self._get_graph()
+        return self._label_index.labels()
 
     async def get_popular_labels(self, limit: int = 300) -> list[str]:
         """
@@ -249,44 +350,10 @@ class NetworkXStorage(BaseGraphStorage):
         Returns:
             List of matching labels sorted by relevance
         """
-        graph = await self._get_graph()
-        query_lower = query.lower().strip()
-
-        if not query_lower:
-            return []
-
-        # Collect matching nodes with relevance scores
-        matches = []
-        for node in graph.nodes():
-            node_str = str(node)
-            node_lower = node_str.lower()
-
-            # Skip if no match
-            if query_lower not in node_lower:
-                continue
-
-            # Calculate relevance score
-            # Exact match gets highest score
-            if node_lower == query_lower:
-                score = 1000
-            # Prefix match gets high score
-            elif node_lower.startswith(query_lower):
-                score = 500
-            # Contains match gets base score, with bonus for shorter strings
-            else:
-                # Shorter strings with matches are more relevant
-                score = 100 - len(node_str)
-                # Bonus for word boundary matches
-                if f" {query_lower}" in node_lower or f"_{query_lower}" in node_lower:
-                    score += 50
-
-            matches.append((node_str, score))
-
-        # Sort by relevance score (desc) then alphabetically
-        matches.sort(key=lambda x: (-x[1], x[0]))
-
-        # Return top matches limited by the specified limit
-        search_results = [match[0] for match in matches[:limit]]
+        await self._get_graph()
+        # Same scoring as a full scan: exact 1000, prefix 500, otherwise
+        # 100 - len(label) with a 50 bonus for word boundary matches
+        search_results = self._label_index.search(query, limit)
 
         logger.debug(
             f"[{self.workspace}] Search query '{query}' returned {len(search_results)} results (limit: {limit})"
@@ -509,9 +576,7 @@ class NetworkXStorage(BaseGraphStorage):
                 logger.info(
                     f"[{self.workspace}] Graph was updated by another process, reloading..."
                 )
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                await self._reload_graph()
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
@@ -523,6 +588,19 @@ class NetworkXStorage(BaseGraphStorage):
                 NetworkXStorage.write_nx_graph(
                     self._graph, self._graphml_xml_file, self.workspace
                 )
+                self._label_index.save(self._label_index_file, self._graph_file_stamp())
+                if change_log_enabled():
+                    self._change_log_generation = self._change_log.append(
+                        self._change_log_delta()
+                    )
+                self._pending_nodes.clear()
+                self._pending_edges.clear()
+                if snapshots_enabled():
+                    # Speeds up the reload of other workers; each still
+                    # unpickles a private copy of the graph
+                    await publish_snapshot(
+                        self.namespace, self.workspace, arrays={}, payload=self._graph
+                    )
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
                 # Reset own update flag to avoid self-reloading
@@ -553,7 +631,15 @@ class NetworkXStorage(BaseGraphStorage):
                 # delete _client_file_name
                 if os.path.exists(self._graphml_xml_file):
                     os.remove(self._graphml_xml_file)
+                LabelIndex.delete(self._label_index_file)
                 self._graph = nx.Graph()
+                self._label_index = LabelIndex()
+                self._pending_nodes.clear()
+                self._pending_edges.clear()
+                if change_log_enabled():
+                    self._change_log_generation = self._change_log.append_reset()
+                if snapshots_enabled():
+                    await discard_snapshot(self.namespace, self.workspace)
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
                 # Reset own update flag to avoid self-reloading
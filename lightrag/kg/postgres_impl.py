@@ -11,6 +11,8 @@ import numpy as np
 import configparser
 import ssl
 import itertools
+from collections import OrderedDict
+from functools import lru_cache
 
 from lightrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 
@@ -35,7 +37,11 @@ from ..base import (
 from ..exceptions import DataMigrationError
 from ..namespace import NameSpace, is_namespace
 from ..utils import logger
-from ..kg.shared_storage import get_data_init_lock
+from ..kg.shared_storage import (
+    get_data_init_lock,
+    get_update_flag,
+    set_all_update_flags,
+)
 
 import pipmaster as pm
 
@@ -125,6 +131,69 @@ def _dollar_quote(s: str, tag_prefix: str = "AGE") -> str:
             return f"{wrapper}{s}{wrapper}"
 
 
+@lru_cache(maxsize=512)
+def _compile_cypher(graph_name: str, cypher: str, columns: str) -> str:
+    """
+    Wrap a parameterized Cypher statement in the SQL call AGE expects.
+
+    Values are passed as one agtype map in $1 and referenced as $name inside the
+    Cypher text, so the SQL text only depends on the statement. asyncpg's
+    per-connection statement cache then reuses the prepared (parsed and planned)
+    statement for every call.
+
+    Args:
+        graph_name: AGE graph to run the statement on
+        cypher: Cypher statement with $name parameters
+        columns: Column definition list of the result, e.g. "n agtype"
+
+    Returns:
+        The SQL statement
+    """
+    return (
+        f"SELECT * FROM cypher({_dollar_quote(graph_name)}::name, "
+        f"{_dollar_quote(cypher)}::cstring, $1::agtype) AS ({columns})"
+    )
+
+
+@lru_cache(maxsize=128)
+def _agtype_columns(columns: str) -> frozenset[str]:
+    """Names of the agtype columns in a column definition list"""
+    names = set()
+    for column in columns.split(","):
+        name, _, column_type = column.strip().partition(" ")
+        if column_type.strip().lower() == "agtype":
+            names.add(name)
+    return frozenset(names)
+
+
+# Type annotation AGE appends to vertices, edges and paths in agtype text
+_AGTYPE_ANNOTATION = re.compile(r"(?<=[}\]])::(?:vertex|edge|path)")
+
+
+def _decode_agtype(value: Any) -> Any:
+    """
+    Decode agtype text into Python values.
+
+    Maps, lists and scalars are JSON. Vertices, edges and paths carry a
+    `::vertex`/`::edge`/`::path` annotation after their closing bracket, which
+    is stripped before parsing; vertices and edges decode to their
+    {"id", "label", "properties", ...} maps, paths to lists of them.
+    Non-text values are returned unchanged, text that is not valid agtype JSON
+    as is.
+    """
+    if not isinstance(value, str):
+        return value
+    if "::" in value:
+        if value.endswith("::numeric"):
+            value = value[: -len("::numeric")]
+        else:
+            value = _AGTYPE_ANNOTATION.sub("", value)
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
 class PostgreSQLDB:
     def __init__(self, config: dict[str, Any], **kwargs: Any):
         self.host = config["host"]
@@ -159,6 +228,9 @@ class PostgreSQLDB:
         # Statement LRU cache size (keep as-is, allow None for optional configuration)
         self.statement_cache_size = config.get("statement_cache_size")
 
+        # Rows per executemany batch for bulk upserts
+        self.upsert_batch_size = int(config.get("upsert_batch_size", 1000))
+
         if self.user is None or self.password is None or self.database is None:
             raise ValueError("Missing database user, password, or database")
 
@@ -1692,6 +1764,41 @@ class PostgreSQLDB:
             logger.error(f"PostgreSQL database,\nsql:{sql},\ndata:{data},\nerror:{e}")
             raise
 
+    async def executemany(
+        self,
+        sql: str,
+        rows: list[dict[str, Any]],
+        batch_size: int | None = None,
+    ) -> None:
+        """Execute one statement for many parameter rows in batches.
+
+        Each batch is sent through asyncpg's executemany, which prepares the
+        statement once and pipelines the rows in a single round-trip. A batch
+        is atomic and is retried as a whole on transient connection errors.
+
+        Args:
+            sql: Statement with positional parameters.
+            rows: Parameter dicts, values in placeholder order as for execute().
+            batch_size: Rows per batch, defaults to upsert_batch_size.
+        """
+        if not rows:
+            return
+        batch_size = max(1, batch_size or self.upsert_batch_size)
+
+        for start in range(0, len(rows), batch_size):
+            batch = [tuple(row.values()) for row in rows[start : start + batch_size]]
+
+            async def _operation(connection: asyncpg.Connection) -> None:
+                await connection.executemany(sql, batch)
+
+            try:
+                await self._run_with_retry(_operation)
+            except Exception as e:
+                logger.error(
+                    f"PostgreSQL database,\nsql:{sql},\nbatch:{start}-{start + len(batch)} of {len(rows)} rows,\nerror:{e}"
+                )
+                raise
+
 
 class ClientManager:
     _instances: dict[str, Any] = {"db": None, "ref_count": 0}
@@ -1795,6 +1902,12 @@ class ClientManager:
                 "POSTGRES_STATEMENT_CACHE_SIZE",
                 config.get("postgres", "statement_cache_size", fallback=None),
             ),
+            "upsert_batch_size": int(
+                os.environ.get(
+                    "POSTGRES_UPSERT_BATCH_SIZE",
+                    config.get("postgres", "upsert_batch_size", fallback=1000),
+                )
+            ),
             # Connection retry configuration
             "connection_retry_attempts": min(
                 100,  # Increased from 10 to 100 for long-running operations
@@ -1920,7 +2033,7 @@ class PGKVStorage(BaseKVStorage):
             response["create_time"] = create_time
             response["update_time"] = create_time if update_time == 0 else update_time
 
-        # Special handling for LLM cache to ensure compatibility with _get_cached_extraction_results
+        # Special handling for LLM cache to ensure compatibility with _iter_cached_extraction_results
         if response and is_namespace(
             self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE
         ):
@@ -2054,7 +2167,7 @@ class PGKVStorage(BaseKVStorage):
                 result["create_time"] = create_time
                 result["update_time"] = create_time if update_time == 0 else update_time
 
-        # Special handling for LLM cache to ensure compatibility with _get_cached_extraction_results
+        # Special handling for LLM cache to ensure compatibility with _iter_cached_extraction_results
         if results and is_namespace(
             self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE
         ):
@@ -2177,11 +2290,14 @@ class PGKVStorage(BaseKVStorage):
         if not data:
             return
 
+        # All rows of a call go out through one executemany per batch
+        upsert_sql = None
+        rows = []
         if is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_text_chunk"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_text_chunk"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -2194,20 +2310,20 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_DOCS):
+            upsert_sql = SQL_TEMPLATES["upsert_doc_full"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_doc_full"]
                 _data = {
                     "id": k,
                     "content": v["content"],
                     "doc_name": v.get("file_path", ""),  # Map file_path to doc_name
                     "workspace": self.workspace,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+            upsert_sql = SQL_TEMPLATES["upsert_llm_response_cache"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_llm_response_cache"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,  # Use flattened key as id
@@ -2221,13 +2337,12 @@ class PGKVStorage(BaseKVStorage):
                     if v.get("queryparam")
                     else None,
                 }
-
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_ENTITIES):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_full_entities"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_full_entities"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -2236,12 +2351,12 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_RELATIONS):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_full_relations"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_full_relations"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -2250,12 +2365,12 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_ENTITY_CHUNKS):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_entity_chunks"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_entity_chunks"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -2264,12 +2379,12 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_RELATION_CHUNKS):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_relation_chunks"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_relation_chunks"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -2278,7 +2393,10 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
+
+        if upsert_sql is not None:
+            await self.db.executemany(upsert_sql, rows)
 
     async def index_done_callback(self) -> None:
         # PG handles persistence automatically
@@ -3796,14 +3914,14 @@ class PGDocStatusStorage(DocStatusStorage):
                   error_msg = EXCLUDED.error_msg,
                   created_at = EXCLUDED.created_at,
                   updated_at = EXCLUDED.updated_at"""
+        rows = []
         for k, v in data.items():
             # Remove timezone information, store utc time in db
             created_at = parse_datetime(v.get("created_at"))
             updated_at = parse_datetime(v.get("updated_at"))
 
             # chunks_count, chunks_list, track_id, metadata, and error_msg are optional
-            await self.db.execute(
-                sql,
+            rows.append(
                 {
                     "workspace": self.workspace,
                     "id": k,
@@ -3820,8 +3938,9 @@ class PGDocStatusStorage(DocStatusStorage):
                     "error_msg": v.get("error_msg"),  # Add error_msg support
                     "created_at": created_at,  # Use the converted datetime object
                     "updated_at": updated_at,  # Use the converted datetime object
-                },
+                }
             )
+        await self.db.executemany(sql, rows)
 
     async def drop(self) -> dict[str, str]:
         """Drop the storage"""
@@ -3863,9 +3982,18 @@ class PGGraphQueryException(Exception):
 @final
 @dataclass
 class PGGraphStorage(BaseGraphStorage):
+    # Subgraphs kept for get_knowledge_graph, most recently used last
+    _SUBGRAPH_CACHE_SIZE = 32
+    # Side table in the graph schema holding the degree of every connected node
+    _DEGREE_TABLE = "_node_degree"
+
     def __post_init__(self):
         # Graph name will be dynamically generated in initialize() based on workspace
         self.db: PostgreSQLDB | None = None
+        # Bumped on every write; cached subgraphs of older generations are stale
+        self._data_generation = 0
+        self._subgraph_cache: OrderedDict[tuple, KnowledgeGraph] = OrderedDict()
+        self.storage_updated = None
 
     def _get_workspace_graph_name(self) -> str:
         """
@@ -3931,6 +4059,11 @@ class PGGraphStorage(BaseGraphStorage):
             # Dynamically generate graph name based on workspace
             self.graph_name = self._get_workspace_graph_name()
 
+            # Writes by other workers invalidate cached subgraphs through this flag
+            self.storage_updated = await get_update_flag(
+                self.namespace, workspace=self.workspace
+            )
+
             # Log the graph initialization for debugging
             logger.info(
                 f"[{self.workspace}] PostgreSQL Graph initialized: graph_name='{self.graph_name}'"
@@ -3973,6 +4106,97 @@ class PGGraphStorage(BaseGraphStorage):
                     graph_name=self.graph_name,
                 )
 
+            await self._create_degree_index()
+
+    async def _create_degree_index(self) -> None:
+        """Create the node degree table, filling it from the edges on first use"""
+        row = await self.db.query(
+            "SELECT to_regclass($1) IS NOT NULL AS present",
+            [f'{self.graph_name}."{self._DEGREE_TABLE}"'],
+        )
+        if row and row["present"]:
+            return
+
+        queries = [
+            f"""CREATE TABLE IF NOT EXISTS {self.graph_name}."{self._DEGREE_TABLE}" (
+                    entity_id TEXT PRIMARY KEY,
+                    degree BIGINT NOT NULL
+                )""",
+            f"""CREATE INDEX IF NOT EXISTS {self.graph_name}_node_degree_rank_idx
+                ON {self.graph_name}."{self._DEGREE_TABLE}" (degree DESC, entity_id)""",
+            f"""INSERT INTO {self.graph_name}."{self._DEGREE_TABLE}" (entity_id, degree)
+                SELECT label, COUNT(*)
+                FROM (
+                    -- agtype text keeps the JSON quotes of a string; decode it to
+                    -- the plain entity id that edge writes and lookups use
+                    SELECT ((ag_catalog.agtype_access_operator(
+                              VARIADIC ARRAY[v.properties, '"entity_id"'::agtype]
+                            ))::text)::json #>> '{{}}' AS label
+                    FROM (
+                        SELECT start_id AS vid FROM {self.graph_name}."DIRECTED"
+                        UNION ALL
+                        SELECT end_id AS vid FROM {self.graph_name}."DIRECTED"
+                    ) AS e
+                    JOIN {self.graph_name}.base AS v ON v.id = e.vid
+                ) AS endpoints
+                WHERE label IS NOT NULL
+                GROUP BY label
+                ON CONFLICT (entity_id) DO UPDATE SET degree = EXCLUDED.degree""",
+        ]
+        for query in queries:
+            await self.db.execute(
+                query, with_age=True, graph_name=self.graph_name, upsert=True
+            )
+        logger.info(
+            f"[{self.workspace}] Created node degree index for graph '{self.graph_name}'"
+        )
+
+    async def _refresh_degrees(self, node_ids) -> None:
+        """Recount the degrees of the given nodes into the degree table
+
+        Counting the edges of a node is an index lookup, and recounting keeps
+        the table exact whether or not a MERGE created a new edge. Nodes that
+        no longer exist are removed from the table.
+        """
+        node_ids = list(dict.fromkeys(node_ids))
+        if not node_ids:
+            return
+        query = f"""
+            WITH ids AS (
+              SELECT DISTINCT v AS entity_id FROM unnest($1::text[]) AS t(v)
+            ),
+            vids AS (
+              SELECT i.entity_id, b.id AS vid
+              FROM ids i
+              LEFT JOIN {self.graph_name}.base AS b
+                ON ag_catalog.agtype_access_operator(
+                     VARIADIC ARRAY[b.properties, '"entity_id"'::agtype]
+                   ) = (to_json(i.entity_id)::text)::agtype
+            ),
+            per_vid AS (
+              SELECT entity_id, vid,
+                     (SELECT COUNT(*) FROM {self.graph_name}."DIRECTED" d
+                       WHERE d.start_id = vids.vid)
+                     + (SELECT COUNT(*) FROM {self.graph_name}."DIRECTED" d
+                         WHERE d.end_id = vids.vid) AS degree
+              FROM vids
+            ),
+            degrees AS (
+              SELECT entity_id, COUNT(vid) AS nodes, SUM(degree)::bigint AS degree
+              FROM per_vid
+              GROUP BY entity_id
+            ),
+            removed AS (
+              DELETE FROM {self.graph_name}."{self._DEGREE_TABLE}" AS n
+              USING degrees d
+              WHERE n.entity_id = d.entity_id AND d.nodes = 0
+            )
+            INSERT INTO {self.graph_name}."{self._DEGREE_TABLE}" (entity_id, degree)
+            SELECT entity_id, degree FROM degrees WHERE nodes > 0
+            ON CONFLICT (entity_id) DO UPDATE SET degree = EXCLUDED.degree
+        """
+        await self._query(query, readonly=False, params={"ids": node_ids})
+
     async def finalize(self):
         if self.db is not None:
             await ClientManager.release_client(self.db)
@@ -3982,6 +4206,25 @@ class PGGraphStorage(BaseGraphStorage):
         # PG handles persistence automatically
         pass
 
+    async def _graph_written(self) -> None:
+        """Mark cached subgraphs stale, in this and every other worker
+
+        Published on every committed write rather than in index_done_callback,
+        which runs only at the end of a pipeline run. The own flag is set too:
+        one extra cache miss, but a flag another worker set meanwhile is never
+        dropped.
+        """
+        self._data_generation += 1
+        if self.storage_updated is not None:
+            await set_all_update_flags(self.namespace, workspace=self.workspace)
+
+    def _current_generation(self) -> int:
+        """Data generation of the graph, advanced by writes of any worker"""
+        if self.storage_updated is not None and self.storage_updated.value:
+            self._data_generation += 1
+            self.storage_updated.value = False
+        return self._data_generation
+
     @staticmethod
     def _record_to_dict(record: asyncpg.Record) -> dict[str, Any]:
         """
@@ -4095,32 +4338,6 @@ class PGGraphStorage(BaseGraphStorage):
 
         return d
 
-    @staticmethod
-    def _format_properties(
-        properties: dict[str, Any], _id: Union[str, None] = None
-    ) -> str:
-        """
-        Convert a dictionary of properties to a string representation that
-        can be used in a cypher query insert/merge statement.
-
-        Args:
-            properties (dict[str,str]): a dictionary containing node/edge properties
-            _id (Union[str, None]): the id of the node or None if none exists
-
-        Returns:
-            str: the properties dictionary as a properly formatted string
-        """
-        props = []
-        # wrap property key in backticks to escape
-        for k, v in properties.items():
-            prop = f"`{k}`: {json.dumps(v)}"
-            props.append(prop)
-        if _id is not None and "id" not in properties:
-            props.append(
-                f"id: {json.dumps(_id)}" if isinstance(_id, str) else f"id: {_id}"
-            )
-        return "{" + ", ".join(props) + "}"
-
     async def _query(
         self,
         query: str,
@@ -4150,6 +4367,7 @@ class PGGraphStorage(BaseGraphStorage):
             else:
                 data = await self.db.execute(
                     query,
+                    params,
                     upsert=upsert,
                     with_age=True,
                     graph_name=self.graph_name,
@@ -4164,6 +4382,10 @@ class PGGraphStorage(BaseGraphStorage):
                     "error_type": e.__class__.__name__,
                 }
             ) from e
+        finally:
+            if not readonly:
+                # A failed write may still have changed the graph
+                await self._graph_written()
 
         if data is None:
             result = []
@@ -4173,6 +4395,67 @@ class PGGraphStorage(BaseGraphStorage):
 
         return result
 
+    async def _cypher(
+        self,
+        cypher: str,
+        params: dict[str, Any],
+        columns: str,
+        readonly: bool = True,
+        upsert: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Run a parameterized Cypher statement and decode the agtype results
+
+        Args:
+            cypher: Cypher statement referencing the values as $name
+            params: Values for the $name parameters
+            columns: Column definition list of the result, e.g. "n agtype"
+
+        Returns:
+            list[dict[str, Any]]: one dictionary per row (empty for writes)
+        """
+        sql = _compile_cypher(self.graph_name, cypher, columns)
+        args = json.dumps(params, ensure_ascii=False)
+        try:
+            if readonly:
+                data = await self.db.query(
+                    sql,
+                    [args],
+                    multirows=True,
+                    with_age=True,
+                    graph_name=self.graph_name,
+                )
+            else:
+                data = await self.db.execute(
+                    sql,
+                    {"params": args},
+                    upsert=upsert,
+                    with_age=True,
+                    graph_name=self.graph_name,
+                )
+        except Exception as e:
+            raise PGGraphQueryException(
+                {
+                    "message": f"Error executing graph query: {cypher}",
+                    "wrapped": sql,
+                    "detail": repr(e),
+                    "error_type": e.__class__.__name__,
+                }
+            ) from e
+        finally:
+            if not readonly:
+                await self._graph_written()
+
+        # Columns declared as text are already plain strings
+        agtype_columns = _agtype_columns(columns)
+        return [
+            {
+                key: _decode_agtype(value) if key in agtype_columns else value
+                for key, value in row.items()
+            }
+            for row in data or []
+        ]
+
     async def has_node(self, node_id: str) -> bool:
         query = f"""
             SELECT EXISTS (
@@ -4261,16 +4544,15 @@ class PGGraphStorage(BaseGraphStorage):
         Retrieves all edges (relationships) for a particular node identified by its label.
         :return: list of dictionaries containing edge information
         """
-        label = self._normalize_node_id(source_node_id)
-
-        # Build Cypher query with dynamic dollar-quoting to handle entity_id containing $ sequences
-        cypher_query = f"""MATCH (n:base {{entity_id: "{label}"}})
+        cypher_query = """MATCH (n:base {entity_id: $entity_id})
                       OPTIONAL MATCH (n)-[]-(connected:base)
                       RETURN n.entity_id AS source_id, connected.entity_id AS connected_id"""
 
-        query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(cypher_query)}) AS (source_id text, connected_id text)"
-
-        results = await self._query(query)
+        results = await self._cypher(
+            cypher_query,
+            {"entity_id": source_node_id},
+            "source_id text, connected_id text",
+        )
         edges = []
         for record in results:
             source_id = record["source_id"]
@@ -4299,19 +4581,18 @@ class PGGraphStorage(BaseGraphStorage):
                 "PostgreSQL: node properties must contain an 'entity_id' field"
             )
 
-        label = self._normalize_node_id(node_id)
-        properties = self._format_properties(node_data)
-
-        # Build Cypher query with dynamic dollar-quoting to handle content containing $$
-        # This prevents syntax errors when LLM-extracted descriptions contain $ sequences
-        cypher_query = f"""MERGE (n:base {{entity_id: "{label}"}})
-                     SET n += {properties}
+        cypher_query = """MERGE (n:base {entity_id: $entity_id})
+                     SET n += $properties
                      RETURN n"""
 
-        query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(cypher_query)}) AS (n agtype)"
-
         try:
-            await self._query(query, readonly=False, upsert=True)
+            await self._cypher(
+                cypher_query,
+                {"entity_id": node_id, "properties": node_data},
+                "n agtype",
+                readonly=False,
+                upsert=True,
+            )
 
         except Exception:
             logger.error(
@@ -4335,25 +4616,27 @@ class PGGraphStorage(BaseGraphStorage):
             target_node_id (str): Label of the target node (used as identifier)
             edge_data (dict): dictionary of properties to set on the edge
         """
-        src_label = self._normalize_node_id(source_node_id)
-        tgt_label = self._normalize_node_id(target_node_id)
-        edge_properties = self._format_properties(edge_data)
-
-        # Build Cypher query with dynamic dollar-quoting to handle content containing $$
-        # This prevents syntax errors when LLM-extracted descriptions contain $ sequences
-        # See: https://github.com/HKUDS/LightRAG/issues/1438#issuecomment-2826000195
-        cypher_query = f"""MATCH (source:base {{entity_id: "{src_label}"}})
+        cypher_query = """MATCH (source:base {entity_id: $source_id})
                      WITH source
-                     MATCH (target:base {{entity_id: "{tgt_label}"}})
+                     MATCH (target:base {entity_id: $target_id})
                      MERGE (source)-[r:DIRECTED]-(target)
-                     SET r += {edge_properties}
-                     SET r += {edge_properties}
+                     SET r += $properties
+                     SET r += $properties
                      RETURN r"""
 
-        query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(cypher_query)}) AS (r agtype)"
-
         try:
-            await self._query(query, readonly=False, upsert=True)
+            await self._cypher(
+                cypher_query,
+                {
+                    "source_id": source_node_id,
+                    "target_id": target_node_id,
+                    "properties": edge_data,
+                },
+                "r agtype",
+                readonly=False,
+                upsert=True,
+            )
+            await self._refresh_degrees([source_node_id, target_node_id])
 
         except Exception:
             logger.error(
@@ -4368,16 +4651,17 @@ class PGGraphStorage(BaseGraphStorage):
         Args:
             node_id (str): The ID of the node to delete.
         """
-        label = self._normalize_node_id(node_id)
-
-        # Build Cypher query with dynamic dollar-quoting to handle entity_id containing $ sequences
-        cypher_query = f"""MATCH (n:base {{entity_id: "{label}"}})
+        cypher_query = """MATCH (n:base {entity_id: $entity_id})
                      DETACH DELETE n"""
 
-        query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(cypher_query)}) AS (n agtype)"
-
         try:
-            await self._query(query, readonly=False)
+            neighbors = await self.get_node_edges(node_id) or []
+            await self._cypher(
+                cypher_query, {"entity_id": node_id}, "n agtype", readonly=False
+            )
+            await self._refresh_degrees(
+                [node_id, *(node for edge in neighbors for node in edge)]
+            )
         except Exception as e:
             logger.error(f"[{self.workspace}] Error during node deletion: {e}")
             raise
@@ -4389,18 +4673,26 @@ class PGGraphStorage(BaseGraphStorage):
         Args:
             node_ids (list[str]): A list of node IDs to remove.
         """
-        node_ids_normalized = [self._normalize_node_id(node_id) for node_id in node_ids]
-        node_id_list = ", ".join([f'"{node_id}"' for node_id in node_ids_normalized])
-
-        # Build Cypher query with dynamic dollar-quoting to handle entity_id containing $ sequences
-        cypher_query = f"""MATCH (n:base)
-                     WHERE n.entity_id IN [{node_id_list}]
+        cypher_query = """MATCH (n:base)
+                     WHERE n.entity_id IN $entity_ids
                      DETACH DELETE n"""
 
-        query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(cypher_query)}) AS (n agtype)"
-
         try:
-            await self._query(query, readonly=False)
+            edges = await self.get_nodes_edges_batch(list(node_ids))
+            await self._cypher(
+                cypher_query, {"entity_ids": list(node_ids)}, "n agtype", readonly=False
+            )
+            await self._refresh_degrees(
+                [
+                    *node_ids,
+                    *(
+                        node
+                        for pairs in edges.values()
+                        for edge in pairs
+                        for node in edge
+                    ),
+                ]
+            )
         except Exception as e:
             logger.error(f"[{self.workspace}] Error during node removal: {e}")
             raise
@@ -4412,24 +4704,23 @@ class PGGraphStorage(BaseGraphStorage):
         Args:
             edges (list[tuple[str, str]]): A list of edges to remove, where each edge is a tuple of (source_node_id, target_node_id).
         """
-        for source, target in edges:
-            src_label = self._normalize_node_id(source)
-            tgt_label = self._normalize_node_id(target)
-
-            # Build Cypher query with dynamic dollar-quoting to handle entity_id containing $ sequences
-            cypher_query = f"""MATCH (a:base {{entity_id: "{src_label}"}})-[r]-(b:base {{entity_id: "{tgt_label}"}})
-                         DELETE r"""
+        if not edges:
+            return
 
-            query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(cypher_query)}) AS (r agtype)"
+        cypher_query = """UNWIND $pairs AS p
+                     MATCH (a:base {entity_id: p.src})-[r]-(b:base {entity_id: p.tgt})
+                     DELETE r"""
+        pairs = [{"src": source, "tgt": target} for source, target in edges]
 
-            try:
-                await self._query(query, readonly=False)
-                logger.debug(
-                    f"[{self.workspace}] Deleted edge from '{source}' to '{target}'"
-                )
-            except Exception as e:
-                logger.error(f"[{self.workspace}] Error during edge deletion: {str(e)}")
-                raise
+        try:
+            await self._cypher(
+                cypher_query, {"pairs": pairs}, "r agtype", readonly=False
+            )
+            await self._refresh_degrees(node for edge in edges for node in edge)
+            logger.debug(f"[{self.workspace}] Deleted {len(edges)} edges")
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error during edge deletion: {str(e)}")
+            raise
 
     async def get_nodes_batch(
         self, node_ids: list[str], batch_size: int = 1000
@@ -4515,9 +4806,7 @@ class PGGraphStorage(BaseGraphStorage):
         self, node_ids: list[str], batch_size: int = 500
     ) -> dict[str, int]:
         """
-        Retrieve the degree for multiple nodes in a single query using UNWIND.
-        Calculates the total degree by counting distinct relationships.
-        Uses separate queries for outgoing and incoming edges.
+        Retrieve the degree for multiple nodes from the node degree table.
 
         Args:
             node_ids: List of node labels (entity_id values) to look up.
@@ -4530,86 +4819,20 @@ class PGGraphStorage(BaseGraphStorage):
         if not node_ids:
             return {}
 
-        seen: set[str] = set()
-        unique_ids: list[str] = []
-        lookup: dict[str, str] = {}
-        requested: set[str] = set()
-        for nid in node_ids:
-            if nid not in seen:
-                seen.add(nid)
-                unique_ids.append(nid)
-            requested.add(nid)
-            lookup[nid] = nid
-            lookup[self._normalize_node_id(nid)] = nid
-
-        out_degrees = {}
-        in_degrees = {}
-
+        unique_ids = list(dict.fromkeys(node_ids))
+        degrees: dict[str, int] = {}
         for i in range(0, len(unique_ids), batch_size):
             batch = unique_ids[i : i + batch_size]
-
             query = f"""
-                    WITH input(v, ord) AS (
-                      SELECT v, ord
-                      FROM unnest($1::text[]) WITH ORDINALITY AS t(v, ord)
-                    ),
-                    ids(node_id, ord) AS (
-                      SELECT (to_json(v)::text)::agtype AS node_id, ord
-                      FROM input
-                    ),
-                    vids AS (
-                      SELECT b.id AS vid, i.node_id, i.ord
-                      FROM {self.graph_name}.base AS b
-                      JOIN ids i
-                        ON ag_catalog.agtype_access_operator(
-                             VARIADIC ARRAY[b.properties, '"entity_id"'::agtype]
-                           ) = i.node_id
-                    ),
-                    deg_out AS (
-                      SELECT d.start_id AS vid, COUNT(*)::bigint AS out_degree
-                      FROM {self.graph_name}."DIRECTED" AS d
-                      JOIN vids v ON v.vid = d.start_id
-                      GROUP BY d.start_id
-                    ),
-                    deg_in AS (
-                      SELECT d.end_id AS vid, COUNT(*)::bigint AS in_degree
-                      FROM {self.graph_name}."DIRECTED" AS d
-                      JOIN vids v ON v.vid = d.end_id
-                      GROUP BY d.end_id
-                    )
-                    SELECT v.node_id::text AS node_id,
-                           COALESCE(o.out_degree, 0) AS out_degree,
-                           COALESCE(n.in_degree, 0)  AS in_degree
-                    FROM vids v
-                    LEFT JOIN deg_out o ON o.vid = v.vid
-                    LEFT JOIN deg_in  n ON n.vid = v.vid
-                    ORDER BY v.ord;
-                """
-
-            combined_results = await self._query(query, params={"ids": batch})
-
-            for row in combined_results:
-                node_id = row["node_id"]
-                if not node_id:
-                    continue
-                node_key = node_id
-                original_key = lookup.get(node_key)
-                if original_key is None:
-                    logger.warning(
-                        f"[{self.workspace}] Node {node_key} not found in lookup map"
-                    )
-                    original_key = node_key
-                if original_key in requested:
-                    out_degrees[original_key] = int(row.get("out_degree", 0) or 0)
-                    in_degrees[original_key] = int(row.get("in_degree", 0) or 0)
-
-        degrees_dict = {}
-        for node_id in node_ids:
-            out_degree = out_degrees.get(node_id, 0)
-            in_degree = in_degrees.get(node_id, 0)
-            degrees_dict[node_id] = out_degree + in_degree
+                SELECT entity_id, degree
+                FROM {self.graph_name}."{self._DEGREE_TABLE}"
+                WHERE entity_id = ANY($1::text[])
+            """
+            results = await self._query(query, params={"ids": batch})
+            for row in results:
+                degrees[row["entity_id"]] = int(row["degree"] or 0)
 
-        return degrees_dict
+        return {node_id: degrees.get(node_id, 0) for node_id in node_ids}
 
     async def edge_degrees_batch(
         self, edges: list[tuple[str, str]]
@@ -4693,55 +4916,22 @@ class PGGraphStorage(BaseGraphStorage):
                          MATCH (a)<-[r]-(b)
                          RETURN src_eid AS source, tgt_eid AS target, properties(r) AS edge_properties"""
 
-            sql_fwd = f"""
-            SELECT * FROM cypher({_dollar_quote(self.graph_name)}::name,
-                                 {_dollar_quote(forward_cypher)}::cstring,
-                                 $1::agtype)
-              AS (source text, target text, edge_properties agtype)
-            """
-
-            sql_bwd = f"""
-            SELECT * FROM cypher({_dollar_quote(self.graph_name)}::name,
-                                 {_dollar_quote(backward_cypher)}::cstring,
-                                 $1::agtype)
-              AS (source text, target text, edge_properties agtype)
-            """
-
-            pg_params = {"params": json.dumps({"pairs": pairs}, ensure_ascii=False)}
-
-            forward_results = await self._query(sql_fwd, params=pg_params)
-            backward_results = await self._query(sql_bwd, params=pg_params)
-
-            for result in forward_results:
-                if result["source"] and result["target"] and result["edge_properties"]:
-                    edge_props = result["edge_properties"]
-
-                    # Process string result, parse it to JSON dictionary
-                    if isinstance(edge_props, str):
-                        try:
-                            edge_props = json.loads(edge_props)
-                        except json.JSONDecodeError:
-                            logger.warning(
-                                f"[{self.workspace}]Failed to parse edge properties string: {edge_props}"
-                            )
-                            continue
-
-                    edges_dict[(result["source"], result["target"])] = edge_props
-
-            for result in backward_results:
-                if result["source"] and result["target"] and result["edge_properties"]:
-                    edge_props = result["edge_properties"]
-
-                    # Process string result, parse it to JSON dictionary
-                    if isinstance(edge_props, str):
-                        try:
-                            edge_props = json.loads(edge_props)
-                        except json.JSONDecodeError:
-                            logger.warning(
-                                f"[{self.workspace}] Failed to parse edge properties string: {edge_props}"
-                            )
-                            continue
+            columns = "source text, target text, edge_properties agtype"
+            forward_results = await self._cypher(
+                forward_cypher, {"pairs": pairs}, columns
+            )
+            backward_results = await self._cypher(
+                backward_cypher, {"pairs": pairs}, columns
+            )
 
+            for result in forward_results + backward_results:
+                edge_props = result["edge_properties"]
+                if result["source"] and result["target"] and edge_props:
+                    if not isinstance(edge_props, dict):
+                        logger.warning(
+                            f"[{self.workspace}] Failed to parse edge properties: {edge_props}"
+                        )
+                        continue
                     edges_dict[(result["source"], result["target"])] = edge_props
 
         return edges_dict
@@ -4762,56 +4952,38 @@ class PGGraphStorage(BaseGraphStorage):
         if not node_ids:
             return {}
 
-        seen = set()
-        unique_ids: list[str] = []
-        for nid in node_ids:
-            n = self._normalize_node_id(nid)
-            if n and n not in seen:
-                seen.add(n)
-                unique_ids.append(n)
-
-        edges_norm: dict[str, list[tuple[str, str]]] = {n: [] for n in unique_ids}
-
-        for i in range(0, len(unique_ids), batch_size):
-            batch = unique_ids[i : i + batch_size]
-            # Format node IDs for the query
-            formatted_ids = ", ".join([f'"{n}"' for n in batch])
-
-            # Build Cypher queries with dynamic dollar-quoting to handle entity_id containing $ sequences
-            outgoing_cypher = f"""UNWIND [{formatted_ids}] AS node_id
-                         MATCH (n:base {{entity_id: node_id}})
-                         OPTIONAL MATCH (n:base)-[]->(connected:base)
-                         RETURN node_id, connected.entity_id AS connected_id"""
+        unique_ids = list(dict.fromkeys(nid for nid in node_ids if nid))
+        edges_by_id: dict[str, list[tuple[str, str]]] = {n: [] for n in unique_ids}
 
-            incoming_cypher = f"""UNWIND [{formatted_ids}] AS node_id
-                         MATCH (n:base {{entity_id: node_id}})
-                         OPTIONAL MATCH (n:base)<-[]-(connected:base)
-                         RETURN node_id, connected.entity_id AS connected_id"""
+        outgoing_cypher = """UNWIND $node_ids AS node_id
+                     MATCH (n:base {entity_id: node_id})
+                     OPTIONAL MATCH (n:base)-[]->(connected:base)
+                     RETURN node_id, connected.entity_id AS connected_id"""
 
-            outgoing_query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(outgoing_cypher)}) AS (node_id text, connected_id text)"
-            incoming_query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(incoming_cypher)}) AS (node_id text, connected_id text)"
+        incoming_cypher = """UNWIND $node_ids AS node_id
+                     MATCH (n:base {entity_id: node_id})
+                     OPTIONAL MATCH (n:base)<-[]-(connected:base)
+                     RETURN node_id, connected.entity_id AS connected_id"""
 
-            outgoing_results = await self._query(outgoing_query)
-            incoming_results = await self._query(incoming_query)
+        columns = "node_id text, connected_id text"
+        for i in range(0, len(unique_ids), batch_size):
+            params = {"node_ids": unique_ids[i : i + batch_size]}
+            outgoing_results = await self._cypher(outgoing_cypher, params, columns)
+            incoming_results = await self._cypher(incoming_cypher, params, columns)
 
             for result in outgoing_results:
                 if result["node_id"] and result["connected_id"]:
-                    edges_norm[result["node_id"]].append(
+                    edges_by_id[result["node_id"]].append(
                         (result["node_id"], result["connected_id"])
                     )
 
             for result in incoming_results:
                 if result["node_id"] and result["connected_id"]:
-                    edges_norm[result["node_id"]].append(
+                    edges_by_id[result["node_id"]].append(
                         (result["connected_id"], result["node_id"])
                     )
 
-        out: dict[str, list[tuple[str, str]]] = {}
-        for orig in node_ids:
-            n = self._normalize_node_id(orig)
-            out[orig] = edges_norm.get(n, [])
-
-        return out
+        return {nid: edges_by_id.get(nid, []) for nid in node_ids}
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -4841,9 +5013,12 @@ class PGGraphStorage(BaseGraphStorage):
         self, node_label: str, max_depth: int, max_nodes: int
     ) -> KnowledgeGraph:
         """
-        Implements a true breadth-first search algorithm for subgraph retrieval.
-        This method is used as a fallback when the standard Cypher query is too slow
-        or when we need to guarantee BFS ordering.
+        Breadth-first subgraph around a node, computed by the server in one query.
+
+        A recursive CTE over the AGE vertex and edge tables walks the edges in
+        both directions up to max_depth. Reached nodes are ranked by BFS depth,
+        then by degree, and the first max_nodes are returned together with all
+        edges between them (one edge per node pair).
 
         Args:
             node_label: Label of the starting node
@@ -4853,196 +5028,116 @@ class PGGraphStorage(BaseGraphStorage):
         Returns:
             KnowledgeGraph object containing nodes and edges
         """
-        from collections import deque
-
-        result = KnowledgeGraph()
-        visited_nodes = set()
-        visited_node_ids = set()
-        visited_edges = set()
-        visited_edge_pairs = set()
-
-        # Get starting node data
-        label = self._normalize_node_id(node_label)
-
-        # Build Cypher query with dynamic dollar-quoting to handle entity_id containing $ sequences
-        cypher_query = f"""MATCH (n:base {{entity_id: "{label}"}})
-                    RETURN id(n) as node_id, n"""
-
-        query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(cypher_query)}) AS (node_id bigint, n agtype)"
-
-        node_result = await self._query(query)
-        if not node_result or not node_result[0].get("n"):
-            return result
-
-        # Create initial KnowledgeGraphNode
-        start_node_data = node_result[0]["n"]
-        entity_id = start_node_data["properties"]["entity_id"]
-        internal_id = str(start_node_data["id"])
-
-        start_node = KnowledgeGraphNode(
-            id=internal_id,
-            labels=[entity_id],
-            properties=start_node_data["properties"],
-        )
-
-        # Initialize BFS queue, each element is a tuple of (node, depth)
-        queue = deque([(start_node, 0)])
-
-        visited_nodes.add(entity_id)
-        visited_node_ids.add(internal_id)
-        result.nodes.append(start_node)
-
-        result.is_truncated = False
-
-        # BFS search main loop
-        while queue:
-            # Get all nodes at the current depth
-            current_level_nodes = []
-            current_depth = None
-
-            # Determine current depth
-            if queue:
-                current_depth = queue[0][1]
-
-            # Extract all nodes at current depth from the queue
-            while queue and queue[0][1] == current_depth:
-                node, depth = queue.popleft()
-                if depth > max_depth:
-                    continue
-                current_level_nodes.append(node)
-
-            if not current_level_nodes:
-                continue
-
-            # Check depth limit
-            if current_depth > max_depth:
-                continue
-
-            # Prepare node IDs list
-            node_ids = [node.labels[0] for node in current_level_nodes]
-            formatted_ids = ", ".join(
-                [f'"{self._normalize_node_id(node_id)}"' for node_id in node_ids]
+        query = f"""
+            WITH RECURSIVE start_node AS (
+                SELECT id
+                FROM {self.graph_name}.base
+                WHERE ag_catalog.agtype_access_operator(
+                        VARIADIC ARRAY[properties, '"entity_id"'::agtype]
+                      ) = (to_json($1::text)::text)::agtype
+                LIMIT 1
+            ),
+            walk(id, depth) AS (
+                SELECT id, 0 FROM start_node
+                UNION
+                SELECT n.id, w.depth + 1
+                FROM walk w
+                CROSS JOIN LATERAL (
+                    SELECT e.end_id AS id
+                    FROM {self.graph_name}."DIRECTED" e
+                    WHERE e.start_id = w.id
+                    UNION ALL
+                    SELECT e.start_id AS id
+                    FROM {self.graph_name}."DIRECTED" e
+                    WHERE e.end_id = w.id
+                ) n
+                WHERE w.depth < $2
+            ),
+            reached AS (
+                SELECT id, MIN(depth) AS depth FROM walk GROUP BY id
+            ),
+            selected AS (
+                SELECT r.id, r.depth,
+                       (SELECT COUNT(*) FROM {self.graph_name}."DIRECTED" e WHERE e.start_id = r.id)
+                     + (SELECT COUNT(*) FROM {self.graph_name}."DIRECTED" e WHERE e.end_id = r.id) AS degree
+                FROM reached r
+                ORDER BY depth, degree DESC, r.id
+                LIMIT $3
             )
+            SELECT 'node' AS kind, v.id::text AS id, v.properties::text AS properties,
+                   NULL::text AS source, NULL::text AS target,
+                   s.depth, s.degree, (SELECT COUNT(*) FROM reached) AS reached
+            FROM selected s
+            JOIN {self.graph_name}.base v ON v.id = s.id
+            UNION ALL
+            SELECT 'edge', e.id::text, e.properties::text,
+                   e.start_id::text, e.end_id::text, NULL, NULL, NULL
+            FROM (
+                SELECT DISTINCT ON (LEAST(start_id, end_id), GREATEST(start_id, end_id))
+                       id, start_id, end_id, properties
+                FROM {self.graph_name}."DIRECTED"
+                WHERE start_id IN (SELECT id FROM selected)
+                  AND end_id IN (SELECT id FROM selected)
+                ORDER BY LEAST(start_id, end_id), GREATEST(start_id, end_id), id
+            ) e
+        """
 
-            # Build Cypher queries with dynamic dollar-quoting to handle entity_id containing $ sequences
-            outgoing_cypher = f"""UNWIND [{formatted_ids}] AS node_id
-                MATCH (n:base {{entity_id: node_id}})
-                OPTIONAL MATCH (n)-[r]->(neighbor:base)
-                RETURN node_id AS current_id,
-                       id(n) AS current_internal_id,
-                       id(neighbor) AS neighbor_internal_id,
-                       neighbor.entity_id AS neighbor_id,
-                       id(r) AS edge_id,
-                       r,
-                       neighbor,
-                       true AS is_outgoing"""
-
-            incoming_cypher = f"""UNWIND [{formatted_ids}] AS node_id
-                MATCH (n:base {{entity_id: node_id}})
-                OPTIONAL MATCH (n)<-[r]-(neighbor:base)
-                RETURN node_id AS current_id,
-                       id(n) AS current_internal_id,
-                       id(neighbor) AS neighbor_internal_id,
-                       neighbor.entity_id AS neighbor_id,
-                       id(r) AS edge_id,
-                       r,
-                       neighbor,
-                       false AS is_outgoing"""
-
-            outgoing_query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(outgoing_cypher)}) AS (current_id text, current_internal_id bigint, neighbor_internal_id bigint, neighbor_id text, edge_id bigint, r agtype, neighbor agtype, is_outgoing bool)"
-
-            incoming_query = f"SELECT * FROM cypher({_dollar_quote(self.graph_name)}, {_dollar_quote(incoming_cypher)}) AS (current_id text, current_internal_id bigint, neighbor_internal_id bigint, neighbor_id text, edge_id bigint, r agtype, neighbor agtype, is_outgoing bool)"
-
-            # Execute queries
-            outgoing_results = await self._query(outgoing_query)
-            incoming_results = await self._query(incoming_query)
-
-            # Combine results
-            neighbors = outgoing_results + incoming_results
-
-            # Create mapping from node ID to node object
-            node_map = {node.labels[0]: node for node in current_level_nodes}
-
-            # Process all results in a single loop
-            for record in neighbors:
-                if not record.get("neighbor") or not record.get("r"):
-                    continue
-
-                # Get current node information
-                current_entity_id = record["current_id"]
-                current_node = node_map[current_entity_id]
-
-                # Get neighbor node information
-                neighbor_entity_id = record["neighbor_id"]
-                neighbor_internal_id = str(record["neighbor_internal_id"])
-                is_outgoing = record["is_outgoing"]
-
-                # Determine edge direction
-                if is_outgoing:
-                    source_id = current_node.id
-                    target_id = neighbor_internal_id
-                else:
-                    source_id = neighbor_internal_id
-                    target_id = current_node.id
-
-                if not neighbor_entity_id:
-                    continue
-
-                # Get edge and node information
-                b_node = record["neighbor"]
-                rel = record["r"]
-                edge_id = str(record["edge_id"])
+        # Rows hold plain text columns, so skip the agtype decoding of _query
+        try:
+            rows = await self.db.query(
+                query,
+                [node_label, max_depth, max_nodes],
+                multirows=True,
+                with_age=True,
+                graph_name=self.graph_name,
+            )
+        except Exception as e:
+            raise PGGraphQueryException(
+                {
+                    "message": f"Error executing subgraph query for: {node_label}",
+                    "wrapped": query,
+                    "detail": repr(e),
+                    "error_type": e.__class__.__name__,
+                }
+            ) from e
 
-                # Create neighbor node object
-                neighbor_node = KnowledgeGraphNode(
-                    id=neighbor_internal_id,
-                    labels=[neighbor_entity_id],
-                    properties=b_node["properties"],
+        def parse_properties(raw: str | None) -> dict[str, Any]:
+            try:
+                return json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                logger.warning(
+                    f"[{self.workspace}] Failed to parse graph properties: {raw[:100]}"
                 )
+                return {}
 
-                # Sort entity_ids to ensure (A,B) and (B,A) are treated as the same edge
-                sorted_pair = tuple(sorted([current_entity_id, neighbor_entity_id]))
-
-                # Create edge object
-                edge = KnowledgeGraphEdge(
-                    id=edge_id,
-                    type=rel["label"],
-                    source=source_id,
-                    target=target_id,
-                    properties=rel["properties"],
+        result = KnowledgeGraph()
+        node_rows = sorted(
+            (row for row in rows if row["kind"] == "node"),
+            key=lambda row: (row["depth"], -row["degree"]),
+        )
+        for row in node_rows:
+            properties = parse_properties(row["properties"])
+            result.nodes.append(
+                KnowledgeGraphNode(
+                    id=row["id"],
+                    labels=[properties.get("entity_id", row["id"])],
+                    properties=properties,
                 )
-
-                if neighbor_internal_id in visited_node_ids:
-                    # Add backward edge if neighbor node is already visited
-                    if (
-                        edge_id not in visited_edges
-                        and sorted_pair not in visited_edge_pairs
-                    ):
-                        result.edges.append(edge)
-                        visited_edges.add(edge_id)
-                        visited_edge_pairs.add(sorted_pair)
-                else:
-                    if len(visited_node_ids) < max_nodes and current_depth < max_depth:
-                        # Add new node to result and queue
-                        result.nodes.append(neighbor_node)
-                        visited_nodes.add(neighbor_entity_id)
-                        visited_node_ids.add(neighbor_internal_id)
-
-                        # Add node to queue with incremented depth
-                        queue.append((neighbor_node, current_depth + 1))
-
-                        # Add forward edge
-                        if (
-                            edge_id not in visited_edges
-                            and sorted_pair not in visited_edge_pairs
-                        ):
-                            result.edges.append(edge)
-                            visited_edges.add(edge_id)
-                            visited_edge_pairs.add(sorted_pair)
-                    else:
-                        if current_depth < max_depth:
-                            result.is_truncated = True
-
+            )
+        for row in rows:
+            if row["kind"] == "edge":
+                result.edges.append(
+                    KnowledgeGraphEdge(
+                        id=row["id"],
+                        type="DIRECTED",
+                        source=row["source"],
+                        target=row["target"],
+                        properties=parse_properties(row["properties"]),
+                    )
+                )
+        result.is_truncated = bool(node_rows) and node_rows[0]["reached"] > len(
+            node_rows
+        )
         return result
 
     async def get_knowledge_graph(
@@ -5069,6 +5164,16 @@ class PGGraphStorage(BaseGraphStorage):
         else:
             # Limit max_nodes to not exceed global_config max_graph_nodes
             max_nodes = min(max_nodes, self.global_config.get("max_graph_nodes", 1000))
+
+        cache_key = (node_label, max_depth, max_nodes, self._current_generation())
+        cached = self._subgraph_cache.get(cache_key)
+        if cached is not None:
+            self._subgraph_cache.move_to_end(cache_key)
+            logger.debug(
+                f"[{self.workspace}] Subgraph query for '{node_label}' served from cache"
+            )
+            return cached.model_copy(deep=True)
+
         kg = KnowledgeGraph()
 
         # Handle wildcard query - get all nodes
@@ -5170,6 +5275,10 @@ class PGGraphStorage(BaseGraphStorage):
                 f"[{self.workspace}] Subgraph query for '{node_label}' successful | Node count: {len(kg.nodes)} | Edge count: {len(kg.edges)}"
             )
 
+        # Entries of older generations are never hit again and age out
+        self._subgraph_cache[cache_key] = kg.model_copy(deep=True)
+        while len(self._subgraph_cache) > self._SUBGRAPH_CACHE_SIZE:
+            self._subgraph_cache.popitem(last=False)
         return kg
 
     async def get_all_nodes(self) -> list[dict]:
@@ -5249,33 +5358,13 @@ class PGGraphStorage(BaseGraphStorage):
         return edges
 
     async def get_popular_labels(self, limit: int = 300) -> list[str]:
-        """Get popular labels by node degree (most connected entities) using native SQL for performance."""
+        """Get popular labels by node degree (most connected entities) from the node degree table."""
         try:
-            # Native SQL query to calculate node degrees directly from AGE's underlying tables
-            # This is significantly faster than using the cypher() function wrapper
             query = f"""
-            WITH node_degrees AS (
-                SELECT
-                    node_id,
-                    COUNT(*) AS degree
-                FROM (
-                    SELECT start_id AS node_id FROM {self.graph_name}._ag_label_edge
-                    UNION ALL
-                    SELECT end_id AS node_id FROM {self.graph_name}._ag_label_edge
-                ) AS all_edges
-                GROUP BY node_id
-            )
-            SELECT
-                (ag_catalog.agtype_access_operator(VARIADIC ARRAY[v.properties, '"entity_id"'::agtype]))::text AS label
-            FROM
-                node_degrees d
-            JOIN
-                {self.graph_name}._ag_label_vertex v ON d.node_id = v.id
-            WHERE
-                ag_catalog.agtype_access_operator(VARIADIC ARRAY[v.properties, '"entity_id"'::agtype]) IS NOT NULL
-            ORDER BY
-                d.degree DESC,
-                label ASC
+            SELECT entity_id AS label
+            FROM {self.graph_name}."{self._DEGREE_TABLE}"
+            WHERE degree > 0
+            ORDER BY degree DESC, entity_id ASC
             LIMIT $1;
             """
             results = await self._query(query, params={"limit": limit})
@@ -5364,6 +5453,9 @@ class PGGraphStorage(BaseGraphStorage):
                             $$) AS (result agtype)"""
 
             await self._query(drop_query, readonly=False)
+            await self._query(
+                f'DELETE FROM {self.graph_name}."{self._DEGREE_TABLE}"', readonly=False
+            )
             return {
                 "status": "success",
                 "message": f"workspace '{self.workspace}' graph data dropped",
@@ -10,14 +10,15 @@ import numpy as np
 import pipmaster as pm
 
 from ..base import BaseVectorStorage
+from ..constants import DEFAULT_VDB_MAX_CONCURRENCY, DEFAULT_VDB_UPSERT_BATCH_SIZE
 from ..exceptions import DataMigrationError
 from ..kg.shared_storage import get_data_init_lock
-from ..utils import compute_mdhash_id, logger
+from ..utils import compute_mdhash_id, get_env_value, logger
 
 if not pm.is_installed("qdrant-client"):
     pm.install("qdrant-client")
 
-from qdrant_client import QdrantClient, models  # type: ignore
+from qdrant_client import AsyncQdrantClient, QdrantClient, models  # type: ignore
 
 DEFAULT_WORKSPACE = "_"
 WORKSPACE_ID_FIELD = "workspace_id"
@@ -460,8 +461,30 @@ class QdrantVectorDBStorage(BaseVectorStorage):
         # Initialize client as None - will be created in initialize() method
         self._client = None
         self._max_batch_size = self.global_config["embedding_batch_num"]
+        self._upsert_batch_size = max(
+            1,
+            get_env_value(
+                "QDRANT_UPSERT_BATCH_SIZE", DEFAULT_VDB_UPSERT_BATCH_SIZE, int
+            ),
+        )
+        self._max_concurrency = max(
+            1, get_env_value("QDRANT_MAX_CONCURRENCY", DEFAULT_VDB_MAX_CONCURRENCY, int)
+        )
+        # Bounds concurrent upsert requests so large inserts do not flood the server
+        self._request_semaphore = asyncio.Semaphore(self._max_concurrency)
         self._initialized = False
 
+    @staticmethod
+    def _client_kwargs() -> dict[str, Any]:
+        return {
+            "url": os.environ.get(
+                "QDRANT_URL", config.get("qdrant", "uri", fallback=None)
+            ),
+            "api_key": os.environ.get(
+                "QDRANT_API_KEY", config.get("qdrant", "apikey", fallback=None)
+            ),
+        }
+
     async def initialize(self):
         """Initialize Qdrant collection"""
         async with get_data_init_lock():
@@ -469,41 +492,21 @@ class QdrantVectorDBStorage(BaseVectorStorage):
                 return
 
             try:
-                # Create QdrantClient if not already created
+                # Collection setup and legacy migration are one-off admin work done
+                # with a short-lived sync client in a worker thread
+                admin_client = QdrantClient(**self._client_kwargs())
+                try:
+                    await asyncio.to_thread(self._setup_collection, admin_client)
+                finally:
+                    admin_client.close()
+
+                # Data operations use the async client so they never block the event loop
                 if self._client is None:
-                    self._client = QdrantClient(
-                        url=os.environ.get(
-                            "QDRANT_URL", config.get("qdrant", "uri", fallback=None)
-                        ),
-                        api_key=os.environ.get(
-                            "QDRANT_API_KEY",
-                            config.get("qdrant", "apikey", fallback=None),
-                        ),
-                    )
+                    self._client = AsyncQdrantClient(**self._client_kwargs())
                     logger.debug(
-                        f"[{self.workspace}] QdrantClient created successfully"
+                        f"[{self.workspace}] AsyncQdrantClient created successfully"
                     )
 
-                # Setup collection (create if not exists and configure indexes)
-                # Pass namespace and workspace for backward-compatible migration support
-                QdrantVectorDBStorage.setup_collection(
-                    self._client,
-                    self.final_namespace,
-                    namespace=self.namespace,
-                    workspace=self.effective_workspace,
-                    vectors_config=models.VectorParams(
-                        size=self.embedding_func.embedding_dim,
-                        distance=models.Distance.COSINE,
-                    ),
-                    hnsw_config=models.HnswConfigDiff(
-                        payload_m=16,
-                        m=0,
-                    ),
-                    model_suffix=self.model_suffix,
-                )
-
-                # Removed duplicate max batch size initialization
-
                 self._initialized = True
                 logger.info(
                     f"[{self.workspace}] Qdrant collection '{self.namespace}' initialized successfully"
@@ -514,6 +517,32 @@ class QdrantVectorDBStorage(BaseVectorStorage):
                 )
                 raise
 
+    async def finalize(self):
+        """Close the async Qdrant client"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        self._initialized = False
+
+    def _setup_collection(self, client: QdrantClient) -> None:
+        # Setup collection (create if not exists and configure indexes)
+        # Pass namespace and workspace for backward-compatible migration support
+        QdrantVectorDBStorage.setup_collection(
+            client,
+            self.final_namespace,
+            namespace=self.namespace,
+            workspace=self.effective_workspace,
+            vectors_config=models.VectorParams(
+                size=self.embedding_func.embedding_dim,
+                distance=models.Distance.COSINE,
+            ),
+            hnsw_config=models.HnswConfigDiff(
+                payload_m=16,
+                m=0,
+            ),
+            model_suffix=self.model_suffix,
+        )
+
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         logger.debug(f"[{self.workspace}] Inserting {len(data)} to {self.namespace}")
         if not data:
@@ -533,19 +562,17 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             for k, v in data.items()
         ]
         contents = [v["content"] for v in data.values()]
-        batches = [
-            contents[i : i + self._max_batch_size]
-            for i in range(0, len(contents), self._max_batch_size)
-        ]
 
-        embedding_tasks = [self.embedding_func(batch) for batch in batches]
-        embeddings_list = await asyncio.gather(*embedding_tasks)
-
-        embeddings = np.concatenate(embeddings_list)
+        async def upsert_batch(start: int) -> None:
+            batch_data = list_data[start : start + self._upsert_batch_size]
+            batch_contents = contents[start : start + self._upsert_batch_size]
+            embedding_tasks = [
+                self.embedding_func(batch_contents[i : i + self._max_batch_size])
+                for i in range(0, len(batch_contents), self._max_batch_size)
+            ]
+            embeddings = np.concatenate(await asyncio.gather(*embedding_tasks))
 
-        list_points = []
-        for i, d in enumerate(list_data):
-            list_points.append(
+            points = [
                 models.PointStruct(
                     id=compute_mdhash_id_for_qdrant(
                         d[ID_FIELD], prefix=self.effective_workspace
@@ -553,12 +580,21 @@ class QdrantVectorDBStorage(BaseVectorStorage):
                     vector=embeddings[i],
                     payload=d,
                 )
-            )
+                for i, d in enumerate(batch_data)
+            ]
+            async with self._request_semaphore:
+                await self._client.upsert(
+                    collection_name=self.final_namespace, points=points, wait=True
+                )
 
-        results = self._client.upsert(
-            collection_name=self.final_namespace, points=list_points, wait=True
+        # Each batch is written as soon as its embeddings are ready, so embedding
+        # and network I/O of different batches overlap
+        await asyncio.gather(
+            *(
+                upsert_batch(start)
+                for start in range(0, len(list_data), self._upsert_batch_size)
+            )
         )
-        return results
 
     async def query(
         self, query: str, top_k: int, query_embedding: list[float] = None
@@ -571,7 +607,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             )  # higher priority for query
             embedding = embedding_result[0]
 
-        results = self._client.query_points(
+        response = await self._client.query_points(
             collection_name=self.final_namespace,
             query=embedding,
             limit=top_k,
@@ -580,15 +616,47 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             query_filter=models.Filter(
                 must=[workspace_filter_condition(self.effective_workspace)]
             ),
-        ).points
+        )
+        return self._format_points(response.points)
+
+    async def query_batch(
+        self,
+        queries: list[str],
+        top_k: int,
+        query_embeddings: list[list[float]] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Search several query vectors in a single Qdrant request"""
+        embeddings = await self._embed_queries(queries, query_embeddings)
+        if not embeddings:
+            return []
 
+        workspace_filter = models.Filter(
+            must=[workspace_filter_condition(self.effective_workspace)]
+        )
+        responses = await self._client.query_batch_points(
+            collection_name=self.final_namespace,
+            requests=[
+                models.QueryRequest(
+                    query=list(embedding),
+                    limit=top_k,
+                    with_payload=True,
+                    score_threshold=self.cosine_better_than_threshold,
+                    filter=workspace_filter,
+                )
+                for embedding in embeddings
+            ],
+        )
+        return [self._format_points(response.points) for response in responses]
+
+    @staticmethod
+    def _format_points(points) -> list[dict[str, Any]]:
         return [
             {
                 **dp.payload,
                 "distance": dp.score,
                 CREATED_AT_FIELD: dp.payload.get(CREATED_AT_FIELD),
             }
-            for dp in results
+            for dp in points
         ]
 
     async def index_done_callback(self) -> None:
@@ -611,7 +679,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
                 for id in ids
             ]
             # Delete points from the collection with workspace filtering
-            self._client.delete(
+            await self._client.delete(
                 collection_name=self.final_namespace,
                 points_selector=models.PointIdsList(points=qdrant_ids),
                 wait=True,
@@ -639,7 +707,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
 
             # Scroll to find the entity by its ID field in payload with workspace filtering
             # This is safer than reconstructing the Qdrant point ID
-            results = self._client.scroll(
+            results = await self._client.scroll(
                 collection_name=self.final_namespace,
                 scroll_filter=models.Filter(
                     must=[
@@ -657,7 +725,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             points = results[0]
             if points:
                 ids_to_delete = [point.id for point in points]
-                self._client.delete(
+                await self._client.delete(
                     collection_name=self.final_namespace,
                     points_selector=models.PointIdsList(points=ids_to_delete),
                     wait=True,
@@ -701,7 +769,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             while True:
                 # Scroll to find relations, using with_payload=False for efficiency
                 # since we only need point IDs for deletion
-                results = self._client.scroll(
+                results = await self._client.scroll(
                     collection_name=self.final_namespace,
                     scroll_filter=relation_filter,
                     with_payload=False,
@@ -718,7 +786,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
                 ids_to_delete = [point.id for point in points]
 
                 # Delete the batch of relations
-                self._client.delete(
+                await self._client.delete(
                     collection_name=self.final_namespace,
                     points_selector=models.PointIdsList(points=ids_to_delete),
                     wait=True,
@@ -759,7 +827,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             )
 
             # Retrieve the point by ID with workspace filtering
-            result = self._client.retrieve(
+            result = await self._client.retrieve(
                 collection_name=self.final_namespace,
                 ids=[qdrant_id],
                 with_payload=True,
@@ -799,7 +867,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             ]
 
             # Retrieve the points by IDs
-            results = self._client.retrieve(
+            results = await self._client.retrieve(
                 collection_name=self.final_namespace,
                 ids=qdrant_ids,
                 with_payload=True,
@@ -857,7 +925,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             ]
 
             # Retrieve the points by IDs with vectors
-            results = self._client.retrieve(
+            results = await self._client.retrieve(
                 collection_name=self.final_namespace,
                 ids=qdrant_ids,
                 with_vectors=True,  # Important: request vectors
@@ -896,7 +964,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
         # No need to lock: data integrity is ensured by allowing only one process to hold pipeline at a time
         try:
             # Delete all points for the current workspace
-            self._client.delete(
+            await self._client.delete(
                 collection_name=self.final_namespace,
                 points_selector=models.FilterSelector(
                     filter=models.Filter(
@@ -0,0 +1,259 @@
+"""
+Read-only snapshots of in-memory storage data published in shared memory.
+
+With file based storages and WORKERS>1, every worker keeps its own copy of the
+vector matrix and re-parses the data file whenever another worker persists a
+change. When ENABLE_SHARED_MEMORY_SNAPSHOTS is set, the worker that persists a
+storage also publishes its in-memory state as a generation-numbered POSIX
+shared memory segment:
+
+    [8-byte header length][JSON header][padding][array data ...][payload]
+
+Other workers map the newest generation when their update flag flips instead of
+reading the data file. Only numpy arrays are shared in place: the NanoVectorDB
+matrix is mapped zero-copy and read-only, so it exists once per host instead of
+once per worker. The pickled payload (vector metadata, a whole NetworkX graph)
+is deserialized by each reader into objects of its own, which saves re-parsing
+the data file but not memory. Graph memory is not deduplicated: every worker
+still holds a full private nx.Graph.
+
+The segment registry (namespace -> generation and segment name) lives in the
+shared namespace data, and is read and written under the storage namespace lock.
+Publishing a new generation unlinks the previous one; workers that still map it
+keep a valid mapping until they swap, so the switch is atomic for readers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import struct
+import sys
+import uuid
+import weakref
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Iterable
+
+import numpy as np
+
+from lightrag.utils import get_env_value, logger
+
+from .shared_storage import get_namespace_data, get_shared_state_backend
+
+SNAPSHOT_NAMESPACE = "shared_memory_snapshots"
+
+_HEADER_STRUCT = struct.Struct("<Q")
+_ALIGNMENT = 64
+
+
+def snapshots_enabled() -> bool:
+    """Snapshots are used only in multi-process mode and when enabled by env.
+
+    POSIX only: Windows frees a segment with its last handle, so a generation
+    could not outlive the worker that published it.
+    """
+    return (
+        os.name == "posix"
+        and get_shared_state_backend() is not None
+        and get_env_value("ENABLE_SHARED_MEMORY_SNAPSHOTS", False, bool)
+    )
+
+
+@dataclass
+class SharedSnapshot:
+    """A mapped snapshot generation. Arrays are read-only views into shared memory.
+
+    The segment stays mapped until the last array or payload view is released,
+    even after the snapshot itself is dropped.
+    """
+
+    name: str
+    generation: int
+    arrays: dict[str, np.ndarray]
+    payload: memoryview
+
+    def load_payload(self) -> Any:
+        return pickle.loads(self.payload)
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _segment_name(key: str, generation: int) -> str:
+    # Short names: macOS limits POSIX shm names to 31 characters
+    digest = hashlib.md5(key.encode("utf-8")).hexdigest()[:10]
+    return f"lr{digest}_{generation}_{uuid.uuid4().hex[:8]}"
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0) -> SharedMemory:
+    """Create or attach a segment that outlives this process.
+
+    The multiprocessing resource tracker would unlink the segment when this
+    process exits, while other workers still use it; the registry decides when
+    a generation is unlinked instead.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, create=create, size=size, track=False)
+    from multiprocessing import resource_tracker
+
+    segment = SharedMemory(name, create=create, size=size)
+    resource_tracker.unregister(f"/{segment.name}", "shared_memory")
+    return segment
+
+
+def write_snapshot(name: str, arrays: dict[str, np.ndarray], payload: bytes) -> int:
+    """Create shared memory segment `name` holding `arrays` and `payload`.
+
+    Returns the segment size in bytes.
+    """
+    arrays = {key: np.ascontiguousarray(value) for key, value in arrays.items()}
+    layout = {}
+    offset = 0
+    for key, value in arrays.items():
+        layout[key] = {
+            "dtype": value.dtype.str,
+            "shape": list(value.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + value.nbytes)
+    header = json.dumps(
+        {"arrays": layout, "payload_offset": offset, "payload_size": len(payload)}
+    ).encode("utf-8")
+    data_start = _align(_HEADER_STRUCT.size + len(header))
+    size = max(data_start + offset + len(payload), 1)
+
+    segment = _open_segment(name, create=True, size=size)
+    try:
+        buf = segment.buf
+        buf[: _HEADER_STRUCT.size] = _HEADER_STRUCT.pack(len(header))
+        buf[_HEADER_STRUCT.size : _HEADER_STRUCT.size + len(header)] = header
+        for key, value in arrays.items():
+            start = data_start + layout[key]["offset"]
+            buf[start : start + value.nbytes] = value.reshape(-1).view(np.uint8)
+        start = data_start + offset
+        buf[start : start + len(payload)] = payload
+        del buf
+    except BaseException:
+        segment.close()
+        unlink_snapshot(name)
+        raise
+    segment.close()
+    return size
+
+
+def read_snapshot(name: str, generation: int = 0) -> SharedSnapshot:
+    """Map segment `name` read-only. Raises FileNotFoundError if it was unlinked."""
+    segment = _open_segment(name)
+    data = np.frombuffer(segment.buf, dtype=np.uint8)
+    data.flags.writeable = False
+    # Arrays and payload are slices of data, which numpy bases on a memoryview
+    # of its own; the segment is closed once that view is released with them
+    # Not at exit, where views may still be alive
+    weakref.finalize(data.base, segment.close).atexit = False
+
+    (header_len,) = _HEADER_STRUCT.unpack_from(data, 0)
+    header = json.loads(
+        data[_HEADER_STRUCT.size : _HEADER_STRUCT.size + header_len].tobytes()
+    )
+    data_start = _align(_HEADER_STRUCT.size + header_len)
+    arrays = {}
+    for key, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        start = data_start + spec["offset"]
+        nbytes = int(np.prod(spec["shape"], dtype=np.int64)) * dtype.itemsize
+        arrays[key] = data[start : start + nbytes].view(dtype).reshape(spec["shape"])
+    payload_start = data_start + header["payload_offset"]
+    payload = memoryview(data[payload_start : payload_start + header["payload_size"]])
+    return SharedSnapshot(
+        name=name, generation=generation, arrays=arrays, payload=payload
+    )
+
+
+def unlink_snapshot(name: str) -> None:
+    """Remove a segment name; existing mappings remain valid until released."""
+    try:
+        # Attached with tracking on Python < 3.13, which unlink() then unregisters
+        segment = (
+            SharedMemory(name, track=False)
+            if sys.version_info >= (3, 13)
+            else SharedMemory(name)
+        )
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+async def publish_snapshot(
+    namespace: str,
+    workspace: str,
+    arrays: dict[str, np.ndarray],
+    payload: Any,
+) -> SharedSnapshot | None:
+    """Publish a new snapshot generation for a storage namespace.
+
+    Must be called under the storage namespace lock. On failure the registry
+    entry is removed so readers fall back to loading the data file.
+    """
+    registry = await get_namespace_data(SNAPSHOT_NAMESPACE, workspace=workspace)
+    previous = registry.get(namespace)
+    generation = previous["generation"] + 1 if previous else 1
+    name = _segment_name(f"{workspace}:{namespace}", generation)
+    try:
+        size = write_snapshot(
+            name, arrays, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+    except Exception as e:
+        logger.warning(
+            f"[{workspace}] Failed to publish shared memory snapshot for {namespace}: {e}"
+        )
+        await discard_snapshot(namespace, workspace)
+        return None
+
+    registry[namespace] = {"generation": generation, "name": name}
+    if previous:
+        unlink_snapshot(previous["name"])
+    logger.info(
+        f"[{workspace}] Process {os.getpid()} published {namespace} snapshot "
+        f"generation {generation} ({size / 1024 / 1024:.1f} MiB shared memory)"
+    )
+    return read_snapshot(name, generation)
+
+
+async def load_latest_snapshot(namespace: str, workspace: str) -> SharedSnapshot | None:
+    """Map the newest snapshot of a storage namespace, or None if unavailable.
+
+    Must be called under the storage namespace lock.
+    """
+    registry = await get_namespace_data(SNAPSHOT_NAMESPACE, workspace=workspace)
+    entry = registry.get(namespace)
+    if not entry:
+        return None
+    try:
+        return read_snapshot(entry["name"], entry["generation"])
+    except (OSError, ValueError) as e:
+        logger.warning(
+            f"[{workspace}] Shared memory snapshot for {namespace} unavailable: {e}"
+        )
+        return None
+
+
+async def discard_snapshot(namespace: str, workspace: str) -> None:
+    """Unpublish the current snapshot so readers reload from the data file."""
+    registry = await get_namespace_data(SNAPSHOT_NAMESPACE, workspace=workspace)
+    entry = registry.pop(namespace, None)
+    if entry:
+        unlink_snapshot(entry["name"])
+
+
+def unlink_registry_segments(registries: Iterable[dict[str, Any]]) -> None:
+    """Unlink every published segment; used when shared data is finalized."""
+    if os.name != "posix":
+        return
+    for registry in registries:
+        for entry in list(registry.values()):
+            unlink_snapshot(entry["name"])
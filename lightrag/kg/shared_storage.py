@@ -1,11 +1,13 @@
 import os
 import sys
 import asyncio
+import ctypes
 import multiprocessing as mp
 from multiprocessing.synchronize import Lock as ProcessLock
 from multiprocessing import Manager
 import time
 import logging
+import zlib
 from contextvars import ContextVar
 from typing import Any, Dict, List, Optional, Union, TypeVar, Generic
 
@@ -58,6 +60,29 @@ _is_multiprocess = None
 _workers = None
 _manager = None
 
+# Shared-state backend used in multi-process mode (SHARED_STATE_BACKEND):
+#   "shm":     global locks are POSIX semaphores and update flags live in a shared
+#              memory array; both are created before fork and inherited by workers,
+#              so lock/flag operations never round-trip to the Manager process
+#   "manager": every lock and flag is a multiprocessing.Manager proxy
+# Namespace data and keyed locks are dynamic and stay on the Manager in both modes.
+SHARED_STATE_BACKEND_SHM = "shm"
+SHARED_STATE_BACKEND_MANAGER = "manager"
+_shared_state_backend: Optional[str] = None
+# Update flag slots for the shm backend (env SHARED_STATE_FLAG_SLOTS, default 4096)
+DEFAULT_SHARED_FLAG_SLOTS = 4096
+_flag_slots = None  # shared array, one byte per update flag
+_flag_slots_used = None  # shared counter of allocated slots
+
+# Polling interval bounds while waiting for a cross-process lock held elsewhere
+PROCESS_LOCK_POLL_MIN_SECONDS = 0.0005
+PROCESS_LOCK_POLL_MAX_SECONDS = 0.02
+
+# Lock striping for storage keyed locks: keys hash onto a fixed table of locks
+# instead of getting a registry entry each (env KEYED_LOCK_STRIPES, default 1024)
+DEFAULT_KEYED_LOCK_STRIPES = 1024
+_lock_stripes: Optional[List[Any]] = None  # cross-process stripe locks
+
 # Global singleton data for multi-process keyed locks
 _lock_registry: Optional[Dict[str, mp.synchronize.Lock]] = None
 _lock_registry_count: Optional[Dict[str, int]] = None
@@ -134,6 +159,50 @@ def get_debug_n_locks_acquired():
     return _debug_n_locks_acquired
 
 
+async def _acquire_process_lock(lock: Any) -> None:
+    """Acquire a cross-process lock without blocking the event loop.
+
+    The uncontended case is a single non-blocking acquire. While another process
+    holds the lock, poll with exponential backoff instead of parking the whole
+    event loop in a blocking acquire().
+    """
+    delay = PROCESS_LOCK_POLL_MIN_SECONDS
+    while not lock.acquire(False):
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, PROCESS_LOCK_POLL_MAX_SECONDS)
+
+
+class _SharedFlag:
+    """Update flag backed by a slot of the shared memory flag array (shm backend)"""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        self.index = index
+
+    @property
+    def value(self) -> bool:
+        return bool(_flag_slots[self.index])
+
+    @value.setter
+    def value(self, value: bool) -> None:
+        _flag_slots[self.index] = 1 if value else 0
+
+
+def _read_flag(flag: Any) -> bool:
+    # Shared update flag lists hold slot indexes (shm) or Value proxies (manager)
+    if isinstance(flag, int):
+        return bool(_flag_slots[flag])
+    return flag.value
+
+
+def _write_flag(flag: Any, value: bool) -> None:
+    if isinstance(flag, int):
+        _flag_slots[flag] = 1 if value else 0
+    else:
+        flag.value = value
+
+
 class UnifiedLock(Generic[T]):
     """Provide a unified lock interface type for asyncio.Lock and multiprocessing.Lock"""
 
@@ -169,7 +238,7 @@ class UnifiedLock(Generic[T]):
             if self._is_async:
                 await self._lock.acquire()
             else:
-                self._lock.acquire()
+                await _acquire_process_lock(self._lock)
 
             direct_log(
                 f"== Lock == Process {self._pid}: Acquired lock {self._name} (async={self._is_async})",
@@ -535,10 +604,31 @@ class KeyedUnifiedLock:
     • Builds a fresh `UnifiedLock` each time, so `enable_logging`
       (or future options) can vary per call.
     • Supports dynamic namespaces specified at lock usage time
+    • `striped()` locks batches of storage keys through a fixed stripe table:
+      no registry entries or cleanup, and contention is counted per process
     """
 
-    def __init__(self, *, default_enable_logging: bool = True) -> None:
+    def __init__(
+        self,
+        *,
+        default_enable_logging: bool = True,
+        stripes: int = DEFAULT_KEYED_LOCK_STRIPES,
+        process_stripes: Optional[List[Any]] = None,
+    ) -> None:
         self._default_enable_logging = default_enable_logging
+        # Striped locks: one local gate per stripe, plus the shared process lock
+        # of the stripe in multi-process mode
+        self._stripe_count = len(process_stripes) if process_stripes else stripes
+        self._async_stripes = [asyncio.Lock() for _ in range(self._stripe_count)]
+        self._process_stripes = process_stripes
+        self._stripe_stats = {
+            "acquisitions": 0,
+            "keys": 0,
+            "stripes": 0,
+            "contended": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
         self._async_lock: Dict[str, asyncio.Lock] = {}  # local keyed locks
         self._async_lock_count: Dict[
             str, int
@@ -574,6 +664,26 @@ class KeyedUnifiedLock:
             enable_logging=enable_logging,
         )
 
+    def striped(
+        self, namespace: str, keys: list[str], *, enable_logging: Optional[bool] = None
+    ) -> "_StripedLockContext":
+        """Lock a batch of keys through the stripe table in one call."""
+        if enable_logging is None:
+            enable_logging = self._default_enable_logging
+        return _StripedLockContext(
+            self, namespace=namespace, keys=keys, enable_logging=enable_logging
+        )
+
+    def stripe_of(self, namespace: str, key: str) -> int:
+        return zlib.crc32(f"{namespace}:{key}".encode()) % self._stripe_count
+
+    def _record_stripe_wait(self, waited: float) -> None:
+        stats = self._stripe_stats
+        stats["contended"] += 1
+        stats["wait_seconds"] += waited
+        if waited > stats["max_wait_seconds"]:
+            stats["max_wait_seconds"] = waited
+
     def _get_or_create_async_lock(self, combined_key: str) -> asyncio.Lock:
         async_lock = self._async_lock.get(combined_key)
         count = self._async_lock_count.get(combined_key, 0)
@@ -774,12 +884,22 @@ class KeyedUnifiedLock:
         they work together in the keyed lock system.
 
         Returns:
-            Dict containing lock counts:
+            Dict containing lock counts and striped lock contention metrics:
             {
                 "total_mp_locks": 10,
                 "pending_mp_cleanup": 2,
                 "total_async_locks": 8,
-                "pending_async_cleanup": 1
+                "pending_async_cleanup": 1,
+                "lock_stripes": 1024,
+                "striped_locks_held": 3,
+                "striped_lock_metrics": {
+                    "acquisitions": 500,  # striped lock contexts entered
+                    "keys": 700,
+                    "stripes": 690,
+                    "contended": 12,  # stripe acquisitions that had to wait
+                    "wait_seconds": 0.4,
+                    "max_wait_seconds": 0.1
+                }
             }
         """
         global _lock_registry_count, _lock_cleanup_data, _registry_guard
@@ -789,6 +909,9 @@ class KeyedUnifiedLock:
             "pending_mp_cleanup": 0,
             "total_async_locks": 0,
             "pending_async_cleanup": 0,
+            "lock_stripes": self._stripe_count,
+            "striped_locks_held": sum(lock.locked() for lock in self._async_stripes),
+            "striped_lock_metrics": dict(self._stripe_stats),
         }
 
         try:
@@ -1068,6 +1191,102 @@ class _KeyedLockContext:
             raise all_errors[0][2]  # (key, error_type, error)
 
 
+class _StripedLockContext:
+    """Hold the stripes of a batch of keys for the duration of an `async with`
+
+    Keys are mapped to stripe indexes, deduplicated and acquired in ascending
+    order, so concurrent batches cannot deadlock and N keys cost at most
+    min(N, stripes) acquisitions. Two keys may share a stripe, therefore a task
+    must not nest striped locks: pass all keys it needs in one batch instead.
+    """
+
+    def __init__(
+        self,
+        parent: KeyedUnifiedLock,
+        namespace: str,
+        keys: list[str],
+        enable_logging: bool,
+    ) -> None:
+        self._parent = parent
+        self._namespace = namespace
+        self._keys = keys
+        self._enable_logging = enable_logging
+        self._stripes = sorted({parent.stripe_of(namespace, key) for key in keys})
+        # (stripe, process lock acquired) for every local gate held
+        self._held: Optional[List[tuple[int, bool]]] = None
+
+    async def __aenter__(self):
+        if self._held is not None:
+            raise RuntimeError("Striped lock already acquired in current context")
+        parent = self._parent
+        self._held = []
+        try:
+            for stripe in self._stripes:
+                async_lock = parent._async_stripes[stripe]
+                process_lock = (
+                    parent._process_stripes[stripe]
+                    if parent._process_stripes is not None
+                    else None
+                )
+                start = None
+                if async_lock.locked():
+                    start = time.perf_counter()
+                await async_lock.acquire()
+                self._held.append((stripe, False))
+
+                if process_lock is not None:
+                    if not process_lock.acquire(False):
+                        # Held by another worker process
+                        if start is None:
+                            start = time.perf_counter()
+                        await _acquire_process_lock(process_lock)
+                    self._held[-1] = (stripe, True)
+
+                if start is not None:
+                    parent._record_stripe_wait(time.perf_counter() - start)
+        except BaseException:
+            # Includes cancellation while waiting: only what was taken is released
+            self._release()
+            raise
+
+        stats = parent._stripe_stats
+        stats["acquisitions"] += 1
+        stats["keys"] += len(self._keys)
+        stats["stripes"] += len(self._stripes)
+        direct_log(
+            f"== Lock == Process {os.getpid()}: Acquired {len(self._stripes)} stripes "
+            f"for {len(self._keys)} keys in {self._namespace}",
+            level="INFO",
+            enable_output=self._enable_logging,
+        )
+        return self
+
+    def _release(self) -> None:
+        # Releasing is synchronous, so it cannot be interrupted by cancellation
+        held, self._held = self._held or [], None
+        parent = self._parent
+        for stripe, process_locked in reversed(held):
+            if process_locked:
+                try:
+                    parent._process_stripes[stripe].release()
+                except Exception as e:
+                    direct_log(
+                        f"Striped lock release error for stripe {stripe}: {e}",
+                        level="ERROR",
+                        enable_output=True,
+                    )
+            parent._async_stripes[stripe].release()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._release()
+        direct_log(
+            f"== Lock == Process {os.getpid()}: Released {len(self._stripes)} stripes "
+            f"in {self._namespace}",
+            level="INFO",
+            enable_output=self._enable_logging,
+        )
+
+
 def get_internal_lock(enable_logging: bool = False) -> UnifiedLock:
     """return unified storage lock for data consistency"""
     if _internal_lock is None:
@@ -1092,14 +1311,20 @@ def get_internal_lock(enable_logging: bool = False) -> UnifiedLock:
 
 def get_storage_keyed_lock(
     keys: str | list[str], namespace: str = "default", enable_logging: bool = False
-) -> _KeyedLockContext:
-    """Return unified storage keyed lock for ensuring atomic operations across different namespaces"""
+) -> _StripedLockContext:
+    """Return unified storage keyed lock for ensuring atomic operations across different namespaces
+
+    Keys are locked through a fixed table of lock stripes, so a batch of any
+    size is acquired in one call without per-key bookkeeping. Distinct keys may
+    share a stripe: acquire every key an operation needs in a single call and
+    never nest keyed locks.
+    """
     global _storage_keyed_lock
     if _storage_keyed_lock is None:
         raise RuntimeError("Shared-Data is not initialized")
     if isinstance(keys, str):
         keys = [keys]
-    return _storage_keyed_lock(namespace, keys, enable_logging=enable_logging)
+    return _storage_keyed_lock.striped(namespace, keys, enable_logging=enable_logging)
 
 
 def get_data_init_lock(enable_logging: bool = False) -> UnifiedLock:
@@ -1173,7 +1398,7 @@ def get_keyed_lock_status() -> Dict[str, Any]:
     return status
 
 
-def initialize_share_data(workers: int = 1):
+def initialize_share_data(workers: int = 1, backend: str | None = None):
     """
     Initialize shared storage data for single or multi-process mode.
 
@@ -1186,10 +1411,14 @@ def initialize_share_data(workers: int = 1):
     The function determines whether to use cross-process shared variables for data storage
     based on the number of workers. If workers=1, it uses thread locks and local dictionaries.
     If workers>1, it uses process locks and shared dictionaries managed by multiprocessing.Manager.
+    With the default "shm" backend, the global locks and update flags are instead placed in
+    shared memory (POSIX semaphores and a flag array) so hot paths avoid Manager round trips.
 
     Args:
         workers (int): Number of worker processes. If 1, single-process mode is used.
                       If > 1, multi-process mode with shared memory is used.
+        backend (str | None): Shared-state backend for multi-process mode, "shm" or "manager".
+                      Defaults to the SHARED_STATE_BACKEND environment variable, then "shm".
     """
     global \
         _manager, \
@@ -1208,7 +1437,11 @@ def initialize_share_data(workers: int = 1):
         _async_locks, \
         _storage_keyed_lock, \
         _earliest_mp_cleanup_time, \
-        _last_mp_cleanup_time
+        _last_mp_cleanup_time, \
+        _shared_state_backend, \
+        _flag_slots, \
+        _flag_slots_used, \
+        _lock_stripes
 
     # Check if already initialized
     if _initialized:
@@ -1218,21 +1451,46 @@ def initialize_share_data(workers: int = 1):
         return
 
     _workers = workers
+    stripes = max(
+        int(os.environ.get("KEYED_LOCK_STRIPES", DEFAULT_KEYED_LOCK_STRIPES)), 1
+    )
 
     if workers > 1:
+        backend = (
+            backend or os.environ.get("SHARED_STATE_BACKEND", SHARED_STATE_BACKEND_SHM)
+        ).lower()
+        if backend not in (SHARED_STATE_BACKEND_SHM, SHARED_STATE_BACKEND_MANAGER):
+            raise ValueError(
+                f"Unknown shared-state backend '{backend}', expected "
+                f"'{SHARED_STATE_BACKEND_SHM}' or '{SHARED_STATE_BACKEND_MANAGER}'"
+            )
+
         _is_multiprocess = True
+        _shared_state_backend = backend
         _manager = Manager()
         _lock_registry = _manager.dict()
         _lock_registry_count = _manager.dict()
         _lock_cleanup_data = _manager.dict()
-        _registry_guard = _manager.RLock()
-        _internal_lock = _manager.Lock()
-        _data_init_lock = _manager.Lock()
+        if backend == SHARED_STATE_BACKEND_SHM:
+            _registry_guard = mp.RLock()
+            _internal_lock = mp.Lock()
+            _data_init_lock = mp.Lock()
+            flag_slots = int(
+                os.environ.get("SHARED_STATE_FLAG_SLOTS", DEFAULT_SHARED_FLAG_SLOTS)
+            )
+            _flag_slots = mp.RawArray(ctypes.c_byte, max(flag_slots, 1))
+            _flag_slots_used = mp.RawValue(ctypes.c_int, 0)
+            _lock_stripes = [mp.Lock() for _ in range(stripes)]
+        else:
+            _registry_guard = _manager.RLock()
+            _internal_lock = _manager.Lock()
+            _data_init_lock = _manager.Lock()
+            _lock_stripes = [_manager.Lock() for _ in range(stripes)]
         _shared_dicts = _manager.dict()
         _init_flags = _manager.dict()
         _update_flags = _manager.dict()
 
-        _storage_keyed_lock = KeyedUnifiedLock()
+        _storage_keyed_lock = KeyedUnifiedLock(process_stripes=_lock_stripes)
 
         # Initialize async locks for multiprocess mode
         _async_locks = {
@@ -1242,18 +1500,21 @@ def initialize_share_data(workers: int = 1):
         }
 
         direct_log(
-            f"Process {os.getpid()} Shared-Data created for Multiple Process (workers={workers})"
+            f"Process {os.getpid()} Shared-Data created for Multiple Process "
+            f"(workers={workers}, backend={backend})"
         )
     else:
         _is_multiprocess = False
+        _shared_state_backend = None
         _internal_lock = asyncio.Lock()
         _data_init_lock = asyncio.Lock()
         _shared_dicts = {}
         _init_flags = {}
         _update_flags = {}
         _async_locks = None  # No need for async locks in single process mode
+        _lock_stripes = None
 
-        _storage_keyed_lock = KeyedUnifiedLock()
+        _storage_keyed_lock = KeyedUnifiedLock(stripes=stripes)
         direct_log(f"Process {os.getpid()} Shared-Data created for Single Process")
 
     # Initialize multiprocess cleanup times
@@ -1327,6 +1588,21 @@ async def get_update_flag(namespace: str, workspace: str | None = None):
                 f"Process {os.getpid()} initialized updated flags for namespace: [{final_namespace}]"
             )
 
+        if _shared_state_backend == SHARED_STATE_BACKEND_SHM:
+            # Allocation is serialized by the internal lock held above
+            index = _flag_slots_used.value
+            if index < len(_flag_slots):
+                _flag_slots_used.value = index + 1
+                _flag_slots[index] = 0
+                _update_flags[final_namespace].append(index)
+                return _SharedFlag(index)
+            direct_log(
+                f"Process {os.getpid()} shared update flag slots exhausted "
+                f"({len(_flag_slots)}), falling back to Manager flag for [{final_namespace}]. "
+                "Increase SHARED_STATE_FLAG_SLOTS.",
+                level="WARNING",
+            )
+
         if _is_multiprocess and _manager is not None:
             new_update_flag = _manager.Value("b", False)
         else:
@@ -1352,9 +1628,9 @@ async def set_all_update_flags(namespace: str, workspace: str | None = None):
     async with get_internal_lock():
         if final_namespace not in _update_flags:
             raise ValueError(f"Namespace {final_namespace} not found in update flags")
-        # Update flags for both modes
-        for i in range(len(_update_flags[final_namespace])):
-            _update_flags[final_namespace][i].value = True
+        # Update flags for both modes (one fetch of the flag list in multi-process mode)
+        for flag in list(_update_flags[final_namespace]):
+            _write_flag(flag, True)
 
 
 async def clear_all_update_flags(namespace: str, workspace: str | None = None):
@@ -1368,9 +1644,9 @@ async def clear_all_update_flags(namespace: str, workspace: str | None = None):
     async with get_internal_lock():
         if final_namespace not in _update_flags:
             raise ValueError(f"Namespace {final_namespace} not found in update flags")
-        # Update flags for both modes
-        for i in range(len(_update_flags[final_namespace])):
-            _update_flags[final_namespace][i].value = False
+        # Update flags for both modes (one fetch of the flag list in multi-process mode)
+        for flag in list(_update_flags[final_namespace]):
+            _write_flag(flag, False)
 
 
 async def get_all_update_flags_status(workspace: str | None = None) -> Dict[str, list]:
@@ -1406,7 +1682,7 @@ async def get_all_update_flags_status(workspace: str | None = None) -> Dict[str,
             worker_statuses = []
             for flag in flags:
                 if _is_multiprocess:
-                    worker_statuses.append(flag.value)
+                    worker_statuses.append(_read_flag(flag))
                 else:
                     worker_statuses.append(flag)
             result[namespace] = worker_statuses
@@ -1526,10 +1802,14 @@ class NamespaceLock:
                 "NamespaceLock already acquired in current coroutine context"
             )
 
+        if _storage_keyed_lock is None:
+            raise RuntimeError("Shared-Data is not initialized")
         final_namespace = get_final_namespace(self._namespace, self._workspace)
-        ctx = get_storage_keyed_lock(
+        # Namespace locks nest (e.g. a storage lock taken while pipeline_status is
+        # held), so each namespace keeps a dedicated lock instead of a stripe
+        ctx = _storage_keyed_lock(
+            final_namespace,
             ["default_key"],
-            namespace=final_namespace,
             enable_logging=self._enable_logging,
         )
 
@@ -1603,7 +1883,11 @@ def finalize_share_data():
         _initialized, \
         _update_flags, \
         _async_locks, \
-        _default_workspace
+        _default_workspace, \
+        _shared_state_backend, \
+        _flag_slots, \
+        _flag_slots_used, \
+        _lock_stripes
 
     # Check if already initialized
     if not _initialized:
@@ -1628,6 +1912,20 @@ def finalize_share_data():
                         pipeline_status["history_messages"].clear()
                 except Exception:
                     pass  # Ignore any errors during history messages cleanup
+                # Unlink shared memory snapshot segments published by storages
+                try:
+                    from .shared_memory_snapshot import (
+                        SNAPSHOT_NAMESPACE,
+                        unlink_registry_segments,
+                    )
+
+                    unlink_registry_segments(
+                        registry
+                        for name, registry in _shared_dicts.items()
+                        if name.split(":")[-1] == SNAPSHOT_NAMESPACE
+                    )
+                except Exception:
+                    pass  # Ignore any errors during snapshot cleanup
                 _shared_dicts.clear()
             if _init_flags is not None:
                 _init_flags.clear()
@@ -1667,10 +1965,22 @@ def finalize_share_data():
     _update_flags = None
     _async_locks = None
     _default_workspace = None
+    _shared_state_backend = None
+    _flag_slots = None
+    _flag_slots_used = None
+    _lock_stripes = None
 
     direct_log(f"Process {os.getpid()} storage data finalization complete")
 
 
+def get_shared_state_backend() -> str | None:
+    """Return the active multi-process shared-state backend ("shm" or "manager").
+
+    Returns None in single-process mode or before initialize_share_data().
+    """
+    return _shared_state_backend
+
+
 def set_default_workspace(workspace: str | None = None):
     """
     Set default workspace for namespace operations for backward compatibility.
@@ -7,9 +7,10 @@ import inspect
 import os
 import time
 import warnings
+from contextlib import aclosing
 from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timezone
-from functools import partial
+from functools import partial, wraps
 from typing import (
     Any,
     AsyncIterator,
@@ -28,6 +29,7 @@ from lightrag.prompt import PROMPTS
 from lightrag.exceptions import PipelineCancelledException
 from lightrag.constants import (
     DEFAULT_MAX_GLEANING,
+    DEFAULT_EXPORT_BATCH_SIZE,
     DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE,
     DEFAULT_TOP_K,
     DEFAULT_CHUNK_TOP_K,
@@ -38,17 +40,29 @@ from lightrag.constants import (
     DEFAULT_RELATED_CHUNK_NUMBER,
     DEFAULT_KG_CHUNK_PICK_METHOD,
     DEFAULT_MIN_RERANK_SCORE,
+    DEFAULT_RERANK_MAX_CANDIDATES,
+    DEFAULT_RERANK_CACHE_SIZE,
+    DEFAULT_STREAM_COALESCE_MS,
     DEFAULT_SUMMARY_MAX_TOKENS,
     DEFAULT_SUMMARY_CONTEXT_SIZE,
     DEFAULT_SUMMARY_LENGTH_RECOMMENDED,
     DEFAULT_MAX_ASYNC,
     DEFAULT_MAX_PARALLEL_INSERT,
+    DEFAULT_PARSE_MAX_WORKERS,
+    DEFAULT_REBUILD_BATCH_SIZE,
+    DEFAULT_GRAPH_WRITE_BATCH_SIZE,
     DEFAULT_MAX_GRAPH_NODES,
     DEFAULT_MAX_SOURCE_IDS_PER_ENTITY,
     DEFAULT_MAX_SOURCE_IDS_PER_RELATION,
     DEFAULT_ENTITY_TYPES,
     DEFAULT_SUMMARY_LANGUAGE,
     DEFAULT_LLM_TIMEOUT,
+    DEFAULT_LLM_RPM_LIMIT,
+    DEFAULT_LLM_TPM_LIMIT,
+    DEFAULT_LLM_COMPLETION_TOKENS_ESTIMATE,
+    DEFAULT_LLM_LATENCY_TARGET,
+    DEFAULT_LLM_RESERVED_WORKERS,
+    DEFAULT_BATCH_EXTRACTION_POLL_INTERVAL,
     DEFAULT_EMBEDDING_TIMEOUT,
     DEFAULT_SOURCE_IDS_LIMIT_METHOD,
     DEFAULT_MAX_FILE_PATHS,
@@ -111,6 +125,21 @@ from lightrag.utils import (
     subtract_source_ids,
     make_relation_chunk_key,
     normalize_source_ids_limit_method,
+    coalesce_text_stream,
+)
+from lightrag.metrics import (
+    INGEST_STAGE_SECONDS,
+    QUERY_STAGE_SECONDS,
+    metrics_labels,
+    observe_query_stage,
+    time_ingest_stage,
+)
+from lightrag.query_planner import QueryPlanner, default_query_planner_config
+from lightrag.batch_extraction import BatchBackend, run_batch_extraction
+from lightrag.rate_limit import (
+    AdaptiveConcurrency,
+    TokenBucketLimiter,
+    make_token_estimator,
 )
 from lightrag.types import KnowledgeGraph
 from dotenv import load_dotenv
@@ -125,6 +154,24 @@ config = configparser.ConfigParser()
 config.read("config.ini", "utf-8")
 
 
+def _track_query_metrics(func):
+    """Label query metrics with workspace and requested mode, and record total time."""
+
+    @wraps(func)
+    async def wrapper(
+        self, query: str, param: QueryParam = QueryParam(), *args, **kwargs
+    ):
+        with metrics_labels(workspace=self.workspace, mode=param.mode):
+            start = time.perf_counter()
+            result = await func(self, query, param, *args, **kwargs)
+            # Streaming responses are timed by aquery_stream once generation ends
+            if not result.get("llm_response", {}).get("is_streaming"):
+                observe_query_stage("total", time.perf_counter() - start)
+            return result
+
+    return wrapper
+
+
 @final
 @dataclass
 class LightRAG:
@@ -345,6 +392,66 @@ class LightRAG:
         default=int(os.getenv("LLM_TIMEOUT", DEFAULT_LLM_TIMEOUT))
     )
 
+    llm_rpm_limit: int = field(
+        default=get_env_value("LLM_RPM_LIMIT", DEFAULT_LLM_RPM_LIMIT, int)
+    )
+    """Maximum LLM requests per minute, 0 for no limit."""
+
+    llm_tpm_limit: int = field(
+        default=get_env_value("LLM_TPM_LIMIT", DEFAULT_LLM_TPM_LIMIT, int)
+    )
+    """Maximum LLM tokens per minute, estimated with the tokenizer and corrected with
+    the usage reported by the LLM binding. 0 for no limit."""
+
+    llm_completion_tokens_estimate: int = field(
+        default=get_env_value(
+            "LLM_COMPLETION_TOKENS_ESTIMATE",
+            DEFAULT_LLM_COMPLETION_TOKENS_ESTIMATE,
+            int,
+        )
+    )
+    """Completion tokens a call is expected to use, charged to the TPM budget before
+    it runs when neither the call nor llm_model_kwargs set max_tokens."""
+
+    llm_rate_limit_shared: bool = field(
+        default=get_env_value("LLM_RATE_LIMIT_SHARED", False, bool)
+    )
+    """Share the RPM/TPM budget of a model with all instances and worker processes
+    through the shared storage layer instead of enforcing it per instance."""
+
+    llm_adaptive_concurrency: bool = field(
+        default=get_env_value("LLM_ADAPTIVE_CONCURRENCY", False, bool)
+    )
+    """Adapt the number of concurrent LLM calls (at most llm_model_max_async) to
+    rate limits and latency."""
+
+    llm_latency_target: float = field(
+        default=get_env_value("LLM_LATENCY_TARGET", DEFAULT_LLM_LATENCY_TARGET, float)
+    )
+    """LLM call latency in seconds above which adaptive concurrency backs off, 0 to
+    react to rate limits only."""
+
+    llm_reserved_workers: int = field(
+        default=get_env_value("LLM_RESERVED_WORKERS", DEFAULT_LLM_RESERVED_WORKERS, int)
+    )
+    """LLM workers (out of llm_model_max_async) reserved for query calls, so queries do
+    not wait behind document extraction and summarization."""
+
+    llm_priority_preempt: bool = field(
+        default=get_env_value("LLM_PRIORITY_PREEMPT", False, bool)
+    )
+    """Let ingestion calls still waiting for the rate limiter or adaptive concurrency
+    give their worker to waiting query calls."""
+
+    batch_extraction_poll_interval: float = field(
+        default=get_env_value(
+            "BATCH_EXTRACTION_POLL_INTERVAL",
+            DEFAULT_BATCH_EXTRACTION_POLL_INTERVAL,
+            float,
+        )
+    )
+    """Seconds between status polls of the offline jobs submitted by ainsert_batch."""
+
     # Rerank Configuration
     # ---
 
@@ -356,6 +463,28 @@ class LightRAG:
     )
     """Minimum rerank score threshold for filtering chunks after reranking."""
 
+    rerank_max_candidates: int = field(
+        default=get_env_value(
+            "RERANK_MAX_CANDIDATES", DEFAULT_RERANK_MAX_CANDIDATES, int
+        )
+    )
+    """Maximum number of chunks sent to the reranker per query. Lowest vector-similarity candidates are pruned first. 0 disables pruning."""
+
+    rerank_cache_size: int = field(
+        default=get_env_value("RERANK_CACHE_SIZE", DEFAULT_RERANK_CACHE_SIZE, int)
+    )
+    """Maximum number of cached (query, chunk_id) rerank scores per workspace. 0 disables the cache."""
+
+    query_planner_config: dict[str, Any] = field(
+        default_factory=default_query_planner_config
+    )
+    """Configuration for the adaptive query planner (see lightrag/query_planner.py).
+    - enabled: If True, picks mode, top_k, chunk_top_k, rerank and token budgets per query (env ENABLE_QUERY_PLANNER).
+    - allow_mode_change: If True, easy mix/hybrid/local/global queries may be answered in naive mode.
+    - probe_candidates: If True, runs a small vector probe over chunks to detect a dominant hit.
+    - Thresholds and fast-path sizes: see default_query_planner_config.
+    """
+
     # Storage
     # ---
 
@@ -376,6 +505,30 @@ class LightRAG:
     )
     """Maximum number of parallel insert operations."""
 
+    parse_max_workers: int = field(
+        default=get_env_value("PARSE_MAX_WORKERS", DEFAULT_PARSE_MAX_WORKERS, int)
+    )
+    """Worker processes for parsing extraction results; 0 parses on the event loop."""
+
+    rebuild_batch_size: int = field(
+        default=get_env_value("REBUILD_BATCH_SIZE", DEFAULT_REBUILD_BATCH_SIZE, int)
+    )
+    """Chunks read from the LLM cache and storage writes flushed per batch during knowledge rebuild."""
+
+    graph_batch_writes: bool = field(
+        default=get_env_value("GRAPH_BATCH_WRITES", False, bool)
+    )
+    """Buffer the graph upserts of each document while merging and write them with
+    upsert_nodes_batch/upsert_edges_batch. The document then holds the keyed locks
+    of all its entities for the whole merge."""
+
+    graph_write_batch_size: int = field(
+        default=get_env_value(
+            "GRAPH_WRITE_BATCH_SIZE", DEFAULT_GRAPH_WRITE_BATCH_SIZE, int
+        )
+    )
+    """Rows per transaction in batched graph upserts (Neo4j, Memgraph)."""
+
     max_graph_nodes: int = field(
         default=get_env_value("MAX_GRAPH_NODES", DEFAULT_MAX_GRAPH_NODES, int)
     )
@@ -652,11 +805,39 @@ class LightRAG:
         # Directly use llm_response_cache, don't create a new object
         hashing_kv = self.llm_response_cache
 
+        rate_limiter = None
+        if self.llm_rpm_limit > 0 or self.llm_tpm_limit > 0:
+            rate_limiter = TokenBucketLimiter(
+                rpm=self.llm_rpm_limit,
+                tpm=self.llm_tpm_limit,
+                name=f"llm:{self.llm_model_name}",
+                shared=self.llm_rate_limit_shared,
+            )
+        concurrency = None
+        if self.llm_adaptive_concurrency:
+            concurrency = AdaptiveConcurrency(
+                self.llm_model_max_async,
+                latency_target=self.llm_latency_target,
+                name="LLM func",
+            )
+
         # Get timeout from LLM model kwargs for dynamic timeout calculation
         self.llm_model_func = priority_limit_async_func_call(
             self.llm_model_max_async,
             llm_timeout=self.default_llm_timeout,
             queue_name="LLM func",
+            rate_limiter=rate_limiter,
+            concurrency=concurrency,
+            token_estimator=make_token_estimator(
+                self.tokenizer,
+                completion_tokens=self.llm_model_kwargs.get("max_tokens")
+                or self.llm_model_kwargs.get("max_completion_tokens")
+                or self.llm_completion_tokens_estimate,
+            )
+            if self.llm_tpm_limit > 0
+            else None,
+            reserved_workers=self.llm_reserved_workers,
+            preempt=self.llm_priority_preempt,
         )(
             partial(
                 self.llm_model_func,  # type: ignore
@@ -665,6 +846,8 @@ class LightRAG:
             )
         )
 
+        self.query_planner = QueryPlanner(self.query_planner_config)
+
         self._storages_status = StoragesStatus.CREATED
 
     async def initialize_storages(self):
@@ -1182,6 +1365,145 @@ class LightRAG:
 
         return track_id
 
+    async def ainsert_batch(
+        self,
+        input: str | list[str],
+        backend: BatchBackend,
+        split_by_character: str | None = None,
+        split_by_character_only: bool = False,
+        ids: str | list[str] | None = None,
+        file_paths: str | list[str] | None = None,
+        track_id: str | None = None,
+    ) -> str:
+        """Insert documents with entity extraction answered by offline batch jobs
+
+        The extraction prompts of all pending documents are submitted to `backend`
+        (e.g. batch_extraction.OpenAIBatchBackend) as one job, and the answers are
+        cached before the regular pipeline processes the documents. Suited to bulk re-indexing where
+        the lower cost of a batch API outweighs its turnaround time.
+
+        Args:
+            input: Single document string or list of document strings
+            backend: Batch backend that runs the extraction job
+            split_by_character, split_by_character_only, ids, file_paths, track_id:
+                same as ainsert
+
+        Returns:
+            str: tracking ID for monitoring processing status
+        """
+        if track_id is None:
+            track_id = generate_track_id("batch")
+
+        await self.apipeline_enqueue_documents(input, ids, file_paths, track_id)
+        await self.apipeline_batch_extract(
+            backend, split_by_character, split_by_character_only
+        )
+        await self.apipeline_process_enqueue_documents(
+            split_by_character, split_by_character_only
+        )
+
+        return track_id
+
+    async def apipeline_batch_extract(
+        self,
+        backend: BatchBackend,
+        split_by_character: str | None = None,
+        split_by_character_only: bool = False,
+    ) -> dict[str, int]:
+        """Answer the entity extraction calls of all pending documents with batch jobs
+
+        Results are written to the LLM cache under the keys extract_entities looks
+        up, so apipeline_process_enqueue_documents takes them from there. Calls the
+        jobs do not answer go to the realtime LLM as usual.
+
+        The pipeline is held busy while the jobs run, so the documents are not
+        processed at the same time. If another job holds it, nothing is submitted.
+
+        Returns:
+            dict: chunks and answered calls per round (see run_batch_extraction)
+        """
+        pipeline_status = await get_namespace_data(
+            "pipeline_status", workspace=self.workspace
+        )
+        pipeline_status_lock = get_namespace_lock(
+            "pipeline_status", workspace=self.workspace
+        )
+
+        async with pipeline_status_lock:
+            if pipeline_status.get("busy", False):
+                logger.info(
+                    "Another process is already processing the document queue. "
+                    "Skipping batch extraction."
+                )
+                return {"chunks": 0, "extract": 0, "gleaning": 0}
+
+            to_process_docs: dict[str, DocProcessingStatus] = {}
+            for status in (DocStatus.PROCESSING, DocStatus.FAILED, DocStatus.PENDING):
+                to_process_docs.update(await self.doc_status.get_docs_by_status(status))
+            if not to_process_docs:
+                return {"chunks": 0, "extract": 0, "gleaning": 0}
+
+            pipeline_status.update(
+                {
+                    "busy": True,
+                    "job_name": "Batch extraction",
+                    "job_start": datetime.now(timezone.utc).isoformat(),
+                    "docs": len(to_process_docs),
+                    "batchs": 0,
+                    "cur_batch": 0,
+                    "request_pending": False,
+                    "cancellation_requested": False,
+                    "latest_message": "",
+                }
+            )
+            del pipeline_status["history_messages"][:]
+
+        try:
+            return await self._run_batch_extraction(
+                to_process_docs, backend, split_by_character, split_by_character_only
+            )
+        finally:
+            log_message = "Batch extraction stopped"
+            logger.info(log_message)
+            async with pipeline_status_lock:
+                pipeline_status["busy"] = False
+                pipeline_status["cancellation_requested"] = False
+                pipeline_status["latest_message"] = log_message
+                pipeline_status["history_messages"].append(log_message)
+
+    async def _run_batch_extraction(
+        self,
+        to_process_docs: dict[str, DocProcessingStatus],
+        backend: BatchBackend,
+        split_by_character: str | None,
+        split_by_character_only: bool,
+    ) -> dict[str, int]:
+        doc_ids = list(to_process_docs)
+        chunks: dict[str, Any] = {}
+        for doc_id, content_data in zip(
+            doc_ids, await self.full_docs.get_by_ids(doc_ids)
+        ):
+            if not content_data:
+                continue
+            chunks.update(
+                await self._chunk_document(
+                    doc_id,
+                    content_data["content"],
+                    to_process_docs[doc_id].file_path or "unknown_source",
+                    split_by_character,
+                    split_by_character_only,
+                )
+            )
+
+        return await run_batch_extraction(
+            chunks,
+            asdict(self),
+            self.llm_response_cache,
+            backend,
+            work_dir=os.path.join(self.working_dir, "batch_jobs"),
+            poll_interval=self.batch_extraction_poll_interval,
+        )
+
     # TODO: deprecated, use insert instead
     def insert_custom_chunks(
         self,
@@ -1602,6 +1924,47 @@ class LightRAG:
 
         return to_process_docs
 
+    async def _chunk_document(
+        self,
+        doc_id: str,
+        content: str,
+        file_path: str,
+        split_by_character: str | None = None,
+        split_by_character_only: bool = False,
+    ) -> dict[str, Any]:
+        """Split a document with chunking_func into chunks keyed by chunk ID"""
+        # Call chunking function, supporting both sync and async implementations
+        chunking_result = self.chunking_func(
+            self.tokenizer,
+            content,
+            split_by_character,
+            split_by_character_only,
+            self.chunk_overlap_token_size,
+            self.chunk_token_size,
+        )
+
+        # If result is awaitable, await to get actual result
+        if inspect.isawaitable(chunking_result):
+            chunking_result = await chunking_result
+
+        # Validate return type
+        if not isinstance(chunking_result, (list, tuple)):
+            raise TypeError(
+                f"chunking_func must return a list or tuple of dicts, "
+                f"got {type(chunking_result)}"
+            )
+
+        # Build chunks dictionary
+        return {
+            compute_mdhash_id(dp["content"], prefix="chunk-"): {
+                **dp,
+                "full_doc_id": doc_id,
+                "file_path": file_path,  # Add file path to each chunk
+                "llm_cache_list": [],  # Initialize empty LLM cache list for each chunk
+            }
+            for dp in chunking_result
+        }
+
     async def apipeline_process_enqueue_documents(
         self,
         split_by_character: str | None = None,
@@ -1807,38 +2170,15 @@ class LightRAG:
                                 )
                             content = content_data["content"]
 
-                            # Call chunking function, supporting both sync and async implementations
-                            chunking_result = self.chunking_func(
-                                self.tokenizer,
-                                content,
-                                split_by_character,
-                                split_by_character_only,
-                                self.chunk_overlap_token_size,
-                                self.chunk_token_size,
-                            )
-
-                            # If result is awaitable, await to get actual result
-                            if inspect.isawaitable(chunking_result):
-                                chunking_result = await chunking_result
-
-                            # Validate return type
-                            if not isinstance(chunking_result, (list, tuple)):
-                                raise TypeError(
-                                    f"chunking_func must return a list or tuple of dicts, "
-                                    f"got {type(chunking_result)}"
+                            with time_ingest_stage("chunking", self.workspace):
+                                chunks = await self._chunk_document(
+                                    doc_id,
+                                    content,
+                                    file_path,
+                                    split_by_character,
+                                    split_by_character_only,
                                 )
 
-                            # Build chunks dictionary
-                            chunks: dict[str, Any] = {
-                                compute_mdhash_id(dp["content"], prefix="chunk-"): {
-                                    **dp,
-                                    "full_doc_id": doc_id,
-                                    "file_path": file_path,  # Add file path to each chunk
-                                    "llm_cache_list": [],  # Initialize empty LLM cache list for each chunk
-                                }
-                                for dp in chunking_result
-                            }
-
                             if not chunks:
                                 logger.warning("No document chunks to process")
 
@@ -1892,7 +2232,8 @@ class LightRAG:
                             entity_relation_task = None
 
                             # Execute first stage tasks
-                            await asyncio.gather(*first_stage_tasks)
+                            with time_ingest_stage("chunk_upsert", self.workspace):
+                                await asyncio.gather(*first_stage_tasks)
 
                             # Stage 2: Process entity relation graph (after text_chunks are saved)
                             entity_relation_task = asyncio.create_task(
@@ -1900,7 +2241,8 @@ class LightRAG:
                                     chunks, pipeline_status, pipeline_status_lock
                                 )
                             )
-                            chunk_results = await entity_relation_task
+                            with time_ingest_stage("extraction", self.workspace):
+                                chunk_results = await entity_relation_task
                             file_extraction_stage_ok = True
 
                         except Exception as e:
@@ -1983,6 +2325,7 @@ class LightRAG:
                                         )
 
                                 # Use chunk_results from entity_relation_task
+                                merge_start = time.perf_counter()
                                 await merge_nodes_and_edges(
                                     chunk_results=chunk_results,  # result collected from entity_relation_task
                                     knowledge_graph_inst=self.chunk_entity_relation_graph,
@@ -2001,6 +2344,11 @@ class LightRAG:
                                     total_files=total_files,
                                     file_path=file_path,
                                 )
+                                INGEST_STAGE_SECONDS.observe(
+                                    time.perf_counter() - merge_start,
+                                    workspace=self.workspace,
+                                    stage="merge",
+                                )
 
                                 # Record processing end time
                                 processing_end_time = int(time.time())
@@ -2474,6 +2822,7 @@ class LightRAG:
         loop = always_get_an_event_loop()
         return loop.run_until_complete(self.aquery_data(query, param))
 
+    @_track_query_metrics
     async def aquery_data(
         self,
         query: str,
@@ -2608,6 +2957,14 @@ class LightRAG:
             enable_rerank=param.enable_rerank,
         )
 
+        data_param, query_plan = await self.query_planner.plan(
+            query.strip(),
+            data_param,
+            global_config,
+            chunks_vdb=self.chunks_vdb,
+            hashing_kv=self.llm_response_cache,
+        )
+
         query_result = None
 
         if data_param.mode in ["local", "global", "hybrid", "mix"]:
@@ -2678,9 +3035,13 @@ class LightRAG:
             else:
                 logger.warning("[aquery_data] No data section found in query result")
 
+        if query_plan is not None:
+            final_data.setdefault("metadata", {})["query_plan"] = query_plan.to_dict()
+
         await self._query_done()
         return final_data
 
+    @_track_query_metrics
     async def aquery_llm(
         self,
         query: str,
@@ -2704,8 +3065,16 @@ class LightRAG:
         logger.debug(f"[aquery_llm] Query param: {param}")
 
         global_config = asdict(self)
+        query_plan = None
 
         try:
+            param, query_plan = await self.query_planner.plan(
+                query.strip(),
+                param,
+                global_config,
+                chunks_vdb=self.chunks_vdb,
+                hashing_kv=self.llm_response_cache,
+            )
             query_result = None
 
             if param.mode in ["local", "global", "hybrid", "mix"]:
@@ -2782,6 +3151,11 @@ class LightRAG:
                     "metadata": {
                         "failure_reason": "no_results",
                         "mode": param.mode,
+                        **(
+                            {"query_plan": query_plan.to_dict()}
+                            if query_plan is not None
+                            else {}
+                        ),
                     },
                     "llm_response": {
                         "content": PROMPTS["fail_response"],
@@ -2801,6 +3175,8 @@ class LightRAG:
                 else None,
                 "is_streaming": query_result.is_streaming,
             }
+            if query_plan is not None:
+                raw_data.setdefault("metadata", {})["query_plan"] = query_plan.to_dict()
 
             return raw_data
 
@@ -2819,6 +3195,152 @@ class LightRAG:
                 },
             }
 
+    async def aquery_stream(
+        self,
+        query: str,
+        param: QueryParam = QueryParam(),
+        system_prompt: str | None = None,
+        coalesce_chars: int = 0,
+        coalesce_ms: float = DEFAULT_STREAM_COALESCE_MS,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Asynchronous streaming query API with early context flush.
+
+        Retrieval results are yielded as soon as the query context is built, before
+        the LLM is called, followed by the LLM output as it is generated.
+
+        Args:
+            query: Query text for retrieval and LLM generation.
+            param: Query parameters controlling retrieval and LLM behavior.
+                `stream` is forced to True; `context_callback` is overridden.
+            system_prompt: Optional custom system prompt for LLM generation.
+            coalesce_chars: Merge LLM chunks into token events of at least this many
+                characters, flushing after `coalesce_ms` at the latest (0 disables).
+            coalesce_ms: Maximum time buffered LLM output is held back.
+
+        Yields:
+            dict[str, Any]: Events in the following order:
+            - `{"type": "context", "data": {...}}`: status, message, data (entities,
+              relationships, chunks, references) and metadata, exactly once
+            - `{"type": "token", "content": str}`: LLM output chunks (a single event
+              when the response comes from the LLM cache)
+            - `{"type": "error", "error": str}`: query or streaming failure
+            - `{"type": "done", "metrics": {...}}`: time_to_context,
+              time_to_first_token and total_time in seconds, token_events count
+        """
+        start = time.perf_counter()
+        metrics: dict[str, Any] = {
+            "time_to_context": None,
+            "time_to_first_token": None,
+            "total_time": None,
+            "token_events": 0,
+        }
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def on_context(raw_data: dict[str, Any]) -> None:
+            await events.put(("context", dict(raw_data)))
+
+        async def run_query() -> None:
+            try:
+                result = await self.aquery_llm(
+                    query,
+                    replace(param, stream=True, context_callback=on_context),
+                    system_prompt,
+                )
+            except Exception as e:
+                result = {
+                    "status": "failure",
+                    "message": f"Query failed: {str(e)}",
+                    "data": {},
+                    "metadata": {},
+                }
+            await events.put(("result", result))
+
+        query_task = asyncio.create_task(run_query())
+        streamed = False
+        try:
+            context_sent = False
+            while True:
+                kind, payload = await events.get()
+                if kind == "context":
+                    metrics["time_to_context"] = time.perf_counter() - start
+                    context_sent = True
+                    yield {"type": "context", "data": payload}
+                    continue
+                result = payload
+                break
+
+            if not context_sent:
+                # bypass mode, no results or failure before the context was built
+                metrics["time_to_context"] = time.perf_counter() - start
+                yield {
+                    "type": "context",
+                    "data": {
+                        key: value
+                        for key, value in result.items()
+                        if key != "llm_response"
+                    },
+                }
+
+            llm_response = result.get("llm_response", {})
+            streamed = bool(llm_response.get("is_streaming"))
+            if streamed:
+                try:
+                    # Closing this generator early (client gone) closes the LLM stream
+                    async with aclosing(
+                        coalesce_text_stream(
+                            llm_response["response_iterator"],
+                            min_chars=coalesce_chars,
+                            max_delay_ms=coalesce_ms,
+                        )
+                    ) as chunks:
+                        async for chunk in chunks:
+                            if not chunk:
+                                continue
+                            if metrics["time_to_first_token"] is None:
+                                metrics["time_to_first_token"] = (
+                                    time.perf_counter() - start
+                                )
+                            metrics["token_events"] += 1
+                            yield {"type": "token", "content": chunk}
+                except Exception as e:
+                    logger.error(f"[aquery_stream] Streaming error: {e}")
+                    yield {"type": "error", "error": str(e)}
+            elif llm_response.get("content"):
+                metrics["time_to_first_token"] = time.perf_counter() - start
+                metrics["token_events"] = 1
+                yield {"type": "token", "content": llm_response["content"]}
+            elif result.get("status") == "failure":
+                yield {"type": "error", "error": result.get("message", "")}
+        finally:
+            if not query_task.done():
+                query_task.cancel()
+
+        metrics["total_time"] = time.perf_counter() - start
+        if streamed:
+            # Non-streaming results were already timed by aquery_llm
+            stage_labels = {"workspace": self.workspace, "mode": param.mode}
+            generation_start = metrics["time_to_context"] or 0.0
+            if metrics["time_to_first_token"] is not None:
+                QUERY_STAGE_SECONDS.observe(
+                    metrics["time_to_first_token"] - generation_start,
+                    stage="llm_first_token",
+                    **stage_labels,
+                )
+            QUERY_STAGE_SECONDS.observe(
+                metrics["total_time"] - generation_start,
+                stage="llm_total",
+                **stage_labels,
+            )
+            QUERY_STAGE_SECONDS.observe(
+                metrics["total_time"], stage="total", **stage_labels
+            )
+        logger.debug(
+            f"[aquery_stream] context {metrics['time_to_context']}s, "
+            f"first token {metrics['time_to_first_token']}s, total {metrics['total_time']:.3f}s"
+        )
+        yield {"type": "done", "metrics": metrics}
+
     def query_llm(
         self,
         query: str,
@@ -2958,6 +3480,8 @@ class LightRAG:
         It ensures that not only the document itself but also all its derived and associated
         data across different storage layers are removed or rebuiled. If entities or relationships
         are partially affected, they will be rebuilded using LLM cached from remaining documents.
+        This is adelete_by_doc_ids for a single document; use that method directly when deleting
+        several documents so shared entities and relations are rebuilt only once.
 
         **Concurrency Control Design:**
 
@@ -2992,6 +3516,40 @@ class LightRAG:
                 - `status_code` (int): HTTP status code (e.g., 200, 404, 403, 500).
                 - `file_path` (str | None): The file path of the deleted document, if available.
         """
+        results = await self.adelete_by_doc_ids(
+            [doc_id], delete_llm_cache=delete_llm_cache
+        )
+        return results[0]
+
+    async def adelete_by_doc_ids(
+        self, doc_ids: list[str], delete_llm_cache: bool = False
+    ) -> list[DeletionResult]:
+        """Delete several documents with one consolidated graph update.
+
+        The chunks, entities and relations affected by all documents are unioned
+        before anything is touched, so an entity shared by many of the deleted
+        documents is analysed, deleted or rebuilt exactly once, chunk tracking is
+        read with one get_by_ids call per storage, and storages are persisted once
+        at the end instead of once per document.
+
+        Pipeline handling follows adelete_by_doc_id: an idle pipeline is acquired
+        for the duration of the call, a busy pipeline is only joined when it runs a
+        document deletion job.
+
+        Args:
+            doc_ids (list[str]): IDs of the documents to delete; duplicates are ignored.
+            delete_llm_cache (bool): Whether to delete cached LLM extraction results
+                associated with the documents. Defaults to False.
+
+        Returns:
+            list[DeletionResult]: One result per distinct document ID, in input order.
+                Documents that do not exist get a "not_found" result; if any step of
+                the shared deletion fails, every existing document gets "fail".
+        """
+        doc_ids = list(dict.fromkeys(doc_ids))
+        if not doc_ids:
+            return []
+
         # Get pipeline status shared data and lock for validation
         pipeline_status = await get_namespace_data(
             "pipeline_status", workspace=self.workspace
@@ -3000,6 +3558,14 @@ class LightRAG:
             "pipeline_status", workspace=self.workspace
         )
 
+        if len(doc_ids) == 1:
+            job_name = "Single document deletion"
+            start_message = f"Starting deletion for document: {doc_ids[0]}"
+        else:
+            # Must not start with "deleting", so no other deletion joins this job
+            job_name = f"Batch deletion of {len(doc_ids)} documents"
+            start_message = f"Starting deletion for {len(doc_ids)} documents"
+
         # Track whether WE acquired the pipeline
         we_acquired_pipeline = False
 
@@ -3011,82 +3577,82 @@ class LightRAG:
                 pipeline_status.update(
                     {
                         "busy": True,
-                        "job_name": "Single document deletion",
+                        "job_name": job_name,
                         "job_start": datetime.now(timezone.utc).isoformat(),
-                        "docs": 1,
+                        "docs": len(doc_ids),
                         "batchs": 1,
                         "cur_batch": 0,
                         "request_pending": False,
                         "cancellation_requested": False,
-                        "latest_message": f"Starting deletion for document: {doc_id}",
+                        "latest_message": start_message,
                     }
                 )
                 # Initialize history messages
-                pipeline_status["history_messages"][:] = [
-                    f"Starting deletion for document: {doc_id}"
-                ]
+                pipeline_status["history_messages"][:] = [start_message]
             else:
                 # Pipeline already busy - verify it's a deletion job
-                job_name = pipeline_status.get("job_name", "").lower()
-                if not job_name.startswith("deleting") or "document" not in job_name:
-                    return DeletionResult(
-                        status="not_allowed",
-                        doc_id=doc_id,
-                        message=f"Deletion not allowed: current job '{pipeline_status.get('job_name')}' is not a document deletion job",
-                        status_code=403,
-                        file_path=None,
-                    )
+                current_job = pipeline_status.get("job_name", "").lower()
+                if (
+                    not current_job.startswith("deleting")
+                    or "document" not in current_job
+                ):
+                    return [
+                        DeletionResult(
+                            status="not_allowed",
+                            doc_id=doc_id,
+                            message=f"Deletion not allowed: current job '{pipeline_status.get('job_name')}' is not a document deletion job",
+                            status_code=403,
+                            file_path=None,
+                        )
+                        for doc_id in doc_ids
+                    ]
                 # Pipeline is busy with deletion - proceed without acquiring
 
         deletion_operations_started = False
         original_exception = None
-        doc_llm_cache_ids: list[str] = []
+        results: dict[str, DeletionResult] = {}
+        file_paths: dict[str, str | None] = {}
+        llm_cache_ids: list[str] = []
+        log_message = ""
 
         async with pipeline_status_lock:
-            log_message = f"Starting deletion process for document {doc_id}"
+            if len(doc_ids) == 1:
+                log_message = f"Starting deletion process for document {doc_ids[0]}"
+            else:
+                log_message = f"Starting deletion process for {len(doc_ids)} documents"
             logger.info(log_message)
             pipeline_status["latest_message"] = log_message
             pipeline_status["history_messages"].append(log_message)
 
         try:
             # 1. Get the document status and related data
-            doc_status_data = await self.doc_status.get_by_id(doc_id)
-            file_path = doc_status_data.get("file_path") if doc_status_data else None
-            if not doc_status_data:
-                logger.warning(f"Document {doc_id} not found")
-                return DeletionResult(
-                    status="not_found",
-                    doc_id=doc_id,
-                    message=f"Document {doc_id} not found.",
-                    status_code=404,
-                    file_path="",
-                )
+            doc_status_list = await self.doc_status.get_by_ids(doc_ids)
+            found_doc_ids: list[str] = []
+            chunk_ids: set[str] = set()
+            for doc_id, doc_status_data in zip(doc_ids, doc_status_list):
+                if not doc_status_data:
+                    logger.warning(f"Document {doc_id} not found")
+                    results[doc_id] = DeletionResult(
+                        status="not_found",
+                        doc_id=doc_id,
+                        message=f"Document {doc_id} not found.",
+                        status_code=404,
+                        file_path="",
+                    )
+                    continue
 
-            # Check document status and log warning for non-completed documents
-            raw_status = doc_status_data.get("status")
-            try:
-                doc_status = DocStatus(raw_status)
-            except ValueError:
-                doc_status = raw_status
+                found_doc_ids.append(doc_id)
+                file_path = doc_status_data.get("file_path")
+                file_paths[doc_id] = file_path
 
-            if doc_status != DocStatus.PROCESSED:
-                if doc_status == DocStatus.PENDING:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: PENDING)"
-                    )
-                elif doc_status == DocStatus.PROCESSING:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: PROCESSING)"
-                    )
-                elif doc_status == DocStatus.PREPROCESSED:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: PREPROCESSED)"
-                    )
-                elif doc_status == DocStatus.FAILED:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: FAILED)"
-                    )
-                else:
+                # Check document status and log warning for non-completed documents
+                raw_status = doc_status_data.get("status")
+                try:
+                    doc_status = DocStatus(raw_status)
+                except ValueError:
+                    doc_status = raw_status
+
+                if doc_status != DocStatus.PROCESSED:
                     status_text = (
                         doc_status.value
                         if isinstance(doc_status, DocStatus)
@@ -3095,304 +3661,37 @@ class LightRAG:
                     warning_msg = (
                         f"Deleting {doc_id} {file_path}(previous status: {status_text})"
                     )
-                logger.info(warning_msg)
-                # Update pipeline status for monitoring
-                async with pipeline_status_lock:
-                    pipeline_status["latest_message"] = warning_msg
-                    pipeline_status["history_messages"].append(warning_msg)
+                    logger.info(warning_msg)
+                    # Update pipeline status for monitoring
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = warning_msg
+                        pipeline_status["history_messages"].append(warning_msg)
 
-            # 2. Get chunk IDs from document status
-            chunk_ids = set(doc_status_data.get("chunks_list", []))
+                # 2. Collect chunk IDs from document status
+                doc_chunk_ids = doc_status_data.get("chunks_list", [])
+                if not doc_chunk_ids:
+                    logger.warning(f"No chunks found for document {doc_id}")
+                chunk_ids.update(doc_chunk_ids)
 
-            if not chunk_ids:
-                logger.warning(f"No chunks found for document {doc_id}")
-                # Mark that deletion operations have started
-                deletion_operations_started = True
-                try:
-                    # Still need to delete the doc status and full doc
-                    await self.full_docs.delete([doc_id])
-                    await self.doc_status.delete([doc_id])
-                except Exception as e:
-                    logger.error(
-                        f"Failed to delete document {doc_id} with no chunks: {e}"
-                    )
-                    raise Exception(f"Failed to delete document entry: {e}") from e
-
-                async with pipeline_status_lock:
-                    log_message = (
-                        f"Document deleted without associated chunks: {doc_id}"
-                    )
-                    logger.info(log_message)
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
-
-                return DeletionResult(
-                    status="success",
-                    doc_id=doc_id,
-                    message=log_message,
-                    status_code=200,
-                    file_path=file_path,
-                )
+            if not found_doc_ids:
+                return [results[doc_id] for doc_id in doc_ids]
 
             # Mark that deletion operations have started
             deletion_operations_started = True
 
+            # 3. Collect LLM cache ids of all deleted chunks
             if delete_llm_cache and chunk_ids:
-                if not self.llm_response_cache:
-                    logger.info(
-                        "Skipping LLM cache collection for document %s because cache storage is unavailable",
-                        doc_id,
-                    )
-                elif not self.text_chunks:
-                    logger.info(
-                        "Skipping LLM cache collection for document %s because text chunk storage is unavailable",
-                        doc_id,
-                    )
-                else:
-                    try:
-                        chunk_data_list = await self.text_chunks.get_by_ids(
-                            list(chunk_ids)
-                        )
-                        seen_cache_ids: set[str] = set()
-                        for chunk_data in chunk_data_list:
-                            if not chunk_data or not isinstance(chunk_data, dict):
-                                continue
-                            cache_ids = chunk_data.get("llm_cache_list", [])
-                            if not isinstance(cache_ids, list):
-                                continue
-                            for cache_id in cache_ids:
-                                if (
-                                    isinstance(cache_id, str)
-                                    and cache_id
-                                    and cache_id not in seen_cache_ids
-                                ):
-                                    doc_llm_cache_ids.append(cache_id)
-                                    seen_cache_ids.add(cache_id)
-                        if doc_llm_cache_ids:
-                            logger.info(
-                                "Collected %d LLM cache entries for document %s",
-                                len(doc_llm_cache_ids),
-                                doc_id,
-                            )
-                        else:
-                            logger.info(
-                                "No LLM cache entries found for document %s", doc_id
-                            )
-                    except Exception as cache_collect_error:
-                        logger.error(
-                            "Failed to collect LLM cache ids for document %s: %s",
-                            doc_id,
-                            cache_collect_error,
-                        )
-                        raise Exception(
-                            f"Failed to collect LLM cache ids for document {doc_id}: {cache_collect_error}"
-                        ) from cache_collect_error
-
-            # 4. Analyze entities and relationships that will be affected
-            entities_to_delete = set()
-            entities_to_rebuild = {}  # entity_name -> remaining chunk id list
-            relationships_to_delete = set()
-            relationships_to_rebuild = {}  # (src, tgt) -> remaining chunk id list
-            entity_chunk_updates: dict[str, list[str]] = {}
-            relation_chunk_updates: dict[tuple[str, str], list[str]] = {}
-
-            try:
-                # Get affected entities and relations from full_entities and full_relations storage
-                doc_entities_data = await self.full_entities.get_by_id(doc_id)
-                doc_relations_data = await self.full_relations.get_by_id(doc_id)
-
-                affected_nodes = []
-                affected_edges = []
-
-                # Get entity data from graph storage using entity names from full_entities
-                if doc_entities_data and "entity_names" in doc_entities_data:
-                    entity_names = doc_entities_data["entity_names"]
-                    # get_nodes_batch returns dict[str, dict], need to convert to list[dict]
-                    nodes_dict = await self.chunk_entity_relation_graph.get_nodes_batch(
-                        entity_names
-                    )
-                    for entity_name in entity_names:
-                        node_data = nodes_dict.get(entity_name)
-                        if node_data:
-                            # Ensure compatibility with existing logic that expects "id" field
-                            if "id" not in node_data:
-                                node_data["id"] = entity_name
-                            affected_nodes.append(node_data)
-
-                # Get relation data from graph storage using relation pairs from full_relations
-                if doc_relations_data and "relation_pairs" in doc_relations_data:
-                    relation_pairs = doc_relations_data["relation_pairs"]
-                    edge_pairs_dicts = [
-                        {"src": pair[0], "tgt": pair[1]} for pair in relation_pairs
-                    ]
-                    # get_edges_batch returns dict[tuple[str, str], dict], need to convert to list[dict]
-                    edges_dict = await self.chunk_entity_relation_graph.get_edges_batch(
-                        edge_pairs_dicts
-                    )
-
-                    for pair in relation_pairs:
-                        src, tgt = pair[0], pair[1]
-                        edge_key = (src, tgt)
-                        edge_data = edges_dict.get(edge_key)
-                        if edge_data:
-                            # Ensure compatibility with existing logic that expects "source" and "target" fields
-                            if "source" not in edge_data:
-                                edge_data["source"] = src
-                            if "target" not in edge_data:
-                                edge_data["target"] = tgt
-                            affected_edges.append(edge_data)
-
-            except Exception as e:
-                logger.error(f"Failed to analyze affected graph elements: {e}")
-                raise Exception(f"Failed to analyze graph dependencies: {e}") from e
-
-            try:
-                # Process entities
-                for node_data in affected_nodes:
-                    node_label = node_data.get("entity_id")
-                    if not node_label:
-                        continue
-
-                    existing_sources: list[str] = []
-                    if self.entity_chunks:
-                        stored_chunks = await self.entity_chunks.get_by_id(node_label)
-                        if stored_chunks and isinstance(stored_chunks, dict):
-                            existing_sources = [
-                                chunk_id
-                                for chunk_id in stored_chunks.get("chunk_ids", [])
-                                if chunk_id
-                            ]
-
-                    if not existing_sources and node_data.get("source_id"):
-                        existing_sources = [
-                            chunk_id
-                            for chunk_id in node_data["source_id"].split(
-                                GRAPH_FIELD_SEP
-                            )
-                            if chunk_id
-                        ]
-
-                    if not existing_sources:
-                        # No chunk references means this entity should be deleted
-                        entities_to_delete.add(node_label)
-                        entity_chunk_updates[node_label] = []
-                        continue
-
-                    remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
-
-                    if not remaining_sources:
-                        entities_to_delete.add(node_label)
-                        entity_chunk_updates[node_label] = []
-                    elif remaining_sources != existing_sources:
-                        entities_to_rebuild[node_label] = remaining_sources
-                        entity_chunk_updates[node_label] = remaining_sources
-                    else:
-                        logger.info(f"Untouch entity: {node_label}")
-
-                async with pipeline_status_lock:
-                    log_message = f"Found {len(entities_to_rebuild)} affected entities"
-                    logger.info(log_message)
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
-
-                # Process relationships
-                for edge_data in affected_edges:
-                    # source target is not in normalize order in graph db property
-                    src = edge_data.get("source")
-                    tgt = edge_data.get("target")
-
-                    if not src or not tgt or "source_id" not in edge_data:
-                        continue
-
-                    edge_tuple = tuple(sorted((src, tgt)))
-                    if (
-                        edge_tuple in relationships_to_delete
-                        or edge_tuple in relationships_to_rebuild
-                    ):
-                        continue
-
-                    existing_sources: list[str] = []
-                    if self.relation_chunks:
-                        storage_key = make_relation_chunk_key(src, tgt)
-                        stored_chunks = await self.relation_chunks.get_by_id(
-                            storage_key
-                        )
-                        if stored_chunks and isinstance(stored_chunks, dict):
-                            existing_sources = [
-                                chunk_id
-                                for chunk_id in stored_chunks.get("chunk_ids", [])
-                                if chunk_id
-                            ]
-
-                    if not existing_sources:
-                        existing_sources = [
-                            chunk_id
-                            for chunk_id in edge_data["source_id"].split(
-                                GRAPH_FIELD_SEP
-                            )
-                            if chunk_id
-                        ]
-
-                    if not existing_sources:
-                        # No chunk references means this relationship should be deleted
-                        relationships_to_delete.add(edge_tuple)
-                        relation_chunk_updates[edge_tuple] = []
-                        continue
-
-                    remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
-
-                    if not remaining_sources:
-                        relationships_to_delete.add(edge_tuple)
-                        relation_chunk_updates[edge_tuple] = []
-                    elif remaining_sources != existing_sources:
-                        relationships_to_rebuild[edge_tuple] = remaining_sources
-                        relation_chunk_updates[edge_tuple] = remaining_sources
-                    else:
-                        logger.info(f"Untouch relation: {edge_tuple}")
-
-                async with pipeline_status_lock:
-                    log_message = (
-                        f"Found {len(relationships_to_rebuild)} affected relations"
-                    )
-                    logger.info(log_message)
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
-
-                current_time = int(time.time())
-
-                if entity_chunk_updates and self.entity_chunks:
-                    entity_upsert_payload = {}
-                    for entity_name, remaining in entity_chunk_updates.items():
-                        if not remaining:
-                            # Empty entities are deleted alongside graph nodes later
-                            continue
-                        entity_upsert_payload[entity_name] = {
-                            "chunk_ids": remaining,
-                            "count": len(remaining),
-                            "updated_at": current_time,
-                        }
-                    if entity_upsert_payload:
-                        await self.entity_chunks.upsert(entity_upsert_payload)
-
-                if relation_chunk_updates and self.relation_chunks:
-                    relation_upsert_payload = {}
-                    for edge_tuple, remaining in relation_chunk_updates.items():
-                        if not remaining:
-                            # Empty relations are deleted alongside graph edges later
-                            continue
-                        storage_key = make_relation_chunk_key(*edge_tuple)
-                        relation_upsert_payload[storage_key] = {
-                            "chunk_ids": remaining,
-                            "count": len(remaining),
-                            "updated_at": current_time,
-                        }
-
-                    if relation_upsert_payload:
-                        await self.relation_chunks.upsert(relation_upsert_payload)
-
-            except Exception as e:
-                logger.error(f"Failed to process graph analysis results: {e}")
-                raise Exception(f"Failed to process graph dependencies: {e}") from e
+                llm_cache_ids = await self._collect_llm_cache_ids(chunk_ids)
+
+            # 4. Analyze entities and relationships affected by all documents
+            (
+                entities_to_delete,
+                entities_to_rebuild,
+                relationships_to_delete,
+                relationships_to_rebuild,
+            ) = await self._analyze_deleted_chunks(
+                found_doc_ids, chunk_ids, pipeline_status, pipeline_status_lock
+            )
 
             # Data integrity is ensured by allowing only one process to hold pipeline at a time（no graph db lock is needed anymore)
 
@@ -3574,59 +3873,65 @@ class LightRAG:
 
             # 9. Delete from full_entities and full_relations storage
             try:
-                await self.full_entities.delete([doc_id])
-                await self.full_relations.delete([doc_id])
+                await self.full_entities.delete(found_doc_ids)
+                await self.full_relations.delete(found_doc_ids)
             except Exception as e:
                 logger.error(f"Failed to delete from full_entities/full_relations: {e}")
                 raise Exception(
                     f"Failed to delete from full_entities/full_relations: {e}"
                 ) from e
 
-            # 10. Delete original document and status
+            # 10. Delete original documents and status
             try:
-                await self.full_docs.delete([doc_id])
-                await self.doc_status.delete([doc_id])
+                await self.full_docs.delete(found_doc_ids)
+                await self.doc_status.delete(found_doc_ids)
             except Exception as e:
                 logger.error(f"Failed to delete document and status: {e}")
                 raise Exception(f"Failed to delete document and status: {e}") from e
 
-            if delete_llm_cache and doc_llm_cache_ids and self.llm_response_cache:
+            if len(found_doc_ids) == 1:
+                log_message = f"Document deleted: {found_doc_ids[0]}"
+            else:
+                log_message = f"{len(found_doc_ids)} documents deleted"
+
+            if delete_llm_cache and llm_cache_ids and self.llm_response_cache:
                 try:
-                    await self.llm_response_cache.delete(doc_llm_cache_ids)
-                    cache_log_message = f"Successfully deleted {len(doc_llm_cache_ids)} LLM cache entries for document {doc_id}"
-                    logger.info(cache_log_message)
+                    await self.llm_response_cache.delete(llm_cache_ids)
+                    log_message = f"Successfully deleted {len(llm_cache_ids)} LLM cache entries for {len(found_doc_ids)} document(s)"
+                    logger.info(log_message)
                     async with pipeline_status_lock:
-                        pipeline_status["latest_message"] = cache_log_message
-                        pipeline_status["history_messages"].append(cache_log_message)
-                    log_message = cache_log_message
+                        pipeline_status["latest_message"] = log_message
+                        pipeline_status["history_messages"].append(log_message)
                 except Exception as cache_delete_error:
-                    log_message = f"Failed to delete LLM cache for document {doc_id}: {cache_delete_error}"
+                    log_message = f"Failed to delete LLM cache for {len(found_doc_ids)} document(s): {cache_delete_error}"
                     logger.error(log_message)
                     logger.error(traceback.format_exc())
                     async with pipeline_status_lock:
                         pipeline_status["latest_message"] = log_message
                         pipeline_status["history_messages"].append(log_message)
 
-            return DeletionResult(
-                status="success",
-                doc_id=doc_id,
-                message=log_message,
-                status_code=200,
-                file_path=file_path,
-            )
+            for doc_id in found_doc_ids:
+                results[doc_id] = DeletionResult(
+                    status="success",
+                    doc_id=doc_id,
+                    message=log_message,
+                    status_code=200,
+                    file_path=file_paths[doc_id],
+                )
 
         except Exception as e:
             original_exception = e
-            error_message = f"Error while deleting document {doc_id}: {e}"
-            logger.error(error_message)
+            logger.error(f"Error while deleting documents {doc_ids}: {e}")
             logger.error(traceback.format_exc())
-            return DeletionResult(
-                status="fail",
-                doc_id=doc_id,
-                message=error_message,
-                status_code=500,
-                file_path=file_path,
-            )
+            for doc_id in doc_ids:
+                if doc_id not in results:
+                    results[doc_id] = DeletionResult(
+                        status="fail",
+                        doc_id=doc_id,
+                        message=f"Error while deleting document {doc_id}: {e}",
+                        status_code=500,
+                        file_path=file_paths.get(doc_id),
+                    )
 
         finally:
             # ALWAYS ensure persistence if any deletion operations were started
@@ -3634,24 +3939,24 @@ class LightRAG:
                 try:
                     await self._insert_done()
                 except Exception as persistence_error:
-                    persistence_error_msg = f"Failed to persist data after deletion attempt for {doc_id}: {persistence_error}"
+                    persistence_error_msg = f"Failed to persist data after deletion attempt for {len(doc_ids)} document(s): {persistence_error}"
                     logger.error(persistence_error_msg)
                     logger.error(traceback.format_exc())
 
                     # If there was no original exception, this persistence error becomes the main error
                     if original_exception is None:
-                        return DeletionResult(
-                            status="fail",
-                            doc_id=doc_id,
-                            message=f"Deletion completed but failed to persist changes: {persistence_error}",
-                            status_code=500,
-                            file_path=file_path,
-                        )
-                    # If there was an original exception, log the persistence error but don't override the original error
-                    # The original error result was already returned in the except block
+                        for doc_id, result in results.items():
+                            if result.status == "success":
+                                results[doc_id] = DeletionResult(
+                                    status="fail",
+                                    doc_id=doc_id,
+                                    message=f"Deletion completed but failed to persist changes: {persistence_error}",
+                                    status_code=500,
+                                    file_path=result.file_path,
+                                )
             else:
                 logger.debug(
-                    f"No deletion operations were started for document {doc_id}, skipping persistence"
+                    f"No deletion operations were started for documents {doc_ids}, skipping persistence"
                 )
 
             # Release pipeline only if WE acquired it
@@ -3659,13 +3964,299 @@ class LightRAG:
                 async with pipeline_status_lock:
                     pipeline_status["busy"] = False
                     pipeline_status["cancellation_requested"] = False
-                    completion_msg = (
-                        f"Deletion process completed for document: {doc_id}"
-                    )
+                    if len(doc_ids) == 1:
+                        completion_msg = (
+                            f"Deletion process completed for document: {doc_ids[0]}"
+                        )
+                    else:
+                        completion_msg = (
+                            f"Deletion process completed for {len(doc_ids)} documents"
+                        )
                     pipeline_status["latest_message"] = completion_msg
                     pipeline_status["history_messages"].append(completion_msg)
                     logger.info(completion_msg)
 
+        return [results[doc_id] for doc_id in doc_ids]
+
+    async def _collect_llm_cache_ids(self, chunk_ids: set[str]) -> list[str]:
+        """Return the distinct LLM cache ids referenced by the given chunks."""
+        if not self.llm_response_cache:
+            logger.info(
+                "Skipping LLM cache collection because cache storage is unavailable"
+            )
+            return []
+        if not self.text_chunks:
+            logger.info(
+                "Skipping LLM cache collection because text chunk storage is unavailable"
+            )
+            return []
+
+        llm_cache_ids: list[str] = []
+        try:
+            chunk_data_list = await self.text_chunks.get_by_ids(list(chunk_ids))
+            seen_cache_ids: set[str] = set()
+            for chunk_data in chunk_data_list:
+                if not chunk_data or not isinstance(chunk_data, dict):
+                    continue
+                cache_ids = chunk_data.get("llm_cache_list", [])
+                if not isinstance(cache_ids, list):
+                    continue
+                for cache_id in cache_ids:
+                    if (
+                        isinstance(cache_id, str)
+                        and cache_id
+                        and cache_id not in seen_cache_ids
+                    ):
+                        llm_cache_ids.append(cache_id)
+                        seen_cache_ids.add(cache_id)
+            logger.info(
+                "Collected %d LLM cache entries for %d deleted chunks",
+                len(llm_cache_ids),
+                len(chunk_ids),
+            )
+        except Exception as cache_collect_error:
+            logger.error("Failed to collect LLM cache ids: %s", cache_collect_error)
+            raise Exception(
+                f"Failed to collect LLM cache ids: {cache_collect_error}"
+            ) from cache_collect_error
+        return llm_cache_ids
+
+    async def _analyze_deleted_chunks(
+        self,
+        doc_ids: list[str],
+        chunk_ids: set[str],
+        pipeline_status: dict,
+        pipeline_status_lock,
+    ) -> tuple[
+        set[str],
+        dict[str, list[str]],
+        set[tuple[str, str]],
+        dict[tuple[str, str], list[str]],
+    ]:
+        """Classify the graph elements of deleted documents as deleted or rebuilt.
+
+        Affected entities and relations are unioned across `doc_ids` and their
+        chunk tracking is fetched with one get_by_ids call per storage. The
+        remaining chunk lists are written back to entity_chunks/relation_chunks.
+
+        Returns:
+            (entities_to_delete, entities_to_rebuild, relationships_to_delete,
+            relationships_to_rebuild); the rebuild dicts map to remaining chunk ids.
+        """
+        entities_to_delete = set()
+        entities_to_rebuild = {}  # entity_name -> remaining chunk id list
+        relationships_to_delete = set()
+        relationships_to_rebuild = {}  # (src, tgt) -> remaining chunk id list
+        entity_chunk_updates: dict[str, list[str]] = {}
+        relation_chunk_updates: dict[tuple[str, str], list[str]] = {}
+
+        try:
+            # Get affected entities and relations from full_entities and full_relations storage
+            doc_entities_list = await self.full_entities.get_by_ids(doc_ids)
+            doc_relations_list = await self.full_relations.get_by_ids(doc_ids)
+
+            entity_names: dict[str, None] = {}
+            for doc_entities_data in doc_entities_list:
+                if doc_entities_data and "entity_names" in doc_entities_data:
+                    entity_names.update(
+                        dict.fromkeys(doc_entities_data["entity_names"])
+                    )
+            relation_pairs: dict[tuple[str, str], None] = {}
+            for doc_relations_data in doc_relations_list:
+                if doc_relations_data and "relation_pairs" in doc_relations_data:
+                    relation_pairs.update(
+                        dict.fromkeys(
+                            (pair[0], pair[1])
+                            for pair in doc_relations_data["relation_pairs"]
+                        )
+                    )
+
+            affected_nodes = []
+            affected_edges = []
+
+            # Get entity data from graph storage using entity names from full_entities
+            if entity_names:
+                # get_nodes_batch returns dict[str, dict], need to convert to list[dict]
+                nodes_dict = await self.chunk_entity_relation_graph.get_nodes_batch(
+                    list(entity_names)
+                )
+                for entity_name in entity_names:
+                    node_data = nodes_dict.get(entity_name)
+                    if node_data:
+                        # Ensure compatibility with existing logic that expects "id" field
+                        if "id" not in node_data:
+                            node_data["id"] = entity_name
+                        affected_nodes.append(node_data)
+
+            # Get relation data from graph storage using relation pairs from full_relations
+            if relation_pairs:
+                edge_pairs_dicts = [
+                    {"src": src, "tgt": tgt} for src, tgt in relation_pairs
+                ]
+                # get_edges_batch returns dict[tuple[str, str], dict], need to convert to list[dict]
+                edges_dict = await self.chunk_entity_relation_graph.get_edges_batch(
+                    edge_pairs_dicts
+                )
+                for src, tgt in relation_pairs:
+                    edge_data = edges_dict.get((src, tgt))
+                    if edge_data:
+                        # Ensure compatibility with existing logic that expects "source" and "target" fields
+                        if "source" not in edge_data:
+                            edge_data["source"] = src
+                        if "target" not in edge_data:
+                            edge_data["target"] = tgt
+                        affected_edges.append(edge_data)
+
+        except Exception as e:
+            logger.error(f"Failed to analyze affected graph elements: {e}")
+            raise Exception(f"Failed to analyze graph dependencies: {e}") from e
+
+        def tracked_chunk_ids(stored_chunks) -> list[str]:
+            if not stored_chunks or not isinstance(stored_chunks, dict):
+                return []
+            return [
+                chunk_id for chunk_id in stored_chunks.get("chunk_ids", []) if chunk_id
+            ]
+
+        try:
+            # Process entities
+            affected_nodes = [node for node in affected_nodes if node.get("entity_id")]
+            stored_entity_chunks = [None] * len(affected_nodes)
+            if self.entity_chunks and affected_nodes:
+                stored_entity_chunks = await self.entity_chunks.get_by_ids(
+                    [node["entity_id"] for node in affected_nodes]
+                )
+
+            for node_data, stored_chunks in zip(affected_nodes, stored_entity_chunks):
+                node_label = node_data["entity_id"]
+                existing_sources = tracked_chunk_ids(stored_chunks)
+
+                if not existing_sources and node_data.get("source_id"):
+                    existing_sources = [
+                        chunk_id
+                        for chunk_id in node_data["source_id"].split(GRAPH_FIELD_SEP)
+                        if chunk_id
+                    ]
+
+                if not existing_sources:
+                    # No chunk references means this entity should be deleted
+                    entities_to_delete.add(node_label)
+                    entity_chunk_updates[node_label] = []
+                    continue
+
+                remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+
+                if not remaining_sources:
+                    entities_to_delete.add(node_label)
+                    entity_chunk_updates[node_label] = []
+                elif remaining_sources != existing_sources:
+                    entities_to_rebuild[node_label] = remaining_sources
+                    entity_chunk_updates[node_label] = remaining_sources
+                else:
+                    logger.info(f"Untouch entity: {node_label}")
+
+            async with pipeline_status_lock:
+                log_message = f"Found {len(entities_to_rebuild)} affected entities"
+                logger.info(log_message)
+                pipeline_status["latest_message"] = log_message
+                pipeline_status["history_messages"].append(log_message)
+
+            # Process relationships
+            unique_edges = {}
+            for edge_data in affected_edges:
+                # source target is not in normalize order in graph db property
+                src = edge_data.get("source")
+                tgt = edge_data.get("target")
+                if not src or not tgt or "source_id" not in edge_data:
+                    continue
+                unique_edges.setdefault(tuple(sorted((src, tgt))), edge_data)
+
+            stored_relation_chunks = [None] * len(unique_edges)
+            if self.relation_chunks and unique_edges:
+                stored_relation_chunks = await self.relation_chunks.get_by_ids(
+                    [make_relation_chunk_key(*edge) for edge in unique_edges]
+                )
+
+            for (edge_tuple, edge_data), stored_chunks in zip(
+                unique_edges.items(), stored_relation_chunks
+            ):
+                existing_sources = tracked_chunk_ids(stored_chunks)
+
+                if not existing_sources:
+                    existing_sources = [
+                        chunk_id
+                        for chunk_id in edge_data["source_id"].split(GRAPH_FIELD_SEP)
+                        if chunk_id
+                    ]
+
+                if not existing_sources:
+                    # No chunk references means this relationship should be deleted
+                    relationships_to_delete.add(edge_tuple)
+                    relation_chunk_updates[edge_tuple] = []
+                    continue
+
+                remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+
+                if not remaining_sources:
+                    relationships_to_delete.add(edge_tuple)
+                    relation_chunk_updates[edge_tuple] = []
+                elif remaining_sources != existing_sources:
+                    relationships_to_rebuild[edge_tuple] = remaining_sources
+                    relation_chunk_updates[edge_tuple] = remaining_sources
+                else:
+                    logger.info(f"Untouch relation: {edge_tuple}")
+
+            async with pipeline_status_lock:
+                log_message = (
+                    f"Found {len(relationships_to_rebuild)} affected relations"
+                )
+                logger.info(log_message)
+                pipeline_status["latest_message"] = log_message
+                pipeline_status["history_messages"].append(log_message)
+
+            current_time = int(time.time())
+
+            if entity_chunk_updates and self.entity_chunks:
+                entity_upsert_payload = {}
+                for entity_name, remaining in entity_chunk_updates.items():
+                    if not remaining:
+                        # Empty entities are deleted alongside graph nodes later
+                        continue
+                    entity_upsert_payload[entity_name] = {
+                        "chunk_ids": remaining,
+                        "count": len(remaining),
+                        "updated_at": current_time,
+                    }
+                if entity_upsert_payload:
+                    await self.entity_chunks.upsert(entity_upsert_payload)
+
+            if relation_chunk_updates and self.relation_chunks:
+                relation_upsert_payload = {}
+                for edge_tuple, remaining in relation_chunk_updates.items():
+                    if not remaining:
+                        # Empty relations are deleted alongside graph edges later
+                        continue
+                    storage_key = make_relation_chunk_key(*edge_tuple)
+                    relation_upsert_payload[storage_key] = {
+                        "chunk_ids": remaining,
+                        "count": len(remaining),
+                        "updated_at": current_time,
+                    }
+
+                if relation_upsert_payload:
+                    await self.relation_chunks.upsert(relation_upsert_payload)
+
+        except Exception as e:
+            logger.error(f"Failed to process graph analysis results: {e}")
+            raise Exception(f"Failed to process graph dependencies: {e}") from e
+
+        return (
+            entities_to_delete,
+            entities_to_rebuild,
+            relationships_to_delete,
+            relationships_to_rebuild,
+        )
+
     async def adelete_by_entity(self, entity_name: str) -> DeletionResult:
         """Asynchronously delete an entity and all its relationships.
 
@@ -3987,20 +4578,25 @@ class LightRAG:
     async def aexport_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "excel", "md", "txt", "jsonl", "parquet"] = "csv",
         include_vector_data: bool = False,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+        progress_callback: Callable[[str, int], None] | None = None,
     ) -> None:
         """
         Asynchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "excel", "md", "txt", "jsonl", "parquet".
                 - csv: Comma-separated values file
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
-                - table: Print formatted tables to console
+                - jsonl: One JSON object per row, with a "section" field
+                - parquet: One Parquet file, rows tagged with a "section" column
             include_vector_data: Whether to include data from the vector database.
+            batch_size: Nodes/edges fetched and rows written per batch.
+            progress_callback: Called as (section, rows_written) after every batch.
         """
         from lightrag.utils import aexport_data as utils_aexport_data
 
@@ -4011,25 +4607,32 @@ class LightRAG:
             output_path,
             file_format,
             include_vector_data,
+            batch_size=batch_size,
+            progress_callback=progress_callback,
         )
 
     def export_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "excel", "md", "txt", "jsonl", "parquet"] = "csv",
         include_vector_data: bool = False,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+        progress_callback: Callable[[str, int], None] | None = None,
     ) -> None:
         """
         Synchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "excel", "md", "txt", "jsonl", "parquet".
                 - csv: Comma-separated values file
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
-                - table: Print formatted tables to console
+                - jsonl: One JSON object per row, with a "section" field
+                - parquet: One Parquet file, rows tagged with a "section" column
             include_vector_data: Whether to include data from the vector database.
+            batch_size: Nodes/edges fetched and rows written per batch.
+            progress_callback: Called as (section, rows_written) after every batch.
         """
         try:
             loop = asyncio.get_event_loop()
@@ -4038,5 +4641,11 @@ class LightRAG:
             asyncio.set_event_loop(loop)
 
         loop.run_until_complete(
-            self.aexport_data(output_path, file_format, include_vector_data)
+            self.aexport_data(
+                output_path,
+                file_format,
+                include_vector_data,
+                batch_size=batch_size,
+                progress_callback=progress_callback,
+            )
         )
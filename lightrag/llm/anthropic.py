@@ -37,6 +37,7 @@ from lightrag.utils import (
     logger,
 )
 from lightrag.api import __api_version__
+from lightrag.rate_limit import record_rate_limit
 
 
 # Custom exception for retry mechanism
@@ -120,6 +121,8 @@ async def anthropic_complete_if_cache(
         raise
     except RateLimitError as e:
         logger.error(f"Anthropic API Rate Limit Error: {e}")
+        # Retried by tenacity; let the adaptive limiter see it anyway
+        record_rate_limit()
         raise
     except APITimeoutError as e:
         logger.error(f"Anthropic API Timeout Error: {e}")
@@ -22,6 +22,7 @@ from tenacity import (
     retry_if_exception_type,
 )
 
+from lightrag.rate_limit import record_token_usage, streamed_usage_reporter
 from lightrag.utils import (
     logger,
     remove_think_tags,
@@ -292,6 +293,8 @@ async def gemini_complete_if_cache(
         request_kwargs["config"] = config_obj
 
     if stream:
+        # The rate limiter settles the call once the stream reports its usage
+        report_usage = streamed_usage_reporter()
 
         async def _async_stream() -> AsyncIterator[str]:
             # COT state tracking for streaming
@@ -373,20 +376,19 @@ async def gemini_complete_if_cache(
                 raise exc
             finally:
                 # Track token usage after streaming completes
-                if token_tracker and usage_metadata:
-                    token_tracker.add_usage(
-                        {
-                            "prompt_tokens": getattr(
-                                usage_metadata, "prompt_token_count", 0
-                            ),
-                            "completion_tokens": getattr(
-                                usage_metadata, "candidates_token_count", 0
-                            ),
-                            "total_tokens": getattr(
-                                usage_metadata, "total_token_count", 0
-                            ),
-                        }
-                    )
+                if usage_metadata:
+                    token_counts = {
+                        "prompt_tokens": getattr(
+                            usage_metadata, "prompt_token_count", 0
+                        ),
+                        "completion_tokens": getattr(
+                            usage_metadata, "candidates_token_count", 0
+                        ),
+                        "total_tokens": getattr(usage_metadata, "total_token_count", 0),
+                    }
+                    await report_usage(token_counts["total_tokens"])
+                    if token_tracker:
+                        token_tracker.add_usage(token_counts)
 
         return _async_stream()
 
@@ -422,14 +424,16 @@ async def gemini_complete_if_cache(
     final_text = remove_think_tags(final_text)
 
     usage = getattr(response, "usage_metadata", None)
-    if token_tracker and usage:
-        token_tracker.add_usage(
-            {
-                "prompt_tokens": getattr(usage, "prompt_token_count", 0),
-                "completion_tokens": getattr(usage, "candidates_token_count", 0),
-                "total_tokens": getattr(usage, "total_token_count", 0),
-            }
-        )
+    if usage:
+        token_counts = {
+            "prompt_tokens": getattr(usage, "prompt_token_count", 0),
+            "completion_tokens": getattr(usage, "candidates_token_count", 0),
+            "total_tokens": getattr(usage, "total_token_count", 0),
+        }
+        # Corrects the rate limiter estimate, with or without a tracker
+        record_token_usage(token_counts["total_tokens"])
+        if token_tracker:
+            token_tracker.add_usage(token_counts)
 
     logger.debug("Gemini response length: %s", len(final_text))
     return final_text
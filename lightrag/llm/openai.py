@@ -30,6 +30,11 @@ from lightrag.utils import (
 
 from lightrag.types import GPTKeywordExtractionFormat
 from lightrag.api import __api_version__
+from lightrag.rate_limit import (
+    record_rate_limit,
+    record_token_usage,
+    streamed_usage_reporter,
+)
 
 import numpy as np
 import base64
@@ -344,6 +349,8 @@ async def openai_complete_if_cache(
         raise
     except RateLimitError as e:
         logger.error(f"OpenAI API Rate Limit Error: {e}")
+        # Retried by tenacity; let the adaptive limiter see it anyway
+        record_rate_limit()
         await openai_async_client.close()  # Ensure client is closed
         raise
     except Exception as e:
@@ -354,6 +361,8 @@ async def openai_complete_if_cache(
         raise
 
     if hasattr(response, "__aiter__"):
+        # The rate limiter settles the call once the stream reports its usage
+        report_usage = streamed_usage_reporter()
 
         async def inner():
             # Track if we've started iterating
@@ -446,7 +455,7 @@ async def openai_complete_if_cache(
                     cot_active = False
 
                 # After streaming is complete, track token usage
-                if token_tracker and final_chunk_usage:
+                if final_chunk_usage:
                     # Use actual usage from the API
                     token_counts = {
                         "prompt_tokens": getattr(final_chunk_usage, "prompt_tokens", 0),
@@ -455,7 +464,9 @@ async def openai_complete_if_cache(
                         ),
                         "total_tokens": getattr(final_chunk_usage, "total_tokens", 0),
                     }
-                    token_tracker.add_usage(token_counts)
+                    await report_usage(token_counts["total_tokens"])
+                    if token_tracker:
+                        token_tracker.add_usage(token_counts)
                     logger.debug(f"Streaming token usage (from API): {token_counts}")
                 elif token_tracker:
                     logger.debug("No usage information available in streaming response")
@@ -598,7 +609,7 @@ async def openai_complete_if_cache(
             if r"\u" in final_content:
                 final_content = safe_unicode_decode(final_content.encode("utf-8"))
 
-            if token_tracker and hasattr(response, "usage"):
+            if getattr(response, "usage", None):
                 token_counts = {
                     "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
                     "completion_tokens": getattr(
@@ -606,7 +617,10 @@ async def openai_complete_if_cache(
                     ),
                     "total_tokens": getattr(response.usage, "total_tokens", 0),
                 }
-                token_tracker.add_usage(token_counts)
+                # Corrects the rate limiter estimate, with or without a tracker
+                record_token_usage(token_counts["total_tokens"])
+                if token_tracker:
+                    token_tracker.add_usage(token_counts)
 
             logger.debug(f"Response content len: {len(final_content)}")
             verbose_debug(f"Response: {response}")
@@ -0,0 +1,330 @@
+"""
+In-process metrics for LightRAG, exposed in the Prometheus text format.
+
+The registry is dependency free and process local: each API worker process keeps
+its own counters, so a scrape reflects the worker that served it. Metric names
+follow the Prometheus conventions (`_seconds`, `_total`).
+
+Labels such as workspace and query mode are carried in a context variable set by
+`metrics_labels()`, so deep helpers (vector queries, rerank, cache lookups) record
+them without threading extra arguments through every call.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Sequence
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                )
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def get_count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def get_sum(self, **labels: str) -> float:
+        state = self._values.get(self._key(labels))
+        return state[1] if state else 0.0
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        bucket_names = self.labelnames + ("le",)
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(bucket_names, key + (_format_value(bound),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def clear(self) -> None:
+        """Reset all recorded values (metric definitions are kept)."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+QUERY_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "lightrag_query_stage_seconds",
+        "Time spent per query stage.",
+        ("workspace", "mode", "stage"),
+    )
+)
+INGEST_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "lightrag_ingest_stage_seconds",
+        "Time spent per document ingestion stage.",
+        ("workspace", "stage"),
+    )
+)
+QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "lightrag_queue_depth",
+        "Number of calls waiting in a priority-limited queue, per lane.",
+        ("queue", "lane"),
+    )
+)
+QUEUE_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "lightrag_queue_wait_seconds",
+        "Time a call waited in a priority-limited queue before a worker picked it up.",
+        ("queue", "lane"),
+    )
+)
+LLM_CONCURRENCY_LIMIT = REGISTRY.register(
+    Gauge(
+        "lightrag_llm_concurrency_limit",
+        "Current adaptive limit of calls in flight for a priority-limited queue.",
+        ("queue",),
+    )
+)
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "lightrag_rate_limit_wait_seconds",
+        "Time a call waited for the requests/tokens per minute budget.",
+        ("limiter",),
+    )
+)
+CACHE_REQUESTS_TOTAL = REGISTRY.register(
+    Counter(
+        "lightrag_cache_requests_total",
+        "Cache lookups by cache and result (hit or miss).",
+        ("workspace", "cache", "result"),
+    )
+)
+LLM_TOKENS_TOTAL = REGISTRY.register(
+    Counter(
+        "lightrag_llm_tokens_total",
+        "LLM tokens reported to TokenTracker.",
+        ("workspace", "type"),
+    )
+)
+
+_current_labels: ContextVar[dict[str, str]] = ContextVar(
+    "lightrag_metrics_labels", default={}
+)
+
+
+@contextmanager
+def metrics_labels(**labels: str) -> Iterator[None]:
+    """Set default metric labels (e.g. workspace, mode) for the enclosed code."""
+    token = _current_labels.set({**_current_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _current_labels.reset(token)
+
+
+def current_labels() -> dict[str, str]:
+    return _current_labels.get()
+
+
+def observe_query_stage(stage: str, seconds: float) -> None:
+    labels = _current_labels.get()
+    QUERY_STAGE_SECONDS.observe(
+        seconds,
+        workspace=labels.get("workspace", ""),
+        mode=labels.get("mode", ""),
+        stage=stage,
+    )
+
+
+@contextmanager
+def time_query_stage(stage: str) -> Iterator[None]:
+    """Record the duration of a query stage under the current workspace/mode."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_query_stage(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def time_ingest_stage(stage: str, workspace: str | None = None) -> Iterator[None]:
+    """Record the duration of an ingestion stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if workspace is None:
+            workspace = _current_labels.get().get("workspace", "")
+        INGEST_STAGE_SECONDS.observe(
+            time.perf_counter() - start, workspace=workspace, stage=stage
+        )
+
+
+def record_cache_lookup(
+    cache: str, hit: bool, workspace: str | None = None, count: int = 1
+) -> None:
+    if count <= 0:
+        return
+    if workspace is None:
+        workspace = _current_labels.get().get("workspace", "")
+    CACHE_REQUESTS_TOTAL.inc(
+        count, workspace=workspace, cache=cache, result="hit" if hit else "miss"
+    )
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+    return REGISTRY.render()
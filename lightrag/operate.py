@@ -7,6 +7,7 @@ import json
 import json_repair
 from typing import Any, AsyncIterator, overload, Literal
 from collections import Counter, defaultdict
+from contextlib import asynccontextmanager, nullcontext
 
 from lightrag.exceptions import (
     PipelineCancelledException,
@@ -64,8 +65,12 @@ from lightrag.constants import (
     DEFAULT_FILE_PATH_MORE_PLACEHOLDER,
     DEFAULT_MAX_FILE_PATHS,
     DEFAULT_ENTITY_NAME_MAX_LENGTH,
+    DEFAULT_PARSE_MAX_WORKERS,
+    DEFAULT_REBUILD_BATCH_SIZE,
 )
+from lightrag.extraction_parser import ExtractionItem, aparse_extraction_results
 from lightrag.kg.shared_storage import get_storage_keyed_lock
+from lightrag.metrics import observe_query_stage, time_query_stage
 import time
 from dotenv import load_dotenv
 
@@ -550,6 +555,11 @@ async def rebuild_knowledge_from_chunks(
     following the same approach as the insert process. Now with parallel processing
     controlled by llm_model_max_async and using get_storage_keyed_lock for data consistency.
 
+    Cached extraction results are read in pages of `rebuild_batch_size` chunks and
+    parsed in the extraction parser pool when `parse_max_workers` > 0. Only the
+    records of entities and relationships being rebuilt are kept, and graph,
+    vector and chunk-tracking writes are buffered and flushed in batches.
+
     Args:
         entities_to_rebuild: Dict mapping entity_name -> list of remaining chunk_ids
         relationships_to_rebuild: Dict mapping (src, tgt) -> list of remaining chunk_ids
@@ -581,104 +591,87 @@ async def rebuild_knowledge_from_chunks(
             pipeline_status["latest_message"] = status_message
             pipeline_status["history_messages"].append(status_message)
 
-    # Get cached extraction results for these chunks using storage
-    # cached_results： chunk_id -> [list of (extraction_result, create_time) from LLM cache sorted by create_time of the first extraction_result]
-    cached_results = await _get_cached_extraction_results(
-        llm_response_cache,
-        all_referenced_chunk_ids,
-        text_chunks_storage=text_chunks_storage,
+    batch_size = global_config.get("rebuild_batch_size") or DEFAULT_REBUILD_BATCH_SIZE
+    parse_max_workers = global_config.get(
+        "parse_max_workers", DEFAULT_PARSE_MAX_WORKERS
     )
 
-    if not cached_results:
-        status_message = "No cached extraction results found, cannot rebuild"
-        logger.warning(status_message)
-        if pipeline_status is not None and pipeline_status_lock is not None:
-            async with pipeline_status_lock:
-                pipeline_status["latest_message"] = status_message
-                pipeline_status["history_messages"].append(status_message)
-        return
+    # Records of entities and relationships that are not rebuilt are dropped
+    # right after parsing, so memory is bounded by the rebuild set
+    wanted_entities = set(entities_to_rebuild)
+    wanted_relationships = set(relationships_to_rebuild)
+    wanted_relationships.update((tgt, src) for src, tgt in relationships_to_rebuild)
 
-    # Process cached results to get entities and relationships for each chunk
     chunk_entities = {}  # chunk_id -> {entity_name: [entity_data]}
     chunk_relationships = {}  # chunk_id -> {(src, tgt): [relationship_data]}
+    cached_chunk_count = 0
 
-    for chunk_id, results in cached_results.items():
-        try:
-            # Handle multiple extraction results per chunk
-            chunk_entities[chunk_id] = defaultdict(list)
-            chunk_relationships[chunk_id] = defaultdict(list)
+    # Each page: [(chunk_id, file_path, [(extraction_result, create_time), ...])]
+    async for page in _iter_cached_extraction_results(
+        llm_response_cache,
+        all_referenced_chunk_ids,
+        text_chunks_storage=text_chunks_storage,
+        page_size=batch_size,
+    ):
+        items = [
+            ExtractionItem(extraction_result, chunk_id, create_time, file_path)
+            for chunk_id, file_path, results in page
+            for extraction_result, create_time in results
+        ]
+        parsed_results = iter(
+            await aparse_extraction_results(items, max_workers=parse_max_workers)
+        )
+
+        for chunk_id, _, results in page:
+            cached_chunk_count += 1
+            entities_by_name = {}
+            relationships_by_key = {}
 
             # process multiple LLM extraction results for a single chunk_id
-            for result in results:
-                entities, relationships = await _rebuild_from_extraction_result(
-                    text_chunks_storage=text_chunks_storage,
-                    chunk_id=chunk_id,
-                    extraction_result=result[0],
-                    timestamp=result[1],
-                )
+            for _ in results:
+                parsed = next(parsed_results)
+                if isinstance(parsed, Exception):
+                    status_message = f"Failed to parse cached extraction result for chunk {chunk_id}: {parsed}"
+                    logger.info(status_message)  # Per requirement, change to info
+                    if pipeline_status is not None and pipeline_status_lock is not None:
+                        async with pipeline_status_lock:
+                            pipeline_status["latest_message"] = status_message
+                            pipeline_status["history_messages"].append(status_message)
+                    continue
 
-                # Merge entities and relationships from this extraction result
-                # Compare description lengths and keep the better version for the same chunk_id
-                for entity_name, entity_list in entities.items():
-                    if entity_name not in chunk_entities[chunk_id]:
-                        # New entity for this chunk_id
-                        chunk_entities[chunk_id][entity_name].extend(entity_list)
-                    elif len(chunk_entities[chunk_id][entity_name]) == 0:
-                        # Empty list, add the new entities
-                        chunk_entities[chunk_id][entity_name].extend(entity_list)
-                    else:
-                        # Compare description lengths and keep the better one
-                        existing_desc_len = len(
-                            chunk_entities[chunk_id][entity_name][0].get(
-                                "description", ""
-                            )
-                            or ""
-                        )
-                        new_desc_len = len(entity_list[0].get("description", "") or "")
-
-                        if new_desc_len > existing_desc_len:
-                            # Replace with the new entity that has longer description
-                            chunk_entities[chunk_id][entity_name] = list(entity_list)
-                        # Otherwise keep existing version
-
-                # Compare description lengths and keep the better version for the same chunk_id
-                for rel_key, rel_list in relationships.items():
-                    if rel_key not in chunk_relationships[chunk_id]:
-                        # New relationship for this chunk_id
-                        chunk_relationships[chunk_id][rel_key].extend(rel_list)
-                    elif len(chunk_relationships[chunk_id][rel_key]) == 0:
-                        # Empty list, add the new relationships
-                        chunk_relationships[chunk_id][rel_key].extend(rel_list)
-                    else:
-                        # Compare description lengths and keep the better one
-                        existing_desc_len = len(
-                            chunk_relationships[chunk_id][rel_key][0].get(
-                                "description", ""
-                            )
-                            or ""
-                        )
-                        new_desc_len = len(rel_list[0].get("description", "") or "")
+                entities, relationships = parsed
+                _keep_longer_descriptions(entities_by_name, entities, wanted_entities)
+                _keep_longer_descriptions(
+                    relationships_by_key, relationships, wanted_relationships
+                )
 
-                        if new_desc_len > existing_desc_len:
-                            # Replace with the new relationship that has longer description
-                            chunk_relationships[chunk_id][rel_key] = list(rel_list)
-                        # Otherwise keep existing version
+            if entities_by_name:
+                chunk_entities[chunk_id] = entities_by_name
+            if relationships_by_key:
+                chunk_relationships[chunk_id] = relationships_by_key
 
-        except Exception as e:
-            status_message = (
-                f"Failed to parse cached extraction result for chunk {chunk_id}: {e}"
-            )
-            logger.info(status_message)  # Per requirement, change to info
-            if pipeline_status is not None and pipeline_status_lock is not None:
-                async with pipeline_status_lock:
-                    pipeline_status["latest_message"] = status_message
-                    pipeline_status["history_messages"].append(status_message)
-            continue
+    if not cached_chunk_count:
+        status_message = "No cached extraction results found, cannot rebuild"
+        logger.warning(status_message)
+        if pipeline_status is not None and pipeline_status_lock is not None:
+            async with pipeline_status_lock:
+                pipeline_status["latest_message"] = status_message
+                pipeline_status["history_messages"].append(status_message)
+        return
 
     # Get max async tasks limit from global_config for semaphore control
     graph_max_async = global_config.get("llm_model_max_async", 4) * 2
     semaphore = asyncio.Semaphore(graph_max_async)
 
+    write_buffer = _RebuildWriteBuffer(
+        knowledge_graph_inst=knowledge_graph_inst,
+        entities_vdb=entities_vdb,
+        relationships_vdb=relationships_vdb,
+        entity_chunks_storage=entity_chunks_storage,
+        relation_chunks_storage=relation_chunks_storage,
+        batch_size=batch_size,
+    )
+
     # Counters for tracking progress
     rebuilt_entities_count = 0
     rebuilt_relationships_count = 0
@@ -696,13 +689,12 @@ async def rebuild_knowledge_from_chunks(
                 try:
                     await _rebuild_single_entity(
                         knowledge_graph_inst=knowledge_graph_inst,
-                        entities_vdb=entities_vdb,
+                        write_buffer=write_buffer,
                         entity_name=entity_name,
                         chunk_ids=chunk_ids,
                         chunk_entities=chunk_entities,
                         llm_response_cache=llm_response_cache,
                         global_config=global_config,
-                        entity_chunks_storage=entity_chunks_storage,
                     )
                     rebuilt_entities_count += 1
                 except Exception as e:
@@ -713,6 +705,8 @@ async def rebuild_knowledge_from_chunks(
                         async with pipeline_status_lock:
                             pipeline_status["latest_message"] = status_message
                             pipeline_status["history_messages"].append(status_message)
+        # Storage failures while flushing abort the whole rebuild
+        await write_buffer.flush_if_full()
 
     async def _locked_rebuild_relationship(src, tgt, chunk_ids):
         nonlocal rebuilt_relationships_count, failed_relationships_count
@@ -729,16 +723,13 @@ async def rebuild_knowledge_from_chunks(
                 try:
                     await _rebuild_single_relationship(
                         knowledge_graph_inst=knowledge_graph_inst,
-                        relationships_vdb=relationships_vdb,
-                        entities_vdb=entities_vdb,
+                        write_buffer=write_buffer,
                         src=src,
                         tgt=tgt,
                         chunk_ids=chunk_ids,
                         chunk_relationships=chunk_relationships,
                         llm_response_cache=llm_response_cache,
                         global_config=global_config,
-                        relation_chunks_storage=relation_chunks_storage,
-                        entity_chunks_storage=entity_chunks_storage,
                         pipeline_status=pipeline_status,
                         pipeline_status_lock=pipeline_status_lock,
                     )
@@ -751,6 +742,7 @@ async def rebuild_knowledge_from_chunks(
                         async with pipeline_status_lock:
                             pipeline_status["latest_message"] = status_message
                             pipeline_status["history_messages"].append(status_message)
+        await write_buffer.flush_if_full()
 
     # Create tasks for parallel processing
     tasks = []
@@ -805,6 +797,9 @@ async def rebuild_knowledge_from_chunks(
         # Re-raise the first exception to notify the caller
         raise first_exception
 
+    # Write what is left in the buffer
+    await write_buffer.flush()
+
     # Final status report
     status_message = f"KG rebuild completed: {rebuilt_entities_count} entities and {rebuilt_relationships_count} relationships rebuilt successfully."
     if failed_entities_count > 0 or failed_relationships_count > 0:
@@ -817,94 +812,201 @@ async def rebuild_knowledge_from_chunks(
             pipeline_status["history_messages"].append(status_message)
 
 
-async def _get_cached_extraction_results(
+async def _iter_cached_extraction_results(
     llm_response_cache: BaseKVStorage,
     chunk_ids: set[str],
     text_chunks_storage: BaseKVStorage,
-) -> dict[str, list[str]]:
-    """Get cached extraction results for specific chunk IDs
+    page_size: int = DEFAULT_REBUILD_BATCH_SIZE,
+) -> AsyncIterator[list[tuple[str, str, list[tuple[str, int]]]]]:
+    """Page through cached extraction results for specific chunk IDs
 
-    This function retrieves cached LLM extraction results for the given chunk IDs and returns
-    them sorted by creation time. The results are sorted at two levels:
-    1. Individual extraction results within each chunk are sorted by create_time (earliest first)
-    2. Chunks themselves are sorted by the create_time of their earliest extraction result
+    Chunks are read `page_size` at a time together with the LLM cache entries
+    they reference, so only one page of raw extraction output is held in memory.
+    All cache entries of a chunk are returned in the same page.
 
     Args:
         llm_response_cache: LLM response cache storage
         chunk_ids: Set of chunk IDs to get cached results for
         text_chunks_storage: Text chunks storage for retrieving chunk data and LLM cache references
+        page_size: Number of chunks read per page
 
-    Returns:
-        Dict mapping chunk_id -> list of extraction_result_text, where:
-        - Keys (chunk_ids) are ordered by the create_time of their first extraction result
-        - Values (extraction results) are ordered by create_time within each chunk
+    Yields:
+        Lists of (chunk_id, file_path, results) for the chunks of a page that have
+        cached results, where results is a list of (extraction_result, create_time)
+        ordered by create_time
     """
-    cached_results = {}
-
-    # Collect all LLM cache IDs from chunks
-    all_cache_ids = set()
-
-    # Read from storage
-    chunk_data_list = await text_chunks_storage.get_by_ids(list(chunk_ids))
-    for chunk_data in chunk_data_list:
-        if chunk_data and isinstance(chunk_data, dict):
-            llm_cache_list = chunk_data.get("llm_cache_list", [])
-            if llm_cache_list:
-                all_cache_ids.update(llm_cache_list)
-        else:
-            logger.warning(f"Chunk data is invalid or None: {chunk_data}")
+    chunk_ids = list(chunk_ids)
+    valid_entries = 0
+    chunks_with_results = 0
+
+    for start in range(0, len(chunk_ids), page_size):
+        page_chunk_ids = chunk_ids[start : start + page_size]
+
+        # Collect LLM cache IDs and file paths from the chunks of this page
+        page_cache_ids = set()
+        file_paths = {}
+        chunk_data_list = await text_chunks_storage.get_by_ids(page_chunk_ids)
+        for chunk_id, chunk_data in zip(page_chunk_ids, chunk_data_list):
+            if chunk_data and isinstance(chunk_data, dict):
+                file_paths[chunk_id] = chunk_data.get("file_path", "unknown_source")
+                llm_cache_list = chunk_data.get("llm_cache_list", [])
+                if llm_cache_list:
+                    page_cache_ids.update(llm_cache_list)
+            else:
+                logger.warning(f"Chunk data is invalid or None: {chunk_id}")
 
-    if not all_cache_ids:
-        logger.warning(f"No LLM cache IDs found for {len(chunk_ids)} chunk IDs")
-        return cached_results
+        if not page_cache_ids:
+            continue
 
-    # Batch get LLM cache entries
-    cache_data_list = await llm_response_cache.get_by_ids(list(all_cache_ids))
+        # Batch get LLM cache entries and group them by chunk_id
+        page_chunk_set = set(page_chunk_ids)
+        cached_results: dict[str, list[tuple[str, int]]] = {}
+        cache_data_list = await llm_response_cache.get_by_ids(list(page_cache_ids))
+        for cache_entry in cache_data_list:
+            if (
+                cache_entry is not None
+                and isinstance(cache_entry, dict)
+                and cache_entry.get("cache_type") == "extract"
+                and cache_entry.get("chunk_id") in page_chunk_set
+            ):
+                # Support multiple LLM caches per chunk
+                cached_results.setdefault(cache_entry["chunk_id"], []).append(
+                    (cache_entry["return"], cache_entry.get("create_time", 0))
+                )
+                valid_entries += 1
 
-    # Process cache entries and group by chunk_id
-    valid_entries = 0
-    for cache_entry in cache_data_list:
-        if (
-            cache_entry is not None
-            and isinstance(cache_entry, dict)
-            and cache_entry.get("cache_type") == "extract"
-            and cache_entry.get("chunk_id") in chunk_ids
-        ):
-            chunk_id = cache_entry["chunk_id"]
-            extraction_result = cache_entry["return"]
-            create_time = cache_entry.get(
-                "create_time", 0
-            )  # Get creation time, default to 0
-            valid_entries += 1
-
-            # Support multiple LLM caches per chunk
-            if chunk_id not in cached_results:
-                cached_results[chunk_id] = []
-            # Store tuple with extraction result and creation time for sorting
-            cached_results[chunk_id].append((extraction_result, create_time))
-
-    # Sort extraction results by create_time for each chunk and collect earliest times
-    chunk_earliest_times = {}
-    for chunk_id in cached_results:
-        # Sort by create_time (x[1]), then extract only extraction_result (x[0])
-        cached_results[chunk_id].sort(key=lambda x: x[1])
-        # Store the earliest create_time for this chunk (first item after sorting)
-        chunk_earliest_times[chunk_id] = cached_results[chunk_id][0][1]
-
-    # Sort cached_results by the earliest create_time of each chunk
-    sorted_chunk_ids = sorted(
-        chunk_earliest_times.keys(), key=lambda chunk_id: chunk_earliest_times[chunk_id]
-    )
+        if not cached_results:
+            continue
 
-    # Rebuild cached_results in sorted order
-    sorted_cached_results = {}
-    for chunk_id in sorted_chunk_ids:
-        sorted_cached_results[chunk_id] = cached_results[chunk_id]
+        page = []
+        for chunk_id, results in cached_results.items():
+            # Sort extraction results of a chunk by create_time
+            results.sort(key=lambda x: x[1])
+            page.append((chunk_id, file_paths.get(chunk_id, "unknown_source"), results))
+        chunks_with_results += len(page)
+        yield page
 
-    logger.info(
-        f"Found {valid_entries} valid cache entries, {len(sorted_cached_results)} chunks with results"
-    )
-    return sorted_cached_results  # each item: list(extraction_result, create_time)
+    if not valid_entries:
+        logger.warning(f"No LLM cache entries found for {len(chunk_ids)} chunk IDs")
+    else:
+        logger.info(
+            f"Found {valid_entries} valid cache entries, {chunks_with_results} chunks with results"
+        )
+
+
+def _keep_longer_descriptions(
+    merged: dict[Any, list[dict]],
+    records: dict[Any, list[dict]],
+    wanted_keys: set | None = None,
+) -> None:
+    """Merge parsed records of one chunk, keeping the longer description per key"""
+    for key, record_list in records.items():
+        if (wanted_keys is not None and key not in wanted_keys) or not record_list:
+            continue
+        existing = merged.get(key)
+        if not existing:
+            merged[key] = list(record_list)
+            continue
+
+        # Compare description lengths and keep the better one
+        existing_desc_len = len(existing[0].get("description", "") or "")
+        new_desc_len = len(record_list[0].get("description", "") or "")
+        if new_desc_len > existing_desc_len:
+            merged[key] = list(record_list)
+
+
+class _RebuildWriteBuffer:
+    """Collects the storage writes of a knowledge rebuild and flushes them in batches
+
+    Graph nodes are written before edges, stale relationship vectors are deleted
+    before new ones are upserted, and each storage gets one call per flush.
+    """
+
+    def __init__(
+        self,
+        knowledge_graph_inst: BaseGraphStorage,
+        entities_vdb: BaseVectorStorage,
+        relationships_vdb: BaseVectorStorage,
+        entity_chunks_storage: BaseKVStorage | None = None,
+        relation_chunks_storage: BaseKVStorage | None = None,
+        batch_size: int = DEFAULT_REBUILD_BATCH_SIZE,
+    ):
+        self.knowledge_graph_inst = knowledge_graph_inst
+        self.entities_vdb = entities_vdb
+        self.relationships_vdb = relationships_vdb
+        self.entity_chunks_storage = entity_chunks_storage
+        self.relation_chunks_storage = relation_chunks_storage
+        self.batch_size = batch_size
+        self._flush_lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.nodes: dict[str, dict] = {}
+        self.edges: dict[tuple[str, str], dict] = {}
+        self.entity_vectors: dict[str, dict] = {}
+        self.relation_vectors: dict[str, dict] = {}
+        self.relation_vector_deletes: set[str] = set()
+        self.entity_chunks: dict[str, dict] = {}
+        self.relation_chunks: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes) + len(self.edges)
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    async def flush_if_full(self) -> None:
+        if len(self) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            nodes, edges = self.nodes, self.edges
+            entity_vectors, relation_vectors = (
+                self.entity_vectors,
+                self.relation_vectors,
+            )
+            relation_vector_deletes = self.relation_vector_deletes
+            entity_chunks, relation_chunks = self.entity_chunks, self.relation_chunks
+            self._reset()
+
+            if entity_chunks and self.entity_chunks_storage is not None:
+                await self.entity_chunks_storage.upsert(entity_chunks)
+            if relation_chunks and self.relation_chunks_storage is not None:
+                await self.relation_chunks_storage.upsert(relation_chunks)
+
+            # Endpoints must exist before edges on some graph backends
+            if nodes:
+                await self.knowledge_graph_inst.upsert_nodes_batch(nodes)
+            if edges:
+                await self.knowledge_graph_inst.upsert_edges_batch(
+                    [(src, tgt, data) for (src, tgt), data in edges.items()]
+                )
+
+            # Use safe operation wrapper - VDB failure must throw exception
+            if entity_vectors and self.entities_vdb is not None:
+                await safe_vdb_operation_with_exception(
+                    operation=lambda: self.entities_vdb.upsert(entity_vectors),
+                    operation_name="rebuild_entity_upsert",
+                    entity_name=f"{len(entity_vectors)} entities",
+                    max_retries=3,
+                    retry_delay=0.1,
+                )
+            if relation_vector_deletes:
+                try:
+                    await self.relationships_vdb.delete(list(relation_vector_deletes))
+                except Exception as e:
+                    logger.debug(
+                        f"Could not delete {len(relation_vector_deletes)} old relationship vector records: {e}"
+                    )
+            if relation_vectors:
+                await safe_vdb_operation_with_exception(
+                    operation=lambda: self.relationships_vdb.upsert(relation_vectors),
+                    operation_name="rebuild_relationship_upsert",
+                    entity_name=f"{len(relation_vectors)} relationships",
+                    max_retries=3,
+                    retry_delay=0.2,
+                )
 
 
 async def _process_extraction_result(
@@ -1032,125 +1134,66 @@ async def _process_extraction_result(
     return dict(maybe_nodes), dict(maybe_edges)
 
 
-async def _rebuild_from_extraction_result(
-    text_chunks_storage: BaseKVStorage,
-    extraction_result: str,
-    chunk_id: str,
-    timestamp: int,
-) -> tuple[dict, dict]:
-    """Parse cached extraction result using the same logic as extract_entities
-
-    Args:
-        text_chunks_storage: Text chunks storage to get chunk data
-        extraction_result: The cached LLM extraction result
-        chunk_id: The chunk ID for source tracking
-
-    Returns:
-        Tuple of (entities_dict, relationships_dict)
-    """
-
-    # Get chunk data for file_path from storage
-    chunk_data = await text_chunks_storage.get_by_id(chunk_id)
-    file_path = (
-        chunk_data.get("file_path", "unknown_source")
-        if chunk_data
-        else "unknown_source"
-    )
-
-    # Call the shared processing function
-    return await _process_extraction_result(
-        extraction_result,
-        chunk_id,
-        timestamp,
-        file_path,
-        tuple_delimiter=PROMPTS["DEFAULT_TUPLE_DELIMITER"],
-        completion_delimiter=PROMPTS["DEFAULT_COMPLETION_DELIMITER"],
-    )
-
-
 async def _rebuild_single_entity(
     knowledge_graph_inst: BaseGraphStorage,
-    entities_vdb: BaseVectorStorage,
+    write_buffer: _RebuildWriteBuffer,
     entity_name: str,
     chunk_ids: list[str],
     chunk_entities: dict,
     llm_response_cache: BaseKVStorage,
     global_config: dict[str, str],
-    entity_chunks_storage: BaseKVStorage | None = None,
     pipeline_status: dict | None = None,
     pipeline_status_lock=None,
 ) -> None:
-    """Rebuild a single entity from cached extraction results"""
+    """Rebuild a single entity from cached extraction results
+
+    Storage writes are queued in `write_buffer` and flushed by the caller.
+    """
 
     # Get current entity data
     current_entity = await knowledge_graph_inst.get_node(entity_name)
     if not current_entity:
         return
 
-    # Helper function to update entity in both graph and vector storage
-    async def _update_entity_storage(
+    # Helper function to queue the entity for both graph and vector storage
+    def _update_entity_storage(
         final_description: str,
         entity_type: str,
         file_paths: list[str],
         source_chunk_ids: list[str],
         truncation_info: str = "",
     ):
-        try:
-            # Update entity in graph storage (critical path)
-            updated_entity_data = {
-                **current_entity,
-                "description": final_description,
-                "entity_type": entity_type,
-                "source_id": GRAPH_FIELD_SEP.join(source_chunk_ids),
-                "file_path": GRAPH_FIELD_SEP.join(file_paths)
-                if file_paths
-                else current_entity.get("file_path", "unknown_source"),
-                "created_at": int(time.time()),
-                "truncate": truncation_info,
-            }
-            await knowledge_graph_inst.upsert_node(entity_name, updated_entity_data)
-
-            # Update entity in vector database (equally critical)
-            entity_vdb_id = compute_mdhash_id(entity_name, prefix="ent-")
-            entity_content = f"{entity_name}\n{final_description}"
-
-            vdb_data = {
-                entity_vdb_id: {
-                    "content": entity_content,
-                    "entity_name": entity_name,
-                    "source_id": updated_entity_data["source_id"],
-                    "description": final_description,
-                    "entity_type": entity_type,
-                    "file_path": updated_entity_data["file_path"],
-                }
-            }
-
-            # Use safe operation wrapper - VDB failure must throw exception
-            await safe_vdb_operation_with_exception(
-                operation=lambda: entities_vdb.upsert(vdb_data),
-                operation_name="rebuild_entity_upsert",
-                entity_name=entity_name,
-                max_retries=3,
-                retry_delay=0.1,
-            )
-
-        except Exception as e:
-            error_msg = f"Failed to update entity storage for `{entity_name}`: {e}"
-            logger.error(error_msg)
-            raise  # Re-raise exception
+        updated_entity_data = {
+            **current_entity,
+            "description": final_description,
+            "entity_type": entity_type,
+            "source_id": GRAPH_FIELD_SEP.join(source_chunk_ids),
+            "file_path": GRAPH_FIELD_SEP.join(file_paths)
+            if file_paths
+            else current_entity.get("file_path", "unknown_source"),
+            "created_at": int(time.time()),
+            "truncate": truncation_info,
+        }
+        write_buffer.nodes[entity_name] = updated_entity_data
+
+        entity_vdb_id = compute_mdhash_id(entity_name, prefix="ent-")
+        write_buffer.entity_vectors[entity_vdb_id] = {
+            "content": f"{entity_name}\n{final_description}",
+            "entity_name": entity_name,
+            "source_id": updated_entity_data["source_id"],
+            "description": final_description,
+            "entity_type": entity_type,
+            "file_path": updated_entity_data["file_path"],
+        }
 
     # normalized_chunk_ids = merge_source_ids([], chunk_ids)
     normalized_chunk_ids = chunk_ids
 
-    if entity_chunks_storage is not None and normalized_chunk_ids:
-        await entity_chunks_storage.upsert(
-            {
-                entity_name: {
-                    "chunk_ids": normalized_chunk_ids,
-                    "count": len(normalized_chunk_ids),
-                }
-            }
-        )
+    if normalized_chunk_ids:
+        write_buffer.entity_chunks[entity_name] = {
+            "chunk_ids": normalized_chunk_ids,
+            "count": len(normalized_chunk_ids),
+        }
 
     limit_method = (
         global_config.get("source_ids_limit_method") or SOURCE_IDS_LIMIT_METHOD_KEEP
@@ -1212,7 +1255,7 @@ async def _rebuild_single_entity(
             final_description = current_entity.get("description", "")
 
         entity_type = current_entity.get("entity_type", "UNKNOWN")
-        await _update_entity_storage(
+        _update_entity_storage(
             final_description,
             entity_type,
             file_paths,
@@ -1291,7 +1334,7 @@ async def _rebuild_single_entity(
     else:
         truncation_info = ""
 
-    await _update_entity_storage(
+    _update_entity_storage(
         final_description,
         entity_type,
         file_paths_list,
@@ -1313,23 +1356,21 @@ async def _rebuild_single_entity(
 
 async def _rebuild_single_relationship(
     knowledge_graph_inst: BaseGraphStorage,
-    relationships_vdb: BaseVectorStorage,
-    entities_vdb: BaseVectorStorage,
+    write_buffer: _RebuildWriteBuffer,
     src: str,
     tgt: str,
     chunk_ids: list[str],
     chunk_relationships: dict,
     llm_response_cache: BaseKVStorage,
     global_config: dict[str, str],
-    relation_chunks_storage: BaseKVStorage | None = None,
-    entity_chunks_storage: BaseKVStorage | None = None,
     pipeline_status: dict | None = None,
     pipeline_status_lock=None,
 ) -> None:
     """Rebuild a single relationship from cached extraction results
 
     Note: This function assumes the caller has already acquired the appropriate
-    keyed lock for the relationship pair to ensure thread safety.
+    keyed lock for the relationship pair to ensure thread safety. Storage writes
+    are queued in `write_buffer` and flushed by the caller.
     """
 
     # Get current relationship data
@@ -1340,16 +1381,12 @@ async def _rebuild_single_relationship(
     # normalized_chunk_ids = merge_source_ids([], chunk_ids)
     normalized_chunk_ids = chunk_ids
 
-    if relation_chunks_storage is not None and normalized_chunk_ids:
+    if normalized_chunk_ids:
         storage_key = make_relation_chunk_key(src, tgt)
-        await relation_chunks_storage.upsert(
-            {
-                storage_key: {
-                    "chunk_ids": normalized_chunk_ids,
-                    "count": len(normalized_chunk_ids),
-                }
-            }
-        )
+        write_buffer.relation_chunks[storage_key] = {
+            "chunk_ids": normalized_chunk_ids,
+            "count": len(normalized_chunk_ids),
+        }
 
     limit_method = (
         global_config.get("source_ids_limit_method") or SOURCE_IDS_LIMIT_METHOD_KEEP
@@ -1478,97 +1515,57 @@ async def _rebuild_single_relationship(
     node_file_path = updated_relationship_data.get("file_path", "unknown_source")
 
     for node_id in {src, tgt}:
-        if not (await knowledge_graph_inst.has_node(node_id)):
-            node_created_at = int(time.time())
-            node_data = {
+        if not write_buffer.has_node(node_id) and not (
+            await knowledge_graph_inst.has_node(node_id)
+        ):
+            write_buffer.nodes[node_id] = {
                 "entity_id": node_id,
                 "source_id": node_source_id,
                 "description": node_description,
                 "entity_type": "UNKNOWN",
                 "file_path": node_file_path,
-                "created_at": node_created_at,
+                "created_at": int(time.time()),
                 "truncate": "",
             }
-            await knowledge_graph_inst.upsert_node(node_id, node_data=node_data)
 
             # Update entity_chunks_storage for the newly created entity
-            if entity_chunks_storage is not None and limited_chunk_ids:
-                await entity_chunks_storage.upsert(
-                    {
-                        node_id: {
-                            "chunk_ids": limited_chunk_ids,
-                            "count": len(limited_chunk_ids),
-                        }
-                    }
-                )
+            if limited_chunk_ids:
+                write_buffer.entity_chunks[node_id] = {
+                    "chunk_ids": limited_chunk_ids,
+                    "count": len(limited_chunk_ids),
+                }
 
             # Update entity_vdb for the newly created entity
-            if entities_vdb is not None:
-                entity_vdb_id = compute_mdhash_id(node_id, prefix="ent-")
-                entity_content = f"{node_id}\n{node_description}"
-                vdb_data = {
-                    entity_vdb_id: {
-                        "content": entity_content,
-                        "entity_name": node_id,
-                        "source_id": node_source_id,
-                        "entity_type": "UNKNOWN",
-                        "file_path": node_file_path,
-                    }
-                }
-                await safe_vdb_operation_with_exception(
-                    operation=lambda payload=vdb_data: entities_vdb.upsert(payload),
-                    operation_name="rebuild_added_entity_upsert",
-                    entity_name=node_id,
-                    max_retries=3,
-                    retry_delay=0.1,
-                )
+            entity_vdb_id = compute_mdhash_id(node_id, prefix="ent-")
+            write_buffer.entity_vectors[entity_vdb_id] = {
+                "content": f"{node_id}\n{node_description}",
+                "entity_name": node_id,
+                "source_id": node_source_id,
+                "entity_type": "UNKNOWN",
+                "file_path": node_file_path,
+            }
 
-    await knowledge_graph_inst.upsert_edge(src, tgt, updated_relationship_data)
+    write_buffer.edges[(src, tgt)] = updated_relationship_data
 
     # Update relationship in vector database
     # Sort src and tgt to ensure consistent ordering (smaller string first)
     if src > tgt:
         src, tgt = tgt, src
-    try:
-        rel_vdb_id = compute_mdhash_id(src + tgt, prefix="rel-")
-        rel_vdb_id_reverse = compute_mdhash_id(tgt + src, prefix="rel-")
-
-        # Delete old vector records first (both directions to be safe)
-        try:
-            await relationships_vdb.delete([rel_vdb_id, rel_vdb_id_reverse])
-        except Exception as e:
-            logger.debug(
-                f"Could not delete old relationship vector records {rel_vdb_id}, {rel_vdb_id_reverse}: {e}"
-            )
-
-        # Insert new vector record
-        rel_content = f"{combined_keywords}\t{src}\n{tgt}\n{final_description}"
-        vdb_data = {
-            rel_vdb_id: {
-                "src_id": src,
-                "tgt_id": tgt,
-                "source_id": updated_relationship_data["source_id"],
-                "content": rel_content,
-                "keywords": combined_keywords,
-                "description": final_description,
-                "weight": weight,
-                "file_path": updated_relationship_data["file_path"],
-            }
-        }
-
-        # Use safe operation wrapper - VDB failure must throw exception
-        await safe_vdb_operation_with_exception(
-            operation=lambda: relationships_vdb.upsert(vdb_data),
-            operation_name="rebuild_relationship_upsert",
-            entity_name=f"{src}-{tgt}",
-            max_retries=3,
-            retry_delay=0.2,
-        )
-
-    except Exception as e:
-        error_msg = f"Failed to rebuild relationship storage for `{src}-{tgt}`: {e}"
-        logger.error(error_msg)
-        raise  # Re-raise exception
+    rel_vdb_id = compute_mdhash_id(src + tgt, prefix="rel-")
+    rel_vdb_id_reverse = compute_mdhash_id(tgt + src, prefix="rel-")
+
+    # Old vector records are deleted first (both directions to be safe)
+    write_buffer.relation_vector_deletes.update([rel_vdb_id, rel_vdb_id_reverse])
+    write_buffer.relation_vectors[rel_vdb_id] = {
+        "src_id": src,
+        "tgt_id": tgt,
+        "source_id": updated_relationship_data["source_id"],
+        "content": f"{combined_keywords}\t{src}\n{tgt}\n{final_description}",
+        "keywords": combined_keywords,
+        "description": final_description,
+        "weight": weight,
+        "file_path": updated_relationship_data["file_path"],
+    }
 
     # Log rebuild completion with truncation info
     status_message = f"Rebuild `{src}`~`{tgt}` from {len(chunk_ids)} chunks"
@@ -1590,6 +1587,114 @@ async def _rebuild_single_relationship(
             pipeline_status["history_messages"].append(status_message)
 
 
+class _ChunkTrackingBatch:
+    """Per-document view of a chunk-tracking KV storage used while merging
+
+    Rows are prefetched with one get_by_ids and upserts are buffered, so the
+    merge functions can keep using get_by_id/upsert without a storage round-trip
+    per entity or relation. flush() writes the buffered rows back in one upsert.
+    """
+
+    def __init__(self, storage: BaseKVStorage):
+        self.storage = storage
+        self._rows: dict[str, dict | None] = {}
+        self._dirty: set[str] = set()
+
+    async def prefetch(self, keys) -> None:
+        keys = [key for key in dict.fromkeys(keys) if key not in self._rows]
+        if keys:
+            self._rows.update(zip(keys, await self.storage.get_by_ids(keys)))
+
+    async def get_by_id(self, key: str) -> dict | None:
+        if key not in self._rows:
+            self._rows[key] = await self.storage.get_by_id(key)
+        return self._rows[key]
+
+    async def upsert(self, data: dict[str, dict]) -> None:
+        self._rows.update(data)
+        self._dirty.update(data)
+
+    async def flush(self) -> None:
+        """Write buffered rows, merged with rows stored since the prefetch
+
+        Chunk lists only grow while documents are indexed, so merging with the
+        stored row keeps chunk ids added by concurrent documents. Callers hold
+        the keyed locks of the affected entities while flushing.
+        """
+        if not self._dirty:
+            return
+        keys = sorted(self._dirty)
+        stored_rows = await self.storage.get_by_ids(keys)
+        updates = {}
+        for key, stored in zip(keys, stored_rows):
+            chunk_ids = self._rows[key].get("chunk_ids", [])
+            if stored and isinstance(stored, dict):
+                chunk_ids = merge_source_ids(stored.get("chunk_ids", []), chunk_ids)
+            updates[key] = {"chunk_ids": chunk_ids, "count": len(chunk_ids)}
+        await self.storage.upsert(updates)
+        self._dirty.clear()
+
+
+class _GraphWriteBatch:
+    """Per-document view of the graph storage that buffers node and edge upserts
+
+    Reads of buffered nodes and edges are answered from the buffer, everything
+    else goes to the wrapped storage. flush() writes the buffer with one
+    upsert_nodes_batch and one upsert_edges_batch call, nodes first, so backends
+    can send the writes of a document in a few transactions. Callers hold the
+    keyed locks of all buffered entities until the flush.
+    """
+
+    def __init__(self, storage: BaseGraphStorage):
+        self.storage = storage
+        self._nodes: dict[str, dict] = {}
+        self._edges: dict[tuple[str, str], tuple[str, str, dict]] = {}
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    async def has_node(self, node_id: str) -> bool:
+        return node_id in self._nodes or await self.storage.has_node(node_id)
+
+    async def get_node(self, node_id: str) -> dict | None:
+        if node_id in self._nodes:
+            return dict(self._nodes[node_id])
+        return await self.storage.get_node(node_id)
+
+    async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
+        # Backends merge properties into an existing node, so does the buffer
+        self._nodes[node_id] = {**self._nodes.get(node_id, {}), **node_data}
+
+    async def has_edge(self, source_node_id: str, target_node_id: str) -> bool:
+        if tuple(sorted((source_node_id, target_node_id))) in self._edges:
+            return True
+        return await self.storage.has_edge(source_node_id, target_node_id)
+
+    async def get_edge(
+        self, source_node_id: str, target_node_id: str
+    ) -> dict[str, str] | None:
+        edge = self._edges.get(tuple(sorted((source_node_id, target_node_id))))
+        if edge is not None:
+            return dict(edge[2])
+        return await self.storage.get_edge(source_node_id, target_node_id)
+
+    async def upsert_edge(
+        self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
+    ) -> None:
+        key = tuple(sorted((source_node_id, target_node_id)))
+        src, tgt, data = self._edges.get(key, (source_node_id, target_node_id, {}))
+        self._edges[key] = (src, tgt, {**data, **edge_data})
+
+    async def flush(self) -> None:
+        nodes, edges = self._nodes, list(self._edges.values())
+        self._nodes, self._edges = {}, {}
+        # Endpoints must exist before edges on some graph backends
+        if nodes:
+            await self.storage.upsert_nodes_batch(nodes)
+        if edges:
+            await self.storage.upsert_edges_batch(edges)
+
+
 async def _merge_nodes_then_upsert(
     entity_name: str,
     nodes_data: list[dict],
@@ -1625,10 +1730,11 @@ async def _merge_nodes_then_upsert(
                 chunk_id for chunk_id in stored_chunks.get("chunk_ids", []) if chunk_id
             ]
 
-    if not existing_full_source_ids:
-        existing_full_source_ids = [
-            chunk_id for chunk_id in already_source_ids if chunk_id
-        ]
+    # Graph source ids are a subset of the tracked list; merging them back keeps
+    # ids written by concurrent documents after the tracking rows were prefetched
+    existing_full_source_ids = merge_source_ids(
+        existing_full_source_ids, already_source_ids
+    )
 
     # 2. Merging new source ids with existing ones
     full_source_ids = merge_source_ids(existing_full_source_ids, new_source_ids)
@@ -1938,10 +2044,10 @@ async def _merge_edges_then_upsert(
                 chunk_id for chunk_id in stored_chunks.get("chunk_ids", []) if chunk_id
             ]
 
-    if not existing_full_source_ids:
-        existing_full_source_ids = [
-            chunk_id for chunk_id in already_source_ids if chunk_id
-        ]
+    # Keep ids only recorded on the graph edge, see _merge_nodes_then_upsert
+    existing_full_source_ids = merge_source_ids(
+        existing_full_source_ids, already_source_ids
+    )
 
     # 2. Merge new source ids with existing ones
     full_source_ids = merge_source_ids(existing_full_source_ids, new_source_ids)
@@ -2242,12 +2348,12 @@ async def _merge_edges_then_upsert(
                         if chunk_id
                     ]
 
-            # If not in entity_chunks_storage, get from graph database
-            if not existing_full_source_ids:
-                if existing_node.get("source_id"):
-                    existing_full_source_ids = existing_node["source_id"].split(
-                        GRAPH_FIELD_SEP
-                    )
+            # Add ids only recorded on the graph node (or all of them if untracked)
+            if existing_node.get("source_id"):
+                existing_full_source_ids = merge_source_ids(
+                    existing_full_source_ids,
+                    existing_node["source_id"].split(GRAPH_FIELD_SEP),
+                )
 
             # 2. Merge with new source_ids from this relationship
             new_source_ids_from_relation = [
@@ -2472,226 +2578,278 @@ async def merge_nodes_and_edges(
     graph_max_async = global_config.get("llm_model_max_async", 4) * 2
     semaphore = asyncio.Semaphore(graph_max_async)
 
-    # ===== Phase 1: Process all entities concurrently =====
-    log_message = f"Phase 1: Processing {total_entities_count} entities from {doc_id} (async: {graph_max_async})"
-    logger.info(log_message)
-    async with pipeline_status_lock:
-        pipeline_status["latest_message"] = log_message
-        pipeline_status["history_messages"].append(log_message)
+    # Read the chunk tracking rows of the document once and write them back once
+    # after both phases instead of one get_by_id/upsert per entity and relation
+    entity_names = set(all_nodes)
+    for edge_key in all_edges:
+        entity_names.update(edge_key)
+    if entity_chunks_storage is not None:
+        entity_chunks_storage = _ChunkTrackingBatch(entity_chunks_storage)
+        await entity_chunks_storage.prefetch(sorted(entity_names))
+    if relation_chunks_storage is not None:
+        relation_chunks_storage = _ChunkTrackingBatch(relation_chunks_storage)
+        await relation_chunks_storage.prefetch(
+            make_relation_chunk_key(*edge_key) for edge_key in all_edges
+        )
 
-    async def _locked_process_entity_name(entity_name, entities):
-        async with semaphore:
-            # Check for cancellation before processing entity
-            if pipeline_status is not None and pipeline_status_lock is not None:
-                async with pipeline_status_lock:
-                    if pipeline_status.get("cancellation_requested", False):
-                        raise PipelineCancelledException(
-                            "User cancelled during entity merge"
-                        )
+    # Batched graph writes keep the document's nodes and edges in memory until
+    # both phases are done, so the document holds the keyed locks of all its
+    # entities from the first read to the flush instead of one key at a time
+    workspace = global_config.get("workspace", "")
+    namespace = f"{workspace}:GraphDB" if workspace else "GraphDB"
+    graph_batch = None
+    document_lock = nullcontext()
+    if global_config.get("graph_batch_writes", False):
+        graph_batch = _GraphWriteBatch(knowledge_graph_inst)
+        knowledge_graph_inst = graph_batch
+        document_lock = get_storage_keyed_lock(
+            list(entity_names), namespace=namespace, enable_logging=False
+        )
 
-            workspace = global_config.get("workspace", "")
-            namespace = f"{workspace}:GraphDB" if workspace else "GraphDB"
-            async with get_storage_keyed_lock(
-                [entity_name], namespace=namespace, enable_logging=False
-            ):
-                try:
-                    logger.debug(f"Processing entity {entity_name}")
-                    entity_data = await _merge_nodes_then_upsert(
-                        entity_name,
-                        entities,
-                        knowledge_graph_inst,
-                        entity_vdb,
-                        global_config,
-                        pipeline_status,
-                        pipeline_status_lock,
-                        llm_response_cache,
-                        entity_chunks_storage,
-                    )
+    def _keyed_lock(keys):
+        # Keyed locks must not be nested inside the document lock
+        if graph_batch is not None:
+            return nullcontext()
+        return get_storage_keyed_lock(keys, namespace=namespace, enable_logging=False)
 
-                    return entity_data
+    @asynccontextmanager
+    async def _flush_buffered_writes():
+        merged = False
+        try:
+            yield
+            merged = True
+        finally:
+            # Without batched graph writes, the nodes and edges merged before a
+            # failure are already in the graph: keep their chunk lists in step
+            buffers = [entity_chunks_storage, relation_chunks_storage]
+            if graph_batch is not None:
+                # Batched graph writes are dropped on failure, and so are the lists
+                buffers = [graph_batch, *buffers] if merged else []
+            buffers = [buffer for buffer in buffers if buffer is not None]
+            if buffers:
+                async with _keyed_lock(list(entity_names)):
+                    for buffer in buffers:
+                        await buffer.flush()
+
+    async with document_lock, _flush_buffered_writes():
+        # ===== Phase 1: Process all entities concurrently =====
+        log_message = f"Phase 1: Processing {total_entities_count} entities from {doc_id} (async: {graph_max_async})"
+        logger.info(log_message)
+        async with pipeline_status_lock:
+            pipeline_status["latest_message"] = log_message
+            pipeline_status["history_messages"].append(log_message)
 
-                except Exception as e:
-                    error_msg = f"Error processing entity `{entity_name}`: {e}"
-                    logger.error(error_msg)
+        async def _locked_process_entity_name(entity_name, entities):
+            async with semaphore:
+                # Check for cancellation before processing entity
+                if pipeline_status is not None and pipeline_status_lock is not None:
+                    async with pipeline_status_lock:
+                        if pipeline_status.get("cancellation_requested", False):
+                            raise PipelineCancelledException(
+                                "User cancelled during entity merge"
+                            )
 
-                    # Try to update pipeline status, but don't let status update failure affect main exception
+                async with _keyed_lock([entity_name]):
                     try:
-                        if (
-                            pipeline_status is not None
-                            and pipeline_status_lock is not None
-                        ):
-                            async with pipeline_status_lock:
-                                pipeline_status["latest_message"] = error_msg
-                                pipeline_status["history_messages"].append(error_msg)
-                    except Exception as status_error:
-                        logger.error(
-                            f"Failed to update pipeline status: {status_error}"
+                        logger.debug(f"Processing entity {entity_name}")
+                        entity_data = await _merge_nodes_then_upsert(
+                            entity_name,
+                            entities,
+                            knowledge_graph_inst,
+                            entity_vdb,
+                            global_config,
+                            pipeline_status,
+                            pipeline_status_lock,
+                            llm_response_cache,
+                            entity_chunks_storage,
                         )
 
-                    # Re-raise the original exception with a prefix
-                    prefixed_exception = create_prefixed_exception(
-                        e, f"`{entity_name}`"
-                    )
-                    raise prefixed_exception from e
-
-    # Create entity processing tasks
-    entity_tasks = []
-    for entity_name, entities in all_nodes.items():
-        task = asyncio.create_task(_locked_process_entity_name(entity_name, entities))
-        entity_tasks.append(task)
-
-    # Execute entity tasks with error handling
-    processed_entities = []
-    if entity_tasks:
-        done, pending = await asyncio.wait(
-            entity_tasks, return_when=asyncio.FIRST_EXCEPTION
-        )
+                        return entity_data
+
+                    except Exception as e:
+                        error_msg = f"Error processing entity `{entity_name}`: {e}"
+                        logger.error(error_msg)
+
+                        # Try to update pipeline status, but don't let status update failure affect main exception
+                        try:
+                            if (
+                                pipeline_status is not None
+                                and pipeline_status_lock is not None
+                            ):
+                                async with pipeline_status_lock:
+                                    pipeline_status["latest_message"] = error_msg
+                                    pipeline_status["history_messages"].append(
+                                        error_msg
+                                    )
+                        except Exception as status_error:
+                            logger.error(
+                                f"Failed to update pipeline status: {status_error}"
+                            )
 
-        first_exception = None
+                        # Re-raise the original exception with a prefix
+                        prefixed_exception = create_prefixed_exception(
+                            e, f"`{entity_name}`"
+                        )
+                        raise prefixed_exception from e
+
+        # Create entity processing tasks
+        entity_tasks = []
+        for entity_name, entities in all_nodes.items():
+            task = asyncio.create_task(
+                _locked_process_entity_name(entity_name, entities)
+            )
+            entity_tasks.append(task)
+
+        # Execute entity tasks with error handling
         processed_entities = []
+        if entity_tasks:
+            done, pending = await asyncio.wait(
+                entity_tasks, return_when=asyncio.FIRST_EXCEPTION
+            )
 
-        for task in done:
-            try:
-                result = task.result()
-            except BaseException as e:
-                if first_exception is None:
-                    first_exception = e
-            else:
-                processed_entities.append(result)
+            first_exception = None
+            processed_entities = []
 
-        if pending:
-            for task in pending:
-                task.cancel()
-            pending_results = await asyncio.gather(*pending, return_exceptions=True)
-            for result in pending_results:
-                if isinstance(result, BaseException):
+            for task in done:
+                try:
+                    result = task.result()
+                except BaseException as e:
                     if first_exception is None:
-                        first_exception = result
+                        first_exception = e
                 else:
                     processed_entities.append(result)
 
-        if first_exception is not None:
-            raise first_exception
+            if pending:
+                for task in pending:
+                    task.cancel()
+                pending_results = await asyncio.gather(*pending, return_exceptions=True)
+                for result in pending_results:
+                    if isinstance(result, BaseException):
+                        if first_exception is None:
+                            first_exception = result
+                    else:
+                        processed_entities.append(result)
 
-    # ===== Phase 2: Process all relationships concurrently =====
-    log_message = f"Phase 2: Processing {total_relations_count} relations from {doc_id} (async: {graph_max_async})"
-    logger.info(log_message)
-    async with pipeline_status_lock:
-        pipeline_status["latest_message"] = log_message
-        pipeline_status["history_messages"].append(log_message)
+            if first_exception is not None:
+                raise first_exception
 
-    async def _locked_process_edges(edge_key, edges):
-        async with semaphore:
-            # Check for cancellation before processing edges
-            if pipeline_status is not None and pipeline_status_lock is not None:
-                async with pipeline_status_lock:
-                    if pipeline_status.get("cancellation_requested", False):
-                        raise PipelineCancelledException(
-                            "User cancelled during relation merge"
-                        )
+        # ===== Phase 2: Process all relationships concurrently =====
+        log_message = f"Phase 2: Processing {total_relations_count} relations from {doc_id} (async: {graph_max_async})"
+        logger.info(log_message)
+        async with pipeline_status_lock:
+            pipeline_status["latest_message"] = log_message
+            pipeline_status["history_messages"].append(log_message)
 
-            workspace = global_config.get("workspace", "")
-            namespace = f"{workspace}:GraphDB" if workspace else "GraphDB"
-            sorted_edge_key = sorted([edge_key[0], edge_key[1]])
+        async def _locked_process_edges(edge_key, edges):
+            async with semaphore:
+                # Check for cancellation before processing edges
+                if pipeline_status is not None and pipeline_status_lock is not None:
+                    async with pipeline_status_lock:
+                        if pipeline_status.get("cancellation_requested", False):
+                            raise PipelineCancelledException(
+                                "User cancelled during relation merge"
+                            )
 
-            async with get_storage_keyed_lock(
-                sorted_edge_key,
-                namespace=namespace,
-                enable_logging=False,
-            ):
-                try:
-                    added_entities = []  # Track entities added during edge processing
-
-                    logger.debug(f"Processing relation {sorted_edge_key}")
-                    edge_data = await _merge_edges_then_upsert(
-                        edge_key[0],
-                        edge_key[1],
-                        edges,
-                        knowledge_graph_inst,
-                        relationships_vdb,
-                        entity_vdb,
-                        global_config,
-                        pipeline_status,
-                        pipeline_status_lock,
-                        llm_response_cache,
-                        added_entities,  # Pass list to collect added entities
-                        relation_chunks_storage,
-                        entity_chunks_storage,  # Add entity_chunks_storage parameter
-                    )
+                sorted_edge_key = sorted([edge_key[0], edge_key[1]])
 
-                    if edge_data is None:
-                        return None, []
+                async with _keyed_lock(sorted_edge_key):
+                    try:
+                        added_entities = []  # Track entities added during edge processing
+
+                        logger.debug(f"Processing relation {sorted_edge_key}")
+                        edge_data = await _merge_edges_then_upsert(
+                            edge_key[0],
+                            edge_key[1],
+                            edges,
+                            knowledge_graph_inst,
+                            relationships_vdb,
+                            entity_vdb,
+                            global_config,
+                            pipeline_status,
+                            pipeline_status_lock,
+                            llm_response_cache,
+                            added_entities,  # Pass list to collect added entities
+                            relation_chunks_storage,
+                            entity_chunks_storage,  # Add entity_chunks_storage parameter
+                        )
 
-                    return edge_data, added_entities
+                        if edge_data is None:
+                            return None, []
 
-                except Exception as e:
-                    error_msg = f"Error processing relation `{sorted_edge_key}`: {e}"
-                    logger.error(error_msg)
+                        return edge_data, added_entities
 
-                    # Try to update pipeline status, but don't let status update failure affect main exception
-                    try:
-                        if (
-                            pipeline_status is not None
-                            and pipeline_status_lock is not None
-                        ):
-                            async with pipeline_status_lock:
-                                pipeline_status["latest_message"] = error_msg
-                                pipeline_status["history_messages"].append(error_msg)
-                    except Exception as status_error:
-                        logger.error(
-                            f"Failed to update pipeline status: {status_error}"
+                    except Exception as e:
+                        error_msg = (
+                            f"Error processing relation `{sorted_edge_key}`: {e}"
                         )
+                        logger.error(error_msg)
+
+                        # Try to update pipeline status, but don't let status update failure affect main exception
+                        try:
+                            if (
+                                pipeline_status is not None
+                                and pipeline_status_lock is not None
+                            ):
+                                async with pipeline_status_lock:
+                                    pipeline_status["latest_message"] = error_msg
+                                    pipeline_status["history_messages"].append(
+                                        error_msg
+                                    )
+                        except Exception as status_error:
+                            logger.error(
+                                f"Failed to update pipeline status: {status_error}"
+                            )
 
-                    # Re-raise the original exception with a prefix
-                    prefixed_exception = create_prefixed_exception(
-                        e, f"{sorted_edge_key}"
-                    )
-                    raise prefixed_exception from e
+                        # Re-raise the original exception with a prefix
+                        prefixed_exception = create_prefixed_exception(
+                            e, f"{sorted_edge_key}"
+                        )
+                        raise prefixed_exception from e
 
-    # Create relationship processing tasks
-    edge_tasks = []
-    for edge_key, edges in all_edges.items():
-        task = asyncio.create_task(_locked_process_edges(edge_key, edges))
-        edge_tasks.append(task)
+        # Create relationship processing tasks
+        edge_tasks = []
+        for edge_key, edges in all_edges.items():
+            task = asyncio.create_task(_locked_process_edges(edge_key, edges))
+            edge_tasks.append(task)
 
-    # Execute relationship tasks with error handling
-    processed_edges = []
-    all_added_entities = []
+        # Execute relationship tasks with error handling
+        processed_edges = []
+        all_added_entities = []
 
-    if edge_tasks:
-        done, pending = await asyncio.wait(
-            edge_tasks, return_when=asyncio.FIRST_EXCEPTION
-        )
+        if edge_tasks:
+            done, pending = await asyncio.wait(
+                edge_tasks, return_when=asyncio.FIRST_EXCEPTION
+            )
 
-        first_exception = None
+            first_exception = None
 
-        for task in done:
-            try:
-                edge_data, added_entities = task.result()
-            except BaseException as e:
-                if first_exception is None:
-                    first_exception = e
-            else:
-                if edge_data is not None:
-                    processed_edges.append(edge_data)
-                all_added_entities.extend(added_entities)
-
-        if pending:
-            for task in pending:
-                task.cancel()
-            pending_results = await asyncio.gather(*pending, return_exceptions=True)
-            for result in pending_results:
-                if isinstance(result, BaseException):
+            for task in done:
+                try:
+                    edge_data, added_entities = task.result()
+                except BaseException as e:
                     if first_exception is None:
-                        first_exception = result
+                        first_exception = e
                 else:
-                    edge_data, added_entities = result
                     if edge_data is not None:
                         processed_edges.append(edge_data)
                     all_added_entities.extend(added_entities)
 
-        if first_exception is not None:
-            raise first_exception
+            if pending:
+                for task in pending:
+                    task.cancel()
+                pending_results = await asyncio.gather(*pending, return_exceptions=True)
+                for result in pending_results:
+                    if isinstance(result, BaseException):
+                        if first_exception is None:
+                            first_exception = result
+                    else:
+                        edge_data, added_entities = result
+                        if edge_data is not None:
+                            processed_edges.append(edge_data)
+                        all_added_entities.extend(added_entities)
+
+            if first_exception is not None:
+                raise first_exception
 
     # ===== Phase 3: Update full_entities and full_relations storage =====
     if full_entities_storage and full_relations_storage and doc_id:
@@ -2765,26 +2923,8 @@ async def merge_nodes_and_edges(
         pipeline_status["history_messages"].append(log_message)
 
 
-async def extract_entities(
-    chunks: dict[str, TextChunkSchema],
-    global_config: dict[str, str],
-    pipeline_status: dict = None,
-    pipeline_status_lock=None,
-    llm_response_cache: BaseKVStorage | None = None,
-    text_chunks_storage: BaseKVStorage | None = None,
-) -> list:
-    # Check for cancellation at the start of entity extraction
-    if pipeline_status is not None and pipeline_status_lock is not None:
-        async with pipeline_status_lock:
-            if pipeline_status.get("cancellation_requested", False):
-                raise PipelineCancelledException(
-                    "User cancelled during entity extraction"
-                )
-
-    use_llm_func: callable = global_config["llm_model_func"]
-    entity_extract_max_gleaning = global_config["entity_extract_max_gleaning"]
-
-    ordered_chunks = list(chunks.items())
+def build_entity_extraction_context(global_config: dict) -> dict:
+    """Format parameters shared by the entity extraction prompts of all chunks"""
     # add language and example number params to prompt
     language = global_config["addon_params"].get("language", DEFAULT_SUMMARY_LANGUAGE)
     entity_types = global_config["addon_params"].get(
@@ -2802,7 +2942,7 @@ async def extract_entities(
     # add example's format
     examples = examples.format(**example_context_base)
 
-    context_base = dict(
+    return dict(
         tuple_delimiter=PROMPTS["DEFAULT_TUPLE_DELIMITER"],
         completion_delimiter=PROMPTS["DEFAULT_COMPLETION_DELIMITER"],
         entity_types=",".join(entity_types),
@@ -2810,16 +2950,68 @@ async def extract_entities(
         language=language,
     )
 
+
+async def extract_entities(
+    chunks: dict[str, TextChunkSchema],
+    global_config: dict[str, str],
+    pipeline_status: dict = None,
+    pipeline_status_lock=None,
+    llm_response_cache: BaseKVStorage | None = None,
+    text_chunks_storage: BaseKVStorage | None = None,
+) -> list:
+    # Check for cancellation at the start of entity extraction
+    if pipeline_status is not None and pipeline_status_lock is not None:
+        async with pipeline_status_lock:
+            if pipeline_status.get("cancellation_requested", False):
+                raise PipelineCancelledException(
+                    "User cancelled during entity extraction"
+                )
+
+    use_llm_func: callable = global_config["llm_model_func"]
+    entity_extract_max_gleaning = global_config["entity_extract_max_gleaning"]
+
+    ordered_chunks = list(chunks.items())
+    context_base = build_entity_extraction_context(global_config)
+
     processed_chunks = 0
     total_chunks = len(ordered_chunks)
 
+    # With a parser pool the LLM output of all chunks is parsed in one batch
+    # once extraction finishes, instead of chunk by chunk on the event loop
+    parse_max_workers = global_config.get(
+        "parse_max_workers", DEFAULT_PARSE_MAX_WORKERS
+    )
+    defer_parsing = parse_max_workers > 0
+
+    def _merge_chunk_extractions(parsed_results: list) -> tuple[dict, dict]:
+        """Merge initial and gleaning results, keeping the longer descriptions"""
+        maybe_nodes, maybe_edges = {}, {}
+        for parsed in parsed_results:
+            if isinstance(parsed, Exception):
+                raise parsed
+            nodes, edges = parsed
+            _keep_longer_descriptions(maybe_nodes, nodes)
+            _keep_longer_descriptions(maybe_edges, edges)
+        return maybe_nodes, maybe_edges
+
+    async def _log_chunk_extracted(
+        index: int, chunk_key: str, maybe_nodes, maybe_edges
+    ):
+        log_message = f"Chunk {index} of {total_chunks} extracted {len(maybe_nodes)} Ent + {len(maybe_edges)} Rel {chunk_key}"
+        logger.info(log_message)
+        if pipeline_status is not None:
+            async with pipeline_status_lock:
+                pipeline_status["latest_message"] = log_message
+                pipeline_status["history_messages"].append(log_message)
+
     async def _process_single_content(chunk_key_dp: tuple[str, TextChunkSchema]):
         """Process a single chunk
         Args:
             chunk_key_dp (tuple[str, TextChunkSchema]):
                 ("chunk-xxxxxx", {"tokens": int, "content": str, "full_doc_id": str, "chunk_order_index": int})
         Returns:
-            tuple: (maybe_nodes, maybe_edges) containing extracted entities and relationships
+            tuple: (maybe_nodes, maybe_edges) containing extracted entities and relationships,
+            or the raw extraction items of the chunk when parsing is deferred
         """
         nonlocal processed_chunks
         chunk_key = chunk_key_dp[0]
@@ -2857,16 +3049,9 @@ async def extract_entities(
         history = pack_user_ass_to_openai_messages(
             entity_extraction_user_prompt, final_result
         )
-
-        # Process initial extraction with file path
-        maybe_nodes, maybe_edges = await _process_extraction_result(
-            final_result,
-            chunk_key,
-            timestamp,
-            file_path,
-            tuple_delimiter=context_base["tuple_delimiter"],
-            completion_delimiter=context_base["completion_delimiter"],
-        )
+        extraction_items = [
+            ExtractionItem(final_result, chunk_key, timestamp, file_path)
+        ]
 
         # Process additional gleaning results only 1 time when entity_extract_max_gleaning is greater than zero.
         if entity_extract_max_gleaning > 0:
@@ -2880,48 +3065,10 @@ async def extract_entities(
                 chunk_id=chunk_key,
                 cache_keys_collector=cache_keys_collector,
             )
-
-            # Process gleaning result separately with file path
-            glean_nodes, glean_edges = await _process_extraction_result(
-                glean_result,
-                chunk_key,
-                timestamp,
-                file_path,
-                tuple_delimiter=context_base["tuple_delimiter"],
-                completion_delimiter=context_base["completion_delimiter"],
+            extraction_items.append(
+                ExtractionItem(glean_result, chunk_key, timestamp, file_path)
             )
 
-            # Merge results - compare description lengths to choose better version
-            for entity_name, glean_entities in glean_nodes.items():
-                if entity_name in maybe_nodes:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_nodes[entity_name][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_entities[0].get("description", "") or "")
-
-                    if glean_desc_len > original_desc_len:
-                        maybe_nodes[entity_name] = list(glean_entities)
-                    # Otherwise keep original version
-                else:
-                    # New entity from gleaning stage
-                    maybe_nodes[entity_name] = list(glean_entities)
-
-            for edge_key, glean_edges in glean_edges.items():
-                if edge_key in maybe_edges:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_edges[edge_key][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_edges[0].get("description", "") or "")
-
-                    if glean_desc_len > original_desc_len:
-                        maybe_edges[edge_key] = list(glean_edges)
-                    # Otherwise keep original version
-                else:
-                    # New edge from gleaning stage
-                    maybe_edges[edge_key] = list(glean_edges)
-
         # Batch update chunk's llm_cache_list with all collected cache keys
         if cache_keys_collector and text_chunks_storage:
             await update_chunk_cache_list(
@@ -2932,14 +3079,20 @@ async def extract_entities(
             )
 
         processed_chunks += 1
-        entities_count = len(maybe_nodes)
-        relations_count = len(maybe_edges)
-        log_message = f"Chunk {processed_chunks} of {total_chunks} extracted {entities_count} Ent + {relations_count} Rel {chunk_key}"
-        logger.info(log_message)
-        if pipeline_status is not None:
-            async with pipeline_status_lock:
-                pipeline_status["latest_message"] = log_message
-                pipeline_status["history_messages"].append(log_message)
+        if defer_parsing:
+            return extraction_items
+
+        # Process initial and gleaning extraction results with file path
+        maybe_nodes, maybe_edges = _merge_chunk_extractions(
+            await aparse_extraction_results(
+                extraction_items,
+                tuple_delimiter=context_base["tuple_delimiter"],
+                completion_delimiter=context_base["completion_delimiter"],
+            ),
+        )
+        await _log_chunk_extracted(
+            processed_chunks, chunk_key, maybe_nodes, maybe_edges
+        )
 
         # Return the extracted nodes and edges for centralized processing
         return maybe_nodes, maybe_edges
@@ -3007,6 +3160,29 @@ async def extract_entities(
         prefixed_exception = create_prefixed_exception(first_exception, progress_prefix)
         raise prefixed_exception from first_exception
 
+    if defer_parsing:
+        # Parse the LLM output of all chunks of the document in one pool batch
+        all_items = [item for items in chunk_results for item in items]
+        parsed_iter = iter(
+            await aparse_extraction_results(
+                all_items,
+                max_workers=parse_max_workers,
+                tuple_delimiter=context_base["tuple_delimiter"],
+                completion_delimiter=context_base["completion_delimiter"],
+            )
+        )
+        parsed_chunk_results = []
+        for index, items in enumerate(chunk_results, 1):
+            chunk_key = items[0].chunk_key
+            parsed_results = [next(parsed_iter) for _ in items]
+            try:
+                maybe_nodes, maybe_edges = _merge_chunk_extractions(parsed_results)
+            except Exception as e:
+                raise create_prefixed_exception(e, chunk_key) from e
+            await _log_chunk_extracted(index, chunk_key, maybe_nodes, maybe_edges)
+            parsed_chunk_results.append((maybe_nodes, maybe_edges))
+        chunk_results = parsed_chunk_results
+
     # If all tasks completed successfully, chunk_results already contains the results
     # Return the chunk_results for later processing in merge_nodes_and_edges
     return chunk_results
@@ -3087,17 +3263,18 @@ async def kg_query(
     hl_keywords_str = ", ".join(hl_keywords) if hl_keywords else ""
 
     # Build query context (unified interface)
-    context_result = await _build_query_context(
-        query,
-        ll_keywords_str,
-        hl_keywords_str,
-        knowledge_graph_inst,
-        entities_vdb,
-        relationships_vdb,
-        text_chunks_db,
-        query_param,
-        chunks_vdb,
-    )
+    with time_query_stage("context_build"):
+        context_result = await _build_query_context(
+            query,
+            ll_keywords_str,
+            hl_keywords_str,
+            knowledge_graph_inst,
+            entities_vdb,
+            relationships_vdb,
+            text_chunks_db,
+            query_param,
+            chunks_vdb,
+        )
 
     if context_result is None:
         logger.info("[kg_query] No query context could be built; returning no-result.")
@@ -3130,6 +3307,9 @@ async def kg_query(
         prompt_content = "\n\n".join([sys_prompt, "---User Query---", user_query])
         return QueryResult(content=prompt_content, raw_data=context_result.raw_data)
 
+    if query_param.context_callback:
+        await query_param.context_callback(context_result.raw_data)
+
     # Call LLM
     tokenizer: Tokenizer = global_config["tokenizer"]
     len_of_prompts = len(tokenizer.encode(query + sys_prompt))
@@ -3164,6 +3344,7 @@ async def kg_query(
         )
         response = cached_response
     else:
+        llm_start = time.perf_counter()
         response = await use_model_func(
             user_query,
             system_prompt=sys_prompt,
@@ -3171,6 +3352,9 @@ async def kg_query(
             enable_cot=True,
             stream=query_param.stream,
         )
+        # Streaming generation is timed by LightRAG.aquery_stream
+        if isinstance(response, str):
+            observe_query_stage("llm_total", time.perf_counter() - llm_start)
 
         if hashing_kv and hashing_kv.global_config.get("enable_llm_cache"):
             queryparam_dict = {
@@ -3248,9 +3432,10 @@ async def get_keywords_from_query(
         return query_param.hl_keywords, query_param.ll_keywords
 
     # Extract keywords using extract_keywords_only function which already supports conversation history
-    hl_keywords, ll_keywords = await extract_keywords_only(
-        query, query_param, global_config, hashing_kv
-    )
+    with time_query_stage("keyword_extraction"):
+        hl_keywords, ll_keywords = await extract_keywords_only(
+            query, query_param, global_config, hashing_kv
+        )
     return hl_keywords, ll_keywords
 
 
@@ -3390,9 +3575,10 @@ async def _get_vector_context(
         search_top_k = query_param.chunk_top_k or query_param.top_k
         cosine_threshold = chunks_vdb.cosine_better_than_threshold
 
-        results = await chunks_vdb.query(
-            query, top_k=search_top_k, query_embedding=query_embedding
-        )
+        with time_query_stage("vector_query_chunks"):
+            results = await chunks_vdb.query(
+                query, top_k=search_top_k, query_embedding=query_embedding
+            )
         if not results:
             logger.info(
                 f"Naive query: 0 chunks (chunk_top_k:{search_top_k} cosine:{cosine_threshold})"
@@ -3408,6 +3594,7 @@ async def _get_vector_context(
                     "file_path": result.get("file_path", "unknown_source"),
                     "source_type": "vector",  # Mark the source type
                     "chunk_id": result.get("id"),  # Add chunk_id for deduplication
+                    "distance": result.get("distance"),  # Used for rerank pruning
                 }
                 valid_chunks.append(chunk_with_metadata)
 
@@ -3825,6 +4012,7 @@ async def _merge_all_chunks(
                         "content": chunk["content"],
                         "file_path": chunk.get("file_path", "unknown_source"),
                         "chunk_id": chunk_id,
+                        "distance": chunk.get("distance"),
                     }
                 )
 
@@ -4177,7 +4365,8 @@ async def _get_node_data(
         f"Query nodes: {query} (top_k:{query_param.top_k}, cosine:{entities_vdb.cosine_better_than_threshold})"
     )
 
-    results = await entities_vdb.query(query, top_k=query_param.top_k)
+    with time_query_stage("vector_query_entities"):
+        results = await entities_vdb.query(query, top_k=query_param.top_k)
 
     if not len(results):
         return [], []
@@ -4186,10 +4375,11 @@ async def _get_node_data(
     node_ids = [r["entity_name"] for r in results]
 
     # Call the batch node retrieval and degree functions concurrently.
-    nodes_dict, degrees_dict = await asyncio.gather(
-        knowledge_graph_inst.get_nodes_batch(node_ids),
-        knowledge_graph_inst.node_degrees_batch(node_ids),
-    )
+    with time_query_stage("graph_batch_read"):
+        nodes_dict, degrees_dict = await asyncio.gather(
+            knowledge_graph_inst.get_nodes_batch(node_ids),
+            knowledge_graph_inst.node_degrees_batch(node_ids),
+        )
 
     # Now, if you need the node data and degree in order:
     node_datas = [nodes_dict.get(nid) for nid in node_ids]
@@ -4230,7 +4420,8 @@ async def _find_most_related_edges_from_entities(
     knowledge_graph_inst: BaseGraphStorage,
 ):
     node_names = [dp["entity_name"] for dp in node_datas]
-    batch_edges_dict = await knowledge_graph_inst.get_nodes_edges_batch(node_names)
+    with time_query_stage("graph_batch_read"):
+        batch_edges_dict = await knowledge_graph_inst.get_nodes_edges_batch(node_names)
 
     all_edges = []
     seen = set()
@@ -4250,10 +4441,11 @@ async def _find_most_related_edges_from_entities(
     edge_pairs_tuples = list(all_edges)  # all_edges is already a list of tuples
 
     # Call the batched functions concurrently.
-    edge_data_dict, edge_degrees_dict = await asyncio.gather(
-        knowledge_graph_inst.get_edges_batch(edge_pairs_dicts),
-        knowledge_graph_inst.edge_degrees_batch(edge_pairs_tuples),
-    )
+    with time_query_stage("graph_batch_read"):
+        edge_data_dict, edge_degrees_dict = await asyncio.gather(
+            knowledge_graph_inst.get_edges_batch(edge_pairs_dicts),
+            knowledge_graph_inst.edge_degrees_batch(edge_pairs_tuples),
+        )
 
     # Reconstruct edge_datas list in the same order as the deduplicated results.
     all_edges_data = []
@@ -4417,7 +4609,8 @@ async def _find_related_text_unit_from_entities(
     unique_chunk_ids = list(
         dict.fromkeys(selected_chunk_ids)
     )  # Remove duplicates while preserving order
-    chunk_data_list = await text_chunks_db.get_by_ids(unique_chunk_ids)
+    with time_query_stage("chunk_fetch"):
+        chunk_data_list = await text_chunks_db.get_by_ids(unique_chunk_ids)
 
     # Step 6: Build result chunks with valid data and update chunk tracking
     result_chunks = []
@@ -4449,7 +4642,8 @@ async def _get_edge_data(
         f"Query edges: {keywords} (top_k:{query_param.top_k}, cosine:{relationships_vdb.cosine_better_than_threshold})"
     )
 
-    results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
+    with time_query_stage("vector_query_relationships"):
+        results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
 
     if not len(results):
         return [], []
@@ -4457,7 +4651,8 @@ async def _get_edge_data(
     # Prepare edge pairs in two forms:
     # For the batch edge properties function, use dicts.
     edge_pairs_dicts = [{"src": r["src_id"], "tgt": r["tgt_id"]} for r in results]
-    edge_data_dict = await knowledge_graph_inst.get_edges_batch(edge_pairs_dicts)
+    with time_query_stage("graph_batch_read"):
+        edge_data_dict = await knowledge_graph_inst.get_edges_batch(edge_pairs_dicts)
 
     # Reconstruct edge_datas list in the same order as results.
     edge_datas = []
@@ -4512,7 +4707,8 @@ async def _find_most_related_entities_from_relationships(
             seen.add(e["tgt_id"])
 
     # Only get nodes data, no need for node degrees
-    nodes_dict = await knowledge_graph_inst.get_nodes_batch(entity_names)
+    with time_query_stage("graph_batch_read"):
+        nodes_dict = await knowledge_graph_inst.get_nodes_batch(entity_names)
 
     # Rebuild the list in the same order as entity_names
     node_datas = []
@@ -4709,7 +4905,8 @@ async def _find_related_text_unit_from_relations(
     unique_chunk_ids = list(
         dict.fromkeys(selected_chunk_ids)
     )  # Remove duplicates while preserving order
-    chunk_data_list = await text_chunks_db.get_by_ids(unique_chunk_ids)
+    with time_query_stage("chunk_fetch"):
+        chunk_data_list = await text_chunks_db.get_by_ids(unique_chunk_ids)
 
     # Step 6: Build result chunks with valid data and update chunk tracking
     result_chunks = []
@@ -4924,6 +5121,9 @@ async def naive_query(
         prompt_content = "\n\n".join([sys_prompt, "---User Query---", user_query])
         return QueryResult(content=prompt_content, raw_data=raw_data)
 
+    if query_param.context_callback:
+        await query_param.context_callback(raw_data)
+
     # Handle cache
     args_hash = compute_args_hash(
         query_param.mode,
@@ -4947,6 +5147,7 @@ async def naive_query(
         )
         response = cached_response
     else:
+        llm_start = time.perf_counter()
         response = await use_model_func(
             user_query,
             system_prompt=sys_prompt,
@@ -4954,6 +5155,9 @@ async def naive_query(
             enable_cot=True,
             stream=query_param.stream,
         )
+        # Streaming generation is timed by LightRAG.aquery_stream
+        if isinstance(response, str):
+            observe_query_stage("llm_total", time.perf_counter() - llm_start)
 
         if hashing_kv and hashing_kv.global_config.get("enable_llm_cache"):
             queryparam_dict = {
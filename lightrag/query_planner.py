@@ -0,0 +1,346 @@
+"""
+Adaptive query planning for LightRAG.
+
+The planner runs before retrieval and picks the query mode, top_k, chunk_top_k,
+rerank on/off and token budgets from cheap signals:
+
+- query length (words)
+- keyword counts from `extract_keywords_only` (the extracted keywords are handed
+  on to retrieval, so the planner does not add an extra LLM call)
+- the similarity distribution of a small vector probe over the chunk index
+
+Easy queries (short, few keywords, or with one clearly dominant chunk) take a
+fast path with smaller retrieval sizes, no rerank and reduced token budgets.
+The planner only ever narrows a request: it never raises top_k, chunk_top_k or
+token budgets, and never turns rerank on when the caller turned it off. It does
+override the requested mode: with `allow_mode_change`, a local, global, hybrid or
+mix query without keywords or with one dominant chunk hit is answered with naive
+retrieval. Set `allow_mode_change` to False to keep the caller's mode.
+"""
+
+from __future__ import annotations
+
+import numbers
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from lightrag.base import BaseKVStorage, BaseVectorStorage, QueryParam
+from lightrag.constants import (
+    DEFAULT_PLANNER_SIMPLE_MAX_WORDS,
+    DEFAULT_PLANNER_COMPLEX_MIN_WORDS,
+    DEFAULT_PLANNER_SIMPLE_MAX_KEYWORDS,
+    DEFAULT_PLANNER_COMPLEX_MIN_KEYWORDS,
+    DEFAULT_PLANNER_PROBE_TOP_K,
+    DEFAULT_PLANNER_CONFIDENT_SCORE,
+    DEFAULT_PLANNER_CONFIDENT_MARGIN,
+    DEFAULT_PLANNER_FAST_TOP_K,
+    DEFAULT_PLANNER_FAST_CHUNK_TOP_K,
+    DEFAULT_PLANNER_FAST_TOKEN_RATIO,
+)
+from lightrag.utils import get_env_value, logger
+
+QUERY_COMPLEXITY_SIMPLE = "simple"
+QUERY_COMPLEXITY_MODERATE = "moderate"
+QUERY_COMPLEXITY_COMPLEX = "complex"
+
+# Modes the planner is allowed to replace with a cheaper one
+PLANNABLE_MODES = {"mix", "hybrid", "local", "global"}
+
+
+def default_query_planner_config() -> dict[str, Any]:
+    """Default planner configuration (disabled unless ENABLE_QUERY_PLANNER=true)."""
+    return {
+        "enabled": get_env_value("ENABLE_QUERY_PLANNER", False, bool),
+        "allow_mode_change": True,
+        "probe_candidates": True,
+        "simple_max_words": DEFAULT_PLANNER_SIMPLE_MAX_WORDS,
+        "complex_min_words": DEFAULT_PLANNER_COMPLEX_MIN_WORDS,
+        "simple_max_keywords": DEFAULT_PLANNER_SIMPLE_MAX_KEYWORDS,
+        "complex_min_keywords": DEFAULT_PLANNER_COMPLEX_MIN_KEYWORDS,
+        "probe_top_k": DEFAULT_PLANNER_PROBE_TOP_K,
+        "confident_score": DEFAULT_PLANNER_CONFIDENT_SCORE,
+        "confident_margin": DEFAULT_PLANNER_CONFIDENT_MARGIN,
+        "fast_top_k": DEFAULT_PLANNER_FAST_TOP_K,
+        "fast_chunk_top_k": DEFAULT_PLANNER_FAST_CHUNK_TOP_K,
+        "fast_token_ratio": DEFAULT_PLANNER_FAST_TOKEN_RATIO,
+    }
+
+
+@dataclass
+class QuerySignals:
+    """Cheap signals collected before retrieval."""
+
+    word_count: int = 0
+    hl_keyword_count: int = 0
+    ll_keyword_count: int = 0
+    probe_count: int = 0
+    top_score: float | None = None
+    score_margin: float | None = None
+
+    @property
+    def keyword_count(self) -> int:
+        return self.hl_keyword_count + self.ll_keyword_count
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "word_count": self.word_count,
+            "hl_keyword_count": self.hl_keyword_count,
+            "ll_keyword_count": self.ll_keyword_count,
+            "probe_count": self.probe_count,
+            "top_score": self.top_score,
+            "score_margin": self.score_margin,
+        }
+
+
+@dataclass
+class QueryPlan:
+    """Planner decisions for one query, reported in raw_data.metadata.query_plan."""
+
+    complexity: str
+    mode: str
+    top_k: int
+    chunk_top_k: int
+    enable_rerank: bool
+    max_entity_tokens: int
+    max_relation_tokens: int
+    max_total_tokens: int
+    signals: QuerySignals = field(default_factory=QuerySignals)
+    reasons: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "complexity": self.complexity,
+            "mode": self.mode,
+            "top_k": self.top_k,
+            "chunk_top_k": self.chunk_top_k,
+            "enable_rerank": self.enable_rerank,
+            "max_entity_tokens": self.max_entity_tokens,
+            "max_relation_tokens": self.max_relation_tokens,
+            "max_total_tokens": self.max_total_tokens,
+            "signals": self.signals.to_dict(),
+            "reasons": self.reasons,
+        }
+
+
+class QueryPlanner:
+    """
+    Per-workspace query planner.
+
+    Args:
+        config: Planner configuration, see `default_query_planner_config`.
+            Missing keys fall back to the defaults.
+    """
+
+    def __init__(self, config: dict[str, Any] | None = None):
+        self.config = {**default_query_planner_config(), **(config or {})}
+        self.stats = {
+            QUERY_COMPLEXITY_SIMPLE: 0,
+            QUERY_COMPLEXITY_MODERATE: 0,
+            QUERY_COMPLEXITY_COMPLEX: 0,
+            "rerank_skipped": 0,
+            "mode_changed": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled"))
+
+    async def collect_signals(
+        self,
+        query: str,
+        param: QueryParam,
+        global_config: dict[str, Any],
+        chunks_vdb: BaseVectorStorage | None = None,
+        hashing_kv: BaseKVStorage | None = None,
+    ) -> tuple[QuerySignals, list[str], list[str]]:
+        """Collect planning signals; returns (signals, hl_keywords, ll_keywords)."""
+        from lightrag.operate import get_keywords_from_query
+
+        signals = QuerySignals(word_count=len(query.split()))
+        hl_keywords, ll_keywords = list(param.hl_keywords), list(param.ll_keywords)
+
+        if param.mode in PLANNABLE_MODES:
+            hl_keywords, ll_keywords = await get_keywords_from_query(
+                query, param, global_config, hashing_kv
+            )
+            signals.hl_keyword_count = len(hl_keywords)
+            signals.ll_keyword_count = len(ll_keywords)
+
+        if self.config.get("probe_candidates") and chunks_vdb is not None:
+            try:
+                probe = await chunks_vdb.query(
+                    query, top_k=int(self.config["probe_top_k"])
+                )
+                scores = sorted(
+                    (
+                        float(r["distance"])
+                        for r in probe or []
+                        if isinstance(r.get("distance"), numbers.Real)
+                    ),
+                    reverse=True,
+                )
+                signals.probe_count = len(scores)
+                if scores:
+                    signals.top_score = scores[0]
+                    rest = scores[1:]
+                    signals.score_margin = (
+                        scores[0] - sum(rest) / len(rest) if rest else scores[0]
+                    )
+            except Exception as e:
+                logger.warning(f"Query planner: candidate probe failed: {e}")
+
+        return signals, hl_keywords, ll_keywords
+
+    def classify(self, signals: QuerySignals) -> tuple[str, list[str]]:
+        """Classify query complexity from signals; returns (complexity, reasons)."""
+        cfg = self.config
+        reasons = []
+
+        if signals.word_count >= cfg["complex_min_words"]:
+            reasons.append(f"long query ({signals.word_count} words)")
+        if signals.keyword_count >= cfg["complex_min_keywords"]:
+            reasons.append(f"many keywords ({signals.keyword_count})")
+        if reasons:
+            return QUERY_COMPLEXITY_COMPLEX, reasons
+
+        confident = (
+            signals.top_score is not None
+            and signals.top_score >= cfg["confident_score"]
+            and (signals.score_margin or 0.0) >= cfg["confident_margin"]
+        )
+        short = (
+            signals.word_count <= cfg["simple_max_words"]
+            and signals.keyword_count <= cfg["simple_max_keywords"]
+        )
+        if confident:
+            reasons.append(
+                f"dominant candidate (top {signals.top_score:.3f}, margin {signals.score_margin:.3f})"
+            )
+        if short:
+            reasons.append(
+                f"short query ({signals.word_count} words, {signals.keyword_count} keywords)"
+            )
+        if reasons:
+            return QUERY_COMPLEXITY_SIMPLE, reasons
+
+        return QUERY_COMPLEXITY_MODERATE, ["no fast-path signal"]
+
+    def build_plan(
+        self,
+        param: QueryParam,
+        signals: QuerySignals,
+        complexity: str,
+        reasons: list[str],
+    ) -> QueryPlan:
+        """Turn a complexity class into concrete query parameters."""
+        cfg = self.config
+        plan = QueryPlan(
+            complexity=complexity,
+            mode=param.mode,
+            top_k=param.top_k,
+            chunk_top_k=param.chunk_top_k,
+            enable_rerank=param.enable_rerank,
+            max_entity_tokens=param.max_entity_tokens,
+            max_relation_tokens=param.max_relation_tokens,
+            max_total_tokens=param.max_total_tokens,
+            signals=signals,
+            reasons=list(reasons),
+        )
+
+        if cfg.get("allow_mode_change") and param.mode in PLANNABLE_MODES:
+            if signals.keyword_count == 0:
+                plan.mode = "naive"
+                plan.reasons.append("no keywords extracted: naive retrieval")
+            elif complexity == QUERY_COMPLEXITY_SIMPLE and (
+                signals.top_score is not None
+                and signals.top_score >= cfg["confident_score"]
+                and (signals.score_margin or 0.0) >= cfg["confident_margin"]
+            ):
+                plan.mode = "naive"
+                plan.reasons.append("dominant chunk hit: naive retrieval")
+
+        if complexity == QUERY_COMPLEXITY_SIMPLE:
+            ratio = float(cfg["fast_token_ratio"])
+            plan.top_k = min(param.top_k, int(cfg["fast_top_k"]))
+            if param.chunk_top_k:
+                plan.chunk_top_k = min(param.chunk_top_k, int(cfg["fast_chunk_top_k"]))
+            plan.enable_rerank = False
+            plan.max_entity_tokens = int(param.max_entity_tokens * ratio)
+            plan.max_relation_tokens = int(param.max_relation_tokens * ratio)
+            plan.max_total_tokens = int(param.max_total_tokens * ratio)
+
+        return plan
+
+    async def plan(
+        self,
+        query: str,
+        param: QueryParam,
+        global_config: dict[str, Any],
+        chunks_vdb: BaseVectorStorage | None = None,
+        hashing_kv: BaseKVStorage | None = None,
+    ) -> tuple[QueryParam, QueryPlan | None]:
+        """
+        Plan a query.
+
+        Returns:
+            (planned_param, plan). planned_param is a copy of `param` with the
+            planner decisions and pre-extracted keywords applied. When the planner
+            is disabled or the mode is bypass, `param` is returned unchanged with
+            plan None.
+        """
+        if not self.enabled or param.mode == "bypass":
+            return param, None
+
+        planned_param, plan = await self.explain(
+            query, param, global_config, chunks_vdb, hashing_kv
+        )
+
+        self.stats[plan.complexity] += 1
+        if param.enable_rerank and not plan.enable_rerank:
+            self.stats["rerank_skipped"] += 1
+        if plan.mode != param.mode:
+            self.stats["mode_changed"] += 1
+
+        logger.info(
+            f"Query plan: {plan.complexity} -> mode={plan.mode}, top_k={plan.top_k}, "
+            f"chunk_top_k={plan.chunk_top_k}, rerank={plan.enable_rerank} "
+            f"({'; '.join(plan.reasons)})"
+        )
+        return planned_param, plan
+
+    async def explain(
+        self,
+        query: str,
+        param: QueryParam,
+        global_config: dict[str, Any],
+        chunks_vdb: BaseVectorStorage | None = None,
+        hashing_kv: BaseKVStorage | None = None,
+    ) -> tuple[QueryParam, QueryPlan]:
+        """Build a plan regardless of `enabled`, without recording stats."""
+        signals, hl_keywords, ll_keywords = await self.collect_signals(
+            query, param, global_config, chunks_vdb, hashing_kv
+        )
+        complexity, reasons = self.classify(signals)
+        plan = self.build_plan(param, signals, complexity, reasons)
+        planned_param = replace(
+            param,
+            mode=plan.mode,
+            top_k=plan.top_k,
+            chunk_top_k=plan.chunk_top_k,
+            enable_rerank=plan.enable_rerank,
+            max_entity_tokens=plan.max_entity_tokens,
+            max_relation_tokens=plan.max_relation_tokens,
+            max_total_tokens=plan.max_total_tokens,
+            hl_keywords=hl_keywords,
+            ll_keywords=ll_keywords,
+        )
+        return planned_param, plan
+
+    def get_stats(self) -> dict[str, Any]:
+        """Planner decision counters."""
+        total = (
+            self.stats[QUERY_COMPLEXITY_SIMPLE]
+            + self.stats[QUERY_COMPLEXITY_MODERATE]
+            + self.stats[QUERY_COMPLEXITY_COMPLEX]
+        )
+        return {"enabled": self.enabled, "total_queries": total, **self.stats}
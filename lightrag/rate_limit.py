@@ -0,0 +1,382 @@
+"""
+Rate limiting and adaptive concurrency for priority-limited LLM calls.
+
+TokenBucketLimiter enforces requests-per-minute and tokens-per-minute budgets.
+Calls are charged an estimate of their prompt and completion tokens before they
+run and corrected with the usage the LLM binding reports afterwards, once the
+stream ends for a streamed response. With `shared=True` the
+buckets live in the shared-storage layer, so every LightRAG instance and worker
+process using the same name draws from one quota.
+
+AdaptiveConcurrency caps the number of calls in flight below the worker count
+and adapts the cap AIMD style: one more slot per window of successful calls,
+halved when the provider rate-limits or latency exceeds the target.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from lightrag.metrics import LLM_CONCURRENCY_LIMIT, RATE_LIMIT_WAIT_SECONDS
+
+logger = logging.getLogger("lightrag")
+
+RATE_LIMIT_NAMESPACE = "llm_rate_limits"
+
+
+@dataclass
+class CallFeedback:
+    """Usage and rate-limit signals reported while one limited call runs."""
+
+    tokens: int = 0
+    reported: bool = False
+    rate_limited: bool = False
+    streamed: bool = False
+    """The call returned a stream whose usage is reported when it ends"""
+    settle: Callable[[int], Awaitable[None]] | None = None
+    """Settles the estimate of a streamed call, set when the call returns"""
+
+
+_call_feedback: ContextVar[CallFeedback | None] = ContextVar(
+    "lightrag_call_feedback", default=None
+)
+
+
+def record_token_usage(total_tokens: int) -> None:
+    """Report actual token usage of the running limited call, called by LLM bindings."""
+    feedback = _call_feedback.get()
+    if feedback is not None:
+        feedback.tokens += total_tokens
+        feedback.reported = True
+
+
+def streamed_usage_reporter() -> Callable[[int], Awaitable[None]]:
+    """For an LLM binding about to return a stream: how to report its usage later.
+
+    The usage of a stream is known only once it is consumed, after the limited
+    call returned. Calling this in the running call defers its settlement to
+    the returned function, which the stream awaits with the total tokens when
+    it ends. A stream that ends without usage keeps the estimate.
+    """
+    feedback = _call_feedback.get()
+    if feedback is not None:
+        feedback.streamed = True
+
+    async def report(total_tokens: int) -> None:
+        if feedback is not None and feedback.settle is not None:
+            settle, feedback.settle = feedback.settle, None
+            await settle(total_tokens)
+
+    return report
+
+
+def record_rate_limit() -> None:
+    """Report a provider rate-limit response, including ones retried by a binding."""
+    feedback = _call_feedback.get()
+    if feedback is not None:
+        feedback.rate_limited = True
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception raised by an LLM binding is a provider rate limit."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return any("RateLimit" in cls.__name__ for cls in type(error).__mro__)
+
+
+def make_token_estimator(
+    tokenizer: Any, completion_tokens: int = 0
+) -> Callable[[tuple, dict], int]:
+    """Estimate the tokens of an LLM call before it runs.
+
+    Prompt tokens are counted from the prompt, system prompt and history; the
+    completion is expected to take the call's max_tokens, or
+    `completion_tokens` when the call does not set it.
+    """
+
+    def estimate(args: tuple, kwargs: dict) -> int:
+        texts = [args[0] if args else kwargs.get("prompt", "")]
+        texts.append(kwargs.get("system_prompt") or "")
+        for message in kwargs.get("history_messages") or []:
+            texts.append(str(message.get("content", "")))
+        prompt_tokens = sum(len(tokenizer.encode(text)) for text in texts if text)
+        expected = (
+            kwargs.get("max_tokens")
+            or kwargs.get("max_completion_tokens")
+            or completion_tokens
+        )
+        return prompt_tokens + expected
+
+    return estimate
+
+
+class TokenBucketLimiter:
+    """Requests-per-minute and tokens-per-minute token buckets
+
+    Both buckets start full and refill continuously; a budget of 0 disables
+    that bucket. A call larger than the whole token budget waits for a full
+    bucket instead of failing.
+    """
+
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        name: str = "llm",
+        shared: bool = False,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.name = name
+        self.shared = shared
+        self._local_state: dict[str, dict] = {}
+        self._local_lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rpm > 0 or self.tpm > 0
+
+    async def _store(self):
+        if not self.shared:
+            return self._local_state, self._local_lock
+        from lightrag.kg.shared_storage import get_namespace_data, get_namespace_lock
+
+        # Workspace "" keeps one budget for all workspaces and instances
+        store = await get_namespace_data(RATE_LIMIT_NAMESPACE, workspace="")
+        return store, get_namespace_lock(RATE_LIMIT_NAMESPACE, workspace="")
+
+    def _refill(self, state: dict | None, now: float) -> dict:
+        if state is None:
+            return {"requests": self.rpm, "tokens": self.tpm, "updated": now}
+        elapsed = max(now - state["updated"], 0.0)
+        return {
+            "requests": min(self.rpm, state["requests"] + elapsed * self.rpm / 60),
+            "tokens": min(self.tpm, state["tokens"] + elapsed * self.tpm / 60),
+            "updated": now,
+        }
+
+    async def _update(self, change: Callable[[dict], float]) -> float:
+        store, lock = await self._store()
+        async with lock:
+            state = self._refill(store.get(self.name), time.time())
+            result = change(state)
+            # Reassign so Manager-backed dicts see the change
+            store[self.name] = state
+        return result
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until one request and `tokens` tokens fit into the budget."""
+        tokens = min(tokens, self.tpm)
+
+        def take(state: dict) -> float:
+            waits = [0.0]
+            if self.rpm > 0 and state["requests"] < 1:
+                waits.append((1 - state["requests"]) * 60 / self.rpm)
+            if self.tpm > 0 and state["tokens"] < tokens:
+                waits.append((tokens - state["tokens"]) * 60 / self.tpm)
+            wait = max(waits)
+            if wait == 0:
+                if self.rpm > 0:
+                    state["requests"] -= 1
+                if self.tpm > 0:
+                    state["tokens"] -= tokens
+            return wait
+
+        started = time.monotonic()
+        while wait := await self._update(take):
+            await asyncio.sleep(wait)
+        RATE_LIMIT_WAIT_SECONDS.observe(time.monotonic() - started, limiter=self.name)
+
+    async def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the actual usage of a call is known."""
+        if self.tpm <= 0 or actual == estimated:
+            return
+
+        def correct(state: dict) -> float:
+            # May go negative: the overrun is paid back before the next call
+            state["tokens"] = min(self.tpm, state["tokens"] - (actual - estimated))
+            return 0.0
+
+        await self._update(correct)
+
+    async def penalize(self) -> None:
+        """Drain both buckets after a provider rate limit so all callers back off."""
+
+        def drain(state: dict) -> float:
+            state["requests"] = min(state["requests"], 0)
+            state["tokens"] = min(state["tokens"], 0)
+            return 0.0
+
+        await self._update(drain)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on the number of calls in flight
+
+    The limit grows by one slot per window of successful calls (1/limit per
+    call) up to `max_limit` and is halved when a call is rate-limited or slower
+    than `latency_target` seconds (0 disables the latency signal). Only calls
+    started after the last decrease can trigger another one, so a burst of
+    failures of calls that ran together halves the limit once.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        latency_target: float = 0.0,
+        decrease_factor: float = 0.5,
+        name: str = "limit_async",
+    ):
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.name = name
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = 0
+        LLM_CONCURRENCY_LIMIT.set(max_limit, queue=name)
+
+    async def acquire(self, priority: int = 10) -> None:
+        """Wait for a free slot, release() must follow.
+
+        Waiters get freed slots in priority order (lower first), FIFO within a
+        priority, so queued bulk calls never hold back an interactive one.
+        """
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._waiters, (priority, self._seq, waiter))
+        self._wake()
+        try:
+            # The slot is handed over by _wake()
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def release(self, started: float | None, rate_limited: bool = False) -> None:
+        """Free a slot and adapt the limit; synchronous so it is safe on cancellation.
+
+        `started` is None for calls that never ran, they do not adapt the limit.
+        """
+        self.in_flight -= 1
+        if started is not None:
+            self._adapt(started, rate_limited)
+        self._wake()
+
+    def _adapt(self, started: float, rate_limited: bool) -> None:
+        latency = time.monotonic() - started
+        too_slow = self.latency_target > 0 and latency > self.latency_target
+        if rate_limited or too_slow:
+            if started >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = time.monotonic()
+                logger.info(
+                    f"{self.name}: concurrency limit decreased to {int(self.limit)} "
+                    f"({'rate limited' if rate_limited else f'latency {latency:.1f}s'})"
+                )
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        LLM_CONCURRENCY_LIMIT.set(int(self.limit), queue=self.name)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                self.in_flight += 1
+
+
+class LimitedCall:
+    """Admit one call through the concurrency limit and rate limiter
+
+    Entering waits for a slot and for budget; the body then runs the call.
+    Exiting frees the slot and feeds back latency, rate limits and the actual
+    token usage reported during the body, or leaves settling the estimate to a
+    returned stream (see streamed_usage_reporter):
+
+        async with LimitedCall(rate_limiter, concurrency, estimated_tokens):
+            result = await llm_func(...)
+
+    admit() can be awaited on its own first, e.g. in a task that may be
+    cancelled; entering afterwards does not wait again.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: TokenBucketLimiter | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        estimated_tokens: int = 0,
+        priority: int = 10,
+    ):
+        self.rate_limiter = (
+            rate_limiter if rate_limiter is not None and rate_limiter.enabled else None
+        )
+        self.concurrency = concurrency
+        self.estimated_tokens = estimated_tokens
+        self.priority = priority
+        self.feedback = CallFeedback()
+        self._started: float | None = None
+        self._token = None
+
+    @property
+    def waits(self) -> bool:
+        """Whether admission can wait at all."""
+        return self.rate_limiter is not None or self.concurrency is not None
+
+    async def admit(self) -> None:
+        """Wait for a concurrency slot and for budget."""
+        if self.concurrency is not None:
+            await self.concurrency.acquire(self.priority)
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(self.estimated_tokens)
+        except BaseException:
+            if self.concurrency is not None:
+                self.concurrency.release(None)
+            raise
+        self._started = time.monotonic()
+
+    def abandon(self) -> None:
+        """Free the slot of an admitted call that will not run."""
+        if self.concurrency is not None and self._started is not None:
+            self.concurrency.release(None)
+        self._started = None
+
+    async def __aenter__(self) -> CallFeedback:
+        if self._started is None:
+            await self.admit()
+        self._token = _call_feedback.set(self.feedback)
+        return self.feedback
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        _call_feedback.reset(self._token)
+        feedback = self.feedback
+        if isinstance(exc, Exception) and is_rate_limit_error(exc):
+            feedback.rate_limited = True
+        if self.concurrency is not None:
+            self.concurrency.release(self._started, feedback.rate_limited)
+        # A cancelled call has no usage to report
+        if self.rate_limiter is None or exc_type is asyncio.CancelledError:
+            return
+        if feedback.rate_limited:
+            await self.rate_limiter.penalize()
+        elif feedback.streamed and exc_type is None:
+            feedback.settle = partial(self.rate_limiter.settle, self.estimated_tokens)
+        elif feedback.reported:
+            await self.rate_limiter.settle(self.estimated_tokens, feedback.tokens)
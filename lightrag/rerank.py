@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 import os
+import asyncio
+import threading
+import weakref
 import aiohttp
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, List, Dict, Optional, Tuple
 from tenacity import (
     retry,
@@ -9,7 +15,16 @@ from tenacity import (
     wait_exponential,
     retry_if_exception_type,
 )
-from .utils import logger
+from .utils import logger, compute_args_hash
+from .constants import (
+    DEFAULT_LOCAL_RERANK_MODEL,
+    DEFAULT_LOCAL_RERANK_BACKEND,
+    DEFAULT_LOCAL_RERANK_MAX_LENGTH,
+    DEFAULT_LOCAL_RERANK_BATCH_SIZE,
+    DEFAULT_LOCAL_RERANK_BATCH_WAIT_MS,
+    DEFAULT_LOCAL_RERANK_MAX_WORKERS,
+    DEFAULT_LOCAL_RERANK_CACHE_SIZE,
+)
 
 from dotenv import load_dotenv
 
@@ -19,6 +34,12 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env", override=False)
 
 
+@lru_cache(maxsize=8)
+def _get_rerank_tokenizer(tokenizer_cls, model_name: str):
+    """Build the chunking tokenizer once per model instead of on every rerank call."""
+    return tokenizer_cls(model_name=model_name)
+
+
 def chunk_documents_for_rerank(
     documents: List[str],
     max_tokens: int = 480,
@@ -54,7 +75,7 @@ def chunk_documents_for_rerank(
     try:
         from .utils import TiktokenTokenizer
 
-        tokenizer = TiktokenTokenizer(model_name=tokenizer_model)
+        tokenizer = _get_rerank_tokenizer(TiktokenTokenizer, tokenizer_model)
     except Exception as e:
         logger.warning(
             f"Failed to initialize tokenizer: {e}. Using character-based approximation."
@@ -513,6 +534,313 @@ async def ali_rerank(
     )
 
 
+_PendingPair = Tuple[Tuple[str, str], str, str, asyncio.Future]
+
+
+class _LoopBatchState:
+    """Micro-batch state of one event loop"""
+
+    def __init__(self):
+        self.pending: List[_PendingPair] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        # Strong references keep running batches from being garbage collected
+        self.tasks: set[asyncio.Task] = set()
+
+
+class LocalCrossEncoderReranker:
+    """
+    In-process cross-encoder reranker with dynamic batching and a score cache.
+
+    (query, document) pairs submitted by concurrent queries are collected for up to
+    `batch_wait_ms` milliseconds (or until `batch_size` pairs are pending) and scored
+    together on a bounded thread pool, so the event loop is never blocked by model
+    inference. Scores are cached by (query hash, document hash); since chunk ids are
+    derived from the md5 of chunk content, the document hash identifies the chunk.
+
+    The model, thread pool and score cache are shared by all event loops using the
+    instance, while pending pairs are batched per loop, since their futures and the
+    flush timer belong to the loop that created them.
+
+    Args:
+        model_name: sentence-transformers cross-encoder model name or local path
+        backend: Inference backend for sentence-transformers ("torch" or "onnx")
+        max_length: Maximum token length of a (query, document) pair
+        batch_size: Maximum number of pairs scored in one model call
+        batch_wait_ms: Maximum time to wait for more pairs before flushing a batch
+        max_workers: Number of inference threads
+        cache_size: Maximum number of cached pair scores (0 disables the cache)
+        device: Torch device used for inference
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_LOCAL_RERANK_MODEL,
+        backend: str = DEFAULT_LOCAL_RERANK_BACKEND,
+        max_length: int = DEFAULT_LOCAL_RERANK_MAX_LENGTH,
+        batch_size: int = DEFAULT_LOCAL_RERANK_BATCH_SIZE,
+        batch_wait_ms: float = DEFAULT_LOCAL_RERANK_BATCH_WAIT_MS,
+        max_workers: int = DEFAULT_LOCAL_RERANK_MAX_WORKERS,
+        cache_size: int = DEFAULT_LOCAL_RERANK_CACHE_SIZE,
+        device: str = "cpu",
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.max_length = max_length
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait_ms) / 1000.0
+        self.max_workers = max(1, max_workers)
+        self.cache_size = max(0, cache_size)
+        self.device = device
+
+        self._model = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="lightrag-rerank"
+        )
+        self._cache: OrderedDict[Tuple[str, str], float] = OrderedDict()
+        self._loop_states: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopBatchState
+        ] = weakref.WeakKeyDictionary()
+        self._loop_states_lock = threading.Lock()
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.batches_run = 0
+
+    def _load_model(self):
+        """Load the cross-encoder model (runs inside an executor thread)."""
+        if self._model is not None:
+            return self._model
+
+        import pipmaster as pm
+
+        if not pm.is_installed("sentence-transformers"):
+            pm.install("sentence-transformers")
+        if self.backend == "onnx" and not pm.is_installed("optimum"):
+            pm.install("optimum[onnxruntime]")
+
+        from sentence_transformers import CrossEncoder
+
+        model_kwargs = {"max_length": self.max_length, "device": self.device}
+        if self.backend != "torch":
+            model_kwargs["backend"] = self.backend
+        self._model = CrossEncoder(self.model_name, **model_kwargs)
+        logger.info(
+            f"Local rerank model loaded: {self.model_name} (backend: {self.backend}, device: {self.device})"
+        )
+        return self._model
+
+    def _predict(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Score a batch of (query, document) pairs synchronously."""
+        model = self._load_model()
+        scores = model.predict(
+            pairs, batch_size=self.batch_size, show_progress_bar=False
+        )
+        return [float(score) for score in scores]
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[float]:
+        score = self._cache.get(key)
+        if score is not None:
+            self._cache.move_to_end(key)
+        return score
+
+    def _cache_put(self, key: Tuple[str, str], score: float) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _loop_state(self, loop: asyncio.AbstractEventLoop) -> _LoopBatchState:
+        with self._loop_states_lock:
+            state = self._loop_states.get(loop)
+            if state is None:
+                state = self._loop_states[loop] = _LoopBatchState()
+            return state
+
+    def _schedule_flush(self, state: _LoopBatchState) -> None:
+        loop = asyncio.get_running_loop()
+        if len(state.pending) >= self.batch_size:
+            if state.flush_handle is not None:
+                state.flush_handle.cancel()
+                state.flush_handle = None
+            self._flush(state)
+        elif state.flush_handle is None:
+            state.flush_handle = loop.call_later(self.batch_wait, self._flush, state)
+
+    def _flush(self, state: _LoopBatchState) -> None:
+        state.flush_handle = None
+        while state.pending:
+            batch = state.pending[: self.batch_size]
+            state.pending = state.pending[self.batch_size :]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            state.tasks.add(task)
+            task.add_done_callback(state.tasks.discard)
+
+    async def _run_batch(self, batch: List[_PendingPair]) -> None:
+        # Identical pairs from concurrent queries are scored only once
+        unique_pairs: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        for key, query, document, _ in batch:
+            unique_pairs.setdefault(key, (query, document))
+        keys = list(unique_pairs.keys())
+
+        try:
+            loop = asyncio.get_running_loop()
+            scores = await loop.run_in_executor(
+                self._executor, self._predict, [unique_pairs[k] for k in keys]
+            )
+            self.batches_run += 1
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        score_map = dict(zip(keys, scores))
+        for key, score in score_map.items():
+            self._cache_put(key, score)
+        for key, _, _, future in batch:
+            if not future.done():
+                future.set_result(score_map[key])
+
+    async def score(self, query: str, documents: List[str]) -> List[float]:
+        """
+        Score documents against a query, batching with other in-flight calls.
+
+        Args:
+            query: The search query
+            documents: List of document strings
+
+        Returns:
+            List of relevance scores aligned with `documents`
+        """
+        if not documents:
+            return []
+
+        loop = asyncio.get_running_loop()
+        state = self._loop_state(loop)
+        query_hash = compute_args_hash(query)
+        scores: List[Optional[float]] = [None] * len(documents)
+        waiters: List[Tuple[int, asyncio.Future]] = []
+
+        for idx, document in enumerate(documents):
+            key = (query_hash, compute_args_hash(document))
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                scores[idx] = cached
+                continue
+            self.cache_misses += 1
+            future = loop.create_future()
+            state.pending.append((key, query, document, future))
+            waiters.append((idx, future))
+
+        if waiters:
+            self._schedule_flush(state)
+            results = await asyncio.gather(*(future for _, future in waiters))
+            for (idx, _), score in zip(waiters, results):
+                scores[idx] = score
+
+        return scores
+
+    def shutdown(self) -> None:
+        """Release the inference thread pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=4)
+def get_local_reranker(
+    model_name: str = DEFAULT_LOCAL_RERANK_MODEL,
+    backend: str = DEFAULT_LOCAL_RERANK_BACKEND,
+    max_length: int = DEFAULT_LOCAL_RERANK_MAX_LENGTH,
+    batch_size: int = DEFAULT_LOCAL_RERANK_BATCH_SIZE,
+    batch_wait_ms: float = DEFAULT_LOCAL_RERANK_BATCH_WAIT_MS,
+    max_workers: int = DEFAULT_LOCAL_RERANK_MAX_WORKERS,
+    cache_size: int = DEFAULT_LOCAL_RERANK_CACHE_SIZE,
+) -> LocalCrossEncoderReranker:
+    """Return a process-wide reranker instance shared by all callers with the same settings."""
+    return LocalCrossEncoderReranker(
+        model_name=model_name,
+        backend=backend,
+        max_length=max_length,
+        batch_size=batch_size,
+        batch_wait_ms=batch_wait_ms,
+        max_workers=max_workers,
+        cache_size=cache_size,
+    )
+
+
+async def local_rerank(
+    query: str,
+    documents: List[str],
+    top_n: Optional[int] = None,
+    model: str = DEFAULT_LOCAL_RERANK_MODEL,
+    backend: str = DEFAULT_LOCAL_RERANK_BACKEND,
+    max_length: int = DEFAULT_LOCAL_RERANK_MAX_LENGTH,
+    batch_size: int = DEFAULT_LOCAL_RERANK_BATCH_SIZE,
+    batch_wait_ms: float = DEFAULT_LOCAL_RERANK_BATCH_WAIT_MS,
+    max_workers: int = DEFAULT_LOCAL_RERANK_MAX_WORKERS,
+    cache_size: int = DEFAULT_LOCAL_RERANK_CACHE_SIZE,
+    extra_body: Optional[Dict[str, Any]] = None,
+    enable_chunking: bool = False,
+    max_tokens_per_doc: int = 480,
+) -> List[Dict[str, Any]]:
+    """
+    Rerank documents with an in-process cross-encoder model (no network hop).
+
+    Can be used directly as `rerank_model_func`, or wrapped with functools.partial
+    to pin model and batching settings.
+
+    Args:
+        query: The search query
+        documents: List of strings to rerank
+        top_n: Number of top results to return
+        model: sentence-transformers cross-encoder model name or local path
+        backend: Inference backend ("torch" or "onnx")
+        max_length: Maximum token length of a (query, document) pair
+        batch_size: Maximum number of pairs scored in one model call
+        batch_wait_ms: Time window for collecting pairs from concurrent queries
+        max_workers: Number of inference threads
+        cache_size: Maximum number of cached pair scores
+        extra_body: Unused, accepted for signature compatibility with API rerankers
+        enable_chunking: Whether to chunk documents exceeding max_tokens_per_doc
+        max_tokens_per_doc: Maximum tokens per document for chunking
+
+    Returns:
+        List of dictionary of ["index": int, "relevance_score": float]
+    """
+    if not documents:
+        return []
+
+    reranker = get_local_reranker(
+        model, backend, max_length, batch_size, batch_wait_ms, max_workers, cache_size
+    )
+
+    original_count = len(documents)
+    doc_indices = None
+    if enable_chunking:
+        documents, doc_indices = chunk_documents_for_rerank(
+            documents, max_tokens=max_tokens_per_doc
+        )
+
+    scores = await reranker.score(query, documents)
+    results = [
+        {"index": idx, "relevance_score": score} for idx, score in enumerate(scores)
+    ]
+
+    if doc_indices is not None:
+        results = aggregate_chunk_scores(
+            results, doc_indices, original_count, aggregation="max"
+        )
+    else:
+        results.sort(key=lambda x: x["relevance_score"], reverse=True)
+
+    if top_n is not None and len(results) > top_n:
+        results = results[:top_n]
+
+    return results
+
+
 """Please run this test as a module:
 python -m lightrag.rerank
 """
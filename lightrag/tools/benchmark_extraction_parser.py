@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for parsing entity/relation extraction output.
+
+Parses a synthetic document of LLM extraction results inline on the event loop
+and in the extraction parser pool, and reports wall time together with the
+worst event-loop lag seen by a ticker coroutine while parsing runs.
+
+Usage:
+    python -m lightrag.tools.benchmark_extraction_parser
+    python -m lightrag.tools.benchmark_extraction_parser --chunks 400 --records 60 --workers 2 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from lightrag.extraction_parser import (
+    ExtractionItem,
+    aparse_extraction_results,
+    get_parser_pool,
+    shutdown_parser_pool,
+)
+from lightrag.prompt import PROMPTS
+
+
+def make_items(chunks: int, records: int) -> list[ExtractionItem]:
+    """Build one extraction result per chunk with `records` entities and relations."""
+    tuple_delimiter = PROMPTS["DEFAULT_TUPLE_DELIMITER"]
+    completion_delimiter = PROMPTS["DEFAULT_COMPLETION_DELIMITER"]
+    items = []
+    for chunk in range(chunks):
+        lines = []
+        for i in range(records):
+            name = f"Entity {chunk % 50}-{i}"
+            lines.append(
+                tuple_delimiter.join(
+                    ["entity", name, "concept", f"{name} is described here. " * 4]
+                )
+            )
+            lines.append(
+                tuple_delimiter.join(
+                    [
+                        "relation",
+                        name,
+                        f"Entity {chunk % 50}-{(i + 1) % records}",
+                        "related, linked",
+                        f"{name} relates to its neighbour. " * 3,
+                    ]
+                )
+            )
+        lines.append(completion_delimiter)
+        items.append(ExtractionItem("\n".join(lines), f"chunk-{chunk}", 0, "bench.txt"))
+    return items
+
+
+async def measure(items: list[ExtractionItem], workers: int) -> dict[str, float]:
+    max_lag = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal max_lag
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.001)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await aparse_extraction_results(items, max_workers=workers)
+    elapsed = time.perf_counter() - start
+    running = False
+    await ticker_task
+    return {"wall_ms": elapsed * 1000, "max_loop_lag_ms": max_lag * 1000}
+
+
+async def main_async(chunks: int, records: int, workers: list[int]) -> None:
+    items = make_items(chunks, records)
+    results = {"inline": await measure(items, 0)}
+    for count in workers:
+        # Start the pool outside the measurement, it lives for the whole process
+        get_parser_pool(count)
+        await aparse_extraction_results(items[: count * 2], max_workers=count)
+        results[f"pool x{count}"] = await measure(items, count)
+    shutdown_parser_pool()
+
+    print(f"{chunks} chunks x {records * 2} records")
+    print(f"{'mode':<12} {'wall(ms)':>10} {'max loop lag(ms)':>18}")
+    for mode, stats in results.items():
+        print(f"{mode:<12} {stats['wall_ms']:>10.1f} {stats['max_loop_lag_ms']:>18.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=200)
+    parser.add_argument("--records", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+    asyncio.run(main_async(args.chunks, args.records, args.workers))
+
+
+if __name__ == "__main__":
+    main()
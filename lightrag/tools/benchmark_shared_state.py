@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the multi-process shared-state backends.
+
+Measures per-operation latency of the hot shared-state paths used by every
+worker (global lock acquire/release, update flag read, set_all_update_flags,
+keyed locks taken per key and as one batch of `--keys` keys) for the "manager"
+and "shm" backends of lightrag.kg.shared_storage.
+
+Usage:
+    python -m lightrag.tools.benchmark_shared_state
+    python -m lightrag.tools.benchmark_shared_state --iterations 20000 --flags 32 --keys 50000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from lightrag.kg import shared_storage
+from lightrag.kg.shared_storage import (
+    SHARED_STATE_BACKEND_MANAGER,
+    SHARED_STATE_BACKEND_SHM,
+    finalize_share_data,
+    get_internal_lock,
+    get_storage_keyed_lock,
+    get_update_flag,
+    initialize_share_data,
+    set_all_update_flags,
+)
+
+
+async def _time_op(op, iterations: int) -> dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await op()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+async def benchmark_backend(
+    backend: str, iterations: int, flags: int, keys: int
+) -> dict[str, dict[str, float]]:
+    """Run the benchmark suite against one backend and return latencies per operation."""
+    initialize_share_data(workers=2, backend=backend)
+    try:
+        shared_storage.set_default_workspace("")
+        update_flags = [await get_update_flag("bench") for _ in range(flags)]
+        flag = update_flags[0]
+
+        async def lock_cycle():
+            async with get_internal_lock():
+                pass
+
+        async def flag_read():
+            return flag.value
+
+        async def flag_broadcast():
+            await set_all_update_flags("bench")
+
+        entity_names = [f"entity-{i}" for i in range(keys)]
+
+        async def keyed_lock_cycle():
+            async with get_storage_keyed_lock(entity_names[0], namespace="GraphDB"):
+                pass
+
+        async def keyed_lock_batch():
+            async with get_storage_keyed_lock(entity_names, namespace="GraphDB"):
+                pass
+
+        return {
+            "lock acquire/release": await _time_op(lock_cycle, iterations),
+            "update flag read": await _time_op(flag_read, iterations),
+            f"set_all_update_flags ({flags} flags)": await _time_op(
+                flag_broadcast, max(1, iterations // 10)
+            ),
+            "keyed lock (1 key)": await _time_op(keyed_lock_cycle, iterations),
+            f"keyed lock batch ({keys} keys)": await _time_op(
+                keyed_lock_batch, max(1, iterations // 500)
+            ),
+        }
+    finally:
+        finalize_share_data()
+
+
+async def main_async(iterations: int, flags: int, keys: int) -> None:
+    results = {
+        backend: await benchmark_backend(backend, iterations, flags, keys)
+        for backend in (SHARED_STATE_BACKEND_MANAGER, SHARED_STATE_BACKEND_SHM)
+    }
+
+    print(
+        f"{'operation':<36} {'backend':<8} {'mean(us)':>10} {'p50(us)':>10} {'p99(us)':>10}"
+    )
+    for operation in results[SHARED_STATE_BACKEND_MANAGER]:
+        for backend, ops in results.items():
+            stats = ops[operation]
+            print(
+                f"{operation:<36} {backend:<8} {stats['mean_us']:>10.1f} "
+                f"{stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--flags", type=int, default=16)
+    parser.add_argument("--keys", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.iterations, args.flags, args.keys))
+
+
+if __name__ == "__main__":
+    main()
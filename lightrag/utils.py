@@ -4,16 +4,18 @@ import weakref
 import sys
 
 import asyncio
+import heapq
 import html
-import csv
 import inspect
 import json
 import logging
 import logging.handlers
+import numbers
 import os
 import re
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from functools import wraps
@@ -28,6 +30,7 @@ from typing import (
     Iterable,
     Sequence,
     Collection,
+    AsyncIterator,
 )
 import numpy as np
 from dotenv import load_dotenv
@@ -41,6 +44,23 @@ from lightrag.constants import (
     DEFAULT_SOURCE_IDS_LIMIT_METHOD,
     VALID_SOURCE_IDS_LIMIT_METHODS,
     SOURCE_IDS_LIMIT_METHOD_FIFO,
+    DEFAULT_RERANK_MAX_CANDIDATES,
+    DEFAULT_RERANK_CACHE_SIZE,
+    DEFAULT_STREAM_COALESCE_CHARS,
+    DEFAULT_STREAM_COALESCE_MS,
+    DEFAULT_EXPORT_BATCH_SIZE,
+)
+from lightrag.metrics import (
+    LLM_TOKENS_TOTAL,
+    QUEUE_DEPTH,
+    QUEUE_WAIT_SECONDS,
+    record_cache_lookup,
+    time_query_stage,
+)
+from lightrag.rate_limit import (
+    AdaptiveConcurrency,
+    LimitedCall,
+    TokenBucketLimiter,
 )
 
 # Precompile regex pattern for JSON sanitization (module-level, compiled once)
@@ -407,6 +427,108 @@ class TaskState:
     cleanup_done: bool = False
 
 
+class _LaneQueue:
+    """Priority queue with an interactive lane for priority_limit_async_func_call
+
+    Items are (priority, count, ...) tuples as in asyncio.PriorityQueue. Items
+    at or below `lane_priority` form the interactive lane: reserved workers only
+    take those, and a worker holding a bulk call that still waits for admission
+    can claim_worker() when interactive calls wait with no idle worker, then
+    swap() its call for the most urgent one.
+    """
+
+    def __init__(self, maxsize: int = 0, lane_priority: int = 5):
+        self.maxsize = maxsize
+        self.lane_priority = lane_priority
+        self._heap: list[tuple] = []
+        self._changed = asyncio.Condition()
+        self._interactive = 0
+        self._idle_workers = 0
+        self._claims = 0
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def lane_of(self, priority: int) -> str:
+        return "interactive" if priority <= self.lane_priority else "bulk"
+
+    def qsize(self) -> int:
+        return len(self._heap)
+
+    def lane_sizes(self) -> dict[str, int]:
+        return {
+            "interactive": self._interactive,
+            "bulk": len(self._heap) - self._interactive,
+        }
+
+    def _push(self, item: tuple) -> None:
+        heapq.heappush(self._heap, item)
+        if item[0] <= self.lane_priority:
+            self._interactive += 1
+        self._changed.notify_all()
+
+    def _pop(self) -> tuple:
+        item = heapq.heappop(self._heap)
+        if item[0] <= self.lane_priority:
+            self._interactive -= 1
+        self._changed.notify_all()
+        return item
+
+    async def put(self, item: tuple) -> None:
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self.maxsize <= 0 or len(self._heap) < self.maxsize
+            )
+            self._unfinished += 1
+            self._finished.clear()
+            self._push(item)
+
+    async def get(self, interactive_only: bool = False) -> tuple:
+        async with self._changed:
+            self._idle_workers += 1
+            try:
+                await self._changed.wait_for(
+                    lambda: (
+                        self._heap
+                        and (
+                            not interactive_only
+                            or self._heap[0][0] <= self.lane_priority
+                        )
+                    )
+                )
+            finally:
+                self._idle_workers -= 1
+            return self._pop()
+
+    async def claim_worker(self) -> None:
+        """Wait until an interactive call has no worker to run it, and claim it"""
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self._interactive > self._claims and self._idle_workers == 0
+            )
+            self._claims += 1
+
+    async def release_claim(self) -> None:
+        async with self._changed:
+            self._claims -= 1
+            self._changed.notify_all()
+
+    async def swap(self, item: tuple) -> tuple:
+        """Requeue the call of a claimed worker and take the most urgent one"""
+        async with self._changed:
+            self._claims -= 1
+            self._push(item)
+            return self._pop()
+
+    def task_done(self) -> None:
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        await self._finished.wait()
+
+
 @dataclass
 class EmbeddingFunc:
     """Embedding function wrapper with dimension validation
@@ -621,6 +743,12 @@ def priority_limit_async_func_call(
     max_queue_size: int = 1000,
     cleanup_timeout: float = 2.0,
     queue_name: str = "limit_async",
+    rate_limiter: TokenBucketLimiter | None = None,
+    concurrency: AdaptiveConcurrency | None = None,
+    token_estimator: Callable[[tuple, dict], int] | None = None,
+    reserved_workers: int = 0,
+    lane_priority: int = 5,
+    preempt: bool = False,
 ):
     """
     Enhanced priority-limited asynchronous function call decorator with robust timeout handling
@@ -630,6 +758,7 @@ def priority_limit_async_func_call(
     - Task state tracking to prevent race conditions
     - Enhanced health check system with stuck task detection
     - Proper resource cleanup and error recovery
+    - An interactive lane (priority <= lane_priority, e.g. queries) with reserved workers
 
     Args:
         max_size: Maximum number of concurrent calls
@@ -639,6 +768,13 @@ def priority_limit_async_func_call(
         max_task_duration: Maximum time before health check intervenes (defaults to llm_timeout + 60s)
         cleanup_timeout: Maximum time to wait for cleanup operations (defaults to 2.0s)
         queue_name: Optional queue name for logging identification (defaults to "limit_async")
+        rate_limiter: Optional requests/tokens per minute budget applied before each call
+        concurrency: Optional adaptive limit on calls in flight (at most max_size)
+        token_estimator: Estimates the tokens of a call from (args, kwargs) for rate_limiter
+        reserved_workers: Workers out of max_size that only run interactive-lane calls (defaults to 0)
+        lane_priority: Highest _priority value of the interactive lane (defaults to 5, used by queries)
+        preempt: Let bulk calls still waiting for rate_limiter/concurrency admission give their
+            worker to interactive calls and go back to the queue (defaults to False)
 
     Returns:
         Decorator function
@@ -649,6 +785,10 @@ def priority_limit_async_func_call(
         if not callable(func):
             raise TypeError(f"Expected a callable object, got {type(func)}")
 
+        # Keep at least one worker for bulk calls
+        nonlocal reserved_workers
+        reserved_workers = max(0, min(reserved_workers, max_size - 1))
+
         # Calculate timeout hierarchy if llm_timeout is provided (Dynamic Timeout Calculation)
         if llm_timeout is not None:
             nonlocal max_execution_timeout, max_task_duration
@@ -661,8 +801,9 @@ def priority_limit_async_func_call(
                     llm_timeout * 2 + 15
                 )  # Reserved timeout buffer for health check phase
 
-        queue = asyncio.PriorityQueue(maxsize=max_queue_size)
+        queue = _LaneQueue(maxsize=max_queue_size, lane_priority=lane_priority)
         tasks = set()
+        reserved_tasks = set()
         initialization_lock = asyncio.Lock()
         counter = 0
         shutdown_event = asyncio.Event()
@@ -675,22 +816,62 @@ def priority_limit_async_func_call(
         active_futures = weakref.WeakSet()
         reinit_count = 0
 
-        async def worker():
+        def report_queue_depth():
+            for lane, depth in queue.lane_sizes().items():
+                QUEUE_DEPTH.set(depth, queue=queue_name, lane=lane)
+
+        async def _execute(args, kwargs):
+            # Execute function with timeout protection
+            if max_execution_timeout is not None:
+                return await asyncio.wait_for(
+                    func(*args, **kwargs), timeout=max_execution_timeout
+                )
+            return await func(*args, **kwargs)
+
+        async def admit_or_yield(admission):
+            """Admit a bulk call, or return False once an interactive call needs the worker"""
+            admit = asyncio.ensure_future(admission.admit())
+            claim = asyncio.ensure_future(queue.claim_worker())
+            try:
+                await asyncio.wait({admit, claim}, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                claim.cancel()
+                if admit.done() and not admit.cancelled() and not admit.exception():
+                    admission.abandon()
+                else:
+                    admit.cancel()
+                raise
+
+            if not admit.done():
+                admit.cancel()
+                await asyncio.wait({admit})
+                if admit.cancelled():
+                    # Keep the claim, the caller swaps its call
+                    return False
+            if claim.done() and not claim.cancelled():
+                await queue.release_claim()
+            else:
+                claim.cancel()
+            admit.result()
+            return True
+
+        async def worker(reserved=False):
             """Enhanced worker that processes tasks with proper timeout and state management"""
+            pending = None
             try:
                 while not shutdown_event.is_set():
                     try:
                         # Get task from queue with timeout for shutdown checking
-                        try:
-                            (
-                                priority,
-                                count,
-                                task_id,
-                                args,
-                                kwargs,
-                            ) = await asyncio.wait_for(queue.get(), timeout=1.0)
-                        except asyncio.TimeoutError:
-                            continue
+                        if pending is not None:
+                            item, pending = pending, None
+                        else:
+                            try:
+                                item = await asyncio.wait_for(
+                                    queue.get(interactive_only=reserved), timeout=1.0
+                                )
+                            except asyncio.TimeoutError:
+                                continue
+                        priority, count, task_id, args, kwargs = item
 
                         # Get task state and mark worker as started
                         async with task_states_lock:
@@ -698,11 +879,20 @@ def priority_limit_async_func_call(
                                 queue.task_done()
                                 continue
                             task_state = task_states[task_id]
+                            # A call given back by preemption was already picked up once
+                            first_pickup = not task_state.worker_started
                             task_state.worker_started = True
                             # Record execution start time when worker actually begins processing
                             task_state.execution_start_time = (
                                 asyncio.get_event_loop().time()
                             )
+                        report_queue_depth()
+                        if first_pickup:
+                            QUEUE_WAIT_SECONDS.observe(
+                                task_state.execution_start_time - task_state.start_time,
+                                queue=queue_name,
+                                lane=queue.lane_of(priority),
+                            )
 
                         # Check if task was cancelled before worker started
                         if (
@@ -714,14 +904,38 @@ def priority_limit_async_func_call(
                             queue.task_done()
                             continue
 
+                        requeued = False
                         try:
-                            # Execute function with timeout protection
-                            if max_execution_timeout is not None:
-                                result = await asyncio.wait_for(
-                                    func(*args, **kwargs), timeout=max_execution_timeout
-                                )
+                            admission = LimitedCall(
+                                rate_limiter,
+                                concurrency,
+                                estimated_tokens=token_estimator(args, kwargs)
+                                if token_estimator is not None
+                                and rate_limiter is not None
+                                else 0,
+                                priority=priority,
+                            )
+                            if admission.waits:
+                                # Waiting for a slot or for budget is not execution time
+                                task_state.execution_start_time = None
+                                if (
+                                    preempt
+                                    and priority > lane_priority
+                                    and not await admit_or_yield(admission)
+                                ):
+                                    logger.debug(
+                                        f"{queue_name}: Task {task_id} yields its worker to interactive calls"
+                                    )
+                                    requeued = True
+                                    pending = await queue.swap(item)
+                                    continue
+                                async with admission:
+                                    task_state.execution_start_time = (
+                                        asyncio.get_event_loop().time()
+                                    )
+                                    result = await _execute(args, kwargs)
                             else:
-                                result = await func(*args, **kwargs)
+                                result = await _execute(args, kwargs)
 
                             # Set result if future is still valid
                             if not task_state.future.done():
@@ -754,9 +968,10 @@ def priority_limit_async_func_call(
                                 task_state.future.set_exception(e)
                         finally:
                             # Clean up task state
-                            async with task_states_lock:
-                                task_states.pop(task_id, None)
-                            queue.task_done()
+                            if not requeued:
+                                async with task_states_lock:
+                                    task_states.pop(task_id, None)
+                                queue.task_done()
 
                     except Exception as e:
                         # Critical error in worker loop
@@ -816,20 +1031,14 @@ def priority_limit_async_func_call(
                     current_tasks = set(tasks)
                     done_tasks = {t for t in current_tasks if t.done()}
                     tasks.difference_update(done_tasks)
+                    reserved_tasks.difference_update(done_tasks)
 
-                    active_tasks_count = len(tasks)
-                    workers_needed = max_size - active_tasks_count
-
+                    workers_needed = max_size - len(tasks)
                     if workers_needed > 0:
                         logger.info(
                             f"{queue_name}: Creating {workers_needed} new workers"
                         )
-                        new_tasks = set()
-                        for _ in range(workers_needed):
-                            task = asyncio.create_task(worker())
-                            new_tasks.add(task)
-                            task.add_done_callback(tasks.discard)
-                        tasks.update(new_tasks)
+                        start_workers()
 
             except Exception as e:
                 logger.error(f"{queue_name}: Error in enhanced health check: {str(e)}")
@@ -837,6 +1046,23 @@ def priority_limit_async_func_call(
                 logger.debug(f"{queue_name}: Enhanced health check task exiting")
                 initialized = False
 
+        def start_workers():
+            """Start missing workers, the reserved ones first; returns how many"""
+            started = 0
+            for _ in range(reserved_workers - len(reserved_tasks)):
+                task = asyncio.create_task(worker(reserved=True))
+                tasks.add(task)
+                reserved_tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(reserved_tasks.discard)
+                started += 1
+            for _ in range(max_size - len(tasks)):
+                task = asyncio.create_task(worker())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                started += 1
+            return started
+
         async def ensure_workers():
             """Ensure worker system is initialized with enhanced error handling"""
             nonlocal initialized, worker_health_check_task, tasks, reinit_count
@@ -868,11 +1094,8 @@ def priority_limit_async_func_call(
                     )
 
                 # Create worker tasks
-                workers_needed = max_size - active_tasks_count
-                for _ in range(workers_needed):
-                    task = asyncio.create_task(worker())
-                    tasks.add(task)
-                    task.add_done_callback(tasks.discard)
+                reserved_tasks.difference_update(done_tasks)
+                workers_needed = start_workers()
 
                 # Start enhanced health check
                 worker_health_check_task = asyncio.create_task(enhanced_health_check())
@@ -998,6 +1221,7 @@ def priority_limit_async_func_call(
                         await queue.put(
                             (_priority, current_count, task_id, args, kwargs)
                         )
+                    report_queue_depth()
                 except asyncio.TimeoutError:
                     raise QueueFullError(
                         f"{queue_name}: Queue full, timeout after {_queue_timeout} seconds"
@@ -1397,6 +1621,7 @@ async def handle_cache(
     # Use flattened cache key format: {mode}:{cache_type}:{hash}
     flattened_key = generate_cache_key(mode, cache_type, args_hash)
     cache_entry = await hashing_kv.get_by_id(flattened_key)
+    record_cache_lookup(f"llm_{cache_type}", bool(cache_entry))
     if cache_entry:
         logger.debug(f"Flattened cache hit(key:{flattened_key})")
         content = cache_entry["return"]
@@ -1527,300 +1752,44 @@ async def aexport_data(
     output_path: str,
     file_format: str = "csv",
     include_vector_data: bool = False,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    progress_callback: Callable[[str, int], None] | None = None,
 ) -> None:
     """
     Asynchronously exports all entities, relations, and relationships to various formats.
 
+    Nodes and edges are streamed from the graph storage in batches and rows are
+    written incrementally (see lightrag.utils_export).
+
     Args:
         chunk_entity_relation_graph: Graph storage instance for entities and relations
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
+        file_format: Output format - "csv", "excel", "md", "txt", "jsonl", "parquet".
             - csv: Comma-separated values file
             - excel: Microsoft Excel file with multiple sheets
             - md: Markdown tables
             - txt: Plain text formatted output
+            - jsonl: One JSON object per row, with a "section" field
+            - parquet: One Parquet file, rows tagged with a "section" column
         include_vector_data: Whether to include data from the vector database.
+        batch_size: Nodes/edges fetched and rows written per batch.
+        progress_callback: Called as (section, rows_written) after every batch.
     """
-    # Collect data
-    entities_data = []
-    relations_data = []
-    relationships_data = []
-
-    # --- Entities ---
-    all_entities = await chunk_entity_relation_graph.get_all_labels()
-    for entity_name in all_entities:
-        # Get entity information from graph
-        node_data = await chunk_entity_relation_graph.get_node(entity_name)
-        source_id = node_data.get("source_id") if node_data else None
-
-        entity_info = {
-            "graph_data": node_data,
-            "source_id": source_id,
-        }
-
-        # Optional: Get vector database information
-        if include_vector_data:
-            entity_id = compute_mdhash_id(entity_name, prefix="ent-")
-            vector_data = await entities_vdb.get_by_id(entity_id)
-            entity_info["vector_data"] = vector_data
-
-        entity_row = {
-            "entity_name": entity_name,
-            "source_id": source_id,
-            "graph_data": str(
-                entity_info["graph_data"]
-            ),  # Convert to string to ensure compatibility
-        }
-        if include_vector_data and "vector_data" in entity_info:
-            entity_row["vector_data"] = str(entity_info["vector_data"])
-        entities_data.append(entity_row)
-
-    # --- Relations ---
-    for src_entity in all_entities:
-        for tgt_entity in all_entities:
-            if src_entity == tgt_entity:
-                continue
-
-            edge_exists = await chunk_entity_relation_graph.has_edge(
-                src_entity, tgt_entity
-            )
-            if edge_exists:
-                # Get edge information from graph
-                edge_data = await chunk_entity_relation_graph.get_edge(
-                    src_entity, tgt_entity
-                )
-                source_id = edge_data.get("source_id") if edge_data else None
-
-                relation_info = {
-                    "graph_data": edge_data,
-                    "source_id": source_id,
-                }
-
-                # Optional: Get vector database information
-                if include_vector_data:
-                    rel_id = compute_mdhash_id(src_entity + tgt_entity, prefix="rel-")
-                    vector_data = await relationships_vdb.get_by_id(rel_id)
-                    relation_info["vector_data"] = vector_data
-
-                relation_row = {
-                    "src_entity": src_entity,
-                    "tgt_entity": tgt_entity,
-                    "source_id": relation_info["source_id"],
-                    "graph_data": str(relation_info["graph_data"]),  # Convert to string
-                }
-                if include_vector_data and "vector_data" in relation_info:
-                    relation_row["vector_data"] = str(relation_info["vector_data"])
-                relations_data.append(relation_row)
-
-    # --- Relationships (from VectorDB) ---
-    all_relationships = await relationships_vdb.client_storage
-    for rel in all_relationships["data"]:
-        relationships_data.append(
-            {
-                "relationship_id": rel["__id__"],
-                "data": str(rel),  # Convert to string for compatibility
-            }
-        )
-
-    # Export based on format
-    if file_format == "csv":
-        # CSV export
-        with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-            # Entities
-            if entities_data:
-                csvfile.write("# ENTITIES\n")
-                writer = csv.DictWriter(csvfile, fieldnames=entities_data[0].keys())
-                writer.writeheader()
-                writer.writerows(entities_data)
-                csvfile.write("\n\n")
-
-            # Relations
-            if relations_data:
-                csvfile.write("# RELATIONS\n")
-                writer = csv.DictWriter(csvfile, fieldnames=relations_data[0].keys())
-                writer.writeheader()
-                writer.writerows(relations_data)
-                csvfile.write("\n\n")
-
-            # Relationships
-            if relationships_data:
-                csvfile.write("# RELATIONSHIPS\n")
-                writer = csv.DictWriter(
-                    csvfile, fieldnames=relationships_data[0].keys()
-                )
-                writer.writeheader()
-                writer.writerows(relationships_data)
-
-    elif file_format == "excel":
-        # Excel export
-        import pandas as pd
-
-        entities_df = pd.DataFrame(entities_data) if entities_data else pd.DataFrame()
-        relations_df = (
-            pd.DataFrame(relations_data) if relations_data else pd.DataFrame()
-        )
-        relationships_df = (
-            pd.DataFrame(relationships_data) if relationships_data else pd.DataFrame()
-        )
-
-        with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
-            if not entities_df.empty:
-                entities_df.to_excel(writer, sheet_name="Entities", index=False)
-            if not relations_df.empty:
-                relations_df.to_excel(writer, sheet_name="Relations", index=False)
-            if not relationships_df.empty:
-                relationships_df.to_excel(
-                    writer, sheet_name="Relationships", index=False
-                )
-
-    elif file_format == "md":
-        # Markdown export
-        with open(output_path, "w", encoding="utf-8") as mdfile:
-            mdfile.write("# LightRAG Data Export\n\n")
-
-            # Entities
-            mdfile.write("## Entities\n\n")
-            if entities_data:
-                # Write header
-                mdfile.write("| " + " | ".join(entities_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(entities_data[0].keys())) + " |\n"
-                )
-
-                # Write rows
-                for entity in entities_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in entity.values()) + " |\n"
-                    )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No entity data available*\n\n")
-
-            # Relations
-            mdfile.write("## Relations\n\n")
-            if relations_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relations_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(relations_data[0].keys())) + " |\n"
-                )
-
-                # Write rows
-                for relation in relations_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in relation.values()) + " |\n"
-                    )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No relation data available*\n\n")
-
-            # Relationships
-            mdfile.write("## Relationships\n\n")
-            if relationships_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relationships_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| "
-                    + " | ".join(["---"] * len(relationships_data[0].keys()))
-                    + " |\n"
-                )
-
-                # Write rows
-                for relationship in relationships_data:
-                    mdfile.write(
-                        "| "
-                        + " | ".join(str(v) for v in relationship.values())
-                        + " |\n"
-                    )
-            else:
-                mdfile.write("*No relationship data available*\n\n")
-
-    elif file_format == "txt":
-        # Plain text export
-        with open(output_path, "w", encoding="utf-8") as txtfile:
-            txtfile.write("LIGHTRAG DATA EXPORT\n")
-            txtfile.write("=" * 80 + "\n\n")
-
-            # Entities
-            txtfile.write("ENTITIES\n")
-            txtfile.write("-" * 80 + "\n")
-            if entities_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(e[k])) for e in entities_data))
-                    for k in entities_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in entities_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for entity in entities_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in entity.items()
-                    )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No entity data available\n\n")
-
-            # Relations
-            txtfile.write("RELATIONS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relations_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relations_data))
-                    for k in relations_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in relations_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for relation in relations_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relation.items()
-                    )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No relation data available\n\n")
-
-            # Relationships
-            txtfile.write("RELATIONSHIPS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relationships_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relationships_data))
-                    for k in relationships_data[0]
-                }
-                header = "  ".join(
-                    k.ljust(col_widths[k]) for k in relationships_data[0]
-                )
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for relationship in relationships_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relationship.items()
-                    )
-                    txtfile.write(row + "\n")
-            else:
-                txtfile.write("No relationship data available\n\n")
-
-    else:
-        raise ValueError(
-            f"Unsupported file format: {file_format}. Choose from: csv, excel, md, txt"
-        )
-    if file_format is not None:
-        print(f"Data exported to: {output_path} with format: {file_format}")
-    else:
-        print("Data displayed as table format")
+    from lightrag.utils_export import aexport_data as stream_export
+
+    await stream_export(
+        chunk_entity_relation_graph,
+        entities_vdb,
+        relationships_vdb,
+        output_path,
+        file_format,
+        include_vector_data,
+        batch_size=batch_size,
+        progress_callback=progress_callback,
+    )
+    print(f"Data exported to: {output_path} with format: {file_format}")
 
 
 def export_data(
@@ -1830,6 +1799,8 @@ def export_data(
     output_path: str,
     file_format: str = "csv",
     include_vector_data: bool = False,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    progress_callback: Callable[[str, int], None] | None = None,
 ) -> None:
     """
     Synchronously exports all entities, relations, and relationships to various formats.
@@ -1839,12 +1810,10 @@ def export_data(
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
-            - csv: Comma-separated values file
-            - excel: Microsoft Excel file with multiple sheets
-            - md: Markdown tables
-            - txt: Plain text formatted output
+        file_format: Output format - "csv", "excel", "md", "txt", "jsonl", "parquet".
         include_vector_data: Whether to include data from the vector database.
+        batch_size: Nodes/edges fetched and rows written per batch.
+        progress_callback: Called as (section, rows_written) after every batch.
     """
     try:
         loop = asyncio.get_event_loop()
@@ -1860,6 +1829,8 @@ def export_data(
             output_path,
             file_format,
             include_vector_data,
+            batch_size=batch_size,
+            progress_callback=progress_callback,
         )
     )
 
@@ -1933,6 +1904,52 @@ def remove_think_tags(text: str) -> str:
     ).strip()
 
 
+def prepare_llm_cache_call(
+    user_prompt: str,
+    system_prompt: str | None = None,
+    history_messages: list[dict[str, str]] | None = None,
+) -> tuple[str, str | None, list[dict[str, str]] | None, str]:
+    """Sanitize the inputs of an LLM call and build the prompt its cache key hashes
+
+    Shared by use_llm_func_with_cache and batch extraction, so results fetched
+    through a batch job land on the cache keys the realtime path looks up.
+
+    Returns:
+        tuple: (safe_user_prompt, safe_system_prompt, safe_history_messages, cache_prompt)
+    """
+    # Sanitize input text to prevent UTF-8 encoding errors for all LLM providers
+    safe_user_prompt = sanitize_text_for_encoding(user_prompt)
+    safe_system_prompt = (
+        sanitize_text_for_encoding(system_prompt) if system_prompt else None
+    )
+
+    # Sanitize history messages if provided
+    safe_history_messages = None
+    history = None
+    if history_messages:
+        safe_history_messages = []
+        for msg in history_messages:
+            safe_msg = msg.copy()
+            if "content" in safe_msg:
+                safe_msg["content"] = sanitize_text_for_encoding(safe_msg["content"])
+            safe_history_messages.append(safe_msg)
+        history = json.dumps(safe_history_messages, ensure_ascii=False)
+
+    prompt_parts = []
+    if safe_user_prompt:
+        prompt_parts.append(safe_user_prompt)
+    if safe_system_prompt:
+        prompt_parts.append(safe_system_prompt)
+    if history:
+        prompt_parts.append(history)
+    return (
+        safe_user_prompt,
+        safe_system_prompt,
+        safe_history_messages,
+        "\n".join(prompt_parts),
+    )
+
+
 async def use_llm_func_with_cache(
     user_prompt: str,
     use_llm_func: callable,
@@ -1967,35 +1984,11 @@ async def use_llm_func_with_cache(
             - For cache hits: (content, cache_create_time)
             - For cache misses: (content, current_timestamp)
     """
-    # Sanitize input text to prevent UTF-8 encoding errors for all LLM providers
-    safe_user_prompt = sanitize_text_for_encoding(user_prompt)
-    safe_system_prompt = (
-        sanitize_text_for_encoding(system_prompt) if system_prompt else None
+    safe_user_prompt, safe_system_prompt, safe_history_messages, _prompt = (
+        prepare_llm_cache_call(user_prompt, system_prompt, history_messages)
     )
 
-    # Sanitize history messages if provided
-    safe_history_messages = None
-    if history_messages:
-        safe_history_messages = []
-        for i, msg in enumerate(history_messages):
-            safe_msg = msg.copy()
-            if "content" in safe_msg:
-                safe_msg["content"] = sanitize_text_for_encoding(safe_msg["content"])
-            safe_history_messages.append(safe_msg)
-        history = json.dumps(safe_history_messages, ensure_ascii=False)
-    else:
-        history = None
-
     if llm_response_cache:
-        prompt_parts = []
-        if safe_user_prompt:
-            prompt_parts.append(safe_user_prompt)
-        if safe_system_prompt:
-            prompt_parts.append(safe_system_prompt)
-        if history:
-            prompt_parts.append(history)
-        _prompt = "\n".join(prompt_parts)
-
         arg_hash = compute_args_hash(_prompt)
         # Generate cache key for this LLM call
         cache_key = generate_cache_key("default", cache_type, arg_hash)
@@ -2559,9 +2552,14 @@ async def pick_by_vector_similarity(
 
 
 class TokenTracker:
-    """Track token usage for LLM calls."""
+    """Track token usage for LLM calls.
 
-    def __init__(self):
+    Usage is also added to the lightrag_llm_tokens_total metric, labelled with
+    `workspace`.
+    """
+
+    def __init__(self, workspace: str = ""):
+        self.workspace = workspace
         self.reset()
 
     def __enter__(self):
@@ -2583,8 +2581,14 @@ class TokenTracker:
         Args:
             token_counts: A dictionary containing prompt_tokens, completion_tokens, total_tokens
         """
-        self.prompt_tokens += token_counts.get("prompt_tokens", 0)
-        self.completion_tokens += token_counts.get("completion_tokens", 0)
+        prompt_tokens = token_counts.get("prompt_tokens", 0)
+        completion_tokens = token_counts.get("completion_tokens", 0)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        LLM_TOKENS_TOTAL.inc(prompt_tokens, workspace=self.workspace, type="prompt")
+        LLM_TOKENS_TOTAL.inc(
+            completion_tokens, workspace=self.workspace, type="completion"
+        )
 
         # If total_tokens is provided, use it directly; otherwise calculate the sum
         if "total_tokens" in token_counts:
@@ -2615,6 +2619,92 @@ class TokenTracker:
         )
 
 
+class RerankScoreCache:
+    """LRU cache of rerank scores keyed by (normalized query, chunk_id)."""
+
+    def __init__(self, max_size: int = DEFAULT_RERANK_CACHE_SIZE):
+        self.max_size = max_size
+        self._scores: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query_key: str, chunk_id: str) -> float | None:
+        score = self._scores.get((query_key, chunk_id))
+        if score is None:
+            self.misses += 1
+            return None
+        self._scores.move_to_end((query_key, chunk_id))
+        self.hits += 1
+        return score
+
+    def put(self, query_key: str, chunk_id: str, score: float) -> None:
+        self._scores[(query_key, chunk_id)] = score
+        self._scores.move_to_end((query_key, chunk_id))
+        while len(self._scores) > self.max_size:
+            self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        self._scores.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+# Rerank score caches per workspace (global_config is rebuilt with asdict() on
+# every query, so the cache cannot live inside it)
+_rerank_score_caches: dict[str, RerankScoreCache] = {}
+
+
+def get_rerank_score_cache(global_config: dict) -> RerankScoreCache | None:
+    """Return the rerank score cache for the workspace, or None if caching is disabled."""
+    max_size = global_config.get("rerank_cache_size", DEFAULT_RERANK_CACHE_SIZE)
+    if not max_size or max_size <= 0:
+        return None
+    workspace = global_config.get("workspace", "") or ""
+    cache = _rerank_score_caches.get(workspace)
+    if cache is None:
+        cache = RerankScoreCache(max_size)
+        _rerank_score_caches[workspace] = cache
+    else:
+        cache.max_size = max_size
+    return cache
+
+
+def normalize_rerank_query(query: str) -> str:
+    """Normalize a query for rerank cache lookups (case and whitespace insensitive)."""
+    return " ".join(query.split()).casefold()
+
+
+def prune_rerank_candidates(
+    chunks: list[dict], max_candidates: int | None
+) -> list[dict]:
+    """
+    Cap the number of chunks sent to the reranker.
+
+    When every chunk carries a vector similarity (`distance`), the lowest scoring
+    chunks are dropped. Otherwise chunks keep their round-robin merge order, which
+    already interleaves the best-ranked chunks of each retrieval source.
+
+    Args:
+        chunks: Deduplicated candidate chunks
+        max_candidates: Maximum number of candidates to keep (None or <= 0 keeps all)
+
+    Returns:
+        Pruned list of chunks
+    """
+    if not max_candidates or max_candidates <= 0 or len(chunks) <= max_candidates:
+        return chunks
+
+    # numbers.Real also covers numpy scalars returned by some vector storages
+    if all(isinstance(c.get("distance"), numbers.Real) for c in chunks):
+        ranked = sorted(chunks, key=lambda c: c["distance"], reverse=True)
+        return ranked[:max_candidates]
+
+    return chunks[:max_candidates]
+
+
 async def apply_rerank_if_enabled(
     query: str,
     retrieved_docs: list[dict],
@@ -2625,6 +2715,10 @@ async def apply_rerank_if_enabled(
     """
     Apply reranking to retrieved documents if rerank is enabled.
 
+    Scores of chunks already reranked for the same (normalized) query are served
+    from the workspace rerank score cache, and only the remaining chunks are sent
+    to the rerank model.
+
     Args:
         query: The search query
         retrieved_docs: List of retrieved documents
@@ -2646,54 +2740,87 @@ async def apply_rerank_if_enabled(
         return retrieved_docs
 
     try:
-        # Extract document content for reranking
-        document_texts = []
-        for doc in retrieved_docs:
-            # Try multiple possible content fields
-            content = (
-                doc.get("content")
-                or doc.get("text")
-                or doc.get("chunk_content")
-                or doc.get("document")
-                or str(doc)
-            )
-            document_texts.append(content)
-
-        # Call the new rerank function that returns index-based results
-        rerank_results = await rerank_func(
-            query=query,
-            documents=document_texts,
-            top_n=top_n,
-        )
-
-        # Process rerank results based on return format
-        if rerank_results and len(rerank_results) > 0:
-            # Check if results are in the new index-based format
-            if isinstance(rerank_results[0], dict) and "index" in rerank_results[0]:
-                # New format: [{"index": 0, "relevance_score": 0.85}, ...]
-                reranked_docs = []
-                for result in rerank_results:
-                    index = result["index"]
-                    relevance_score = result["relevance_score"]
-
-                    # Get original document and add rerank score
-                    if 0 <= index < len(retrieved_docs):
-                        doc = retrieved_docs[index].copy()
-                        doc["rerank_score"] = relevance_score
-                        reranked_docs.append(doc)
-
-                logger.info(
-                    f"Successfully reranked: {len(reranked_docs)} chunks from {len(retrieved_docs)} original chunks"
+        score_cache = get_rerank_score_cache(global_config)
+        query_key = normalize_rerank_query(query)
+
+        # Serve cached scores and collect documents that still need reranking
+        doc_scores: dict[int, float] = {}
+        pending_indices = []
+        for idx, doc in enumerate(retrieved_docs):
+            chunk_id = doc.get("chunk_id")
+            if score_cache is not None and chunk_id:
+                cached_score = score_cache.get(query_key, chunk_id)
+                if cached_score is not None:
+                    doc_scores[idx] = cached_score
+                    continue
+            pending_indices.append(idx)
+
+        if score_cache is not None:
+            record_cache_lookup("rerank_score", True, count=len(doc_scores))
+            record_cache_lookup("rerank_score", False, count=len(pending_indices))
+
+        if pending_indices:
+            # Extract document content for reranking
+            document_texts = []
+            for idx in pending_indices:
+                doc = retrieved_docs[idx]
+                # Try multiple possible content fields
+                content = (
+                    doc.get("content")
+                    or doc.get("text")
+                    or doc.get("chunk_content")
+                    or doc.get("document")
+                    or str(doc)
                 )
-                return reranked_docs
-            else:
+                document_texts.append(content)
+
+            # With the cache enabled every score is requested so that all of
+            # them can be cached; top_n is then applied locally
+            with time_query_stage("rerank"):
+                rerank_results = await rerank_func(
+                    query=query,
+                    documents=document_texts,
+                    top_n=None if score_cache is not None else top_n,
+                )
+
+            if rerank_results and not (
+                isinstance(rerank_results[0], dict) and "index" in rerank_results[0]
+            ):
                 # Legacy format: assume it's already reranked documents
                 logger.info(f"Using legacy rerank format: {len(rerank_results)} chunks")
                 return rerank_results[:top_n] if top_n else rerank_results
-        else:
+
+            # New format: [{"index": 0, "relevance_score": 0.85}, ...]
+            for result in rerank_results or []:
+                index = result["index"]
+                if 0 <= index < len(pending_indices):
+                    doc_idx = pending_indices[index]
+                    relevance_score = result["relevance_score"]
+                    doc_scores[doc_idx] = relevance_score
+                    chunk_id = retrieved_docs[doc_idx].get("chunk_id")
+                    if score_cache is not None and chunk_id:
+                        score_cache.put(query_key, chunk_id, relevance_score)
+
+        if not doc_scores:
             logger.warning("Rerank returned empty results, using original chunks")
             return retrieved_docs
 
+        # Get original documents and add rerank score
+        reranked_docs = []
+        for index in sorted(doc_scores, key=lambda i: doc_scores[i], reverse=True):
+            doc = retrieved_docs[index].copy()
+            doc["rerank_score"] = doc_scores[index]
+            reranked_docs.append(doc)
+        if top_n:
+            reranked_docs = reranked_docs[:top_n]
+
+        cached_count = len(retrieved_docs) - len(pending_indices)
+        logger.info(
+            f"Successfully reranked: {len(reranked_docs)} chunks from {len(retrieved_docs)} original chunks"
+            + (f" ({cached_count} scores from cache)" if cached_count else "")
+        )
+        return reranked_docs
+
     except Exception as e:
         logger.error(f"Error during reranking: {e}, using original chunks")
         return retrieved_docs
@@ -2728,6 +2855,14 @@ async def process_chunks_unified(
 
     # 1. Apply reranking if enabled and query is provided
     if query_param.enable_rerank and query and unique_chunks:
+        # Cap the rerank payload before sending it to the rerank model
+        if global_config.get("rerank_model_func"):
+            unique_chunks = prune_rerank_candidates(
+                unique_chunks,
+                global_config.get(
+                    "rerank_max_candidates", DEFAULT_RERANK_MAX_CANDIDATES
+                ),
+            )
         rerank_top_k = query_param.chunk_top_k or len(unique_chunks)
         unique_chunks = await apply_rerank_if_enabled(
             query=query,
@@ -3350,3 +3485,102 @@ def generate_reference_list_from_chunks(
         reference_list.append({"reference_id": str(i + 1), "file_path": file_path})
 
     return reference_list, updated_chunks
+
+
+async def _aclose_iterator(iterator: Any) -> None:
+    """Close an async iterator that supports it, e.g. an LLM response generator"""
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception as e:
+            logger.debug(f"Error closing stream: {e}")
+
+
+async def coalesce_text_stream(
+    stream: AsyncIterator[str],
+    min_chars: int = DEFAULT_STREAM_COALESCE_CHARS,
+    max_delay_ms: float = DEFAULT_STREAM_COALESCE_MS,
+) -> AsyncIterator[str]:
+    """Merge small LLM stream chunks into larger pieces without adding latency.
+
+    The first non-empty chunk is emitted immediately. After that, chunks are
+    buffered until the buffer holds `min_chars` characters or `max_delay_ms` has
+    passed since the previous emit; a slow upstream never holds buffered text
+    longer than `max_delay_ms`. No sleeps are involved: the only waiting is on
+    the upstream iterator.
+
+    Args:
+        stream: Async iterator of text chunks
+        min_chars: Flush threshold in characters (<= 0 disables coalescing)
+        max_delay_ms: Maximum time buffered text is held back
+
+    Yields:
+        Coalesced text chunks
+
+    Closing the returned generator early also closes `stream`.
+    """
+    if min_chars <= 0:
+        try:
+            async for chunk in stream:
+                if chunk:
+                    yield chunk
+        finally:
+            await _aclose_iterator(stream)
+        return
+
+    iterator = stream.__aiter__()
+    max_delay = max_delay_ms / 1000
+    buffer: list[str] = []
+    buffered_chars = 0
+    first = True
+    last_flush = time.perf_counter()
+    pending: asyncio.Future | None = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            timeout = None
+            if buffer:
+                timeout = max(0.0, max_delay - (time.perf_counter() - last_flush))
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+            if not done:
+                # Upstream is slow: release what we have
+                yield "".join(buffer)
+                buffer.clear()
+                buffered_chars = 0
+                last_flush = time.perf_counter()
+                continue
+
+            future, pending = pending, None
+            try:
+                chunk = future.result()
+            except StopAsyncIteration:
+                break
+            if not chunk:
+                continue
+
+            buffer.append(chunk)
+            buffered_chars += len(chunk)
+            if (
+                first
+                or buffered_chars >= min_chars
+                or time.perf_counter() - last_flush >= max_delay
+            ):
+                first = False
+                yield "".join(buffer)
+                buffer.clear()
+                buffered_chars = 0
+                last_flush = time.perf_counter()
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            # The upstream generator can only be closed once the read has stopped
+            await asyncio.wait({pending})
+        await _aclose_iterator(iterator)
@@ -0,0 +1,384 @@
+"""
+Streaming export of the knowledge graph.
+
+Entities and relations are read from the graph storage in batches
+(iter_all_nodes / iter_all_edges), their vector records are fetched with one
+get_by_ids call per batch, and rows are written as they arrive. With graph
+storages that stream their nodes and edges (Neo4j, Memgraph, MongoDB) memory
+use is bounded by the batch size rather than the graph size; the others load
+their node and edge lists once and are then exported batch by batch.
+"""
+
+from __future__ import annotations
+
+import csv
+import inspect
+import json
+import tempfile
+from typing import Any, AsyncIterator, Callable
+
+from .constants import DEFAULT_EXPORT_BATCH_SIZE
+from .utils import compute_mdhash_id, logger
+
+EXPORT_FORMATS = ("csv", "excel", "md", "txt", "jsonl", "parquet")
+
+# (section, title, singular) in export order
+_SECTIONS = (
+    ("entities", "Entities", "entity"),
+    ("relations", "Relations", "relation"),
+    ("relationships", "Relationships", "relationship"),
+)
+_TITLES = {section: title for section, title, _ in _SECTIONS}
+_SINGULAR = {section: singular for section, _, singular in _SECTIONS}
+
+# Parquet holds one schema per file, so all sections share these columns
+_PARQUET_COLUMNS = (
+    "section",
+    "entity_name",
+    "src_entity",
+    "tgt_entity",
+    "source_id",
+    "graph_data",
+    "vector_data",
+    "relationship_id",
+    "data",
+)
+
+
+class _ExportWriter:
+    """Writes sections of rows incrementally.
+
+    begin_section is called with the first batch of a section only, so sections
+    without rows get end_section(section, 0) alone.
+    """
+
+    def begin_section(self, section: str, fieldnames: list[str]) -> None:
+        pass
+
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def end_section(self, section: str, rows_written: int) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _CsvWriter(_ExportWriter):
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", newline="", encoding="utf-8")
+        self._writer = None
+        self._needs_separator = False
+
+    def begin_section(self, section, fieldnames):
+        if self._needs_separator:
+            self._file.write("\n\n")
+        self._file.write(f"# {section.upper()}\n")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+        self._writer.writeheader()
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def end_section(self, section, rows_written):
+        self._needs_separator = self._needs_separator or rows_written > 0
+
+    def close(self):
+        self._file.close()
+
+
+class _MarkdownWriter(_ExportWriter):
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._file.write("# LightRAG Data Export\n\n")
+
+    def begin_section(self, section, fieldnames):
+        self._file.write(f"## {_TITLES[section]}\n\n")
+        self._file.write("| " + " | ".join(fieldnames) + " |\n")
+        self._file.write("| " + " | ".join(["---"] * len(fieldnames)) + " |\n")
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._file.write("| " + " | ".join(str(v) for v in row.values()) + " |\n")
+
+    def end_section(self, section, rows_written):
+        if rows_written:
+            self._file.write("\n\n")
+        else:
+            self._file.write(f"## {_TITLES[section]}\n\n")
+            self._file.write(f"*No {_SINGULAR[section]} data available*\n\n")
+
+    def close(self):
+        self._file.close()
+
+
+class _TextWriter(_ExportWriter):
+    """Fixed-width columns need the widest value, so rows are spooled to a
+    temporary file and rendered when the section ends."""
+
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._file.write("LIGHTRAG DATA EXPORT\n")
+        self._file.write("=" * 80 + "\n\n")
+        self._spool = None
+        self._fieldnames: list[str] = []
+        self._widths: list[int] = []
+
+    def begin_section(self, section, fieldnames):
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._fieldnames = list(fieldnames)
+        self._widths = [len(k) for k in fieldnames]
+
+    def write_rows(self, rows):
+        for row in rows:
+            values = [str(v) for v in row.values()]
+            self._widths = [max(w, len(v)) for w, v in zip(self._widths, values)]
+            self._spool.write(json.dumps(values) + "\n")
+
+    def end_section(self, section, rows_written):
+        self._file.write(f"{section.upper()}\n")
+        self._file.write("-" * 80 + "\n")
+        if not rows_written:
+            self._file.write(f"No {_SINGULAR[section]} data available\n\n")
+            return
+
+        header = "  ".join(k.ljust(w) for k, w in zip(self._fieldnames, self._widths))
+        self._file.write(header + "\n")
+        self._file.write("-" * len(header) + "\n")
+        self._spool.seek(0)
+        for line in self._spool:
+            values = json.loads(line)
+            self._file.write(
+                "  ".join(v.ljust(w) for v, w in zip(values, self._widths)) + "\n"
+            )
+        self._file.write("\n\n")
+        self._spool.close()
+        self._spool = None
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+        self._file.close()
+
+
+class _ExcelWriter(_ExportWriter):
+    """One worksheet per section, written row by row in constant memory mode."""
+
+    def __init__(self, output_path: str):
+        import xlsxwriter
+
+        self._workbook = xlsxwriter.Workbook(output_path, {"constant_memory": True})
+        self._header_format = self._workbook.add_format({"bold": True})
+        self._worksheet = None
+        self._row = 0
+
+    def begin_section(self, section, fieldnames):
+        self._worksheet = self._workbook.add_worksheet(_TITLES[section])
+        self._worksheet.write_row(0, 0, fieldnames, self._header_format)
+        self._row = 1
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._worksheet.write_row(self._row, 0, [str(v) for v in row.values()])
+            self._row += 1
+
+    def close(self):
+        self._workbook.close()
+
+
+class _JsonlWriter(_ExportWriter):
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._section = None
+
+    def begin_section(self, section, fieldnames):
+        self._section = section
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._file.write(
+                json.dumps({"section": self._section, **row}, ensure_ascii=False) + "\n"
+            )
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter(_ExportWriter):
+    """Each batch becomes a row group of one file with a shared string schema."""
+
+    def __init__(self, output_path: str):
+        import pipmaster as pm
+
+        if not pm.is_installed("pyarrow"):
+            pm.install("pyarrow")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([(name, pa.string()) for name in _PARQUET_COLUMNS])
+        self._writer = pq.ParquetWriter(output_path, self._schema)
+        self._section = None
+
+    def begin_section(self, section, fieldnames):
+        self._section = section
+
+    def write_rows(self, rows):
+        table = self._pa.Table.from_pylist(
+            [
+                {"section": self._section, **{k: str(v) for k, v in row.items()}}
+                for row in rows
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+
+_WRITERS: dict[str, type[_ExportWriter]] = {
+    "csv": _CsvWriter,
+    "excel": _ExcelWriter,
+    "md": _MarkdownWriter,
+    "txt": _TextWriter,
+    "jsonl": _JsonlWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+async def _entity_rows(
+    graph, entities_vdb, include_vector_data: bool, batch_size: int
+) -> AsyncIterator[list[dict[str, Any]]]:
+    async for nodes in graph.iter_all_nodes(batch_size):
+        names = [str(node.get("id")) for node in nodes]
+        vectors = None
+        if include_vector_data:
+            vectors = await entities_vdb.get_by_ids(
+                [compute_mdhash_id(name, prefix="ent-") for name in names]
+            )
+
+        rows = []
+        for i, (name, node) in enumerate(zip(names, nodes)):
+            node_data = {k: v for k, v in node.items() if k != "id"}
+            row = {
+                "entity_name": name,
+                "source_id": node_data.get("source_id"),
+                "graph_data": str(node_data),
+            }
+            if vectors is not None:
+                row["vector_data"] = str(vectors[i])
+            rows.append(row)
+        yield rows
+
+
+async def _relation_rows(
+    graph, relationships_vdb, include_vector_data: bool, batch_size: int
+) -> AsyncIterator[list[dict[str, Any]]]:
+    # iter_all_edges yields each undirected edge once
+    async for edges in graph.iter_all_edges(batch_size):
+        batch = [
+            (str(edge.get("source")), str(edge.get("target")), edge) for edge in edges
+        ]
+
+        vectors = None
+        if include_vector_data and batch:
+            # Relation vectors are keyed by either direction of the pair
+            ids = [compute_mdhash_id(s + t, prefix="rel-") for s, t, _ in batch]
+            ids += [compute_mdhash_id(t + s, prefix="rel-") for s, t, _ in batch]
+            found = await relationships_vdb.get_by_ids(ids)
+            vectors = [
+                forward if forward is not None else reverse
+                for forward, reverse in zip(found[: len(batch)], found[len(batch) :])
+            ]
+
+        rows = []
+        for i, (src, tgt, edge) in enumerate(batch):
+            edge_data = {k: v for k, v in edge.items() if k not in ("source", "target")}
+            row = {
+                "src_entity": src,
+                "tgt_entity": tgt,
+                "source_id": edge_data.get("source_id"),
+                "graph_data": str(edge_data),
+            }
+            if vectors is not None:
+                row["vector_data"] = str(vectors[i])
+            rows.append(row)
+        yield rows
+
+
+async def _relationship_rows(
+    relationships_vdb, batch_size: int
+) -> AsyncIterator[list[dict[str, Any]]]:
+    # Raw records of the relationship vector DB (in-memory storages only)
+    storage = getattr(relationships_vdb, "client_storage", None)
+    if storage is None:
+        return
+    if inspect.isawaitable(storage):
+        storage = await storage
+    records = storage["data"]
+    for i in range(0, len(records), batch_size):
+        yield [
+            {"relationship_id": rel["__id__"], "data": str(rel)}
+            for rel in records[i : i + batch_size]
+        ]
+
+
+async def aexport_data(
+    chunk_entity_relation_graph,
+    entities_vdb,
+    relationships_vdb,
+    output_path: str,
+    file_format: str = "csv",
+    include_vector_data: bool = False,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    progress_callback: Callable[[str, int], None] | None = None,
+) -> None:
+    """Stream all entities, relations and relationships to `output_path`.
+
+    Args:
+        chunk_entity_relation_graph: Graph storage instance for entities and relations
+        entities_vdb: Vector database storage for entities
+        relationships_vdb: Vector database storage for relationships
+        output_path: The path to the output file (including extension).
+        file_format: One of EXPORT_FORMATS.
+        include_vector_data: Whether to include data from the vector database.
+        batch_size: Nodes/edges fetched and rows written per batch.
+        progress_callback: Called as (section, rows_written) after every batch.
+    """
+    if file_format not in _WRITERS:
+        raise ValueError(
+            f"Unsupported file format: {file_format}. Choose from: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    sections = {
+        "entities": _entity_rows(
+            chunk_entity_relation_graph, entities_vdb, include_vector_data, batch_size
+        ),
+        "relations": _relation_rows(
+            chunk_entity_relation_graph,
+            relationships_vdb,
+            include_vector_data,
+            batch_size,
+        ),
+        "relationships": _relationship_rows(relationships_vdb, batch_size),
+    }
+
+    writer = _WRITERS[file_format](output_path)
+    try:
+        for section, batches in sections.items():
+            rows_written = 0
+            async for rows in batches:
+                if not rows:
+                    continue
+                if rows_written == 0:
+                    writer.begin_section(section, list(rows[0].keys()))
+                writer.write_rows(rows)
+                rows_written += len(rows)
+                if progress_callback is not None:
+                    progress_callback(section, rows_written)
+            writer.end_section(section, rows_written)
+            logger.info(f"Exported {rows_written} {section} to {output_path}")
+    finally:
+        writer.close()
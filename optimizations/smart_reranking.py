@@ -2,6 +2,8 @@
 Smart Reranking System for LightRAG
 Reduces reranking overhead by 60% through selective application
 
+Note: SmartReranker delegates to the core planner in lightrag/query_planner.py.
+
 Author: AI Assistant
 Date: 2026-01-07
 Impact: HIGH - Saves 2-3s on simple queries, maintains quality on complex queries
@@ -148,30 +150,19 @@ class QueryClassifier:
 
 class SmartReranker:
     """
-    Smart reranking that adapts strategy based on query complexity
-
-    Performance Impact:
-    - SIMPLE queries: Skip reranking (saves 2-4s)
-    - MODERATE queries: Rerank top 30 only (saves 1-2s)
-    - COMPLEX queries: Full reranking (no time saved, but quality maintained)
+    Compatibility wrapper around the core adaptive query planner.
 
-    Expected Distribution:
-    - 40% SIMPLE (insurance FAQ, pricing)
-    - 35% MODERATE (single comparisons)
-    - 25% COMPLEX (multi-step analysis)
-
-    Overall Savings: 0.4 * 3s + 0.35 * 1.5s = 1.7s average
+    Complexity classification, rerank skipping and fast-path retrieval now live in
+    `lightrag.query_planner.QueryPlanner`, which runs inside `LightRAG.aquery_llm`
+    and `LightRAG.aquery_data` on keyword and vector-probe signals. This class
+    enables the planner on the wrapped instance and exposes its decisions in the
+    old response shape.
     """
 
     def __init__(self, rag):
         self.rag = rag
         self.classifier = QueryClassifier()
-        self.stats = {
-            "simple_queries": 0,
-            "moderate_queries": 0,
-            "complex_queries": 0,
-            "total_reranking_time_saved": 0.0
-        }
+        self.rag.query_planner.config["enabled"] = True
 
     async def query_with_smart_reranking(
         self,
@@ -180,7 +171,7 @@ class SmartReranker:
         top_k: int = 60
     ) -> Dict[str, Any]:
         """
-        Query with smart reranking based on complexity
+        Query with planner-selected retrieval settings
 
         Args:
             query: User query
@@ -192,110 +183,27 @@ class SmartReranker:
         """
         import time
 
-        # Classify query
-        complexity = self.classifier.classify(query)
-
-        # Update stats
-        if complexity == QueryComplexity.SIMPLE:
-            self.stats["simple_queries"] += 1
-        elif complexity == QueryComplexity.MODERATE:
-            self.stats["moderate_queries"] += 1
-        else:
-            self.stats["complex_queries"] += 1
-
-        # Configure reranking strategy
-        if complexity == QueryComplexity.SIMPLE:
-            # Skip reranking entirely
-            use_reranker = False
-            rerank_top_k = 0
-            time_saved = 3.0  # Estimated reranking time
-
-        elif complexity == QueryComplexity.MODERATE:
-            # Light reranking (top 30 only)
-            use_reranker = True
-            rerank_top_k = 30
-            time_saved = 1.5  # Partial reranking time
-
-        else:  # COMPLEX
-            # Full reranking
-            use_reranker = True
-            rerank_top_k = top_k
-            time_saved = 0.0
-
-        self.stats["total_reranking_time_saved"] += time_saved
-
-        # Build query parameters
-        param = QueryParam(
-            mode=mode,
-            top_k=top_k,
-            only_need_context=False
-        )
-
-        # Execute query
         start_time = time.time()
-
-        if use_reranker:
-            # Query with reranking
-            result = await self.rag.aquery(query, param=param)
-        else:
-            # Query without reranking (direct retrieval)
-            result = await self._query_without_reranking(query, param)
-
+        result = await self.rag.aquery_llm(
+            query, param=QueryParam(mode=mode, top_k=top_k, stream=False)
+        )
         elapsed = time.time() - start_time
 
-        # Add metadata
+        plan = result.get("metadata", {}).get("query_plan", {})
         return {
-            "response": result,
+            "response": result.get("llm_response", {}).get("content") or "",
             "metadata": {
-                "query_complexity": complexity.value,
-                "reranking_used": use_reranker,
-                "rerank_top_k": rerank_top_k,
-                "time_saved_estimate": time_saved,
+                "query_complexity": plan.get("complexity"),
+                "reranking_used": plan.get("enable_rerank"),
+                "rerank_top_k": plan.get("chunk_top_k"),
+                "query_plan": plan,
                 "total_time": elapsed
             }
         }
 
-    async def _query_without_reranking(
-        self,
-        query: str,
-        param: QueryParam
-    ) -> str:
-        """
-        Execute query without reranking step
-
-        This directly uses retrieval results without Cohere reranking
-        """
-        # Get raw retrieval results
-        # Note: This assumes LightRAG has a method to skip reranking
-        # You may need to modify LightRAG internals or use a custom method
-
-        # Option 1: Use bypass mode (no retrieval at all - not ideal)
-        # Option 2: Monkey-patch reranker to pass-through
-        # Option 3: Add skip_reranking parameter to LightRAG
-
-        # For now, we'll use the standard query but with a flag
-        # You need to modify LightRAG to support skip_reranking
-        return await self.rag.aquery(query, param=param)
-
     def get_stats(self) -> Dict[str, Any]:
-        """Get reranking statistics"""
-        total_queries = (
-            self.stats["simple_queries"] +
-            self.stats["moderate_queries"] +
-            self.stats["complex_queries"]
-        )
-
-        if total_queries == 0:
-            return self.stats
-
-        return {
-            **self.stats,
-            "total_queries": total_queries,
-            "simple_percentage": f"{self.stats['simple_queries'] / total_queries * 100:.1f}%",
-            "moderate_percentage": f"{self.stats['moderate_queries'] / total_queries * 100:.1f}%",
-            "complex_percentage": f"{self.stats['complex_queries'] / total_queries * 100:.1f}%",
-            "avg_time_saved_per_query": f"{self.stats['total_reranking_time_saved'] / total_queries:.2f}s"
-        }
+        """Get query planner statistics"""
+        return self.rag.query_planner.get_stats()
 
 
 # Integration with FastAPI
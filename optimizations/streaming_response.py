@@ -8,8 +8,8 @@ Impact: CRITICAL - Immediate UX improvement
 """
 
 from typing import AsyncGenerator
-import asyncio
 from lightrag import LightRAG, QueryParam
+from lightrag.constants import DEFAULT_STREAM_COALESCE_CHARS
 
 
 class StreamingOptimizer:
@@ -49,12 +49,14 @@ class StreamingOptimizer:
             stream=True  # Enable streaming!
         )
 
-        # Stream response
-        async for chunk in self.rag.aquery_stream(query, param=param):
-            yield chunk
-
-            # Small delay for smooth rendering
-            await asyncio.sleep(0.01)
+        # Stream response tokens as the LLM generates them (coalesced, no delays)
+        async for event in self.rag.aquery_stream(
+            query,
+            param=param,
+            coalesce_chars=DEFAULT_STREAM_COALESCE_CHARS,
+        ):
+            if event["type"] == "token":
+                yield event["content"]
 
 
 # FastAPI endpoint implementation
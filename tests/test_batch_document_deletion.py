@@ -0,0 +1,126 @@
+"""
+Unit tests for deleting several documents with LightRAG.adelete_by_doc_ids.
+
+Entities shared by the deleted documents must be analysed and rebuilt once for
+the whole batch instead of once per document.
+"""
+
+import numpy as np
+import pytest
+
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+DOCS = {
+    "alpha": "Alpha report. Hub works with Alpha.",
+    "beta": "Beta report. Hub works with Beta.",
+    "gamma": "Gamma report. Hub works with Gamma.",
+}
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def mock_llm_func(prompt, system_prompt=None, history_messages=[], **kwargs):
+    text = f"{system_prompt or ''}\n{prompt}"
+    for name in ("Gamma", "Beta", "Alpha"):
+        if f"{name} report" in text:
+            return f"""entity<|#|>Hub<|#|>organization<|#|>Hub is mentioned by {name}.
+entity<|#|>{name}<|#|>organization<|#|>{name} works with Hub.
+relation<|#|>Hub<|#|>{name}<|#|>partnership<|#|>Hub works with {name}.
+<|COMPLETE|>"""
+    return "Summary."
+
+
+async def mock_embedding_func(texts: list[str]) -> np.ndarray:
+    return np.random.rand(len(texts), 16)
+
+
+@pytest.fixture
+async def rag(tmp_path):
+    from lightrag import LightRAG
+
+    finalize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=mock_llm_func,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=16, max_token_size=8192, func=mock_embedding_func
+        ),
+        tokenizer=Tokenizer("mock-tokenizer", _CharTokenizer()),
+        entity_extract_max_gleaning=0,
+    )
+    await rag.initialize_storages()
+    await rag.ainsert(list(DOCS.values()), ids=list(DOCS))
+    yield rag
+    await rag.finalize_storages()
+    finalize_share_data()
+
+
+@pytest.mark.offline
+class TestBatchDocumentDeletion:
+    async def test_shared_entity_rebuilt_once(self, rag, monkeypatch):
+        import lightrag.lightrag as lightrag_module
+
+        rebuild_calls = []
+        original_rebuild = lightrag_module.rebuild_knowledge_from_chunks
+
+        async def counting_rebuild(**kwargs):
+            rebuild_calls.append(
+                (
+                    set(kwargs["entities_to_rebuild"]),
+                    set(kwargs["relationships_to_rebuild"]),
+                )
+            )
+            await original_rebuild(**kwargs)
+
+        monkeypatch.setattr(
+            lightrag_module, "rebuild_knowledge_from_chunks", counting_rebuild
+        )
+
+        async def no_single_reads(*args):
+            raise AssertionError("chunk tracking should be read in batch")
+
+        monkeypatch.setattr(rag.entity_chunks, "get_by_id", no_single_reads)
+        monkeypatch.setattr(rag.relation_chunks, "get_by_id", no_single_reads)
+
+        results = await rag.adelete_by_doc_ids(["alpha", "missing", "beta", "alpha"])
+
+        assert [(r.doc_id, r.status) for r in results] == [
+            ("alpha", "success"),
+            ("missing", "not_found"),
+            ("beta", "success"),
+        ]
+        assert rebuild_calls == [({"Hub"}, set())]
+
+        graph = rag.chunk_entity_relation_graph
+        assert await graph.has_node("Hub")
+        assert await graph.has_node("Gamma")
+        assert not await graph.has_node("Alpha")
+        assert not await graph.has_node("Beta")
+        assert await graph.has_edge("Hub", "Gamma")
+        hub_chunks = await rag.entity_chunks.get_by_ids(["Hub"])
+        assert hub_chunks[0]["count"] == 1
+
+        remaining = await rag.doc_status.get_by_ids(list(DOCS))
+        assert [doc is not None for doc in remaining] == [False, False, True]
+
+    async def test_rejected_while_pipeline_busy(self, rag):
+        from lightrag.kg.shared_storage import get_namespace_data
+
+        pipeline_status = await get_namespace_data(
+            "pipeline_status", workspace=rag.workspace
+        )
+        pipeline_status.update({"busy": True, "job_name": "Indexing files"})
+        try:
+            results = await rag.adelete_by_doc_ids(["alpha", "beta"])
+        finally:
+            pipeline_status["busy"] = False
+
+        assert [r.status for r in results] == ["not_allowed", "not_allowed"]
+        assert all(doc for doc in await rag.doc_status.get_by_ids(["alpha", "beta"]))
@@ -0,0 +1,186 @@
+"""
+Unit tests for offline batch extraction (lightrag/batch_extraction.py).
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from lightrag.batch_extraction import (
+    BATCH_FAILED,
+    LocalBatchBackend,
+    parse_batch_output,
+)
+from lightrag.base import DocStatus
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    get_namespace_data,
+    get_namespace_lock,
+)
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+DOCS = {
+    "alpha": "Alpha report. Hub works with Alpha.",
+    "beta": "Beta report. Hub works with Beta.",
+    "gamma": "Gamma report. Hub works with Gamma.",
+}
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+def make_llm(calls: list):
+    async def llm(prompt, system_prompt=None, history_messages=[], **kwargs):
+        history = " ".join(message["content"] for message in history_messages)
+        text = f"{system_prompt or ''}\n{history}\n{prompt}"
+        for name in ("Gamma", "Beta", "Alpha"):
+            if f"{name} report" in text:
+                calls.append((name, len(history_messages)))
+                return f"""entity<|#|>Hub<|#|>organization<|#|>Hub is mentioned by {name}.
+entity<|#|>{name}<|#|>organization<|#|>{name} works with Hub.
+relation<|#|>Hub<|#|>{name}<|#|>partnership<|#|>Hub works with {name}.
+<|COMPLETE|>"""
+        return "Summary."
+
+    return llm
+
+
+async def mock_embedding_func(texts: list[str]) -> np.ndarray:
+    return np.random.rand(len(texts), 16)
+
+
+@pytest.fixture
+async def realtime_calls():
+    return []
+
+
+@pytest.fixture
+async def rag(tmp_path, realtime_calls):
+    from lightrag import LightRAG
+
+    finalize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=make_llm(realtime_calls),
+        embedding_func=EmbeddingFunc(
+            embedding_dim=16, max_token_size=8192, func=mock_embedding_func
+        ),
+        tokenizer=Tokenizer("mock-tokenizer", _CharTokenizer()),
+        entity_extract_max_gleaning=1,
+        enable_llm_cache_for_entity_extract=True,
+    )
+    await rag.initialize_storages()
+    yield rag
+    await rag.finalize_storages()
+    finalize_share_data()
+
+
+class _FailingBackend(LocalBatchBackend):
+    async def status(self, job_id: str) -> str:
+        return BATCH_FAILED
+
+
+@pytest.mark.offline
+class TestBatchExtraction:
+    async def test_extraction_and_gleaning_come_from_batch_jobs(
+        self, rag, realtime_calls, tmp_path
+    ):
+        batch_calls = []
+        backend = LocalBatchBackend(make_llm(batch_calls), str(tmp_path / "jobs"))
+        rag.batch_extraction_poll_interval = 0.01
+
+        await rag.ainsert_batch(list(DOCS.values()), backend, ids=list(DOCS))
+
+        # Initial extraction without history, gleaning with it
+        assert sorted(batch_calls) == sorted(
+            [(name, 0) for name in ("Alpha", "Beta", "Gamma")]
+            + [(name, 2) for name in ("Alpha", "Beta", "Gamma")]
+        )
+        assert realtime_calls == []
+        assert len(os.listdir(tmp_path / "jobs")) == 2
+
+        node = await rag.chunk_entity_relation_graph.get_node("Hub")
+        assert len(node["source_id"].split("<SEP>")) == 3
+        assert await rag.chunk_entity_relation_graph.has_edge("Hub", "Gamma")
+
+    async def test_failed_job_falls_back_to_realtime_llm(
+        self, rag, realtime_calls, tmp_path
+    ):
+        batch_calls = []
+        backend = _FailingBackend(make_llm(batch_calls), str(tmp_path / "jobs"))
+        rag.batch_extraction_poll_interval = 0.01
+
+        await rag.ainsert_batch(DOCS["alpha"], backend, ids="alpha")
+
+        assert sorted(realtime_calls) == [("Alpha", 0), ("Alpha", 2)]
+        assert await rag.chunk_entity_relation_graph.has_node("Alpha")
+
+    async def test_batch_job_holds_the_pipeline(self, rag, realtime_calls, tmp_path):
+        pipeline_status = await get_namespace_data(
+            "pipeline_status", workspace=rag.workspace
+        )
+        seen = {}
+
+        class _ObservingBackend(LocalBatchBackend):
+            async def submit(self, input_path: str) -> str:
+                seen.setdefault("busy", pipeline_status["busy"])
+                # The regular pipeline must not take the documents meanwhile
+                await rag.apipeline_process_enqueue_documents()
+                seen.setdefault("processed", list(realtime_calls))
+                return await super().submit(input_path)
+
+        backend = _ObservingBackend(make_llm([]), str(tmp_path / "jobs"))
+        rag.batch_extraction_poll_interval = 0.01
+        await rag.apipeline_enqueue_documents(DOCS["alpha"], ids="alpha")
+
+        await rag.apipeline_batch_extract(backend)
+
+        assert seen == {"busy": True, "processed": []}
+        assert pipeline_status["busy"] is False
+        status = await rag.doc_status.get_by_id("alpha")
+        assert status["status"] == DocStatus.PENDING
+
+    async def test_busy_pipeline_skips_batch_extraction(self, rag, tmp_path):
+        batch_calls = []
+        backend = LocalBatchBackend(make_llm(batch_calls), str(tmp_path / "jobs"))
+        await rag.apipeline_enqueue_documents(DOCS["alpha"], ids="alpha")
+        pipeline_status = await get_namespace_data(
+            "pipeline_status", workspace=rag.workspace
+        )
+        async with get_namespace_lock("pipeline_status", workspace=rag.workspace):
+            pipeline_status["busy"] = True
+
+        result = await rag.apipeline_batch_extract(backend)
+
+        assert result == {"chunks": 0, "extract": 0, "gleaning": 0}
+        assert batch_calls == []
+        assert not os.path.exists(tmp_path / "jobs")
+        assert pipeline_status["busy"] is True
+
+    def test_failed_requests_are_skipped_in_output(self):
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": "ok",
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"content": "answer"}}]},
+                    },
+                }
+            ),
+            json.dumps(
+                {
+                    "custom_id": "limited",
+                    "response": {"status_code": 429, "body": {}},
+                }
+            ),
+            json.dumps({"custom_id": "broken", "error": {"message": "bad"}}),
+        ]
+        assert parse_batch_output(lines) == {"ok": "answer"}
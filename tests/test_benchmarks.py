@@ -0,0 +1,76 @@
+"""
+Unit tests for the end-to-end benchmark harness in benchmarks/.
+
+A tiny in-process run must insert every document and answer every query mode
+without failures, and the report comparison must flag regressions.
+"""
+
+import pytest
+
+from benchmarks import BenchmarkConfig, build_corpus, compare_reports, run_benchmark
+from benchmarks.corpus import ENTITY_PATTERN
+from benchmarks.stubs import extraction_result
+
+pytestmark = pytest.mark.offline
+
+
+class TestBenchmarks:
+    def test_corpus_is_deterministic(self):
+        first = build_corpus(num_docs=3, num_entities=20, num_queries=4, seed=5)
+        second = build_corpus(num_docs=3, num_entities=20, num_queries=4, seed=5)
+        assert first == second
+        assert len(set(first.queries)) == 4
+
+        result = extraction_result(first.documents[0])
+        names = set(ENTITY_PATTERN.findall(first.documents[0]))
+        assert {line.split("<|#|>")[1] for line in result.splitlines()[:-1]} == names
+        assert result.endswith("<|COMPLETE|>")
+
+    def test_small_run_reports_every_mode(self, tmp_path):
+        config = BenchmarkConfig(
+            num_docs=2,
+            sentences_per_doc=10,
+            num_entities=20,
+            num_queries=2,
+            llm_latency=0,
+            embedding_latency=0,
+            rerank_latency=0,
+            backends=["json-nano-networkx"],
+            working_dir=str(tmp_path),
+            in_process=True,
+        )
+        report = run_benchmark(config)
+
+        assert report["meta"]["config"]["num_docs"] == 2
+        (result,) = report["results"]
+        assert result["status"] == "ok"
+        assert result["insert"]["status_counts"]["processed"] == 2
+        assert result["insert"]["graph_nodes"] > 0
+        assert set(result["query"]) == set(config.modes)
+        for stats in result["query"].values():
+            assert stats["operations"] == 2
+            assert stats["failures"] == 0
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert result["model_calls"]["rerank"] > 0
+
+    def test_compare_flags_regressions(self):
+        def report(throughput, p95):
+            stats = {"throughput_per_s": throughput, "p95_ms": p95}
+            return {
+                "results": [
+                    {
+                        "backend": "b",
+                        "status": "ok",
+                        "insert": stats,
+                        "query": {"mix": stats},
+                    },
+                    {"backend": "skipped", "status": "skipped"},
+                ]
+            }
+
+        rows = compare_reports(report(10.0, 100.0), report(8.0, 105.0))
+        flagged = {(row["name"], row["metric"]) for row in rows if row["regression"]}
+        assert flagged == {
+            ("b/insert", "throughput_per_s"),
+            ("b/query/mix", "throughput_per_s"),
+        }
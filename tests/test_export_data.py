@@ -0,0 +1,213 @@
+"""
+Unit tests for the streaming knowledge graph export in lightrag/utils_export.py.
+"""
+
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc, aexport_data, compute_mdhash_id
+
+DIM = 8
+
+
+def make_embedding_func():
+    async def embed(texts, **kwargs):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(DIM)
+            vector[sum(map(ord, text)) % DIM] = 1.0
+            vector[len(text) % DIM] += 0.5
+            vectors.append(vector)
+        return np.array(vectors)
+
+    return EmbeddingFunc(embedding_dim=DIM, func=embed, model_name="test-model")
+
+
+@pytest.fixture
+async def storages(tmp_path, monkeypatch):
+    from lightrag.kg.nano_vector_db_impl import NanoVectorDBStorage
+    from lightrag.kg.networkx_impl import NetworkXStorage
+
+    finalize_share_data()
+    initialize_share_data()
+    config = {
+        "working_dir": str(tmp_path),
+        "embedding_batch_num": 4,
+        "vector_db_storage_cls_kwargs": {"cosine_better_than_threshold": 0.1},
+    }
+    graph = NetworkXStorage(
+        namespace="chunk_entity_relation",
+        global_config=config,
+        embedding_func=make_embedding_func(),
+        workspace="",
+    )
+    entities_vdb = NanoVectorDBStorage(
+        namespace="entities",
+        global_config=config,
+        embedding_func=make_embedding_func(),
+        workspace="",
+        meta_fields={"entity_name", "content"},
+    )
+    relationships_vdb = NanoVectorDBStorage(
+        namespace="relationships",
+        global_config=config,
+        embedding_func=make_embedding_func(),
+        workspace="",
+        meta_fields={"src_id", "tgt_id", "content"},
+    )
+    for storage in (graph, entities_vdb, relationships_vdb):
+        await storage.initialize()
+
+    for name in ("Alice", "Bob", "Carol"):
+        await graph.upsert_node(name, {"entity_type": "person", "source_id": "c1"})
+        await entities_vdb.upsert(
+            {
+                compute_mdhash_id(name, prefix="ent-"): {
+                    "entity_name": name,
+                    "content": name,
+                }
+            }
+        )
+    for src, tgt in (("Alice", "Bob"), ("Carol", "Bob")):
+        await graph.upsert_edge(src, tgt, {"weight": "1.0", "source_id": "c1"})
+        # Relation vectors may be keyed in either direction
+        await relationships_vdb.upsert(
+            {
+                compute_mdhash_id(tgt + src, prefix="rel-"): {
+                    "src_id": tgt,
+                    "tgt_id": src,
+                    "content": f"{src} knows {tgt}",
+                }
+            }
+        )
+
+    # The export must not probe every pair of labels
+    async def no_pair_probing(*args):
+        raise AssertionError("has_edge should not be called")
+
+    monkeypatch.setattr(graph, "has_edge", no_pair_probing)
+    yield graph, entities_vdb, relationships_vdb
+    finalize_share_data()
+
+
+def read_csv_sections(path):
+    sections = {}
+    current = None
+    with open(path, newline="", encoding="utf-8") as f:
+        lines = [line for line in f.read().splitlines() if line]
+    for line in lines:
+        if line.startswith("# "):
+            current = sections.setdefault(line[2:], [])
+        else:
+            current.append(line)
+    return {name: list(csv.DictReader(rows)) for name, rows in sections.items()}
+
+
+@pytest.mark.offline
+class TestExportData:
+    async def test_csv_with_vector_data(self, storages, tmp_path):
+        output = tmp_path / "export.csv"
+        await aexport_data(*storages, str(output), "csv", include_vector_data=True)
+
+        sections = read_csv_sections(output)
+        assert sorted(r["entity_name"] for r in sections["ENTITIES"]) == [
+            "Alice",
+            "Bob",
+            "Carol",
+        ]
+        assert all("entity_type" in r["graph_data"] for r in sections["ENTITIES"])
+        assert all(r["vector_data"] != "None" for r in sections["ENTITIES"])
+        # Each undirected edge once, with its vector found in reverse direction
+        pairs = sorted(
+            tuple(sorted((r["src_entity"], r["tgt_entity"])))
+            for r in sections["RELATIONS"]
+        )
+        assert pairs == [("Alice", "Bob"), ("Bob", "Carol")]
+        assert all(r["vector_data"] != "None" for r in sections["RELATIONS"])
+        assert len(sections["RELATIONSHIPS"]) == 2
+
+    async def test_jsonl_streams_batches_with_progress(self, storages, tmp_path):
+        output = tmp_path / "export.jsonl"
+        progress = []
+        await aexport_data(
+            *storages,
+            str(output),
+            "jsonl",
+            batch_size=1,
+            progress_callback=lambda section, n: progress.append((section, n)),
+        )
+
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [r["section"] for r in rows].count("entities") == 3
+        assert [r["section"] for r in rows].count("relations") == 2
+        assert progress[:3] == [("entities", 1), ("entities", 2), ("entities", 3)]
+        assert progress[-1] == ("relationships", 2)
+
+    async def test_edges_listed_in_both_directions_export_once(
+        self, storages, tmp_path
+    ):
+        graph = storages[0]
+        edges = await graph.get_all_edges()
+        reversed_edges = [
+            {**edge, "source": edge["target"], "target": edge["source"]}
+            for edge in edges
+        ]
+
+        async def both_directions():
+            return edges + reversed_edges
+
+        graph.get_all_edges = both_directions
+        output = tmp_path / "export.jsonl"
+        await aexport_data(*storages, str(output), "jsonl", batch_size=1)
+
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [r["section"] for r in rows].count("relations") == 2
+
+    async def test_text_formats(self, storages, tmp_path):
+        md = tmp_path / "export.md"
+        txt = tmp_path / "export.txt"
+        await aexport_data(*storages, str(md), "md")
+        await aexport_data(*storages, str(txt), "txt")
+
+        md_text = md.read_text()
+        assert "## Entities" in md_text and "| entity_name | source_id" in md_text
+        assert md_text.count("| Alice | c1 |") == 1
+
+        lines = txt.read_text().splitlines()
+        header = lines[lines.index("ENTITIES") + 2]
+        rows = lines[lines.index("ENTITIES") + 4 : lines.index("ENTITIES") + 7]
+        # Fixed-width columns line up with the header
+        assert header.index("source_id") == rows[0].index("c1")
+        assert {row.split()[0] for row in rows} == {"Alice", "Bob", "Carol"}
+
+    async def test_excel_sheets(self, storages, tmp_path):
+        openpyxl = pytest.importorskip("openpyxl")
+        output = tmp_path / "export.xlsx"
+        await aexport_data(*storages, str(output), "excel")
+
+        workbook = openpyxl.load_workbook(output, read_only=True)
+        assert workbook.sheetnames == ["Entities", "Relations", "Relationships"]
+        assert workbook["Entities"].max_row == 4
+
+    async def test_parquet(self, storages, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        output = tmp_path / "export.parquet"
+        await aexport_data(*storages, str(output), "parquet", batch_size=2)
+
+        table = pq.read_table(output).to_pylist()
+        assert [r["section"] for r in table].count("entities") == 3
+        assert {r["entity_name"] for r in table if r["section"] == "entities"} == {
+            "Alice",
+            "Bob",
+            "Carol",
+        }
+
+    async def test_unsupported_format(self, storages, tmp_path):
+        output = tmp_path / "export.xml"
+        with pytest.raises(ValueError):
+            await aexport_data(*storages, str(output), "xml")
+        assert not output.exists()
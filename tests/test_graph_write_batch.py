@@ -0,0 +1,111 @@
+"""
+Unit tests for batched graph writes during ingestion.
+
+With graph_batch_writes enabled, merge_nodes_and_edges buffers the node and
+edge upserts of a document in a _GraphWriteBatch and writes them with one
+upsert_nodes_batch and one upsert_edges_batch call.
+"""
+
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.operate import _GraphWriteBatch
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def mock_llm(prompt, system_prompt=None, history_messages=[], **kwargs):
+    return """entity<|#|>Hub<|#|>organization<|#|>Hub is a company.
+entity<|#|>Alpha<|#|>organization<|#|>Alpha works with Hub.
+entity<|#|>Beta<|#|>organization<|#|>Beta works with Hub.
+relation<|#|>Hub<|#|>Alpha<|#|>partnership<|#|>Hub works with Alpha.
+relation<|#|>Beta<|#|>Hub<|#|>partnership<|#|>Hub works with Beta.
+<|COMPLETE|>"""
+
+
+async def mock_embedding_func(texts: list[str]) -> np.ndarray:
+    return np.random.rand(len(texts), 16)
+
+
+@pytest.fixture
+async def rag(tmp_path):
+    from lightrag import LightRAG
+
+    finalize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=mock_llm,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=16, max_token_size=8192, func=mock_embedding_func
+        ),
+        tokenizer=Tokenizer("mock-tokenizer", _CharTokenizer()),
+        entity_extract_max_gleaning=0,
+        graph_batch_writes=True,
+    )
+    await rag.initialize_storages()
+    yield rag
+    await rag.finalize_storages()
+    finalize_share_data()
+
+
+@pytest.mark.offline
+class TestGraphWriteBatch:
+    async def test_reads_are_served_from_the_buffer(self):
+        storage = AsyncMock()
+        storage.get_node.return_value = None
+        storage.has_edge.return_value = False
+        batch = _GraphWriteBatch(storage)
+
+        await batch.upsert_node("A", {"entity_id": "A", "description": "a"})
+        await batch.upsert_node("A", {"source_id": "c1"})
+        await batch.upsert_edge("B", "A", {"weight": 1.0})
+        await batch.upsert_edge("A", "B", {"weight": 2.0})
+
+        assert await batch.get_node("A") == {
+            "entity_id": "A",
+            "description": "a",
+            "source_id": "c1",
+        }
+        assert await batch.has_edge("A", "B")
+        assert await batch.get_edge("A", "B") == {"weight": 2.0}
+        assert await batch.get_node("C") is None
+        storage.upsert_node.assert_not_called()
+        storage.upsert_edge.assert_not_called()
+
+        await batch.flush()
+        storage.upsert_nodes_batch.assert_awaited_once_with(
+            {"A": {"entity_id": "A", "description": "a", "source_id": "c1"}}
+        )
+        # The edge keeps the direction of its first upsert
+        storage.upsert_edges_batch.assert_awaited_once_with(
+            [("B", "A", {"weight": 2.0})]
+        )
+
+    async def test_document_is_written_with_batch_calls(self, rag):
+        graph = rag.chunk_entity_relation_graph
+        graph.upsert_nodes_batch = AsyncMock(wraps=graph.upsert_nodes_batch)
+        graph.upsert_edges_batch = AsyncMock(wraps=graph.upsert_edges_batch)
+
+        await rag.ainsert("Hub works with Alpha and Beta.")
+
+        graph.upsert_nodes_batch.assert_awaited_once()
+        assert set(graph.upsert_nodes_batch.call_args.args[0]) == {
+            "Hub",
+            "Alpha",
+            "Beta",
+        }
+        graph.upsert_edges_batch.assert_awaited_once()
+        assert len(graph.upsert_edges_batch.call_args.args[0]) == 2
+        assert await graph.has_edge("Hub", "Beta")
+        node = await graph.get_node("Alpha")
+        assert node["entity_type"] == "organization"
@@ -0,0 +1,128 @@
+"""
+Unit tests for the striped storage keyed locks in lightrag/kg/shared_storage.py.
+"""
+
+import asyncio
+import multiprocessing as mp
+
+import pytest
+
+from lightrag.kg import shared_storage
+from lightrag.kg.shared_storage import (
+    SHARED_STATE_BACKEND_MANAGER,
+    SHARED_STATE_BACKEND_SHM,
+    finalize_share_data,
+    get_keyed_lock_status,
+    get_namespace_lock,
+    get_storage_keyed_lock,
+    initialize_share_data,
+)
+
+
+@pytest.fixture
+def shared_state(request, monkeypatch):
+    workers, backend = getattr(request, "param", (1, None))
+    monkeypatch.setenv("KEYED_LOCK_STRIPES", "64")
+    finalize_share_data()
+    initialize_share_data(workers=workers, backend=backend)
+    shared_storage.set_default_workspace("")
+    yield
+    finalize_share_data()
+
+
+def _child_takes_stripe(stripe, locked, release):
+    lock = shared_storage._lock_stripes[stripe]
+    with lock:
+        locked.set()
+        release.wait(10)
+
+
+@pytest.mark.offline
+class TestKeyedLockStriping:
+    async def test_batch_acquires_each_stripe_once(self, shared_state):
+        keys = [f"entity-{i}" for i in range(10_000)]
+        async with get_storage_keyed_lock(keys, namespace="GraphDB"):
+            status = get_keyed_lock_status()
+            assert status["lock_stripes"] == 64
+            assert status["striped_locks_held"] == 64
+            # No per-key bookkeeping
+            assert status["total_async_locks"] == 0
+
+        status = get_keyed_lock_status()
+        assert status["striped_locks_held"] == 0
+        metrics = status["striped_lock_metrics"]
+        assert (metrics["acquisitions"], metrics["keys"], metrics["stripes"]) == (
+            1,
+            10_000,
+            64,
+        )
+
+    async def test_same_key_serializes_and_counts_contention(self, shared_state):
+        events = []
+
+        async def worker(name, keys):
+            async with get_storage_keyed_lock(keys, namespace="GraphDB"):
+                events.append(f"{name} in")
+                await asyncio.sleep(0.02)
+                events.append(f"{name} out")
+
+        await asyncio.gather(worker("a", ["Hub", "Alpha"]), worker("b", ["Hub"]))
+
+        assert events == ["a in", "a out", "b in", "b out"]
+        metrics = get_keyed_lock_status()["striped_lock_metrics"]
+        assert metrics["contended"] == 1 and metrics["max_wait_seconds"] > 0.01
+
+    async def test_cancelled_waiter_releases_taken_stripes(self, shared_state):
+        keyed_lock = shared_storage._storage_keyed_lock
+        stripes = {keyed_lock.stripe_of("GraphDB", f"k{i}"): f"k{i}" for i in range(10)}
+        first, second = sorted(stripes)[:2]
+        low, high = stripes[first], stripes[second]
+
+        async with get_storage_keyed_lock([high], namespace="GraphDB"):
+            # Takes the lower stripe, then waits on the held one
+            waiter = asyncio.create_task(
+                get_storage_keyed_lock([low, high], namespace="GraphDB").__aenter__()
+            )
+            await asyncio.sleep(0.01)
+            assert keyed_lock._async_stripes[first].locked()
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        assert get_keyed_lock_status()["striped_locks_held"] == 0
+
+    async def test_namespace_locks_do_not_share_stripes(self, shared_state):
+        # A storage lock taken while holding a keyed lock must never collide
+        async with get_storage_keyed_lock(["Hub"], namespace="GraphDB"):
+            async with get_namespace_lock("pipeline_status"):
+                async with get_namespace_lock("entity_chunks"):
+                    pass
+
+    @pytest.mark.parametrize(
+        "shared_state",
+        [(2, SHARED_STATE_BACKEND_SHM), (2, SHARED_STATE_BACKEND_MANAGER)],
+        indirect=True,
+    )
+    async def test_stripes_are_shared_with_forked_workers(self, shared_state):
+        stripe = shared_storage._storage_keyed_lock.stripe_of("GraphDB", "Hub")
+
+        ctx = mp.get_context("fork")
+        locked, release = ctx.Event(), ctx.Event()
+        child = ctx.Process(target=_child_takes_stripe, args=(stripe, locked, release))
+        child.start()
+        try:
+            assert locked.wait(10)
+            acquire = asyncio.create_task(
+                get_storage_keyed_lock(["Hub"], namespace="GraphDB").__aenter__()
+            )
+            await asyncio.sleep(0.05)
+            assert not acquire.done()
+            release.set()
+            context = await asyncio.wait_for(acquire, timeout=10)
+            await context.__aexit__(None, None, None)
+        finally:
+            release.set()
+            child.join(timeout=10)
+        assert child.exitcode == 0
+        metrics = get_keyed_lock_status()["striped_lock_metrics"]
+        assert metrics["contended"] == 1
@@ -0,0 +1,207 @@
+"""
+Unit tests for the streaming knowledge rebuild and the extraction parser pool.
+"""
+
+from dataclasses import asdict
+
+import numpy as np
+import pytest
+
+from lightrag.extraction_parser import (
+    ExtractionItem,
+    aparse_extraction_results,
+    shutdown_parser_pool,
+)
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.utils import EmbeddingFunc, Tokenizer, compute_mdhash_id
+
+DOCS = {
+    "alpha": "Alpha report. Hub works with Alpha.",
+    "beta": "Beta report. Hub works with Beta.",
+    "gamma": "Gamma report. Hub works with Gamma.",
+}
+
+
+def extraction_output(name: str) -> str:
+    return f"""entity<|#|>Hub<|#|>organization<|#|>Hub is mentioned by {name}.
+entity<|#|>{name}<|#|>organization<|#|>{name} works with Hub.
+relation<|#|>Hub<|#|>{name}<|#|>partnership<|#|>Hub works with {name}.
+<|COMPLETE|>"""
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def mock_llm_func(prompt, system_prompt=None, history_messages=[], **kwargs):
+    text = f"{system_prompt or ''}\n{prompt}"
+    for name in ("Gamma", "Beta", "Alpha"):
+        if f"{name} report" in text:
+            return extraction_output(name)
+    return "Summary."
+
+
+async def mock_embedding_func(texts: list[str]) -> np.ndarray:
+    return np.random.rand(len(texts), 16)
+
+
+@pytest.fixture
+def parser_pool():
+    yield
+    shutdown_parser_pool()
+
+
+@pytest.fixture
+async def rag(tmp_path):
+    from lightrag import LightRAG
+
+    finalize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=mock_llm_func,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=16, max_token_size=8192, func=mock_embedding_func
+        ),
+        tokenizer=Tokenizer("mock-tokenizer", _CharTokenizer()),
+        entity_extract_max_gleaning=0,
+    )
+    await rag.initialize_storages()
+    await rag.ainsert(list(DOCS.values()), ids=list(DOCS))
+    yield rag
+    await rag.finalize_storages()
+    finalize_share_data()
+
+
+@pytest.mark.offline
+class TestExtractionParser:
+    async def test_pool_matches_inline(self, parser_pool):
+        items = [
+            ExtractionItem(extraction_output(name), f"chunk-{name}", 1, "doc.txt")
+            for name in ("Alpha", "Beta", "Gamma")
+        ]
+        items.append(ExtractionItem(None, "chunk-broken", 1))
+
+        inline = await aparse_extraction_results(items, max_workers=0)
+        pooled = await aparse_extraction_results(items, max_workers=2)
+
+        assert pooled[:3] == inline[:3]
+        nodes, edges = pooled[1]
+        assert nodes["Hub"][0]["description"] == "Hub is mentioned by Beta."
+        assert list(edges) == [("Hub", "Beta")]
+        # A malformed result fails alone instead of failing the batch
+        assert isinstance(inline[3], Exception) and isinstance(pooled[3], Exception)
+
+
+@pytest.mark.offline
+class TestKnowledgeRebuild:
+    @pytest.mark.parametrize("parse_max_workers", [0, 2])
+    async def test_rebuild_after_deletion(
+        self, rag, parser_pool, monkeypatch, parse_max_workers
+    ):
+        rag.parse_max_workers = parse_max_workers
+        rag.rebuild_batch_size = 2
+
+        upsert_calls = []
+        original_upsert = rag.entities_vdb.upsert
+
+        async def counting_upsert(data):
+            upsert_calls.append(set(data))
+            await original_upsert(data)
+
+        monkeypatch.setattr(rag.entities_vdb, "upsert", counting_upsert)
+
+        result = await rag.adelete_by_doc_id("alpha")
+        assert result.status == "success"
+
+        graph = rag.chunk_entity_relation_graph
+        hub = await graph.get_node("Hub")
+        assert "Beta" in hub["description"] and "Gamma" in hub["description"]
+        assert "Alpha" not in hub["description"]
+        assert len(hub["source_id"].split("<SEP>")) == 2
+        assert not await graph.has_edge("Hub", "Alpha")
+        assert await graph.has_edge("Hub", "Beta")
+        # Only Hub is rebuilt: Alpha and its relation were deleted
+        assert upsert_calls == [{compute_mdhash_id("Hub", prefix="ent-")}]
+
+    async def test_writes_are_batched(self, rag, monkeypatch):
+        calls = {"entities": 0, "relationships": 0, "nodes": 0}
+        for storage, key in (
+            (rag.entities_vdb, "entities"),
+            (rag.relationships_vdb, "relationships"),
+        ):
+            original = storage.upsert
+
+            async def counting_upsert(data, original=original, key=key):
+                calls[key] += 1
+                await original(data)
+
+            monkeypatch.setattr(storage, "upsert", counting_upsert)
+
+        graph = rag.chunk_entity_relation_graph
+        original_nodes_batch = graph.upsert_nodes_batch
+
+        async def counting_nodes_batch(nodes):
+            calls["nodes"] += 1
+            await original_nodes_batch(nodes)
+
+        monkeypatch.setattr(graph, "upsert_nodes_batch", counting_nodes_batch)
+
+        from lightrag.operate import rebuild_knowledge_from_chunks
+
+        hub = await graph.get_node("Hub")
+        chunk_ids = hub["source_id"].split("<SEP>")
+        await rebuild_knowledge_from_chunks(
+            entities_to_rebuild={"Hub": chunk_ids, "Beta": chunk_ids},
+            relationships_to_rebuild={
+                ("Hub", "Beta"): chunk_ids,
+                ("Hub", "Gamma"): chunk_ids,
+            },
+            knowledge_graph_inst=graph,
+            entities_vdb=rag.entities_vdb,
+            relationships_vdb=rag.relationships_vdb,
+            text_chunks_storage=rag.text_chunks,
+            llm_response_cache=rag.llm_response_cache,
+            global_config={**asdict(rag), "rebuild_batch_size": 100},
+            entity_chunks_storage=rag.entity_chunks,
+            relation_chunks_storage=rag.relation_chunks,
+        )
+
+        # Two entities and two relations, one storage call each
+        assert calls == {"entities": 1, "relationships": 1, "nodes": 1}
+
+    @pytest.mark.parametrize("gleaning", [0, 1])
+    async def test_extract_entities_parses_per_document_in_pool(
+        self, parser_pool, gleaning
+    ):
+        from lightrag.operate import extract_entities
+
+        chunks = {
+            f"chunk-{name}": {
+                "content": f"{name} report. Hub works with {name}.",
+                "file_path": "doc.txt",
+                "tokens": 8,
+                "full_doc_id": "doc",
+                "chunk_order_index": i,
+            }
+            for i, name in enumerate(("Alpha", "Beta", "Gamma"))
+        }
+
+        async def run(parse_max_workers):
+            results = await extract_entities(
+                chunks,
+                global_config={
+                    "llm_model_func": mock_llm_func,
+                    "entity_extract_max_gleaning": gleaning,
+                    "addon_params": {},
+                    "parse_max_workers": parse_max_workers,
+                },
+            )
+            return sorted((sorted(nodes), sorted(edges)) for nodes, edges in results)
+
+        inline = await run(0)
+        assert inline == await run(2)
+        assert ["Alpha", "Hub"] in [nodes for nodes, _ in inline]
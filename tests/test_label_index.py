@@ -0,0 +1,168 @@
+"""
+Unit tests for the label index behind NetworkXStorage.search_labels.
+
+Results must match the full scan the index replaces, including the tie-break
+order, while labels are added and removed.
+"""
+
+import os
+import random
+
+import pytest
+
+from lightrag.kg.label_index import LabelIndex
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+
+pytestmark = pytest.mark.offline
+
+
+def scan_labels(labels, query, limit):
+    """search_labels as a full scan over all labels"""
+    query_lower = query.lower().strip()
+    if not query_lower:
+        return []
+    matches = []
+    for label in labels:
+        label_lower = label.lower()
+        if query_lower not in label_lower:
+            continue
+        if label_lower == query_lower:
+            score = 1000
+        elif label_lower.startswith(query_lower):
+            score = 500
+        else:
+            score = 100 - len(label)
+            if f" {query_lower}" in label_lower or f"_{query_lower}" in label_lower:
+                score += 50
+        matches.append((label, score))
+    matches.sort(key=lambda x: (-x[1], x[0]))
+    return [label for label, _ in matches[:limit]]
+
+
+def random_labels(rng, count):
+    alphabet = "abAB _é"
+    return {
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+        for _ in range(count)
+    }
+
+
+QUERIES = ["a", "B", "ab", "a b", "_a", "aBa", "é", "ba_", "x", " "]
+
+
+class TestLabelIndex:
+    def test_search_matches_full_scan(self):
+        rng = random.Random(7)
+        labels = random_labels(rng, 3000)
+        index = LabelIndex(labels)
+
+        assert index.labels() == sorted(labels)
+        for query in QUERIES:
+            for limit in (1, 5, 50, 2000):
+                assert index.search(query, limit) == scan_labels(labels, query, limit)
+
+    def test_updates_keep_search_consistent(self):
+        rng = random.Random(11)
+        labels = random_labels(rng, 1000)
+        index = LabelIndex(labels)
+
+        for _ in range(5):
+            for label in rng.sample(sorted(labels), 200):
+                index.remove(label)
+                labels.discard(label)
+            for label in random_labels(rng, 300):
+                index.add(label)
+                labels.add(label)
+            # Removed and re-added before the next read
+            index.remove("abab")
+            index.add("abab")
+            labels.add("abab")
+
+            assert len(index) == len(labels)
+            assert index.labels() == sorted(labels)
+            for query in QUERIES:
+                assert index.search(query, 20) == scan_labels(labels, query, 20)
+
+    def test_saved_index_is_reused_only_for_its_graph_file(self, tmp_path):
+        file_name = str(tmp_path / "labels.pkl")
+        LabelIndex(["Alpha", "Beta"]).save(file_name, (10, 1))
+
+        loaded = LabelIndex.load(file_name, (10, 1))
+        assert loaded.labels() == ["Alpha", "Beta"]
+        assert loaded.search("lph") == ["Alpha"]
+        assert LabelIndex.load(file_name, (11, 1)) is None
+        assert LabelIndex.load(str(tmp_path / "missing.pkl"), (10, 1)) is None
+
+    def test_index_is_rewritten_only_when_labels_change(self, tmp_path, monkeypatch):
+        from lightrag.kg import label_index
+
+        written = []
+        dump = label_index._dump
+
+        def recording_dump(data, file_name):
+            written.append(os.path.basename(file_name))
+            dump(data, file_name)
+
+        monkeypatch.setattr(label_index, "_dump", recording_dump)
+        file_name = str(tmp_path / "labels.pkl")
+        index = LabelIndex(["Alpha", "Beta"])
+        index.save(file_name, (10, 1))
+        assert written == ["labels.pkl", "labels.pkl.stamp"]
+
+        # Unchanged labels and graph file: nothing is written
+        written.clear()
+        index.add("Alpha")
+        index.save(file_name, (10, 1))
+        assert written == []
+
+        # Graph file rewritten without label changes: only the stamp is renewed
+        index.save(file_name, (12, 2))
+        assert written == ["labels.pkl.stamp"]
+        loaded = LabelIndex.load(file_name, (12, 2))
+        assert loaded.labels() == ["Alpha", "Beta"]
+
+        written.clear()
+        loaded.save(file_name, (12, 2))
+        assert written == []
+        loaded.remove("Beta")
+        loaded.save(file_name, (13, 3))
+        assert written == ["labels.pkl", "labels.pkl.stamp"]
+        assert LabelIndex.load(file_name, (13, 3)).labels() == ["Alpha"]
+        assert LabelIndex.load(file_name, (12, 2)) is None
+
+    async def test_networkx_storage_persists_label_index(self, tmp_path):
+        from lightrag.kg.networkx_impl import NetworkXStorage
+
+        finalize_share_data()
+        initialize_share_data()
+
+        def make_storage():
+            return NetworkXStorage(
+                namespace="chunk_entity_relation",
+                global_config={"working_dir": str(tmp_path)},
+                embedding_func=None,
+                workspace="",
+            )
+
+        try:
+            storage = make_storage()
+            await storage.initialize()
+            await storage.upsert_node("Machine Learning", {"entity_type": "topic"})
+            await storage.upsert_edge("Deep Learning", "Machine Learning", {})
+            await storage.upsert_node("Learning", {"entity_type": "topic"})
+            await storage.delete_node("Deep Learning")
+            assert await storage.search_labels("learn") == [
+                "Learning",
+                "Machine Learning",
+            ]
+            assert await storage.index_done_callback()
+
+            reloaded = make_storage()
+            await reloaded.initialize()
+            assert reloaded._label_index.labels() == ["Learning", "Machine Learning"]
+            assert await reloaded.get_all_labels() == [
+                "Learning",
+                "Machine Learning",
+            ]
+        finally:
+            finalize_share_data()
@@ -0,0 +1,195 @@
+"""
+Unit tests for the in-process cross-encoder reranker.
+
+Tests LocalCrossEncoderReranker and local_rerank in lightrag/rerank.py with a
+fake model, covering dynamic batching across concurrent queries, the
+(query, chunk) score cache and the index-based result format.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from lightrag.rerank import (
+    LocalCrossEncoderReranker,
+    get_local_reranker,
+    local_rerank,
+)
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the number of query words found in the document."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append(list(pairs))
+        scores = []
+        for query, document in pairs:
+            words = query.lower().split()
+            hits = sum(1 for w in words if w in document.lower())
+            scores.append(hits / max(len(words), 1))
+        return scores
+
+
+def make_reranker(**kwargs):
+    reranker = LocalCrossEncoderReranker(model_name="fake", **kwargs)
+    reranker._model = FakeCrossEncoder()
+    return reranker
+
+
+@pytest.mark.offline
+class TestLocalCrossEncoderReranker:
+    async def test_scores_align_with_documents(self):
+        reranker = make_reranker()
+        scores = await reranker.score(
+            "capital france", ["Paris is the capital of France", "Tokyo", "capital"]
+        )
+        assert scores == [1.0, 0.0, 0.5]
+        reranker.shutdown()
+
+    async def test_concurrent_queries_share_one_batch(self):
+        reranker = make_reranker(batch_size=64, batch_wait_ms=20)
+        docs = [f"doc {i} about cats" for i in range(5)]
+
+        results = await asyncio.gather(
+            reranker.score("cats", docs),
+            reranker.score("dogs", docs),
+            reranker.score("doc", docs),
+        )
+
+        assert len(reranker._model.calls) == 1
+        assert len(reranker._model.calls[0]) == 15
+        assert results[0] == [1.0] * 5
+        assert results[1] == [0.0] * 5
+        reranker.shutdown()
+
+    async def test_batch_size_splits_model_calls(self):
+        reranker = make_reranker(batch_size=4, batch_wait_ms=50)
+        docs = [f"doc {i}" for i in range(10)]
+
+        scores = await reranker.score("doc", docs)
+
+        assert scores == [1.0] * 10
+        assert [len(call) for call in reranker._model.calls] == [4, 4, 2]
+        reranker.shutdown()
+
+    async def test_cache_hits_skip_inference(self):
+        reranker = make_reranker()
+        docs = ["alpha beta", "gamma"]
+
+        first = await reranker.score("alpha", docs)
+        second = await reranker.score("alpha", docs)
+
+        assert first == second
+        assert len(reranker._model.calls) == 1
+        assert reranker.cache_hits == 2
+        assert reranker.cache_misses == 2
+        reranker.shutdown()
+
+    async def test_cache_is_bounded(self):
+        reranker = make_reranker(cache_size=3)
+        await reranker.score("q", [f"doc {i}" for i in range(5)])
+        assert len(reranker._cache) == 3
+        reranker.shutdown()
+
+    async def test_model_error_propagates_to_all_waiters(self):
+        reranker = make_reranker()
+
+        def broken_predict(pairs, **kwargs):
+            raise RuntimeError("inference failed")
+
+        reranker._model.predict = broken_predict
+
+        with pytest.raises(RuntimeError, match="inference failed"):
+            await reranker.score("q", ["a", "b"])
+        reranker.shutdown()
+
+
+@pytest.mark.offline
+class TestLocalRerank:
+    def setup_method(self):
+        get_local_reranker.cache_clear()
+
+    def teardown_method(self):
+        get_local_reranker.cache_clear()
+
+    async def test_returns_sorted_index_results(self):
+        reranker = make_reranker()
+
+        with patch("lightrag.rerank.get_local_reranker", return_value=reranker):
+            results = await local_rerank(
+                query="capital france",
+                documents=["Tokyo", "Paris is the capital of France", "capital"],
+                top_n=2,
+                model="fake-model",
+            )
+
+        assert results == [
+            {"index": 1, "relevance_score": 1.0},
+            {"index": 2, "relevance_score": 0.5},
+        ]
+        reranker.shutdown()
+
+    async def test_chunking_aggregates_to_documents(self):
+        reranker = make_reranker()
+        long_doc = " ".join(["filler"] * 300 + ["needle"])
+
+        with patch("lightrag.rerank.get_local_reranker", return_value=reranker):
+            results = await local_rerank(
+                query="needle",
+                documents=[long_doc, "nothing here"],
+                model="fake-model",
+                enable_chunking=True,
+                max_tokens_per_doc=50,
+            )
+
+        assert results[0] == {"index": 0, "relevance_score": 1.0}
+        assert len(results) == 2
+        reranker.shutdown()
+
+    def test_instance_serves_successive_event_loops(self):
+        reranker = make_reranker(batch_wait_ms=50)
+        docs = ["cats and dogs", "birds"]
+
+        async def abandon_batch():
+            # Leaves pairs pending and a flush timer on a loop that then closes
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(reranker.score("cats", docs), 0.001)
+
+        async def score_concurrently():
+            return await asyncio.wait_for(
+                asyncio.gather(
+                    reranker.score("dogs", docs), reranker.score("birds", docs)
+                ),
+                1,
+            )
+
+        asyncio.run(abandon_batch())
+        results = asyncio.run(score_concurrently())
+
+        assert results == [[1.0, 0.0], [0.0, 1.0]]
+        assert len(reranker._model.calls) == 1
+        reranker.shutdown()
+
+    async def test_running_batches_are_referenced(self):
+        reranker = make_reranker(batch_wait_ms=0)
+        state = reranker._loop_state(asyncio.get_running_loop())
+
+        pending = asyncio.ensure_future(reranker.score("cats", ["cats"]))
+        while not state.tasks:
+            await asyncio.sleep(0)
+        assert await pending == [1.0]
+        await asyncio.sleep(0)
+        assert not state.tasks
+        reranker.shutdown()
+
+    def test_factory_reuses_instance(self):
+        first = get_local_reranker("fake-model")
+        assert get_local_reranker("fake-model") is first
+        first.shutdown()
+
+    async def test_empty_documents(self):
+        assert await local_rerank(query="q", documents=[], model="fake-model") == []
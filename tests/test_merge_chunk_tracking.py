@@ -0,0 +1,133 @@
+"""
+Unit tests for batched chunk tracking reads and writes in merge_nodes_and_edges.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.utils import EmbeddingFunc, Tokenizer, make_relation_chunk_key
+
+DOCS = {
+    "alpha": "Alpha report. Hub works with Alpha.",
+    "beta": "Beta report. Hub works with Beta.",
+    "gamma": "Gamma report. Hub works with Gamma.",
+}
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def mock_llm_func(prompt, system_prompt=None, history_messages=[], **kwargs):
+    text = f"{system_prompt or ''}\n{prompt}"
+    for name in ("Delta", "Gamma", "Beta", "Alpha"):
+        if f"{name} report" in text:
+            return f"""entity<|#|>Hub<|#|>organization<|#|>Hub is mentioned by {name}.
+entity<|#|>{name}<|#|>organization<|#|>{name} works with Hub.
+relation<|#|>Hub<|#|>{name}<|#|>partnership<|#|>Hub works with {name}.
+relation<|#|>{name}<|#|>Registry<|#|>listing<|#|>{name} is listed in the Registry.
+<|COMPLETE|>"""
+    return "Summary."
+
+
+async def mock_embedding_func(texts: list[str]) -> np.ndarray:
+    return np.random.rand(len(texts), 16)
+
+
+@pytest.fixture
+async def rag(tmp_path):
+    from lightrag import LightRAG
+
+    finalize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=mock_llm_func,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=16, max_token_size=8192, func=mock_embedding_func
+        ),
+        tokenizer=Tokenizer("mock-tokenizer", _CharTokenizer()),
+        entity_extract_max_gleaning=0,
+    )
+    await rag.initialize_storages()
+    yield rag
+    await rag.finalize_storages()
+    finalize_share_data()
+
+
+@pytest.mark.offline
+class TestMergeChunkTracking:
+    async def test_one_read_and_write_per_document(self, rag, monkeypatch):
+        await rag.ainsert(list(DOCS.values()), ids=list(DOCS))
+
+        calls = []
+        for storage in (rag.entity_chunks, rag.relation_chunks):
+            original_get_by_ids = storage.get_by_ids
+            original_upsert = storage.upsert
+
+            async def no_single_reads(*args):
+                raise AssertionError("chunk tracking should be read in batch")
+
+            async def counting_get_by_ids(
+                ids, original=original_get_by_ids, namespace=storage.namespace
+            ):
+                calls.append(("get_by_ids", namespace))
+                return await original(ids)
+
+            async def counting_upsert(
+                data, original=original_upsert, namespace=storage.namespace
+            ):
+                calls.append(("upsert", namespace))
+                await original(data)
+
+            monkeypatch.setattr(storage, "get_by_id", no_single_reads)
+            monkeypatch.setattr(storage, "get_by_ids", counting_get_by_ids)
+            monkeypatch.setattr(storage, "upsert", counting_upsert)
+
+        await rag.ainsert("Delta report. Hub works with Delta.", ids="delta")
+
+        # Prefetch, re-read on flush and one upsert per storage
+        for storage in (rag.entity_chunks, rag.relation_chunks):
+            assert calls.count(("get_by_ids", storage.namespace)) == 2
+            assert calls.count(("upsert", storage.namespace)) == 1
+
+        monkeypatch.undo()
+        hub, registry = await rag.entity_chunks.get_by_ids(["Hub", "Registry"])
+        assert hub["count"] == 4 and registry["count"] == 4
+        (relation,) = await rag.relation_chunks.get_by_ids(
+            [make_relation_chunk_key("Hub", "Delta")]
+        )
+        assert relation["count"] == 1
+
+    async def test_concurrent_documents_keep_all_chunks(self, rag):
+        await asyncio.gather(
+            *(rag.ainsert(text, ids=doc_id) for doc_id, text in DOCS.items())
+        )
+
+        hub, registry = await rag.entity_chunks.get_by_ids(["Hub", "Registry"])
+        assert hub["count"] == 3 and registry["count"] == 3
+        node = await rag.chunk_entity_relation_graph.get_node("Hub")
+        assert len(node["source_id"].split("<SEP>")) == 3
+
+    async def test_failed_merge_keeps_chunk_lists_of_written_nodes(
+        self, rag, monkeypatch
+    ):
+        import lightrag.operate as operate
+
+        async def failing_edge_merge(*args, **kwargs):
+            raise RuntimeError("relation merge failed")
+
+        monkeypatch.setattr(operate, "_merge_edges_then_upsert", failing_edge_merge)
+        await rag.ainsert(DOCS["alpha"], ids="alpha")
+
+        # Phase 1 wrote the nodes before phase 2 failed; their chunk lists
+        # must match the graph for later deletion and rebuild
+        node = await rag.chunk_entity_relation_graph.get_node("Alpha")
+        (tracked,) = await rag.entity_chunks.get_by_ids(["Alpha"])
+        assert tracked["chunk_ids"] == node["source_id"].split("<SEP>")
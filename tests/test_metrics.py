@@ -0,0 +1,149 @@
+"""
+Unit tests for the in-process Prometheus metrics.
+
+Tests the registry and exposition format in lightrag/metrics.py and the
+instrumentation hooks in priority_limit_async_func_call, apply_rerank_if_enabled
+and TokenTracker.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.metrics import (
+    CACHE_REQUESTS_TOTAL,
+    LLM_TOKENS_TOTAL,
+    QUERY_STAGE_SECONDS,
+    QUEUE_WAIT_SECONDS,
+    REGISTRY,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    metrics_labels,
+    render_metrics,
+    time_query_stage,
+)
+from lightrag.utils import (
+    TokenTracker,
+    _rerank_score_caches,
+    apply_rerank_if_enabled,
+    priority_limit_async_func_call,
+)
+
+
+@pytest.mark.offline
+class TestRegistry:
+    def test_histogram_exposition(self):
+        registry = MetricsRegistry()
+        hist = registry.register(
+            Histogram("test_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+        )
+        hist.observe(0.05, stage="a")
+        hist.observe(0.5, stage="a")
+        hist.observe(5, stage="a")
+
+        text = registry.render()
+        assert "# TYPE test_seconds histogram" in text
+        assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+        assert 'test_seconds_bucket{stage="a",le="1"} 2' in text
+        assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in text
+        assert 'test_seconds_count{stage="a"} 3' in text
+        assert 'test_seconds_sum{stage="a"} 5.55' in text
+
+    def test_counter_and_label_escaping(self):
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("test_total", "Test.", ("name",)))
+        counter.inc(name='a"b')
+        counter.inc(2, name='a"b')
+        assert 'test_total{name="a\\"b"} 3' in registry.render()
+
+    def test_duplicate_registration_fails(self):
+        registry = MetricsRegistry()
+        registry.register(Counter("dup_total", "Test."))
+        with pytest.raises(ValueError):
+            registry.register(Counter("dup_total", "Test."))
+
+
+@pytest.mark.offline
+class TestInstrumentation:
+    def setup_method(self):
+        REGISTRY.clear()
+        _rerank_score_caches.clear()
+
+    def teardown_method(self):
+        REGISTRY.clear()
+        _rerank_score_caches.clear()
+
+    def test_stage_timer_uses_context_labels(self):
+        with metrics_labels(workspace="ws", mode="mix"):
+            with time_query_stage("context_build"):
+                pass
+        assert (
+            QUERY_STAGE_SECONDS.get_count(
+                workspace="ws", mode="mix", stage="context_build"
+            )
+            == 1
+        )
+        assert "lightrag_query_stage_seconds_count" in render_metrics()
+
+    async def test_labels_are_task_local(self):
+        async def query(workspace):
+            with metrics_labels(workspace=workspace, mode="naive"):
+                await asyncio.sleep(0)
+                with time_query_stage("total"):
+                    await asyncio.sleep(0)
+
+        await asyncio.gather(query("a"), query("b"))
+        for workspace in ("a", "b"):
+            assert (
+                QUERY_STAGE_SECONDS.get_count(
+                    workspace=workspace, mode="naive", stage="total"
+                )
+                == 1
+            )
+
+    async def test_priority_queue_wait_is_recorded(self):
+        @priority_limit_async_func_call(2, queue_name="test_queue")
+        async def func(x):
+            await asyncio.sleep(0.01)
+            return x
+
+        assert await asyncio.gather(*(func(i) for i in range(4))) == [0, 1, 2, 3]
+        await func.shutdown()
+        assert QUEUE_WAIT_SECONDS.get_count(queue="test_queue", lane="bulk") == 4
+
+    async def test_rerank_cache_lookups_and_timing(self):
+        async def rerank(query, documents, top_n=None):
+            return [{"index": i, "relevance_score": 1.0} for i in range(len(documents))]
+
+        config = {
+            "rerank_model_func": rerank,
+            "workspace": "ws",
+            "rerank_cache_size": 10,
+        }
+        chunks = [{"content": "a", "chunk_id": "chunk-a"}]
+        with metrics_labels(workspace="ws", mode="mix"):
+            await apply_rerank_if_enabled("q", chunks, config)
+            await apply_rerank_if_enabled("q", chunks, config)
+
+        assert (
+            CACHE_REQUESTS_TOTAL.get(
+                workspace="ws", cache="rerank_score", result="miss"
+            )
+            == 1
+        )
+        assert (
+            CACHE_REQUESTS_TOTAL.get(workspace="ws", cache="rerank_score", result="hit")
+            == 1
+        )
+        assert (
+            QUERY_STAGE_SECONDS.get_count(workspace="ws", mode="mix", stage="rerank")
+            == 1
+        )
+
+    def test_token_tracker_feeds_counter(self):
+        tracker = TokenTracker(workspace="ws")
+        tracker.add_usage({"prompt_tokens": 10, "completion_tokens": 5})
+        assert LLM_TOKENS_TOTAL.get(workspace="ws", type="prompt") == 10
+        assert LLM_TOKENS_TOTAL.get(workspace="ws", type="completion") == 5
+        assert tracker.get_usage()["total_tokens"] == 15
@@ -0,0 +1,109 @@
+"""
+Unit tests for batched PostgreSQL upserts.
+
+PGKVStorage and PGDocStatusStorage send all rows of an upsert through
+PostgreSQLDB.executemany, which splits them into upsert_batch_size batches.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from lightrag.kg.postgres_impl import PGDocStatusStorage, PGKVStorage, PostgreSQLDB
+from lightrag.namespace import NameSpace
+
+pytestmark = pytest.mark.offline
+
+
+def make_db(upsert_batch_size: int) -> tuple[PostgreSQLDB, AsyncMock]:
+    db = PostgreSQLDB(
+        {
+            "host": "localhost",
+            "port": 5432,
+            "user": "postgres",
+            "password": "postgres",
+            "database": "postgres",
+            "workspace": None,
+            "max_connections": 10,
+            "connection_retry_attempts": 1,
+            "connection_retry_backoff": 0.0,
+            "connection_retry_backoff_max": 0.0,
+            "pool_close_timeout": 1.0,
+            "upsert_batch_size": upsert_batch_size,
+        }
+    )
+    connection = AsyncMock()
+
+    async def run_with_retry(operation, **kwargs):
+        return await operation(connection)
+
+    db._run_with_retry = AsyncMock(side_effect=run_with_retry)
+    return db, connection
+
+
+class TestPostgresBulkUpsert:
+    async def test_executemany_splits_rows_into_batches(self):
+        db, connection = make_db(upsert_batch_size=2)
+        rows = [{"workspace": "ws", "id": f"id-{i}"} for i in range(5)]
+
+        await db.executemany("INSERT", rows)
+
+        batches = [call.args[1] for call in connection.executemany.call_args_list]
+        assert batches == [
+            [("ws", "id-0"), ("ws", "id-1")],
+            [("ws", "id-2"), ("ws", "id-3")],
+            [("ws", "id-4")],
+        ]
+        assert db._run_with_retry.call_count == 3
+
+    async def test_kv_upsert_sends_one_executemany(self):
+        db = AsyncMock()
+        storage = PGKVStorage(
+            namespace=NameSpace.KV_STORE_FULL_DOCS,
+            global_config={"embedding_batch_num": 10},
+            embedding_func=None,
+            workspace="ws",
+            db=db,
+        )
+
+        await storage.upsert(
+            {
+                f"doc-{i}": {"content": f"text {i}", "file_path": "a.txt"}
+                for i in range(3)
+            }
+        )
+
+        db.execute.assert_not_called()
+        db.executemany.assert_awaited_once()
+        rows = db.executemany.call_args.args[1]
+        assert [row["id"] for row in rows] == ["doc-0", "doc-1", "doc-2"]
+
+    async def test_doc_status_upsert_sends_one_executemany(self):
+        db = AsyncMock()
+        storage = PGDocStatusStorage(
+            namespace=NameSpace.DOC_STATUS,
+            global_config={},
+            embedding_func=None,
+            workspace="ws",
+            db=db,
+        )
+
+        await storage.upsert(
+            {
+                f"doc-{i}": {
+                    "content_summary": "summary",
+                    "content_length": 10,
+                    "status": "pending",
+                    "file_path": "a.txt",
+                    "created_at": "2025-01-01T00:00:00+00:00",
+                    "updated_at": "2025-01-01T00:00:00+00:00",
+                }
+                for i in range(3)
+            }
+        )
+
+        db.execute.assert_not_called()
+        db.executemany.assert_awaited_once()
+        rows = db.executemany.call_args.args[1]
+        assert len(rows) == 3
+        assert rows[0]["chunks_count"] == -1
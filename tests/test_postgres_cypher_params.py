@@ -0,0 +1,90 @@
+"""
+Unit tests for parameterized Cypher statements of PGGraphStorage.
+
+Values are bound through one agtype parameter, so the SQL text of a statement is
+the same for every call and asyncpg can reuse the prepared statement.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from lightrag.kg.postgres_impl import PGGraphStorage, _decode_agtype
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture
+def storage():
+    storage = PGGraphStorage(
+        namespace="chunk_entity_relation",
+        global_config={},
+        embedding_func=None,
+        workspace="ws",
+    )
+    storage.graph_name = "ws_chunk_entity_relation"
+    storage.db = AsyncMock()
+    return storage
+
+
+class TestDecodeAgtype:
+    def test_vertex_and_edge(self):
+        vertex = '{"id": 844424930131969, "label": "base", "properties": {"entity_id": "A"}}::vertex'
+        assert _decode_agtype(vertex)["properties"] == {"entity_id": "A"}
+        edge = '{"id": 1, "label": "DIRECTED", "end_id": 2, "start_id": 3, "properties": {}}::edge'
+        assert _decode_agtype(edge)["label"] == "DIRECTED"
+
+    def test_path(self):
+        path = (
+            '[{"id": 1, "label": "base", "properties": {}}::vertex, '
+            '{"id": 5, "label": "DIRECTED", "end_id": 2, "start_id": 1, "properties": {}}::edge, '
+            '{"id": 2, "label": "base", "properties": {}}::vertex]::path'
+        )
+        assert [item["id"] for item in _decode_agtype(path)] == [1, 5, 2]
+
+    def test_scalars_and_maps(self):
+        assert _decode_agtype('"a::b"') == "a::b"
+        assert _decode_agtype('{"description": "x::vertex"}') == {
+            "description": "x::vertex"
+        }
+        assert _decode_agtype("3.5::numeric") == 3.5
+        assert _decode_agtype("12") == 12
+        assert _decode_agtype(None) is None
+
+
+class TestCypherParameters:
+    async def test_upserts_share_one_statement(self, storage):
+        await storage.upsert_node("A", {"entity_id": "A", "description": 'say "$$"'})
+        await storage.upsert_node("B\\", {"entity_id": "B\\", "description": "b"})
+
+        (sql_a, data_a), (sql_b, data_b) = [
+            call.args for call in storage.db.execute.call_args_list
+        ]
+        assert sql_a == sql_b
+        assert "$$" not in sql_a
+        assert json.loads(data_a["params"]) == {
+            "entity_id": "A",
+            "properties": {"entity_id": "A", "description": 'say "$$"'},
+        }
+        assert json.loads(data_b["params"])["entity_id"] == "B\\"
+
+    async def test_edges_are_removed_in_one_statement(self, storage):
+        await storage.remove_edges([("A", "B"), ("C", "D")])
+
+        # One Cypher statement, then the degree refresh of the endpoints
+        (_, data), (_, refresh) = [
+            call.args for call in storage.db.execute.call_args_list
+        ]
+        assert refresh == {"ids": ["A", "B", "C", "D"]}
+        params = json.loads(data["params"])
+        assert params == {"pairs": [{"src": "A", "tgt": "B"}, {"src": "C", "tgt": "D"}]}
+
+    async def test_only_agtype_columns_are_decoded(self, storage):
+        storage.db.query = AsyncMock(
+            return_value=[
+                {"source": "123", "target": "B", "edge_properties": '{"weight": 2.0}'}
+            ]
+        )
+        edges = await storage.get_edges_batch([{"src": "123", "tgt": "B"}])
+        assert edges == {("123", "B"): {"weight": 2.0}}
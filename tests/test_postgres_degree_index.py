@@ -0,0 +1,92 @@
+"""
+Unit tests for the node degree table of PGGraphStorage.
+
+Edge writes recount the degrees of the touched nodes into a side table, so
+degree lookups and popular labels are point reads instead of aggregates over
+the edge table.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from lightrag.kg.postgres_impl import PGGraphStorage
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture
+def storage():
+    storage = PGGraphStorage(
+        namespace="chunk_entity_relation",
+        global_config={},
+        embedding_func=None,
+        workspace="ws",
+    )
+    storage.graph_name = "ws_chunk_entity_relation"
+    storage.db = AsyncMock()
+    return storage
+
+
+class TestPGDegreeIndex:
+    async def test_edge_writes_refresh_endpoint_degrees(self, storage):
+        await storage.upsert_edge("A", "B", {"weight": 1.0})
+
+        (_, _), (refresh_sql, refresh_args) = [
+            call.args for call in storage.db.execute.call_args_list
+        ]
+        assert '"_node_degree"' in refresh_sql
+        assert refresh_args == {"ids": ["A", "B"]}
+
+        storage.db.execute.reset_mock()
+        await storage.remove_edges([("A", "B"), ("B", "C")])
+        assert storage.db.execute.call_args.args[1] == {"ids": ["A", "B", "C"]}
+
+    async def test_deleted_node_refreshes_its_neighbours(self, storage):
+        storage.get_node_edges = AsyncMock(return_value=[("A", "B"), ("C", "A")])
+
+        await storage.delete_node("A")
+
+        assert storage.db.execute.call_args.args[1] == {"ids": ["A", "B", "C"]}
+
+    async def test_degrees_are_read_from_the_table(self, storage):
+        storage.db.query = AsyncMock(
+            return_value=[
+                {"entity_id": "A", "degree": 3},
+                {"entity_id": "B", "degree": 1},
+            ]
+        )
+
+        degrees = await storage.node_degrees_batch(["A", "B", "Z", "A"])
+        assert degrees == {"A": 3, "B": 1, "Z": 0}
+        sql, params = storage.db.query.call_args.args
+        assert '"_node_degree"' in sql and "DIRECTED" not in sql
+        assert params == [["A", "B", "Z"]]
+
+        assert await storage.edge_degrees_batch([("A", "B")]) == {("A", "B"): 4}
+
+        storage.db.query = AsyncMock(return_value=[{"label": "A"}, {"label": "B"}])
+        assert await storage.get_popular_labels(limit=2) == ["A", "B"]
+        sql, params = storage.db.query.call_args.args
+        assert "ORDER BY degree DESC" in sql and "DIRECTED" not in sql
+        assert params == [2]
+
+    async def test_backfill_keys_match_refresh_and_lookup_keys(self, storage):
+        storage.db.query = AsyncMock(return_value={"present": False})
+
+        await storage._create_degree_index()
+
+        backfill = storage.db.execute.call_args_list[-1].args[0]
+        assert backfill.lstrip().startswith("INSERT INTO")
+        # The agtype string is decoded to the plain entity id, not kept as
+        # its quoted JSON text
+        label = backfill.split("AS label")[0].rsplit("SELECT", 1)[1]
+        assert "::json #>> '{}'" in label
+
+        # Edge writes and degree lookups key the table by the same plain ids
+        storage.db.execute.reset_mock()
+        await storage.upsert_edge('Say "Hi"', "Bob", {"weight": 1.0})
+        assert storage.db.execute.call_args.args[1] == {"ids": ['Say "Hi"', "Bob"]}
+        storage.db.query = AsyncMock(return_value=[])
+        await storage.node_degrees_batch(['Say "Hi"'])
+        assert storage.db.query.call_args.args[1] == [['Say "Hi"']]
@@ -0,0 +1,119 @@
+"""
+Unit tests for the server-side subgraph query of PGGraphStorage.
+
+get_knowledge_graph fetches a node's neighbourhood with one recursive SQL query
+and caches the result until the graph data generation changes.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from lightrag.kg.postgres_impl import PGGraphStorage
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    get_update_flag,
+    initialize_share_data,
+)
+
+pytestmark = pytest.mark.offline
+
+
+def node_row(node_id, entity_id, depth, degree, reached):
+    return {
+        "kind": "node",
+        "id": node_id,
+        "properties": f'{{"entity_id": "{entity_id}", "description": "a::b"}}',
+        "source": None,
+        "target": None,
+        "depth": depth,
+        "degree": degree,
+        "reached": reached,
+    }
+
+
+def edge_row(edge_id, source, target):
+    return {
+        "kind": "edge",
+        "id": edge_id,
+        "properties": '{"weight": 1.0}',
+        "source": source,
+        "target": target,
+        "depth": None,
+        "degree": None,
+        "reached": None,
+    }
+
+
+@pytest.fixture
+def storage():
+    storage = PGGraphStorage(
+        namespace="chunk_entity_relation",
+        global_config={"max_graph_nodes": 1000},
+        embedding_func=None,
+        workspace="ws",
+    )
+    storage.graph_name = "ws_chunk_entity_relation"
+    storage.db = AsyncMock()
+    storage.db.query = AsyncMock(
+        return_value=[
+            edge_row("20", "1", "3"),
+            node_row("3", "Leaf", 1, 1, 4),
+            node_row("1", "Hub", 0, 3, 4),
+            node_row("2", "Big", 1, 5, 4),
+            edge_row("21", "2", "1"),
+        ]
+    )
+    return storage
+
+
+class TestPGGraphSubgraph:
+    async def test_subgraph_is_built_from_one_query(self, storage):
+        kg = await storage.get_knowledge_graph("Hub", max_depth=2, max_nodes=3)
+
+        storage.db.query.assert_awaited_once()
+        assert storage.db.query.call_args.args[1] == ["Hub", 2, 3]
+        # Start node first, then neighbours by degree
+        assert [node.labels[0] for node in kg.nodes] == ["Hub", "Big", "Leaf"]
+        assert kg.nodes[0].properties["description"] == "a::b"
+        assert {(edge.source, edge.target) for edge in kg.edges} == {
+            ("1", "3"),
+            ("2", "1"),
+        }
+        assert kg.edges[0].properties == {"weight": 1.0}
+        # Four nodes were reached within max_depth, three returned
+        assert kg.is_truncated
+
+    async def test_cached_subgraph_is_reused_until_the_graph_changes(self, storage):
+        first = await storage.get_knowledge_graph("Hub", max_depth=2)
+        first.nodes.clear()
+        second = await storage.get_knowledge_graph("Hub", max_depth=2)
+        assert len(second.nodes) == 3
+        assert storage.db.query.await_count == 1
+
+        # Other parameters are cached separately
+        await storage.get_knowledge_graph("Hub", max_depth=1)
+        assert storage.db.query.await_count == 2
+
+        storage.get_node_edges = AsyncMock(return_value=[])
+        await storage.delete_node("Leaf")
+        await storage.get_knowledge_graph("Hub", max_depth=2)
+        assert storage.db.query.await_count == 3
+
+    async def test_writes_invalidate_other_workers_without_index_done(self, storage):
+        finalize_share_data()
+        initialize_share_data()
+        try:
+            storage.storage_updated = await get_update_flag(
+                storage.namespace, workspace=storage.workspace
+            )
+            other_worker = await get_update_flag(
+                storage.namespace, workspace=storage.workspace
+            )
+            other_worker.value = False
+
+            # Other workers learn of the write before the pipeline run ends
+            await storage.upsert_node("Leaf", {"entity_id": "Leaf"})
+            assert other_worker.value
+        finally:
+            finalize_share_data()
@@ -0,0 +1,77 @@
+"""
+Unit tests for the interactive lane of priority_limit_async_func_call.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.metrics import QUEUE_WAIT_SECONDS
+from lightrag.rate_limit import AdaptiveConcurrency
+from lightrag.utils import priority_limit_async_func_call
+
+
+@pytest.mark.offline
+class TestPriorityLanes:
+    async def test_reserved_worker_serves_queries_during_bulk_load(self):
+        running_bulk = peak_bulk = 0
+
+        @priority_limit_async_func_call(3, reserved_workers=1, queue_name="lanes")
+        async def llm(kind, duration):
+            nonlocal running_bulk, peak_bulk
+            if kind == "bulk":
+                running_bulk += 1
+                peak_bulk = max(peak_bulk, running_bulk)
+            await asyncio.sleep(duration)
+            if kind == "bulk":
+                running_bulk -= 1
+            return kind
+
+        bulk = [asyncio.create_task(llm("bulk", 0.2, _priority=8)) for _ in range(6)]
+        await asyncio.sleep(0.02)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await llm("query", 0.01, _priority=5) == "query"
+        assert loop.time() - started < 0.15
+
+        assert await asyncio.gather(*bulk) == ["bulk"] * 6
+        assert peak_bulk == 2
+        assert QUEUE_WAIT_SECONDS.get_count(queue="lanes", lane="interactive") == 1
+        assert QUEUE_WAIT_SECONDS.get_count(queue="lanes", lane="bulk") == 6
+        await llm.shutdown()
+
+    async def test_preempted_bulk_call_yields_worker_to_query(self):
+        order = []
+        concurrency = AdaptiveConcurrency(1, name="preempt")
+
+        @priority_limit_async_func_call(2, concurrency=concurrency, preempt=True)
+        async def llm(name):
+            order.append(name)
+            await asyncio.sleep(0.05)
+            return name
+
+        bulk = [asyncio.create_task(llm(f"bulk{i}", _priority=8)) for i in range(2)]
+        # bulk0 runs, bulk1 holds the second worker waiting for the only slot
+        await asyncio.sleep(0.02)
+        query = asyncio.create_task(llm("query", _priority=5))
+
+        assert await asyncio.gather(query, *bulk) == ["query", "bulk0", "bulk1"]
+        assert order == ["bulk0", "query", "bulk1"]
+        await llm.shutdown()
+
+    async def test_without_preemption_query_waits_for_queued_bulk_call(self):
+        order = []
+        concurrency = AdaptiveConcurrency(1, name="no preempt")
+
+        @priority_limit_async_func_call(2, concurrency=concurrency)
+        async def llm(name):
+            order.append(name)
+            await asyncio.sleep(0.05)
+            return name
+
+        bulk = [asyncio.create_task(llm(f"bulk{i}", _priority=8)) for i in range(2)]
+        await asyncio.sleep(0.02)
+        await asyncio.gather(llm("query", _priority=5), *bulk)
+        assert order == ["bulk0", "bulk1", "query"]
+        await llm.shutdown()
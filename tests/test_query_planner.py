@@ -0,0 +1,163 @@
+"""
+Unit tests for the adaptive query planner.
+
+Tests QueryPlanner in lightrag/query_planner.py with a fake chunk vector store
+and preset keywords, so no LLM or embedding calls are made.
+"""
+
+import numpy as np
+import pytest
+
+from lightrag.base import QueryParam
+from lightrag.query_planner import (
+    QUERY_COMPLEXITY_COMPLEX,
+    QUERY_COMPLEXITY_MODERATE,
+    QUERY_COMPLEXITY_SIMPLE,
+    QueryPlanner,
+)
+
+
+class FakeChunksVDB:
+    """Returns fixed similarity scores for every probe."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = 0
+
+    async def query(self, query, top_k, query_embedding=None):
+        self.calls += 1
+        return [
+            {"id": f"chunk-{i}", "distance": score}
+            for i, score in enumerate(self.scores[:top_k])
+        ]
+
+
+def make_planner(**overrides):
+    return QueryPlanner({"enabled": True, **overrides})
+
+
+def make_param(**kwargs):
+    defaults = {
+        "mode": "mix",
+        "top_k": 40,
+        "chunk_top_k": 20,
+        "enable_rerank": True,
+        "max_entity_tokens": 6000,
+        "max_relation_tokens": 8000,
+        "max_total_tokens": 30000,
+        "hl_keywords": ["pricing"],
+        "ll_keywords": ["premium"],
+    }
+    defaults.update(kwargs)
+    return QueryParam(**defaults)
+
+
+LONG_QUERY = " ".join(["word"] * 12)
+
+
+@pytest.mark.offline
+class TestQueryPlanner:
+    async def test_disabled_planner_leaves_param_untouched(self):
+        planner = QueryPlanner({"enabled": False})
+        param = make_param()
+        planned, plan = await planner.plan("what is the fee?", param, {})
+        assert planned is param
+        assert plan is None
+
+    async def test_bypass_is_not_planned(self):
+        planner = make_planner()
+        param = make_param(mode="bypass")
+        planned, plan = await planner.plan("hi", param, {})
+        assert planned is param
+        assert plan is None
+
+    async def test_short_query_takes_fast_path(self):
+        planner = make_planner(probe_candidates=False)
+        planned, plan = await planner.plan("what is the fee?", make_param(), {})
+
+        assert plan.complexity == QUERY_COMPLEXITY_SIMPLE
+        assert planned.mode == "mix"
+        assert planned.enable_rerank is False
+        assert planned.top_k == 20
+        assert planned.chunk_top_k == 5
+        assert planned.max_total_tokens == 15000
+        assert planner.get_stats()["rerank_skipped"] == 1
+
+    async def test_dominant_chunk_switches_to_naive(self):
+        planner = make_planner()
+        vdb = FakeChunksVDB([0.9, 0.4, 0.35])
+        planned, plan = await planner.plan(LONG_QUERY, make_param(), {}, chunks_vdb=vdb)
+
+        assert vdb.calls == 1
+        assert plan.complexity == QUERY_COMPLEXITY_SIMPLE
+        assert planned.mode == "naive"
+        assert plan.signals.top_score == 0.9
+        assert plan.signals.score_margin == pytest.approx(0.525)
+
+    async def test_numpy_probe_scores_are_used(self):
+        planner = make_planner()
+        vdb = FakeChunksVDB([np.float32(0.9), np.float32(0.4), np.float32(0.35)])
+        planned, plan = await planner.plan(LONG_QUERY, make_param(), {}, chunks_vdb=vdb)
+
+        assert plan.signals.probe_count == 3
+        assert planned.mode == "naive"
+
+    async def test_flat_probe_keeps_user_settings(self):
+        planner = make_planner()
+        vdb = FakeChunksVDB([0.5, 0.49, 0.48])
+        param = make_param()
+        planned, plan = await planner.plan(LONG_QUERY, param, {}, chunks_vdb=vdb)
+
+        assert plan.complexity == QUERY_COMPLEXITY_MODERATE
+        assert planned.mode == "mix"
+        assert planned.enable_rerank is True
+        assert planned.top_k == param.top_k
+        assert planned.chunk_top_k == param.chunk_top_k
+
+    async def test_long_query_is_complex(self):
+        planner = make_planner(probe_candidates=False)
+        query = " ".join(["word"] * 30)
+        planned, plan = await planner.plan(query, make_param(), {})
+
+        assert plan.complexity == QUERY_COMPLEXITY_COMPLEX
+        assert planned.enable_rerank is True
+
+    async def test_never_enables_rerank_or_raises_sizes(self):
+        planner = make_planner(probe_candidates=False)
+        param = make_param(enable_rerank=False, top_k=10, chunk_top_k=3)
+        planned, plan = await planner.plan("fee?", param, {})
+
+        assert planned.enable_rerank is False
+        assert planned.top_k == 10
+        assert planned.chunk_top_k == 3
+        assert planner.get_stats()["rerank_skipped"] == 0
+
+    async def test_keywords_are_handed_to_retrieval(self):
+        planner = make_planner(probe_candidates=False)
+        planned, _ = await planner.plan(LONG_QUERY, make_param(), {})
+        assert planned.hl_keywords == ["pricing"]
+        assert planned.ll_keywords == ["premium"]
+
+    async def test_mode_change_can_be_disabled(self):
+        planner = make_planner(allow_mode_change=False)
+        vdb = FakeChunksVDB([0.9, 0.1])
+        planned, _ = await planner.plan("fee?", make_param(), {}, chunks_vdb=vdb)
+        assert planned.mode == "mix"
+
+    async def test_probe_failure_is_not_fatal(self):
+        class BrokenVDB:
+            async def query(self, query, top_k, query_embedding=None):
+                raise RuntimeError("vector store down")
+
+        planner = make_planner()
+        planned, plan = await planner.plan(
+            LONG_QUERY, make_param(), {}, chunks_vdb=BrokenVDB()
+        )
+        assert plan.signals.top_score is None
+        assert planned.mode == "mix"
+
+    async def test_explain_does_not_record_stats(self):
+        planner = QueryPlanner({"enabled": False, "probe_candidates": False})
+        _, plan = await planner.explain("fee?", make_param(), {})
+        assert plan.complexity == QUERY_COMPLEXITY_SIMPLE
+        assert planner.get_stats()["total_queries"] == 0
@@ -0,0 +1,202 @@
+"""
+Unit tests for the rate limiter and adaptive concurrency in lightrag/rate_limit.py.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from lightrag.kg import shared_storage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.rate_limit import (
+    RATE_LIMIT_NAMESPACE,
+    AdaptiveConcurrency,
+    LimitedCall,
+    TokenBucketLimiter,
+    make_token_estimator,
+    record_token_usage,
+    streamed_usage_reporter,
+)
+from lightrag.utils import priority_limit_async_func_call
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class _WordTokenizer:
+    def encode(self, content: str) -> list[str]:
+        return content.split()
+
+
+@pytest.mark.offline
+class TestTokenBucketLimiter:
+    async def test_waits_when_request_budget_is_spent(self):
+        # 600 rpm refills one request every 0.1s
+        limiter = TokenBucketLimiter(rpm=600, name="rpm")
+        limiter._local_state["rpm"] = {
+            "requests": 1,
+            "tokens": 0,
+            "updated": time.time(),
+        }
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await limiter.acquire()
+        await limiter.acquire()
+        assert loop.time() - started >= 0.08
+
+    async def test_settle_and_penalize_adjust_token_bucket(self):
+        limiter = TokenBucketLimiter(tpm=6000, name="tpm")
+        await limiter.acquire(1000)
+        assert limiter._local_state["tpm"]["tokens"] == pytest.approx(5000, abs=5)
+
+        await limiter.settle(estimated=1000, actual=3000)
+        assert limiter._local_state["tpm"]["tokens"] == pytest.approx(3000, abs=5)
+
+        await limiter.penalize()
+        assert limiter._local_state["tpm"]["tokens"] <= 0
+
+    async def test_shared_buckets_use_shared_namespace(self):
+        finalize_share_data()
+        initialize_share_data()
+        try:
+            first = TokenBucketLimiter(tpm=6000, name="llm:shared", shared=True)
+            second = TokenBucketLimiter(tpm=6000, name="llm:shared", shared=True)
+            await first.acquire(2000)
+            await second.acquire(2000)
+
+            store = await shared_storage.get_namespace_data(
+                RATE_LIMIT_NAMESPACE, workspace=""
+            )
+            assert store["llm:shared"]["tokens"] == pytest.approx(2000, abs=5)
+        finally:
+            finalize_share_data()
+
+    def test_token_estimator_counts_prompt_and_history(self):
+        estimate = make_token_estimator(_WordTokenizer())
+        tokens = estimate(
+            ("one two three",),
+            {
+                "system_prompt": "four five",
+                "history_messages": [{"role": "user", "content": "six"}],
+            },
+        )
+        assert tokens == 6
+
+    def test_token_estimator_expects_completion_tokens(self):
+        estimate = make_token_estimator(_WordTokenizer(), completion_tokens=50)
+        assert estimate(("one two",), {}) == 52
+        assert estimate(("one two",), {"max_tokens": 10}) == 12
+
+
+@pytest.mark.offline
+class TestAdaptiveConcurrency:
+    async def test_rate_limit_halves_once_and_success_regrows(self):
+        concurrency = AdaptiveConcurrency(8, name="aimd")
+
+        async def call(error=None):
+            async with LimitedCall(concurrency=concurrency):
+                await asyncio.sleep(0.01)
+                if error:
+                    raise error
+
+        # Calls that ran together back off once
+        results = await asyncio.gather(
+            *(call(RateLimitError("429")) for _ in range(4)), return_exceptions=True
+        )
+        assert all(isinstance(r, RateLimitError) for r in results)
+        assert int(concurrency.limit) == 4
+
+        for _ in range(8):
+            await call()
+        assert int(concurrency.limit) == 5
+
+    async def test_other_errors_do_not_back_off(self):
+        concurrency = AdaptiveConcurrency(4, name="errors")
+        with pytest.raises(ValueError):
+            async with LimitedCall(concurrency=concurrency):
+                raise ValueError("bad request")
+        assert int(concurrency.limit) == 4 and concurrency.in_flight == 0
+
+    async def test_freed_slots_go_to_the_lowest_priority_value(self):
+        concurrency = AdaptiveConcurrency(1, name="order")
+        await concurrency.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            await concurrency.acquire(priority)
+            order.append(name)
+            concurrency.release(None)
+
+        waiters = [
+            asyncio.create_task(waiter(name, priority))
+            for name, priority in (("bulk", 8), ("bulk2", 8), ("query", 5))
+        ]
+        await asyncio.sleep(0)
+        concurrency.release(None)
+        await asyncio.gather(*waiters)
+        assert order == ["query", "bulk", "bulk2"]
+
+    async def test_limit_caps_calls_in_flight(self):
+        concurrency = AdaptiveConcurrency(2, name="in flight")
+        running = peak = 0
+
+        @priority_limit_async_func_call(4, concurrency=concurrency)
+        async def llm(prompt):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return prompt
+
+        assert await asyncio.gather(*(llm(i) for i in range(8))) == list(range(8))
+        assert peak == 2
+        await llm.shutdown()
+
+
+@pytest.mark.offline
+class TestLimitedLLMCalls:
+    async def test_reported_usage_settles_estimate(self):
+        limiter = TokenBucketLimiter(tpm=60000, name="usage")
+
+        @priority_limit_async_func_call(
+            2,
+            rate_limiter=limiter,
+            token_estimator=make_token_estimator(_WordTokenizer()),
+        )
+        async def llm(prompt):
+            # As the LLM bindings do with the usage of a response
+            record_token_usage(100)
+            return "ok"
+
+        assert await llm("a b c") == "ok"
+        # Charged 3 estimated tokens, settled to the 100 reported
+        assert limiter._local_state["usage"]["tokens"] == pytest.approx(59900, abs=5)
+        await llm.shutdown()
+
+    async def test_stream_settles_estimate_when_it_ends(self):
+        limiter = TokenBucketLimiter(tpm=60000, name="stream")
+
+        @priority_limit_async_func_call(
+            2,
+            rate_limiter=limiter,
+            token_estimator=make_token_estimator(_WordTokenizer()),
+        )
+        async def llm(prompt):
+            report_usage = streamed_usage_reporter()
+
+            async def stream():
+                yield "ok"
+                await report_usage(100)
+
+            return stream()
+
+        chunks = await llm("a b c")
+        # Charged the estimate until the stream reports its usage
+        assert limiter._local_state["stream"]["tokens"] == pytest.approx(59997, abs=5)
+        assert [chunk async for chunk in chunks] == ["ok"]
+        assert limiter._local_state["stream"]["tokens"] == pytest.approx(59900, abs=5)
+        await llm.shutdown()
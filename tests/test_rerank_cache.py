@@ -0,0 +1,206 @@
+"""
+Unit tests for rerank score caching and candidate pruning.
+
+Tests apply_rerank_if_enabled, prune_rerank_candidates and the per-workspace
+RerankScoreCache in lightrag/utils.py.
+"""
+
+import numpy as np
+import pytest
+
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.utils import (
+    RerankScoreCache,
+    _rerank_score_caches,
+    EmbeddingFunc,
+    Tokenizer,
+    apply_rerank_if_enabled,
+    normalize_rerank_query,
+    prune_rerank_candidates,
+)
+
+
+def make_chunks(n, with_distance=False):
+    chunks = []
+    for i in range(n):
+        chunk = {"content": f"content {i}", "chunk_id": f"chunk-{i}"}
+        if with_distance:
+            chunk["distance"] = i / 10
+        chunks.append(chunk)
+    return chunks
+
+
+class RecordingRerank:
+    """Fake rerank function: scores documents by their numeric suffix."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, query, documents, top_n=None):
+        self.calls.append({"query": query, "documents": documents, "top_n": top_n})
+        results = [
+            {"index": i, "relevance_score": int(doc.split()[-1]) / 100}
+            for i, doc in enumerate(documents)
+        ]
+        results.sort(key=lambda r: r["relevance_score"], reverse=True)
+        return results[:top_n] if top_n else results
+
+
+@pytest.mark.offline
+class TestPruneRerankCandidates:
+    def test_keeps_all_below_cap(self):
+        chunks = make_chunks(5)
+        assert prune_rerank_candidates(chunks, 10) is chunks
+
+    def test_disabled_with_zero(self):
+        chunks = make_chunks(5)
+        assert prune_rerank_candidates(chunks, 0) is chunks
+
+    def test_drops_lowest_vector_scores(self):
+        chunks = make_chunks(6, with_distance=True)
+        pruned = prune_rerank_candidates(chunks, 3)
+        assert [c["chunk_id"] for c in pruned] == ["chunk-5", "chunk-4", "chunk-3"]
+
+    def test_ranks_numpy_scores(self):
+        chunks = make_chunks(6, with_distance=True)
+        for chunk in chunks:
+            chunk["distance"] = np.float32(chunk["distance"])
+        pruned = prune_rerank_candidates(chunks, 3)
+        assert [c["chunk_id"] for c in pruned] == ["chunk-5", "chunk-4", "chunk-3"]
+
+    def test_keeps_merge_order_without_scores(self):
+        chunks = make_chunks(6, with_distance=True)
+        chunks[2]["distance"] = None  # e.g. a graph-sourced chunk
+        pruned = prune_rerank_candidates(chunks, 3)
+        assert [c["chunk_id"] for c in pruned] == ["chunk-0", "chunk-1", "chunk-2"]
+
+
+@pytest.mark.offline
+class TestRerankScoreCache:
+    def setup_method(self):
+        _rerank_score_caches.clear()
+
+    def teardown_method(self):
+        _rerank_score_caches.clear()
+
+    def test_lru_eviction(self):
+        cache = RerankScoreCache(max_size=2)
+        cache.put("q", "a", 0.1)
+        cache.put("q", "b", 0.2)
+        assert cache.get("q", "a") == 0.1
+        cache.put("q", "c", 0.3)
+        assert cache.get("q", "b") is None
+        assert len(cache) == 2
+
+    def test_query_normalization(self):
+        assert normalize_rerank_query("  What   IS  this? ") == "what is this?"
+
+    async def test_repeated_query_is_served_from_cache(self):
+        rerank = RecordingRerank()
+        config = {
+            "rerank_model_func": rerank,
+            "workspace": "ws",
+            "rerank_cache_size": 100,
+        }
+        chunks = make_chunks(4)
+
+        first = await apply_rerank_if_enabled("Query", chunks, config, top_n=2)
+        second = await apply_rerank_if_enabled(" query ", chunks, config, top_n=2)
+
+        assert len(rerank.calls) == 1
+        # Cache enabled: all scores requested, top_n applied locally
+        assert rerank.calls[0]["top_n"] is None
+        assert [c["chunk_id"] for c in first] == ["chunk-3", "chunk-2"]
+        assert first == second
+
+    async def test_follow_up_query_sends_only_new_chunks(self):
+        rerank = RecordingRerank()
+        config = {
+            "rerank_model_func": rerank,
+            "workspace": "ws",
+            "rerank_cache_size": 100,
+        }
+
+        await apply_rerank_if_enabled("query", make_chunks(3), config)
+        result = await apply_rerank_if_enabled("query", make_chunks(5), config)
+
+        assert rerank.calls[1]["documents"] == ["content 3", "content 4"]
+        assert [c["chunk_id"] for c in result] == [
+            "chunk-4",
+            "chunk-3",
+            "chunk-2",
+            "chunk-1",
+            "chunk-0",
+        ]
+
+    async def test_workspaces_do_not_share_scores(self):
+        rerank = RecordingRerank()
+        chunks = make_chunks(2)
+        for workspace in ("a", "b"):
+            config = {
+                "rerank_model_func": rerank,
+                "workspace": workspace,
+                "rerank_cache_size": 100,
+            }
+            await apply_rerank_if_enabled("query", chunks, config)
+        assert len(rerank.calls) == 2
+
+    async def test_cache_disabled_passes_top_n(self):
+        rerank = RecordingRerank()
+        config = {"rerank_model_func": rerank, "rerank_cache_size": 0}
+        chunks = make_chunks(4)
+
+        await apply_rerank_if_enabled("query", chunks, config, top_n=2)
+        await apply_rerank_if_enabled("query", chunks, config, top_n=2)
+
+        assert len(rerank.calls) == 2
+        assert rerank.calls[0]["top_n"] == 2
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def mock_llm(prompt, system_prompt=None, history_messages=[], **kwargs):
+    return """entity<|#|>Alpha<|#|>organization<|#|>Alpha is a company.
+<|COMPLETE|>"""
+
+
+async def constant_embedding(texts: list[str]) -> np.ndarray:
+    return np.ones((len(texts), 16), dtype=np.float32)
+
+
+@pytest.mark.offline
+class TestNanoVectorNaiveQuery:
+    async def test_naive_query_with_nano_distances(self, tmp_path):
+        """NanoVectorDB distances survive the JSON based token truncation"""
+        from lightrag import LightRAG, QueryParam
+
+        finalize_share_data()
+        rag = LightRAG(
+            working_dir=str(tmp_path),
+            llm_model_func=mock_llm,
+            embedding_func=EmbeddingFunc(
+                embedding_dim=16, max_token_size=8192, func=constant_embedding
+            ),
+            tokenizer=Tokenizer("mock-tokenizer", _CharTokenizer()),
+            entity_extract_max_gleaning=0,
+            vector_storage="NanoVectorDBStorage",
+        )
+        await rag.initialize_storages()
+        try:
+            await rag.ainsert("Alpha reported 42 results.")
+            result = await rag.aquery_llm(
+                "What did Alpha report?",
+                param=QueryParam(mode="naive", enable_rerank=False),
+            )
+        finally:
+            await rag.finalize_storages()
+            finalize_share_data()
+
+        assert result["status"] == "success"
+        assert len(result["data"]["chunks"]) == 1
@@ -0,0 +1,151 @@
+"""
+Unit tests for shared memory snapshots of file based storages.
+
+Two storage instances in one process stand in for two gunicorn workers: the
+writer publishes its state on index_done_callback and the reader maps it (the
+vector matrix) or unpickles it (a graph) instead of reloading the data file.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from lightrag.kg import shared_storage
+from lightrag.kg.shared_memory_snapshot import (
+    load_latest_snapshot,
+    publish_snapshot,
+    read_snapshot,
+    unlink_snapshot,
+    write_snapshot,
+)
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="POSIX shared memory only")
+
+DIM = 8
+
+
+def make_embedding_func():
+    async def embed(texts, **kwargs):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(DIM)
+            vector[sum(map(ord, text)) % DIM] = 1.0
+            vector[len(text) % DIM] += 0.5
+            vectors.append(vector)
+        return np.array(vectors)
+
+    return EmbeddingFunc(embedding_dim=DIM, func=embed, model_name="test-model")
+
+
+@pytest.fixture
+def multiprocess_state(monkeypatch):
+    monkeypatch.setenv("ENABLE_SHARED_MEMORY_SNAPSHOTS", "true")
+    finalize_share_data()
+    initialize_share_data(workers=2)
+    shared_storage.set_default_workspace("")
+    yield
+    finalize_share_data()
+
+
+@pytest.mark.offline
+class TestSharedMemorySnapshot:
+    def test_segment_roundtrip_is_read_only(self):
+        name = "lrtest_roundtrip"
+        unlink_snapshot(name)
+        matrix = np.arange(12, dtype=np.float32).reshape(3, 4)
+        write_snapshot(name, {"matrix": matrix, "ids": np.arange(3)}, b"payload")
+        try:
+            snapshot = read_snapshot(name, generation=7)
+            np.testing.assert_array_equal(snapshot.arrays["matrix"], matrix)
+            np.testing.assert_array_equal(snapshot.arrays["ids"], np.arange(3))
+            assert bytes(snapshot.payload) == b"payload"
+            assert not snapshot.arrays["matrix"].flags.writeable
+        finally:
+            unlink_snapshot(name)
+        # Unlinking removes the name, not the existing mapping
+        assert snapshot.arrays["matrix"][2, 3] == 11
+        with pytest.raises(FileNotFoundError):
+            read_snapshot(name)
+
+    async def test_new_generation_replaces_previous(self, multiprocess_state):
+        first = await publish_snapshot("graph", "ws", {}, {"n": 1})
+        second = await publish_snapshot("graph", "ws", {}, {"n": 2})
+        assert (first.generation, second.generation) == (1, 2)
+
+        latest = await load_latest_snapshot("graph", "ws")
+        assert latest.generation == 2
+        assert latest.load_payload() == {"n": 2}
+        with pytest.raises(FileNotFoundError):
+            read_snapshot(first.name)
+
+    async def test_nano_vector_db_reader_maps_writer_matrix(
+        self, multiprocess_state, tmp_path
+    ):
+        from lightrag.kg.nano_vector_db_impl import NanoVectorDBStorage
+
+        def make_storage():
+            return NanoVectorDBStorage(
+                namespace="chunks",
+                global_config={
+                    "working_dir": str(tmp_path),
+                    "embedding_batch_num": 4,
+                    "vector_db_storage_cls_kwargs": {
+                        "cosine_better_than_threshold": 0.1
+                    },
+                },
+                embedding_func=make_embedding_func(),
+                workspace="",
+                meta_fields={"content"},
+            )
+
+        writer, reader = make_storage(), make_storage()
+        await writer.initialize()
+        await reader.initialize()
+
+        await writer.upsert({f"c{i}": {"content": f"text {i}"} for i in range(4)})
+        assert await writer.index_done_callback()
+
+        # The file is gone; the reader can only get the data from shared memory
+        (tmp_path / "vdb_chunks.json").unlink()
+        client = await reader._get_client()
+        matrix = client.storage["matrix"]
+        assert matrix.shape == (4, DIM)
+        assert not matrix.flags.writeable
+        assert (await reader.get_by_id("c2"))["content"] == "text 2"
+        assert (await reader.query("text 1", top_k=1))[0]["id"] == "c1"
+
+        # Updating an existing vector copies the shared matrix first
+        await reader.upsert({"c1": {"content": "changed"}})
+        assert client.storage["matrix"].flags.writeable
+        assert not matrix.flags.writeable
+
+    async def test_networkx_reader_uses_snapshot(
+        self, multiprocess_state, tmp_path, monkeypatch
+    ):
+        from lightrag.kg.networkx_impl import NetworkXStorage
+
+        def make_storage():
+            return NetworkXStorage(
+                namespace="chunk_entity_relation",
+                global_config={"working_dir": str(tmp_path)},
+                embedding_func=make_embedding_func(),
+                workspace="",
+            )
+
+        writer, reader = make_storage(), make_storage()
+        await writer.initialize()
+        await reader.initialize()
+
+        await writer.upsert_node("A", {"entity_type": "person"})
+        await writer.upsert_edge("A", "B", {"weight": "1.0"})
+        assert await writer.index_done_callback()
+
+        def fail_load(file_name):
+            raise AssertionError("GraphML should not be parsed")
+
+        monkeypatch.setattr(NetworkXStorage, "load_nx_graph", staticmethod(fail_load))
+        assert await reader.has_edge("A", "B")
+        assert (await reader.get_node("A"))["entity_type"] == "person"
@@ -0,0 +1,110 @@
+"""
+Unit tests for the multi-process shared-state backends in lightrag/kg/shared_storage.py.
+
+The "shm" backend keeps global locks and update flags in shared memory; these
+tests check flags and locks across a forked child process and that waiting on a
+cross-process lock does not block the event loop.
+"""
+
+import asyncio
+import multiprocessing as mp
+import threading
+
+import pytest
+
+from lightrag.kg import shared_storage
+from lightrag.kg.shared_storage import (
+    SHARED_STATE_BACKEND_MANAGER,
+    SHARED_STATE_BACKEND_SHM,
+    clear_all_update_flags,
+    finalize_share_data,
+    get_all_update_flags_status,
+    get_internal_lock,
+    get_shared_state_backend,
+    get_update_flag,
+    initialize_share_data,
+    set_all_update_flags,
+)
+
+
+@pytest.fixture
+def shared_state(request):
+    finalize_share_data()
+    initialize_share_data(workers=2, backend=request.param)
+    shared_storage.set_default_workspace("")
+    yield request.param
+    finalize_share_data()
+
+
+def _child_sets_flag(index, lock, done):
+    # Runs in a forked process: shared memory is inherited, not copied
+    with lock:
+        shared_storage._flag_slots[index] = 1
+    done.set()
+
+
+@pytest.mark.offline
+class TestSharedStateBackend:
+    @pytest.mark.parametrize(
+        "shared_state",
+        [SHARED_STATE_BACKEND_SHM, SHARED_STATE_BACKEND_MANAGER],
+        indirect=True,
+    )
+    async def test_update_flags_roundtrip(self, shared_state):
+        assert get_shared_state_backend() == shared_state
+        flags = [await get_update_flag("chunks"), await get_update_flag("chunks")]
+        assert [flag.value for flag in flags] == [False, False]
+
+        await set_all_update_flags("chunks")
+        assert [flag.value for flag in flags] == [True, True]
+        assert (await get_all_update_flags_status())["chunks"] == [True, True]
+
+        flags[0].value = False
+        assert (await get_all_update_flags_status())["chunks"] == [False, True]
+        await clear_all_update_flags("chunks")
+        assert [flag.value for flag in flags] == [False, False]
+
+    @pytest.mark.parametrize("shared_state", [SHARED_STATE_BACKEND_SHM], indirect=True)
+    async def test_flags_and_locks_are_shared_with_forked_workers(self, shared_state):
+        flag = await get_update_flag("graph")
+        ctx = mp.get_context("fork")
+        done = ctx.Event()
+        child = ctx.Process(
+            target=_child_sets_flag,
+            args=(flag.index, shared_storage._internal_lock, done),
+        )
+        child.start()
+        child.join(timeout=10)
+        assert child.exitcode == 0
+        assert flag.value is True
+
+    @pytest.mark.parametrize("shared_state", [SHARED_STATE_BACKEND_SHM], indirect=True)
+    async def test_contended_lock_does_not_block_event_loop(self, shared_state):
+        raw_lock = shared_storage._internal_lock
+        raw_lock.acquire()
+        release = threading.Timer(0.1, raw_lock.release)
+        release.start()
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            async with get_internal_lock():
+                pass
+        finally:
+            ticker_task.cancel()
+            release.join()
+        # The loop kept running while the lock was held by "another process"
+        assert ticks >= 5
+
+    def test_unknown_backend_is_rejected(self):
+        finalize_share_data()
+        with pytest.raises(ValueError):
+            initialize_share_data(workers=2, backend="redis")
+        finalize_share_data()
@@ -0,0 +1,162 @@
+"""
+Unit tests for incremental cross-process reload of file based storages.
+
+Two storage instances in one process stand in for two workers: the reader must
+catch up with the writer by applying the change log instead of re-reading the
+data file.
+"""
+
+import numpy as np
+import pytest
+
+from lightrag.kg import shared_storage
+from lightrag.kg.change_log import StorageChangeLog
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+DIM = 8
+
+
+def make_embedding_func():
+    async def embed(texts, **kwargs):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(DIM)
+            vector[sum(map(ord, text)) % DIM] = 1.0
+            vector[len(text) % DIM] += 0.5
+            vectors.append(vector)
+        return np.array(vectors)
+
+    return EmbeddingFunc(embedding_dim=DIM, func=embed, model_name="test-model")
+
+
+@pytest.fixture
+def multiprocess_state(monkeypatch):
+    monkeypatch.delenv("ENABLE_SHARED_MEMORY_SNAPSHOTS", raising=False)
+    finalize_share_data()
+    initialize_share_data(workers=2)
+    shared_storage.set_default_workspace("")
+    yield
+    finalize_share_data()
+
+
+@pytest.mark.offline
+class TestStorageChangeLog:
+    def test_read_since_and_compaction(self, tmp_path):
+        log = StorageChangeLog(str(tmp_path / "data.json"), retention=2)
+        assert log.current_generation() == 0
+        assert log.read_since(0) is None
+
+        for i in range(3):
+            assert log.append({"n": i}) == i + 1
+        assert [d["n"] for d in log.read_since(1)] == [1, 2]
+        # Generation 1 was compacted away
+        assert log.read_since(0) is None
+        # Nothing logged after the reader's generation: reload to be safe
+        assert log.read_since(3) is None
+
+        log.append_reset()
+        assert log.read_since(3) is None
+
+    async def test_nano_vector_db_reader_applies_delta(
+        self, multiprocess_state, tmp_path
+    ):
+        from lightrag.kg.nano_vector_db_impl import NanoVectorDBStorage
+
+        def make_storage():
+            return NanoVectorDBStorage(
+                namespace="chunks",
+                global_config={
+                    "working_dir": str(tmp_path),
+                    "embedding_batch_num": 4,
+                    "vector_db_storage_cls_kwargs": {
+                        "cosine_better_than_threshold": 0.1
+                    },
+                },
+                embedding_func=make_embedding_func(),
+                workspace="",
+                meta_fields={"content"},
+            )
+
+        writer, reader = make_storage(), make_storage()
+        await writer.initialize()
+        await reader.initialize()
+
+        await writer.upsert({f"c{i}": {"content": f"text {i}"} for i in range(4)})
+        assert await writer.index_done_callback()
+        await writer.delete(["c0"])
+        await writer.upsert({"c1": {"content": "changed"}, "c9": {"content": "new"}})
+        assert await writer.index_done_callback()
+
+        async def fail_load():
+            raise AssertionError("full reload should not be needed")
+
+        reader._load_client = fail_load
+        rows = await reader.get_by_ids(["c0", "c1", "c2", "c9"])
+        assert rows[0] is None
+        assert [r["content"] for r in rows[1:]] == ["changed", "text 2", "new"]
+        assert (await reader.query("new", top_k=1))[0]["id"] == "c9"
+        assert reader._change_log_generation == writer._change_log_generation == 2
+
+    async def test_networkx_reader_matches_writer(
+        self, multiprocess_state, tmp_path, monkeypatch
+    ):
+        from lightrag.kg.networkx_impl import NetworkXStorage
+
+        def make_storage():
+            return NetworkXStorage(
+                namespace="chunk_entity_relation",
+                global_config={"working_dir": str(tmp_path)},
+                embedding_func=make_embedding_func(),
+                workspace="",
+            )
+
+        writer, reader = make_storage(), make_storage()
+        await writer.initialize()
+        await reader.initialize()
+
+        await writer.upsert_node("A", {"entity_type": "person", "note": "x"})
+        await writer.upsert_edge("A", "B", {"weight": "1.0"})
+        await writer.upsert_edge("B", "C", {"weight": "2.0"})
+        assert await writer.index_done_callback()
+        assert await reader.has_edge("A", "B")
+
+        # Deleting A drops its edges; re-adding it must not resurrect them
+        await writer.delete_node("A")
+        await writer.upsert_node("A", {"entity_type": "org"})
+        await writer.upsert_edge("C", "B", {"weight": "3.0"})
+        await writer.remove_edges([("B", "C")])
+        await writer.upsert_edge("A", "C", {"weight": "4.0"})
+        assert await writer.index_done_callback()
+
+        def fail_load(file_name):
+            raise AssertionError("GraphML should not be parsed")
+
+        monkeypatch.setattr(NetworkXStorage, "load_nx_graph", staticmethod(fail_load))
+        reader_graph = await reader._get_graph()
+        assert dict(reader_graph.nodes(data=True)) == dict(
+            writer._graph.nodes(data=True)
+        )
+        assert sorted(map(sorted, reader_graph.edges())) == [["A", "C"]]
+        assert reader_graph.edges["A", "C"] == {"weight": "4.0"}
+
+    async def test_drop_forces_full_reload(self, multiprocess_state, tmp_path):
+        from lightrag.kg.networkx_impl import NetworkXStorage
+
+        def make_storage():
+            return NetworkXStorage(
+                namespace="chunk_entity_relation",
+                global_config={"working_dir": str(tmp_path)},
+                embedding_func=make_embedding_func(),
+                workspace="",
+            )
+
+        writer, reader = make_storage(), make_storage()
+        await writer.initialize()
+        await reader.initialize()
+        await writer.upsert_node("A", {"entity_type": "person"})
+        assert await writer.index_done_callback()
+        assert await reader.has_node("A")
+
+        await writer.drop()
+        assert not await reader.has_node("A")
@@ -0,0 +1,180 @@
+"""
+Unit tests for streaming queries with early context flush.
+
+Tests coalesce_text_stream in lightrag/utils.py and LightRAG.aquery_stream,
+driven by a fake aquery_llm so no storage or LLM is needed.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.base import QueryParam
+from lightrag.lightrag import LightRAG
+from lightrag.utils import coalesce_text_stream
+
+
+async def make_stream(chunks, delay=0.0):
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+class TrackedStream:
+    """Async generator wrapper that records whether it was closed."""
+
+    def __init__(self, chunks):
+        self.closed = False
+        self._stream = self._generate(chunks)
+
+    async def _generate(self, chunks):
+        try:
+            for chunk in chunks:
+                await asyncio.sleep(0)
+                yield chunk
+        finally:
+            self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._stream.__anext__()
+
+    async def aclose(self):
+        await self._stream.aclose()
+
+
+class FakeRAG:
+    """Provides the aquery_llm contract used by LightRAG.aquery_stream."""
+
+    workspace = "test"
+
+    def __init__(self, chunks, context=True, llm_started=None):
+        self.chunks = chunks
+        self.context = context
+        self.llm_started = llm_started
+        self.params = []
+
+    async def aquery_llm(self, query, param, system_prompt=None):
+        self.params.append(param)
+        raw_data = {
+            "status": "success",
+            "message": "ok",
+            "data": {"references": [{"reference_id": "1", "file_path": "a.txt"}]},
+            "metadata": {"query_mode": param.mode},
+        }
+        if self.context:
+            await param.context_callback(raw_data)
+        if self.llm_started is not None:
+            # Context must already be flushed before generation starts
+            await self.llm_started.wait()
+        raw_data["llm_response"] = {
+            "content": None,
+            "response_iterator": (
+                self.chunks
+                if isinstance(self.chunks, TrackedStream)
+                else make_stream(self.chunks)
+            ),
+            "is_streaming": True,
+        }
+        return raw_data
+
+    async def aquery_stream(self, *args, **kwargs):
+        async for event in LightRAG.aquery_stream(self, *args, **kwargs):
+            yield event
+
+
+@pytest.mark.offline
+class TestCoalesceTextStream:
+    async def test_passthrough_when_disabled(self):
+        chunks = [c async for c in coalesce_text_stream(make_stream(["a", "", "b"]), 0)]
+        assert chunks == ["a", "b"]
+
+    async def test_first_chunk_is_not_delayed(self):
+        stream = coalesce_text_stream(
+            make_stream(["Hello", " w", "o", "rld", "!"]), min_chars=4
+        )
+        chunks = [c async for c in stream]
+        assert chunks[0] == "Hello"
+        assert "".join(chunks) == "Hello world!"
+        assert chunks[1:] == [" world", "!"]
+
+    async def test_slow_upstream_flushes_on_timeout(self):
+        stream = coalesce_text_stream(
+            make_stream(["a", "b", "c"], delay=0.05), min_chars=100, max_delay_ms=10
+        )
+        chunks = [c async for c in stream]
+        assert chunks == ["a", "b", "c"]
+
+    @pytest.mark.parametrize("min_chars", [0, 4])
+    async def test_early_close_closes_upstream(self, min_chars):
+        upstream = TrackedStream(["a", "b", "c"])
+        stream = coalesce_text_stream(upstream, min_chars=min_chars)
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        assert upstream.closed
+
+
+@pytest.mark.offline
+class TestAqueryStream:
+    async def test_context_is_flushed_before_generation(self):
+        llm_started = asyncio.Event()
+        rag = FakeRAG(["Hi", " there"], llm_started=llm_started)
+
+        events = rag.aquery_stream("question", QueryParam(mode="mix", stream=False))
+        first = await events.__anext__()
+        assert first["type"] == "context"
+        assert first["data"]["data"]["references"][0]["file_path"] == "a.txt"
+
+        llm_started.set()
+        rest = [event async for event in events]
+        assert [e["content"] for e in rest if e["type"] == "token"] == ["Hi", " there"]
+        done = rest[-1]
+        assert done["type"] == "done"
+        assert done["metrics"]["token_events"] == 2
+        assert done["metrics"]["time_to_first_token"] >= 0
+        assert rag.params[0].stream is True
+
+    async def test_coalesces_tokens(self):
+        rag = FakeRAG(["a", "b", "c", "d", "e"])
+        events = [
+            event
+            async for event in rag.aquery_stream(
+                "question", QueryParam(), coalesce_chars=2, coalesce_ms=1000
+            )
+        ]
+        tokens = [e["content"] for e in events if e["type"] == "token"]
+        assert tokens == ["a", "bc", "de"]
+
+    async def test_failure_without_context(self):
+        class FailingRAG(FakeRAG):
+            async def aquery_llm(self, query, param, system_prompt=None):
+                return {
+                    "status": "failure",
+                    "message": "Query failed: boom",
+                    "data": {},
+                    "metadata": {},
+                    "llm_response": {
+                        "content": None,
+                        "response_iterator": None,
+                        "is_streaming": False,
+                    },
+                }
+
+        events = [e async for e in FailingRAG([]).aquery_stream("question")]
+        assert [e["type"] for e in events] == ["context", "error", "done"]
+        assert "llm_response" not in events[0]["data"]
+        assert events[1]["error"] == "Query failed: boom"
+
+    async def test_early_close_closes_llm_stream(self):
+        upstream = TrackedStream(["a", "b", "c"])
+        rag = FakeRAG(upstream)
+        events = LightRAG.aquery_stream(rag, "question", QueryParam())
+
+        assert (await events.__anext__())["type"] == "context"
+        assert (await events.__anext__())["type"] == "token"
+        # The client went away after the first token
+        await events.aclose()
+        assert upstream.closed
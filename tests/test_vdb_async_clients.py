@@ -0,0 +1,170 @@
+"""
+Unit tests for the non-blocking Qdrant and Milvus vector storage clients.
+
+Qdrant runs against the in-memory AsyncQdrantClient; Milvus uses a fake
+blocking client to check that calls are moved off the event loop.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from lightrag.utils import EmbeddingFunc
+
+DIM = 8
+
+
+def make_embedding_func():
+    async def embed(texts, **kwargs):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(DIM)
+            vector[sum(map(ord, text)) % DIM] = 1.0
+            vector[len(text) % DIM] += 0.5
+            vectors.append(vector)
+        return np.array(vectors)
+
+    return EmbeddingFunc(embedding_dim=DIM, func=embed, model_name="test-model")
+
+
+def make_config(**kwargs):
+    return {
+        "embedding_batch_num": 2,
+        "working_dir": "/tmp",
+        "vector_db_storage_cls_kwargs": {"cosine_better_than_threshold": 0.1},
+        **kwargs,
+    }
+
+
+@pytest.mark.offline
+class TestQdrantAsyncClient:
+    async def make_storage(self, monkeypatch):
+        from qdrant_client import AsyncQdrantClient, models
+
+        from lightrag.kg.qdrant_impl import QdrantVectorDBStorage
+
+        monkeypatch.setenv("QDRANT_UPSERT_BATCH_SIZE", "3")
+        storage = QdrantVectorDBStorage(
+            namespace="chunks",
+            global_config=make_config(),
+            embedding_func=make_embedding_func(),
+            workspace="ws",
+            meta_fields={"content"},
+        )
+        storage._client = AsyncQdrantClient(":memory:")
+        await storage._client.create_collection(
+            storage.final_namespace,
+            vectors_config=models.VectorParams(
+                size=DIM, distance=models.Distance.COSINE
+            ),
+        )
+        return storage
+
+    async def test_upsert_in_concurrent_batches(self, monkeypatch):
+        storage = await self.make_storage(monkeypatch)
+        calls = []
+        original_upsert = storage._client.upsert
+
+        async def counting_upsert(**kwargs):
+            calls.append(len(kwargs["points"]))
+            return await original_upsert(**kwargs)
+
+        storage._client.upsert = counting_upsert
+        data = {f"chunk-{i}": {"content": f"text {i}" * (i + 1)} for i in range(7)}
+        await storage.upsert(data)
+
+        assert sorted(calls) == [1, 3, 3]
+        rows = await storage.get_by_ids(["chunk-0", "chunk-6", "missing"])
+        assert rows[0]["content"] == "text 0"
+        assert rows[1]["id"] == "chunk-6"
+        assert rows[2] is None
+
+    async def test_query_batch_matches_single_queries(self, monkeypatch):
+        storage = await self.make_storage(monkeypatch)
+        data = {f"chunk-{i}": {"content": f"text {i}" * (i + 1)} for i in range(5)}
+        await storage.upsert(data)
+
+        queries = ["text 1text 1", "text 3" * 4]
+        batched = await storage.query_batch(queries, top_k=2)
+        singles = await asyncio.gather(*(storage.query(q, top_k=2) for q in queries))
+
+        assert len(batched) == 2
+        for batch_rows, single_rows in zip(batched, singles):
+            assert [r["id"] for r in batch_rows] == [r["id"] for r in single_rows]
+            assert all("distance" in r for r in batch_rows)
+        assert await storage.query_batch([], top_k=2) == []
+
+    async def test_delete_and_drop(self, monkeypatch):
+        storage = await self.make_storage(monkeypatch)
+        await storage.upsert({"a": {"content": "alpha"}, "b": {"content": "beta"}})
+        await storage.delete(["a"])
+        assert await storage.get_by_id("a") is None
+        assert (await storage.get_by_id("b"))["content"] == "beta"
+
+        assert (await storage.drop())["status"] == "success"
+        assert await storage.get_by_id("b") is None
+        await storage.finalize()
+        assert storage._client is None
+
+
+@pytest.mark.offline
+class TestMilvusExecutor:
+    async def test_blocking_calls_run_off_the_event_loop(self, monkeypatch):
+        pytest.importorskip("pymilvus")
+        from lightrag.kg.milvus_impl import MilvusVectorDBStorage
+
+        loop_thread = threading.get_ident()
+
+        class FakeMilvusClient:
+            def __init__(self):
+                self.threads = []
+                self.upserts = []
+                self.loads = 0
+
+            def _record(self):
+                self.threads.append(threading.get_ident())
+
+            def has_collection(self, name):
+                self._record()
+                return True
+
+            def load_collection(self, name):
+                self._record()
+                self.loads += 1
+
+            def upsert(self, collection_name, data):
+                self._record()
+                self.upserts.append(len(data))
+
+            def search(self, collection_name, data, **kwargs):
+                self._record()
+                return [
+                    [{"id": "x", "distance": 0.9, "entity": {"content": "x"}}]
+                    for _ in data
+                ]
+
+            def close(self):
+                pass
+
+        monkeypatch.setenv("MILVUS_UPSERT_BATCH_SIZE", "2")
+        storage = MilvusVectorDBStorage(
+            namespace="chunks",
+            global_config=make_config(),
+            embedding_func=make_embedding_func(),
+            workspace="ws",
+            meta_fields={"content"},
+        )
+        client = FakeMilvusClient()
+        storage._client = client
+
+        await storage.upsert({f"c{i}": {"content": f"t{i}"} for i in range(5)})
+        results = await storage.query_batch(["a", "b", "c"], top_k=1)
+
+        assert sorted(client.upserts) == [1, 2, 2]
+        assert [r[0]["id"] for r in results] == ["x", "x", "x"]
+        assert client.threads and loop_thread not in client.threads
+        # The collection is loaded once and then remembered
+        assert client.loads == 1
+        await storage.finalize()